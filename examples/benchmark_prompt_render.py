@@ -0,0 +1,66 @@
+"""
+提示词渲染性能基准
+
+对比逐变量str.replace的旧渲染方式与编译模板的单次遍历渲染，
+使用默认角色提示词作为测试模板。
+
+运行方式:
+    python examples/benchmark_prompt_render.py
+"""
+
+import os
+import sys
+import timeit
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.prompt_manager import PromptManager
+
+
+CHARACTER_VARIABLES = {
+    'character_name': '小可',
+    'character_age': '17',
+    'character_gender': '女',
+    'character_role': '高中生',
+    'character_height': '150cm',
+    'character_weight': '45kg',
+    'character_personality': '活泼开朗',
+    'character_background': '普通高中的学生',
+    'character_hobby': '历史、音乐',
+}
+
+
+def legacy_render(template: str, variables: dict) -> str:
+    """旧版渲染：每个变量对整个模板执行一次replace"""
+    result = template
+    for key, value in variables.items():
+        result = result.replace(f"{{{key}}}", str(value) if value is not None else "")
+    return result
+
+
+def run_benchmark(number: int = 20000):
+    """运行基准测试"""
+    manager = PromptManager()
+    template = manager.load_prompt('character', 'default_character')
+    compiled = manager.load_compiled_prompt('character', 'default_character')
+
+    assert legacy_render(template, CHARACTER_VARIABLES) == compiled.render(CHARACTER_VARIABLES)
+
+    cases = [
+        ("旧版 str.replace 渲染", lambda: legacy_render(template, CHARACTER_VARIABLES)),
+        ("编译模板渲染", lambda: compiled.render(CHARACTER_VARIABLES)),
+        ("get_character_prompt（含stat校验）",
+         lambda: manager.get_character_prompt(character_data=CHARACTER_VARIABLES)),
+    ]
+
+    print("=" * 60)
+    print(f"角色提示词渲染基准（模板 {len(template)} 字符，{number} 次）")
+    print("=" * 60)
+    for name, func in cases:
+        elapsed = min(timeit.repeat(func, number=number, repeat=3))
+        print(f"{name:<36} {elapsed / number * 1e6:8.2f} µs/次")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,126 @@
+"""
+日程区间索引性能基准
+
+向临时数据库批量写入10万条日程，对比旧版SQL OR 条件查询与按天分桶区间索引的
+冲突检测、单日日程列表和空闲时段计算耗时，以及基于epoch列的可走索引SQL区间查询。
+
+运行方式:
+    python examples/benchmark_schedule_index.py [日程数量]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.schedule_manager import ScheduleManager, SchedulePriority
+
+
+def populate(manager: ScheduleManager, count: int, days: int):
+    """批量写入日程（直接 executemany，绕过冲突检测）"""
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1)
+    now = datetime.now().isoformat()
+    rows = []
+    for i in range(count):
+        start = base + timedelta(days=rng.randrange(days), minutes=rng.randrange(0, 24 * 60, 15))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90, 120]))
+        derived = manager._derived_columns(start.isoformat(), end.isoformat(), {})
+        rows.append((str(uuid.uuid4()), f'日程{i}', '', 'appointment', rng.randint(1, 4),
+                     start.isoformat(), end.isoformat(), now, 1, 'not_required', 1, '{}')
+                    + tuple(derived.values()))
+    with manager.db.get_connection() as conn:
+        conn.executemany('''
+            INSERT INTO schedules (
+                schedule_id, title, description, schedule_type,
+                priority, start_time, end_time, created_at,
+                is_active, collaboration_status, is_queryable, metadata,
+                start_epoch, end_epoch, day, involves_user, recurrence_pattern, weekday
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def legacy_check_conflict(manager: ScheduleManager, start_time: str, end_time: str, priority: int):
+    """旧版冲突检测：三段 OR 条件的SQL查询"""
+    with manager.db.get_connection() as conn:
+        rows = conn.execute('''
+            SELECT * FROM schedules
+            WHERE is_active = 1
+            AND (
+                (start_time < ? AND end_time > ?)
+                OR (start_time >= ? AND start_time < ?)
+                OR (end_time > ? AND end_time <= ?)
+            )
+        ''', [end_time, start_time, start_time, end_time, start_time, end_time]).fetchall()
+    return any(row[4] >= priority for row in rows)
+
+
+def legacy_day_listing(manager: ScheduleManager, date: str):
+    """旧版单日列表：SQL查询后逐行构建日程对象"""
+    with manager.db.get_connection() as conn:
+        rows = conn.execute('''
+            SELECT * FROM schedules
+            WHERE (
+                (start_time < ? AND end_time > ?)
+                OR (start_time >= ? AND start_time < ?)
+            )
+            AND is_queryable = 1 AND is_active = 1
+            ORDER BY start_time ASC
+        ''', [f'{date}T23:59:59', f'{date}T00:00:00', f'{date}T00:00:00', f'{date}T23:59:59']).fetchall()
+    return [manager._row_to_schedule(row) for row in rows]
+
+
+def run_benchmark(count: int = 100000, days: int = 365, number: int = 50):
+    """运行基准测试"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        manager = ScheduleManager(DatabaseManager(db_path))
+        populate(manager, count, days)
+
+        started = time.perf_counter()
+        manager.index.query(datetime(2024, 1, 1), datetime(2024, 1, 1, 1))
+        load_seconds = time.perf_counter() - started
+
+        date = '2024-06-15'
+        start_time, end_time = f'{date}T10:00:00', f'{date}T11:00:00'
+        assert legacy_check_conflict(manager, start_time, end_time, SchedulePriority.MEDIUM.value) == \
+            manager.check_conflict(start_time, end_time, SchedulePriority.MEDIUM)[0]
+        assert len(legacy_day_listing(manager, date)) == \
+            len(manager.get_schedules_by_time_range(f'{date}T00:00:00', f'{date}T23:59:59'))
+
+        cases = [
+            ("旧版 SQL 冲突检测", lambda: legacy_check_conflict(
+                manager, start_time, end_time, SchedulePriority.MEDIUM.value)),
+            ("区间索引 check_conflict", lambda: manager.check_conflict(
+                start_time, end_time, SchedulePriority.MEDIUM)),
+            ("旧版 SQL 单日列表", lambda: legacy_day_listing(manager, date)),
+            ("epoch列 SQL 单日列表（含未激活）", lambda: manager.get_schedules_by_time_range(
+                f'{date}T00:00:00', f'{date}T23:59:59', active_only=False, include_inactive=True)),
+            ("区间索引 get_schedules_by_time_range", lambda: manager.get_schedules_by_time_range(
+                f'{date}T00:00:00', f'{date}T23:59:59')),
+            ("区间索引 get_free_time_slots", lambda: manager.get_free_time_slots(date)),
+        ]
+
+        print("=" * 60)
+        print(f"日程区间索引基准（{count} 条日程，分布在 {days} 天，{number} 次）")
+        print(f"首次加载索引: {load_seconds * 1000:.1f} ms")
+        print("=" * 60)
+        for name, func in cases:
+            elapsed = min(timeit.repeat(func, number=number, repeat=3))
+            print(f"{name:<40} {elapsed / number * 1000:8.3f} ms/次")
+    finally:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
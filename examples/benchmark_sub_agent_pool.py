@@ -0,0 +1,66 @@
+"""
+子智能体池性能基准
+
+模拟传统协作流程处理任务事件时创建子智能体的开销：每个任务创建任务分析、任务规划
+和若干执行智能体。对比每次新建 DeepSubAgentWrapper（构建LLM客户端、中间件和智能体图）
+与从 SubAgentPool 复用已编译智能体的单任务准备耗时。只构建智能体，不调用模型。
+
+运行方式:
+    python examples/benchmark_sub_agent_pool.py [任务数量] [每个任务的执行步骤数]
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 只构建客户端，不发送请求
+os.environ.setdefault('SILICON_FLOW_API_KEY', 'benchmark-key')
+
+from src.core.deepagents_wrapper import DeepSubAgentWrapper, SubAgentPool
+
+
+def task_agents(task_index: int, steps: int):
+    """一个任务事件需要的子智能体 (agent_id, 角色, 描述)"""
+    agents = [
+        (f'task{task_index}_understanding', '任务分析专家', '负责理解和分析任务需求'),
+        (f'task{task_index}_planning', '任务规划专家', '负责将复杂任务分解为可执行的步骤'),
+    ]
+    agents += [(f'task{task_index}_execution_{i}', '任务执行专家', '负责执行具体的任务步骤')
+               for i in range(steps)]
+    return agents
+
+
+def run_benchmark(tasks: int = 20, steps: int = 4):
+    """运行基准测试"""
+    def without_pool(task_index):
+        return [DeepSubAgentWrapper(agent_id, role, description)
+                for agent_id, role, description in task_agents(task_index, steps)]
+
+    pool = SubAgentPool()
+
+    def with_pool(task_index):
+        return [pool.acquire(agent_id, role, description)
+                for agent_id, role, description in task_agents(task_index, steps)]
+
+    print("=" * 60)
+    print(f"子智能体池基准（{tasks} 个任务事件，每个任务 {steps + 2} 个子智能体）")
+    print("=" * 60)
+    for name, setup in [("每次新建 DeepSubAgentWrapper", without_pool), ("SubAgentPool 复用", with_pool)]:
+        durations = []
+        for task_index in range(tasks):
+            started = time.perf_counter()
+            setup(task_index)
+            durations.append(time.perf_counter() - started)
+        first, rest = durations[0], durations[1:] or durations
+        print(f"{name:<32} 首个任务 {first * 1000:8.1f} ms  之后平均 {sum(rest) / len(rest) * 1000:8.2f} ms/任务")
+    print(f"池统计: {pool.get_statistics()}")
+
+
+if __name__ == '__main__':
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    )
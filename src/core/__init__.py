@@ -18,15 +18,29 @@ Usage:
 """
 
 __all__ = [
+    'agent_result_cache',
     'chat_agent',
+    'checkpoint_store',
+    'dag_executor',
     'database_manager',
     'emotion_analyzer',
+    'emotion_prescorer',
+    'emotion_trends',
+    'environment_graph',
     'event_manager',
+    'event_scheduler',
+    'file_spill_backend',
     'knowledge_base',
+    'knowledge_maintenance',
     'long_term_memory',
     'base_knowledge',
     'multi_agent_coordinator',
+    'name_matcher',
+    'recurrence',
+    'schedule_index',
     'schedule_manager',
+    'schedule_reminder',
     'schedule_generator',
     'schedule_similarity_checker',
+    'text_fingerprint',
 ]
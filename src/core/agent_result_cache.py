@@ -0,0 +1,161 @@
+"""
+子智能体结果缓存模块
+按角色、任务文本、所属任务事件、角色上下文和依赖智能体的输出缓存子智能体的执行结果，
+结果保存在数据库中并带有过期时间，用户重复提交相近的任务时直接复用
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from src.core.database_manager import DatabaseManager
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+# 任务文本中不影响含义的空白和标点（语气词、程度副词会改变任务含义，不做归一化）
+_NON_WORD = re.compile(r'[\s\W_]+')
+
+
+class AgentResultCache:
+    """
+    子智能体结果缓存
+    缓存键为 (角色, 任务文本, 任务事件标题和描述, 角色上下文, 依赖输出) 的哈希，读取时忽略已过期的条目，
+    写入时按过期时间和条目上限清理
+    """
+
+    def __init__(self, db_manager: DatabaseManager = None, ttl_hours: float = None, max_entries: int = None):
+        """
+        初始化结果缓存
+
+        Args:
+            db_manager: 数据库管理器实例
+            ttl_hours: 结果有效期（小时）
+            max_entries: 最多保留的条目数量
+        """
+        self.db = db_manager or DatabaseManager()
+        self.ttl_hours = ttl_hours if ttl_hours is not None else float(os.getenv('AGENT_RESULT_CACHE_TTL_HOURS', '6'))
+        self.max_entries = max_entries or int(os.getenv('AGENT_RESULT_CACHE_MAX_ENTRIES', '500'))
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._initialize_database()
+
+        debug_logger.log_module('AgentResultCache', '子智能体结果缓存初始化完成', {
+            'ttl_hours': self.ttl_hours,
+            'max_entries': self.max_entries
+        })
+
+    def _initialize_database(self):
+        """初始化数据库表"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS agent_result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    role TEXT NOT NULL,
+                    task_text TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    expires_at TEXT NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_agent_result_cache_expires '
+                         'ON agent_result_cache(expires_at)')
+
+    @staticmethod
+    def make_key(role: str, task: str, dependency_outputs: Optional[List[Any]] = None,
+                 task_info: Optional[Dict[str, Any]] = None, character: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            role: 智能体角色
+            task: 任务文本（忽略大小写、空白和标点的差异）
+            dependency_outputs: 依赖智能体的输出（与智能体ID无关，不同计划中的同一依赖也能命中）
+            task_info: 所属任务事件（标题和描述参与计算，不同事件中相同的子任务文本不会互相命中）
+            character: 智能体执行时读取的角色上下文
+
+        Returns:
+            缓存键
+        """
+        task_info = task_info or {}
+        payload = json.dumps([
+            role,
+            _NON_WORD.sub('', (task or '').lower()),
+            list(dependency_outputs or []),
+            task_info.get('title', ''),
+            task_info.get('description', ''),
+            character or {}
+        ], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, now: datetime = None) -> Optional[str]:
+        """
+        读取未过期的缓存结果
+
+        Args:
+            key: 缓存键
+            now: 当前时间（默认系统时间）
+
+        Returns:
+            缓存的结果，不存在或已过期时返回None
+        """
+        now = now or datetime.now()
+        with self.db.get_connection() as conn:
+            row = conn.execute('SELECT result FROM agent_result_cache WHERE cache_key = ? AND expires_at > ?',
+                               (key, now.isoformat())).fetchone()
+            if row is not None:
+                conn.execute('UPDATE agent_result_cache SET hit_count = hit_count + 1 WHERE cache_key = ?', (key,))
+        with self._lock:
+            self._stats['hits' if row is not None else 'misses'] += 1
+        return row['result'] if row is not None else None
+
+    def put(self, key: str, role: str, task: str, result: str, now: datetime = None):
+        """
+        写入缓存结果，并清理过期和超出上限的条目
+
+        Args:
+            key: 缓存键
+            role: 智能体角色
+            task: 任务文本
+            result: 执行结果
+            now: 当前时间（默认系统时间）
+        """
+        now = now or datetime.now()
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO agent_result_cache
+                (cache_key, role, task_text, result, created_at, expires_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            ''', (key, role, task, result, now.isoformat(),
+                  (now + timedelta(hours=self.ttl_hours)).isoformat()))
+            conn.execute('DELETE FROM agent_result_cache WHERE expires_at <= ?', (now.isoformat(),))
+            conn.execute('''
+                DELETE FROM agent_result_cache WHERE cache_key IN (
+                    SELECT cache_key FROM agent_result_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+        with self._lock:
+            self._stats['stores'] += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self.db.get_connection() as conn:
+            conn.execute('DELETE FROM agent_result_cache')
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            本进程的命中、未命中、写入次数和当前条目数
+        """
+        with self.db.get_connection() as conn:
+            entries = conn.execute('SELECT COUNT(*) FROM agent_result_cache').fetchone()[0]
+        with self._lock:
+            return dict(self._stats, entries=entries)
@@ -16,14 +16,18 @@ from src.core.database_manager import DatabaseManager
 from src.core.long_term_memory import LongTermMemoryManager
 from src.tools.debug_logger import get_debug_logger
 from src.core.emotion_analyzer import EmotionRelationshipAnalyzer
+from src.core.emotion_prescorer import EmotionPreScorer
 from src.tools.agent_vision import AgentVisionTool
-from src.core.event_manager import EventManager, EventType, EventStatus, NotificationEvent, TaskEvent
+from src.core.event_manager import EventManager, Event, EventType, EventStatus, NotificationEvent, TaskEvent
+from src.core.event_scheduler import EventScheduler, EventExecutionError
+from src.core.langchain_llm import LLMRequestError
 from src.tools.interrupt_question_tool import InterruptQuestionTool
 from src.core.multi_agent_coordinator import MultiAgentCoordinator
 from src.tools.expression_style import ExpressionStyleManager
 from src.core.schedule_manager import ScheduleManager, ScheduleType, SchedulePriority
 from src.tools.schedule_intent_tool import ScheduleIntentTool
-from src.core.schedule_generator import TemporaryScheduleGenerator
+from src.core.schedule_generator import TemporaryScheduleGenerator, TemporarySchedulePlanner
+from src.core.schedule_reminder import ScheduleReminderEngine
 from src.nps.nps_registry import NPSRegistry
 from src.nps.nps_invoker import NPSInvoker
 
@@ -292,6 +296,15 @@ class CharacterProfile:
             'character_background': self.background
         }
 
+    def get_brief_description(self) -> str:
+        """
+        获取简短的角色描述（用于增量情感分析等不需要完整人设的场景）
+
+        Returns:
+            一行角色简介
+        """
+        return f"{self.name}，{self.age}岁{self.gender}{self.role}，性格{self.personality}，爱好{self.hobby}"
+
 
 class SiliconFlowLLM:
     """
@@ -329,13 +342,14 @@ class SiliconFlowLLM:
             # 打印多层模型配置
             print(self.config.get_summary())
 
-    def chat(self, messages: List[Dict[str, str]], task_type: str = 'main') -> str:
+    def chat(self, messages: List[Dict[str, str]], task_type: str = 'main', raise_errors: bool = False) -> str:
         """
         发送聊天请求到API（通过LangChain）
 
         Args:
             messages: 消息列表，格式为 [{'role': 'user/assistant/system', 'content': '...'}]
             task_type: 任务类型 ('main', 'tool', 'vision')，用于选择合适的模型
+            raise_errors: 请求失败时抛出 LLMRequestError，而不是返回错误提示文本
 
         Returns:
             AI的回复内容
@@ -350,12 +364,16 @@ class SiliconFlowLLM:
             })
             
             # 调用LangChain LLM
-            response = llm.chat(messages)
+            response = llm.chat(messages, raise_errors=raise_errors)
             return response
 
+        except LLMRequestError:
+            raise
         except Exception as e:
             debug_logger.log_error('SiliconFlowLLM', f'处理请求时出错: {str(e)}', e)
             print(f"处理请求时出错: {e}")
+            if raise_errors:
+                raise LLMRequestError(str(e)) from e
             return f"抱歉，处理请求时出现错误: {str(e)}"
 
 
@@ -381,19 +399,29 @@ class ChatAgent:
 
         # 初始化情感关系分析器（共享数据库）
         self.emotion_analyzer = EmotionRelationshipAnalyzer(db_manager=self.db)
+
+        # 本地情感预评分器（决定何时需要调用LLM进行情感分析）
+        self.emotion_prescorer = EmotionPreScorer()
         
         # 初始化智能体视觉工具（共享数据库）
         self.vision_tool = AgentVisionTool(db_manager=self.db)
         
         # 初始化事件管理器（共享数据库）
         self.event_manager = EventManager(db_manager=self.db)
+
+        # 初始化事件执行引擎（按优先级排队，由固定的工作线程池执行事件）
+        self.event_scheduler = EventScheduler(self.event_manager, handler=self.execute_event)
+        self.event_scheduler.start()
+        if os.getenv('EVENT_AUTO_PROCESS', 'false').lower() == 'true':
+            self.event_scheduler.load_pending()
         
         # 初始化中断性提问工具
         self.interrupt_question_tool = InterruptQuestionTool()
         
         # 初始化多智能体协调器
         self.multi_agent_coordinator = MultiAgentCoordinator(
-            question_tool=self.interrupt_question_tool
+            question_tool=self.interrupt_question_tool,
+            db_manager=self.db
         )
         
         # 初始化个性化表达风格管理器（共享数据库）
@@ -407,6 +435,28 @@ class ChatAgent:
         
         # 初始化临时日程生成器
         self.schedule_generator = TemporaryScheduleGenerator(schedule_manager=self.schedule_manager)
+
+        # 初始化临时日程后台规划器（空闲时预生成今天及之后几天的临时日程）
+        self.schedule_planner = TemporarySchedulePlanner(
+            self.schedule_generator,
+            character_name=self.character.name,
+            character_info=self.character.get_info_dict()
+        )
+        if os.getenv('SCHEDULE_PREFETCH_ENABLED', 'false').lower() == 'true':
+            self.schedule_planner.start()
+
+        # 初始化日程提醒引擎（日程即将开始时生成通知型事件，提醒文本在本地生成，出现在事件列表中；
+        # 开启 SCHEDULE_REMINDER_AUTO_PROCESS 后才交给事件执行引擎由LLM说明）
+        on_reminder = None
+        if os.getenv('SCHEDULE_REMINDER_AUTO_PROCESS', 'false').lower() == 'true':
+            on_reminder = lambda event: self.event_scheduler.submit(event.event_id)
+        self.schedule_reminder = ScheduleReminderEngine(
+            self.schedule_manager,
+            self.event_manager,
+            on_event=on_reminder
+        )
+        if os.getenv('SCHEDULE_REMINDER_ENABLED', 'true').lower() == 'true':
+            self.schedule_reminder.start()
         
         # 初始化NPS工具系统
         self.nps_registry = NPSRegistry()
@@ -457,6 +507,9 @@ class ChatAgent:
         """
         debug_logger.log_module('ChatAgent', '开始处理用户输入', f'输入长度: {len(user_input)}')
 
+        # 记录用户活动，推迟后台日程预生成
+        self.schedule_planner.touch()
+
         # ===== 理解阶段 =====
         debug_logger.log_module('ChatAgent', '理解阶段开始', '提取相关主体并检索知识库')
 
@@ -473,7 +526,7 @@ class ChatAgent:
             # 执行切换
             success = self.vision_tool.switch_environment(to_env['uuid'])
             if success:
-                switch_msg = f"\n🚪 [环境切换] 已从「{from_env['name']}」移动到「{to_env['name']}」"
+                switch_msg = self.vision_tool.format_switch_message(switch_intent)
                 print(switch_msg)
                 debug_logger.log_info('ChatAgent', '环境切换成功', {
                     'from': from_env['name'],
@@ -606,11 +659,9 @@ class ChatAgent:
                     debug_logger.log_info('ChatAgent', '触发临时日程生成', {'date': query_date})
                     print(f"\n📅 [日程规划] 正在为你规划{date_desc}的日程...")
                     
-                    generated_schedules = self.schedule_generator.generate_temporary_schedules(
-                        date=query_date,
-                        character_name=self.character.name,
-                        character_info=self.character.get_info_dict(),
-                        context=self._get_recent_context()
+                    # 后台已在生成该日期时短暂等待，否则在前台生成
+                    generated_schedules = self.schedule_planner.ensure_schedules(
+                        query_date, context=self._get_recent_context()
                     )
                     
                     if generated_schedules:
@@ -668,10 +719,11 @@ class ChatAgent:
 
         # 添加用户消息到记忆
         self.memory_manager.add_message('user', user_input)
+        self.emotion_prescorer.observe(user_input)
 
         # ===== 检查是否需要进行情感分析 =====
         # 初次评估：5轮对话后
-        # 后续更新：每15轮对话
+        # 后续更新：由本地预评分决定，信号明显变化时提前分析，平淡时推迟（默认每15轮）
         stats = self.memory_manager.get_statistics()
         current_rounds = stats['short_term']['rounds']
 
@@ -686,14 +738,21 @@ class ChatAgent:
         # 获取上次分析时的轮数
         last_analyzed_rounds = getattr(self, '_last_analyzed_rounds', 0)
         
-        if current_rounds >= 5 and last_analyzed_rounds == 0:
+        if last_analyzed_rounds == 0:
             # 初次评估：完成至少5轮对话，且尚未进行过情感分析
-            should_analyze = True
-            is_initial = True
-        elif current_rounds > 5 and (current_rounds - last_analyzed_rounds) >= 15:
-            # 更新评估：每15轮对话
-            should_analyze = True
-            is_initial = False
+            if current_rounds >= 5:
+                should_analyze = True
+                is_initial = True
+        else:
+            # 更新评估：由预评分器根据信号变化决定
+            # 短期记忆超过20轮会归档，轮数不单调，间隔使用预评分器自己统计的消息数
+            should_analyze, trigger_reason = self.emotion_prescorer.should_analyze()
+            if trigger_reason in (EmotionPreScorer.REASON_SHIFT, EmotionPreScorer.REASON_FLAT):
+                debug_logger.log_info('ChatAgent', '情感预评分调整分析时机', {
+                    'reason': trigger_reason,
+                    'rounds_since_last': self.emotion_prescorer.rounds_since_analysis,
+                    'prescore': self.emotion_prescorer.get_state()
+                })
 
         if should_analyze:
             analysis_type = "初次" if is_initial else "更新"
@@ -711,6 +770,7 @@ class ChatAgent:
                 analysis_time = time.time() - start_time
 
                 self._last_analyzed_rounds = current_rounds
+                self.emotion_prescorer.mark_analyzed()
 
                 debug_logger.log_info('ChatAgent', '自动情感分析完成', {
                     'rounds': current_rounds,
@@ -1078,26 +1138,31 @@ class ChatAgent:
     def analyze_emotion(self) -> Dict[str, Any]:
         """
         分析当前情感关系
-        初次评估基于最近5轮对话，此后更新基于最近15轮对话（共30条消息）
+        初次评估基于最近5轮对话；此后使用增量评估，只发送上次的情感状态和之后的新消息
 
         Returns:
             情感分析结果字典
         """
-        # 获取所有消息用于分析器自动判断
-        messages = self.memory_manager.get_recent_messages(count=30)
-
-        # 获取角色设定
-        character_settings = self.character.get_system_prompt()
+        if self.emotion_analyzer.get_latest_emotion() is None:
+            # 初次评估：使用完整角色设定
+            messages = self.memory_manager.get_messages_since(count=30)
+            return self.emotion_analyzer.analyze_emotion_relationship(
+                messages=messages,
+                character_name=self.character.name,
+                character_settings=self.character.get_system_prompt()
+            )
 
-        # 调用情感分析器（让分析器自动判断是初次还是更新）
-        emotion_data = self.emotion_analyzer.analyze_emotion_relationship(
+        # 增量评估：只取上次分析之后的新消息
+        messages = self.memory_manager.get_messages_since(
+            self.emotion_analyzer.get_last_analyzed_message_id(),
+            count=self.emotion_analyzer.INCREMENTAL_MAX_MESSAGES
+        )
+        return self.emotion_analyzer.analyze_emotion_incremental(
             messages=messages,
             character_name=self.character.name,
-            character_settings=character_settings
+            character_brief=self.character.get_brief_description()
         )
 
-        return emotion_data
-
     def get_emotion_history(self) -> List[Dict[str, Any]]:
         """
         获取情感关系历史记录
@@ -1107,6 +1172,27 @@ class ChatAgent:
         """
         return self.emotion_analyzer.get_emotion_trend()
 
+    def get_emotion_count(self) -> int:
+        """
+        获取情感分析记录数量
+
+        Returns:
+            记录数量
+        """
+        return self.db.get_emotion_count()
+
+    def get_emotion_trend_analytics(self, max_points: int = 100) -> Dict[str, Any]:
+        """
+        获取情感趋势分析（用于图表展示，点数固定）
+
+        Args:
+            max_points: 图表数据的最大点数
+
+        Returns:
+            趋势分析字典
+        """
+        return self.emotion_analyzer.get_emotion_trend_analytics(max_points)
+
     def get_latest_emotion(self) -> Dict[str, Any]:
         """
         获取最新的情感分析结果
@@ -1211,6 +1297,9 @@ class ChatAgent:
 
         Returns:
             智能体的说明
+
+        Raises:
+            LLMRequestError: LLM请求失败（由事件执行引擎重试）
         """
         debug_logger.log_module('ChatAgent', '处理通知型事件', {
             'event_id': event.event_id,
@@ -1245,7 +1334,7 @@ class ChatAgent:
             {'role': 'user', 'content': understanding_prompt}
         ]
 
-        explanation = self.llm.chat(messages)
+        explanation = self.llm.chat(messages, raise_errors=True)
 
         # 记录到事件日志
         self.event_manager.add_event_log(
@@ -1386,54 +1475,8 @@ class ChatAgent:
         if not event:
             return f"❌ 错误：未找到事件 {event_id}"
 
-        debug_logger.log_module('ChatAgent', '开始处理事件', {
-            'event_id': event_id,
-            'type': event.event_type.value,
-            'title': event.title
-        })
-
         try:
-            if event.event_type == EventType.NOTIFICATION:
-                # 处理通知型事件
-                explanation = self.process_notification_event(event)
-                return f"📢 【通知事件】{event.title}\n\n{explanation}"
-
-            elif event.event_type == EventType.TASK:
-                # 处理任务型事件
-                result = self.process_task_event(event)
-                
-                # 获取最后一次任务执行专家的结果输出
-                if 'execution_results' in result and result['execution_results']:
-                    # 获取最后一个执行步骤的输出
-                    last_result = result['execution_results'][-1]
-                    final_output = last_result.get('output', '')
-                    
-                    # 如果输出为空，尝试构建更详细的反馈
-                    if not final_output:
-                        # 检查是否有错误
-                        if 'error' in last_result:
-                            final_output = f"❌ 任务执行失败：{last_result['error']}"
-                        elif 'step' in last_result:
-                            # 有步骤信息但无输出
-                            final_output = f"✅ 任务步骤「{last_result['step']}」已完成，但未返回具体内容"
-                        else:
-                            # 使用result中的message
-                            final_output = result.get('message', '任务执行完成但未返回具体内容')
-                    
-                    # 使用正常的智能体回复模式，直接返回最后的执行结果
-                    return final_output
-                else:
-                    # 如果没有执行结果，检查是否有错误信息
-                    if 'error' in result:
-                        return f"❌ 任务执行失败：{result['error']}"
-                    elif result.get('success') == False:
-                        return f"❌ 任务执行未成功：{result.get('message', '未知原因')}"
-                    else:
-                        # 返回基本消息或默认消息
-                        return result.get('message', '⚠️ 任务执行未产生结果，请检查任务配置')
-
-            else:
-                return f"❌ 错误：未知的事件类型 {event.event_type.value}"
+            return self.execute_event(event)
 
         except Exception as e:
             debug_logger.log_error('ChatAgent', f'处理事件失败: {str(e)}', e)
@@ -1444,6 +1487,70 @@ class ChatAgent:
             )
             return f"❌ 处理事件时发生错误：{str(e)}"
 
+    def execute_event(self, event: Event) -> str:
+        """
+        按事件类型执行事件（事件执行引擎的处理函数，异常向上抛出以便重试）
+
+        Args:
+            event: 事件对象
+
+        Returns:
+            处理结果消息
+
+        Raises:
+            LLMRequestError: 通知事件的LLM请求失败
+            EventExecutionError: 任务执行失败
+        """
+        debug_logger.log_module('ChatAgent', '开始处理事件', {
+            'event_id': event.event_id,
+            'type': event.event_type.value,
+            'title': event.title
+        })
+
+        if event.event_type == EventType.NOTIFICATION:
+            # 处理通知型事件
+            explanation = self.process_notification_event(event)
+            return f"📢 【通知事件】{event.title}\n\n{explanation}"
+
+        elif event.event_type == EventType.TASK:
+            # 处理任务型事件
+            result = self.process_task_event(event)
+            if result.get('success') is False:
+                raise EventExecutionError(result.get('error') or result.get('message') or '任务执行失败')
+            
+            # 获取最后一次任务执行专家的结果输出
+            if 'execution_results' in result and result['execution_results']:
+                # 获取最后一个执行步骤的输出
+                last_result = result['execution_results'][-1]
+                final_output = last_result.get('output', '')
+                
+                # 如果输出为空，尝试构建更详细的反馈
+                if not final_output:
+                    # 检查是否有错误
+                    if 'error' in last_result:
+                        final_output = f"❌ 任务执行失败：{last_result['error']}"
+                    elif 'step' in last_result:
+                        # 有步骤信息但无输出
+                        final_output = f"✅ 任务步骤「{last_result['step']}」已完成，但未返回具体内容"
+                    else:
+                        # 使用result中的message
+                        final_output = result.get('message', '任务执行完成但未返回具体内容')
+                
+                # 使用正常的智能体回复模式，直接返回最后的执行结果
+                return final_output
+            else:
+                # 如果没有执行结果，检查是否有错误信息
+                if 'error' in result:
+                    return f"❌ 任务执行失败：{result['error']}"
+                elif result.get('success') == False:
+                    return f"❌ 任务执行未成功：{result.get('message', '未知原因')}"
+                else:
+                    # 返回基本消息或默认消息
+                    return result.get('message', '⚠️ 任务执行未产生结果，请检查任务配置')
+
+        else:
+            return f"❌ 错误：未知的事件类型 {event.event_type.value}"
+
     def get_pending_events(self) -> List[Dict[str, Any]]:
         """
         获取待处理的事件列表
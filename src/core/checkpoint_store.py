@@ -0,0 +1,549 @@
+"""
+LangGraph 状态检查点存储模块
+把协作图的检查点保存在应用数据库中：状态用紧凑的二进制格式序列化并在较大时压缩，
+每个线程只保留最近若干个检查点，长期未访问和超出数量上限的线程按过期时间/最近最少使用淘汰，
+进程重启后被中断的任务可以从最后一个检查点继续执行
+"""
+
+import os
+import random
+import threading
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from src.core.database_manager import DatabaseManager
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+# 序列化结果超过该字节数时压缩
+COMPRESS_THRESHOLD = 512
+COMPRESSED_SUFFIX = '+zlib'
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    基于应用数据库的 LangGraph 检查点存储
+    检查点（含通道值）整体序列化后保存为一行；写入检查点时裁剪该线程的旧检查点，
+    每写入一定次数检查一次线程的过期时间和数量上限
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager = None,
+        max_checkpoints_per_thread: int = None,
+        ttl_hours: float = None,
+        max_threads: int = None,
+        prune_interval: int = None
+    ):
+        """
+        初始化检查点存储
+
+        Args:
+            db_manager: 数据库管理器实例
+            max_checkpoints_per_thread: 每个线程（及命名空间）保留的检查点数量
+            ttl_hours: 线程多久未访问后被删除（小时）
+            max_threads: 最多保留的线程数量，超出时删除最久未访问的线程
+            prune_interval: 每写入多少个检查点执行一次线程淘汰
+        """
+        super().__init__()
+        self.db = db_manager or DatabaseManager()
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread or int(
+            os.getenv('CHECKPOINT_MAX_PER_THREAD', '10'))
+        self.ttl_hours = ttl_hours if ttl_hours is not None else float(os.getenv('CHECKPOINT_TTL_HOURS', '168'))
+        self.max_threads = max_threads or int(os.getenv('CHECKPOINT_MAX_THREADS', '200'))
+        self.prune_interval = prune_interval or int(os.getenv('CHECKPOINT_PRUNE_INTERVAL', '50'))
+
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._stats = {'puts': 0, 'writes': 0, 'trimmed_checkpoints': 0, 'pruned_threads': 0,
+                       'raw_bytes': 0, 'stored_bytes': 0}
+
+        self._initialize_database()
+        self.prune_expired()
+
+        debug_logger.log_module('SQLiteCheckpointSaver', '检查点存储初始化完成', {
+            'max_checkpoints_per_thread': self.max_checkpoints_per_thread,
+            'ttl_hours': self.ttl_hours,
+            'max_threads': self.max_threads
+        })
+
+    def _initialize_database(self):
+        """初始化数据库表"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS graph_checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    checkpoint_type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS graph_checkpoint_writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    task_path TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS graph_threads (
+                    thread_id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    last_access_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_graph_threads_access '
+                         'ON graph_threads(last_access_at)')
+
+    # ==================== 序列化 ====================
+
+    def _dumps(self, obj: Any) -> Tuple[str, bytes]:
+        """
+        序列化对象，超过阈值时压缩
+
+        Args:
+            obj: 要序列化的对象
+
+        Returns:
+            (类型标记, 字节数据)
+        """
+        type_, data = self.serde.dumps_typed(obj)
+        raw_size = len(data)
+        if raw_size >= COMPRESS_THRESHOLD:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < raw_size:
+                type_, data = type_ + COMPRESSED_SUFFIX, compressed
+        with self._lock:
+            self._stats['raw_bytes'] += raw_size
+            self._stats['stored_bytes'] += len(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        """
+        反序列化 _dumps 的结果
+
+        Args:
+            type_: 类型标记
+            data: 字节数据
+
+        Returns:
+            原对象
+        """
+        if type_.endswith(COMPRESSED_SUFFIX):
+            type_, data = type_[:-len(COMPRESSED_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # ==================== 读取 ====================
+
+    def _make_tuple(self, conn, row) -> CheckpointTuple:
+        """
+        把检查点行转换为 CheckpointTuple（附带该检查点的待处理写入）
+
+        Args:
+            conn: 数据库连接
+            row: graph_checkpoints 表的一行
+
+        Returns:
+            检查点元组
+        """
+        thread_id, checkpoint_ns = row['thread_id'], row['checkpoint_ns']
+        writes = conn.execute('''
+            SELECT task_id, channel, value_type, value FROM graph_checkpoint_writes
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+            ORDER BY task_path, task_id, idx
+        ''', (thread_id, checkpoint_ns, row['checkpoint_id'])).fetchall()
+
+        parent_id = row['parent_checkpoint_id']
+        return CheckpointTuple(
+            config={'configurable': {
+                'thread_id': thread_id,
+                'checkpoint_ns': checkpoint_ns,
+                'checkpoint_id': row['checkpoint_id']
+            }},
+            checkpoint=self._loads(row['checkpoint_type'], row['checkpoint']),
+            metadata=self._loads(row['metadata_type'], row['metadata']),
+            parent_config={'configurable': {
+                'thread_id': thread_id,
+                'checkpoint_ns': checkpoint_ns,
+                'checkpoint_id': parent_id
+            }} if parent_id else None,
+            pending_writes=[
+                (write['task_id'], write['channel'], self._loads(write['value_type'], write['value']))
+                for write in writes
+            ]
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        获取检查点：配置中带 checkpoint_id 时取该检查点，否则取线程最新的检查点
+
+        Args:
+            config: 运行配置
+
+        Returns:
+            检查点元组，不存在时返回None
+        """
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self.db.get_connection() as conn:
+            if checkpoint_id:
+                row = conn.execute('''
+                    SELECT * FROM graph_checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+                ''', (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = conn.execute('''
+                    SELECT * FROM graph_checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT 1
+                ''', (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            # 读取也算一次访问，供最近最少使用淘汰
+            conn.execute('UPDATE graph_threads SET last_access_at = ? WHERE thread_id = ?',
+                         (datetime.now().isoformat(), thread_id))
+            return self._make_tuple(conn, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """
+        按时间倒序列出检查点
+
+        Args:
+            config: 限定线程/命名空间/检查点的配置
+            filter: 元数据过滤条件
+            before: 只列出该检查点之前的检查点
+            limit: 最多返回的数量
+
+        Yields:
+            检查点元组
+        """
+        where, params = [], []
+        if config:
+            where.append('thread_id = ?')
+            params.append(config['configurable']['thread_id'])
+            checkpoint_ns = config['configurable'].get('checkpoint_ns')
+            if checkpoint_ns is not None:
+                where.append('checkpoint_ns = ?')
+                params.append(checkpoint_ns)
+            checkpoint_id = get_checkpoint_id(config)
+            if checkpoint_id:
+                where.append('checkpoint_id = ?')
+                params.append(checkpoint_id)
+        before_id = get_checkpoint_id(before) if before else None
+        if before_id:
+            where.append('checkpoint_id < ?')
+            params.append(before_id)
+
+        query = 'SELECT * FROM graph_checkpoints'
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        query += ' ORDER BY checkpoint_id DESC'
+
+        # 元数据过滤需要反序列化，一次性读出后在连接外逐个产出
+        results = []
+        with self.db.get_connection() as conn:
+            for row in conn.execute(query, params).fetchall():
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self._loads(row['metadata_type'], row['metadata'])
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                results.append(self._make_tuple(conn, row))
+        yield from results
+
+    # ==================== 写入 ====================
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """
+        保存检查点，并裁剪该线程超出保留数量的旧检查点
+
+        Args:
+            config: 运行配置
+            checkpoint: 检查点（含全部通道值）
+            metadata: 检查点元数据
+            new_versions: 本次更新的通道版本
+
+        Returns:
+            指向新检查点的配置
+        """
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        checkpoint_type, checkpoint_data = self._dumps(checkpoint)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+        now = datetime.now().isoformat()
+
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO graph_checkpoints
+                (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                 checkpoint_type, checkpoint, metadata_type, metadata, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (thread_id, checkpoint_ns, checkpoint['id'], config['configurable'].get('checkpoint_id'),
+                  checkpoint_type, checkpoint_data, metadata_type, metadata_data, now))
+            conn.execute('''
+                INSERT INTO graph_threads (thread_id, created_at, last_access_at) VALUES (?, ?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET last_access_at = excluded.last_access_at
+            ''', (thread_id, now, now))
+            trimmed = self._trim_thread(conn, thread_id, checkpoint_ns)
+
+        with self._lock:
+            self._stats['puts'] += 1
+            self._stats['trimmed_checkpoints'] += trimmed
+            self._puts_since_prune += 1
+            prune_due = self._puts_since_prune >= self.prune_interval
+            if prune_due:
+                self._puts_since_prune = 0
+        if prune_due:
+            self.prune_expired()
+
+        return {'configurable': {
+            'thread_id': thread_id,
+            'checkpoint_ns': checkpoint_ns,
+            'checkpoint_id': checkpoint['id']
+        }}
+
+    def _trim_thread(self, conn, thread_id: str, checkpoint_ns: str, keep: int = None) -> int:
+        """
+        删除线程在某个命名空间下超出保留数量的旧检查点及其写入
+
+        Args:
+            conn: 数据库连接
+            thread_id: 线程ID
+            checkpoint_ns: 检查点命名空间
+            keep: 保留数量（默认 max_checkpoints_per_thread）
+
+        Returns:
+            删除的检查点数量
+        """
+        keep = keep or self.max_checkpoints_per_thread
+        cursor = conn.execute('''
+            DELETE FROM graph_checkpoints
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                SELECT checkpoint_id FROM graph_checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                ORDER BY checkpoint_id DESC LIMIT ?
+            )
+        ''', (thread_id, checkpoint_ns, thread_id, checkpoint_ns, keep))
+        if cursor.rowcount:
+            conn.execute('''
+                DELETE FROM graph_checkpoint_writes
+                WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM graph_checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                )
+            ''', (thread_id, checkpoint_ns, thread_id, checkpoint_ns))
+        return max(cursor.rowcount, 0)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ''
+    ) -> None:
+        """
+        保存某个检查点上任务产生的待处理写入
+
+        Args:
+            config: 指向检查点的配置
+            writes: (通道, 值) 列表
+            task_id: 任务ID
+            task_path: 任务路径
+        """
+        thread_id = config['configurable']['thread_id']
+        checkpoint_ns = config['configurable'].get('checkpoint_ns', '')
+        checkpoint_id = config['configurable']['checkpoint_id']
+
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_data = self._dumps(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                         channel, value_type, value_data, task_path))
+
+        with self.db.get_connection() as conn:
+            # 普通写入只记录第一次（重放时不覆盖），特殊通道（错误、中断等）以最新的为准
+            conn.executemany('''
+                INSERT OR IGNORE INTO graph_checkpoint_writes
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [row for row in rows if row[4] >= 0])
+            conn.executemany('''
+                INSERT OR REPLACE INTO graph_checkpoint_writes
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [row for row in rows if row[4] < 0])
+
+        with self._lock:
+            self._stats['writes'] += len(rows)
+
+    # ==================== 删除与淘汰 ====================
+
+    def _delete_threads(self, conn, thread_ids: Sequence[str]):
+        """
+        删除线程的全部检查点、写入和访问记录
+
+        Args:
+            conn: 数据库连接
+            thread_ids: 线程ID列表
+        """
+        params = [(thread_id,) for thread_id in thread_ids]
+        conn.executemany('DELETE FROM graph_checkpoints WHERE thread_id = ?', params)
+        conn.executemany('DELETE FROM graph_checkpoint_writes WHERE thread_id = ?', params)
+        conn.executemany('DELETE FROM graph_threads WHERE thread_id = ?', params)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        删除线程的全部检查点
+
+        Args:
+            thread_id: 线程ID
+        """
+        with self.db.get_connection() as conn:
+            self._delete_threads(conn, [thread_id])
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = 'keep_latest') -> None:
+        """
+        裁剪指定线程的检查点
+
+        Args:
+            thread_ids: 线程ID列表
+            strategy: keep_latest 每个命名空间只保留最新的检查点，delete 删除全部检查点
+        """
+        with self.db.get_connection() as conn:
+            if strategy == 'delete':
+                self._delete_threads(conn, thread_ids)
+                return
+            for thread_id in thread_ids:
+                namespaces = conn.execute('SELECT DISTINCT checkpoint_ns FROM graph_checkpoints WHERE thread_id = ?',
+                                          (thread_id,)).fetchall()
+                for row in namespaces:
+                    self._trim_thread(conn, thread_id, row['checkpoint_ns'], keep=1)
+
+    def prune_expired(self, now: datetime = None) -> int:
+        """
+        删除超过过期时间未访问的线程，以及超出数量上限时最久未访问的线程
+
+        Args:
+            now: 当前时间（默认系统时间）
+
+        Returns:
+            删除的线程数量
+        """
+        now = now or datetime.now()
+        cutoff = (now - timedelta(hours=self.ttl_hours)).isoformat()
+        with self.db.get_connection() as conn:
+            expired = [row['thread_id'] for row in conn.execute(
+                'SELECT thread_id FROM graph_threads WHERE last_access_at < ?', (cutoff,)).fetchall()]
+            overflow = [row['thread_id'] for row in conn.execute('''
+                SELECT thread_id FROM graph_threads WHERE last_access_at >= ?
+                ORDER BY last_access_at DESC LIMIT -1 OFFSET ?
+            ''', (cutoff, self.max_threads)).fetchall()]
+            removed = expired + overflow
+            if removed:
+                self._delete_threads(conn, removed)
+
+        if removed:
+            with self._lock:
+                self._stats['pruned_threads'] += len(removed)
+            debug_logger.log_info('SQLiteCheckpointSaver', '淘汰检查点线程', {
+                'expired': len(expired),
+                'overflow': len(overflow)
+            })
+        return len(removed)
+
+    # ==================== 异步接口与版本号 ====================
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = '') -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """
+        生成通道的下一个版本号（递增整数加随机后缀，可按字符串排序）
+
+        Args:
+            current: 当前版本号
+            channel: 未使用
+
+        Returns:
+            新版本号
+        """
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split('.')[0])
+        return f'{current_v + 1:032}.{random.random():016}'
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取检查点存储统计
+
+        Returns:
+            线程数、检查点数、存储字节数和累计的写入/淘汰次数
+        """
+        with self.db.get_connection() as conn:
+            threads = conn.execute('SELECT COUNT(*) FROM graph_threads').fetchone()[0]
+            checkpoints, stored = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM graph_checkpoints').fetchone()
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({'threads': threads, 'checkpoints': checkpoints, 'checkpoint_bytes': stored})
+        return stats
@@ -172,12 +172,11 @@ class ConversationGraph:
         # 检测环境切换意图
         switch_intent = self.agent.vision_tool.detect_environment_switch_intent(state['user_input'])
         if switch_intent and switch_intent.get('can_switch'):
-            from_env = switch_intent['from_env']
             to_env = switch_intent['to_env']
             
             success = self.agent.vision_tool.switch_environment(to_env['uuid'])
             if success:
-                switch_msg = f"\n🚪 [环境切换] 已从「{from_env['name']}」移动到「{to_env['name']}」"
+                switch_msg = self.agent.vision_tool.format_switch_message(switch_intent)
                 print(switch_msg)
                 self.agent.memory_manager.add_message('system', switch_msg)
         
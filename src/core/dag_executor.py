@@ -0,0 +1,206 @@
+"""
+依赖图执行模块
+按依赖关系（有向无环图）执行一组任务：执行前检测循环依赖，每个任务在其依赖全部结束后立即开始，
+同时运行的任务数受并发上限约束，整体耗时由关键路径而不是任务数量决定
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+
+class DependencyCycleError(ValueError):
+    """依赖关系中存在循环"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(' -> '.join(cycle))
+
+
+def find_cycle(dependencies: Dict[str, List[str]]) -> Optional[List[str]]:
+    """
+    查找依赖图中的一个循环
+
+    Args:
+        dependencies: 节点 -> 依赖的节点列表（不在图中的依赖会被忽略）
+
+    Returns:
+        循环路径（首尾为同一节点），没有循环时返回None
+    """
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = {node: WHITE for node in dependencies}
+
+    for root in dependencies:
+        if color[root] != WHITE:
+            continue
+        # 迭代深度优先搜索，栈中保存 (节点, 依赖迭代器)
+        path = [root]
+        stack = [(root, iter(dependencies[root]))]
+        color[root] = GREY
+        while stack:
+            node, deps = stack[-1]
+            for dep in deps:
+                if dep not in color:
+                    continue
+                if color[dep] == GREY:
+                    return path[path.index(dep):] + [dep]
+                if color[dep] == WHITE:
+                    color[dep] = GREY
+                    path.append(dep)
+                    stack.append((dep, iter(dependencies[dep])))
+                    break
+            else:
+                color[node] = BLACK
+                path.pop()
+                stack.pop()
+    return None
+
+
+def critical_path(dependencies: Dict[str, List[str]], durations: Dict[str, float]) -> Tuple[List[str], float]:
+    """
+    计算依赖图的关键路径（耗时之和最大的依赖链）
+
+    Args:
+        dependencies: 节点 -> 依赖的节点列表
+        durations: 节点 -> 耗时（秒）
+
+    Returns:
+        (关键路径上的节点列表, 路径总耗时)
+    """
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+
+    def visit(node: str) -> float:
+        if node not in finish:
+            best_dep, best = None, 0.0
+            for dep in dependencies.get(node, []):
+                if dep in dependencies and visit(dep) > best:
+                    best_dep, best = dep, finish[dep]
+            finish[node] = best + durations.get(node, 0.0)
+            previous[node] = best_dep
+        return finish[node]
+
+    if not dependencies:
+        return [], 0.0
+    end = max(dependencies, key=visit)
+    path = []
+    node = end
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], finish[end]
+
+
+class DagExecutor:
+    """
+    依赖图执行器
+    维护每个节点未完成的依赖数，依赖数降为0的节点进入就绪队列（保持输入顺序），
+    在并发上限内立即提交到线程池；完成回调在调用 run 的线程中执行，因此回调写入的结果对后续节点可见
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        """
+        初始化依赖图执行器
+
+        Args:
+            max_concurrency: 最大并发数
+        """
+        self.max_concurrency = max_concurrency or int(os.getenv('MULTI_AGENT_MAX_CONCURRENCY', '3'))
+
+    @staticmethod
+    def normalize(dependencies: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        去掉不存在的依赖和重复依赖
+
+        Args:
+            dependencies: 节点 -> 依赖的节点列表
+
+        Returns:
+            规范化后的依赖图
+        """
+        normalized = {}
+        for node, deps in dependencies.items():
+            unknown = [dep for dep in deps or [] if dep not in dependencies]
+            if unknown:
+                debug_logger.log_info('DagExecutor', '忽略不存在的依赖', {'node': node, 'unknown': unknown})
+            normalized[node] = list(dict.fromkeys(dep for dep in deps or [] if dep in dependencies))
+        return normalized
+
+    def run(
+        self,
+        dependencies: Dict[str, List[str]],
+        execute: Callable[[str], Any],
+        on_complete: Callable[[str, Dict[str, Any]], None] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        执行依赖图
+
+        Args:
+            dependencies: 节点 -> 依赖的节点列表（字典顺序即同等就绪时的提交顺序）
+            execute: 执行单个节点的函数，返回值记为结果，抛出的异常记为错误（不影响依赖它的节点执行）
+            on_complete: 节点结束后的回调，参数为 (节点, 运行记录)；返回 False 时不再启动新的节点
+
+        Returns:
+            节点 -> 运行记录（result、error、started、finished、duration，时间为相对开始执行的秒数）；
+            停止调度后未启动的节点不在其中
+
+        Raises:
+            DependencyCycleError: 依赖图中存在循环
+        """
+        dependencies = self.normalize(dependencies)
+        cycle = find_cycle(dependencies)
+        if cycle:
+            raise DependencyCycleError(cycle)
+
+        remaining = {node: len(deps) for node, deps in dependencies.items()}
+        dependents: Dict[str, List[str]] = {node: [] for node in dependencies}
+        for node, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(node)
+        ready = deque(node for node, count in remaining.items() if count == 0)
+
+        origin = time.perf_counter()
+
+        def timed(node: str) -> Dict[str, Any]:
+            started = time.perf_counter() - origin
+            record = {'result': None, 'error': None, 'started': started}
+            try:
+                record['result'] = execute(node)
+            except Exception as e:
+                record['error'] = str(e)
+            record['finished'] = time.perf_counter() - origin
+            record['duration'] = record['finished'] - started
+            return record
+
+        runs: Dict[str, Dict[str, Any]] = {}
+        stopped = False
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(dependencies) or 1))) as pool:
+            running = {}
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    node = ready.popleft()
+                    running[pool.submit(timed, node)] = node
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    runs[node] = future.result()
+                    if on_complete is not None and on_complete(node, runs[node]) is False:
+                        # 停止调度：等待已启动的节点结束，不再启动新节点
+                        stopped = True
+                        ready.clear()
+                    if stopped:
+                        continue
+                    for dependent in dependents[node]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            ready.append(dependent)
+
+        return runs
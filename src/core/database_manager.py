@@ -3,12 +3,15 @@
 使用SQLite替代JSON文件存储，统一管理所有数据
 """
 
+import os
 import sqlite3
 import json
+import threading
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable
 from contextlib import contextmanager
+from src.core.text_fingerprint import compute_fingerprint, fingerprint_similarity, is_near_duplicate
 
 global INIT_Database_PreParation_Complete
 INIT_Database_PreParation_Complete = False
@@ -26,6 +29,13 @@ class DatabaseManager:
     # 知识状态升级阈值：当提及次数达到此值时，状态从"疑似"升级为"确认"
     KNOWLEDGE_CONFIRMATION_THRESHOLD = 3
 
+    # 批量操作中 IN (...) 查询的分块大小，避免超出SQLite变量数量限制
+    BATCH_CHUNK_SIZE = 500
+
+    # 各数据表的变更计数器（按数据库文件共享，同一进程内的多个实例都能看到彼此的写入）
+    _table_versions: Dict[str, Dict[str, int]] = {}
+    _table_versions_lock = threading.Lock()
+
     def __init__(self, db_path: str = "chat_agent.db", debug: bool = False):
         """
         初始化数据库管理器
@@ -38,6 +48,8 @@ class DatabaseManager:
         self.debug = debug
         self._query_count = 0  # 查询计数器
         self._operation_log = []  # 操作日志
+        self._versions_key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+        self._fragment_cache: Dict[str, Tuple[Tuple[int, ...], Any]] = {}  # 派生片段缓存
 
         if self.debug:
             print(f"🐛 [DEBUG] 数据库管理器初始化 - 路径: {db_path}")
@@ -64,6 +76,7 @@ class DatabaseManager:
     def get_connection(self):
         """
         获取数据库连接的上下文管理器
+        事务提交后递增被写入表的变更计数器
         """
         if self.debug:
             print(f"🐛 [DEBUG] 打开数据库连接: {self.db_path}")
@@ -71,9 +84,21 @@ class DatabaseManager:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row  # 使结果可以像字典一样访问
 
+        # 通过授权回调记录本次连接写入过的表（在语句编译时触发，不影响逐行执行）
+        written_tables = set()
+
+        def _track_writes(action, arg1, arg2, db_name, trigger):
+            if action in (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE):
+                written_tables.add(arg1)
+            return sqlite3.SQLITE_OK
+
+        conn.set_authorizer(_track_writes)
+
         try:
             yield conn
             conn.commit()
+            if written_tables:
+                self._bump_table_versions(written_tables)
 
             if self.debug:
                 print(f"🐛 [DEBUG] 数据库事务提交成功")
@@ -91,6 +116,67 @@ class DatabaseManager:
             if self.debug:
                 print(f"🐛 [DEBUG] 数据库连接已关闭")
 
+    # ==================== 派生片段缓存 ====================
+
+    def _bump_table_versions(self, tables: Iterable[str]):
+        """
+        递增数据表的变更计数器
+
+        Args:
+            tables: 被写入的表名
+        """
+        with self._table_versions_lock:
+            versions = self._table_versions.setdefault(self._versions_key, {})
+            for table in tables:
+                versions[table] = versions.get(table, 0) + 1
+
+    def get_table_version(self, table: str) -> int:
+        """
+        获取数据表的变更计数（本进程内通过 get_connection 提交的写入次数）
+
+        Args:
+            table: 表名
+
+        Returns:
+            变更计数，从未写入时为0
+        """
+        return self._table_versions.get(self._versions_key, {}).get(table, 0)
+
+    def get_cached_fragment(self, key: str, tables: Iterable[str], builder: Callable[[], Any]) -> Any:
+        """
+        获取派生片段（如提示词片段），仅在依赖表发生变更时重新构建
+
+        Args:
+            key: 片段缓存键
+            tables: 片段依赖的数据表
+            builder: 构建片段的无参函数
+
+        Returns:
+            片段内容
+        """
+        versions = self._table_versions.get(self._versions_key, {})
+        stamp = tuple(versions.get(table, 0) for table in tables)
+        cached = self._fragment_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        value = builder()
+        self._fragment_cache[key] = (stamp, value)
+        return value
+
+    def invalidate_fragments(self, prefix: str = ""):
+        """
+        清除派生片段缓存
+
+        Args:
+            prefix: 只清除以此前缀开头的缓存键，为空时全部清除
+        """
+        if not prefix:
+            self._fragment_cache.clear()
+            return
+        for key in [k for k in self._fragment_cache if k.startswith(prefix)]:
+            del self._fragment_cache[key]
+
     def init_database(self):
         """
         初始化数据库，创建所有必要的表
@@ -157,6 +243,8 @@ class DatabaseManager:
                     mention_count INTEGER DEFAULT 1,
                     last_mentioned_at TEXT,
                     created_at TEXT NOT NULL,
+                    fingerprint TEXT,
+                    demoted_at TEXT,
                     FOREIGN KEY (entity_uuid) REFERENCES entities(uuid) ON DELETE CASCADE
                 )
             ''')
@@ -369,6 +457,10 @@ class DatabaseManager:
                 migrations_needed.append(('mention_count', "ALTER TABLE entity_related_info ADD COLUMN mention_count INTEGER DEFAULT 1"))
             if 'last_mentioned_at' not in columns:
                 migrations_needed.append(('last_mentioned_at', "ALTER TABLE entity_related_info ADD COLUMN last_mentioned_at TEXT"))
+            if 'fingerprint' not in columns:
+                migrations_needed.append(('fingerprint', "ALTER TABLE entity_related_info ADD COLUMN fingerprint TEXT"))
+            if 'demoted_at' not in columns:
+                migrations_needed.append(('demoted_at', "ALTER TABLE entity_related_info ADD COLUMN demoted_at TEXT"))
             
             if migrations_needed:
                 print(f"○ 检测到数据库需要迁移，正在添加新字段...")
@@ -382,6 +474,26 @@ class DatabaseManager:
                 conn.commit()
                 print("✓ 数据库迁移完成")
 
+            if not columns:
+                # 表不存在（如每次连接都是新库的 :memory: 模式），无需建索引和补算
+                return
+
+            # 近似重复检测按 (entity_uuid, type) 读取候选时使用的索引（依赖迁移后的fingerprint字段）
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_related_info_fingerprint
+                ON entity_related_info(entity_uuid, type, fingerprint)
+            ''')
+
+            # 为旧数据补算指纹
+            cursor.execute('SELECT uuid, content FROM entity_related_info WHERE fingerprint IS NULL')
+            missing = cursor.fetchall()
+            if missing:
+                cursor.executemany(
+                    'UPDATE entity_related_info SET fingerprint = ? WHERE uuid = ?',
+                    [(compute_fingerprint(row['content']), row['uuid']) for row in missing]
+                )
+                print(f"  ✓ 已为 {len(missing)} 条相关信息生成指纹")
+
 
     # ==================== 基础知识相关方法 ====================
 
@@ -690,7 +802,7 @@ class DatabaseManager:
                                 source: str = "", confidence: float = 0.7, 
                                 status: str = "疑似", mention_count: int = 1) -> str:
         """
-        添加实体相关信息，如果相似信息已存在，则增加mention_count并可能升级状态
+        添加实体相关信息，如果相似信息已存在，则增加mention_count、恢复被衰减的置信度并可能升级状态
 
         Args:
             entity_uuid: 实体UUID
@@ -712,25 +824,28 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # 检查是否已存在相似的信息
+            # 检查是否已存在相同或近似重复的信息：按 (entity_uuid, type) 读取候选，在内存中逐条比较
+            fingerprint = compute_fingerprint(content)
             cursor.execute('''
-                SELECT uuid, mention_count, status FROM entity_related_info 
-                WHERE entity_uuid = ? AND content = ? AND type = ?
-            ''', (entity_uuid, content, type_))
-            existing = cursor.fetchone()
+                SELECT uuid, content, fingerprint, mention_count, status, confidence FROM entity_related_info
+                WHERE entity_uuid = ? AND type = ?
+            ''', (entity_uuid, type_))
+            existing = self._find_duplicate_info(cursor.fetchall(), content, fingerprint)
             
             if existing:
                 # 如果已存在相同信息，增加mention_count
-                existing_uuid, existing_mention_count, existing_status = existing[0], existing[1], existing[2]
+                existing_uuid, existing_mention_count, existing_status = existing['uuid'], existing['mention_count'], existing['status']
                 new_mention_count = existing_mention_count + 1
                 # 如果提及次数达到阈值，状态升级为"确认"
                 new_status = self.STATUS_CONFIRMED if new_mention_count >= self.KNOWLEDGE_CONFIRMATION_THRESHOLD else existing_status
+                # 再次提及时恢复被知识维护衰减的置信度
+                new_confidence = max(existing['confidence'] or 0.0, confidence)
                 
                 cursor.execute('''
                     UPDATE entity_related_info 
-                    SET mention_count = ?, status = ?, last_mentioned_at = ?
+                    SET mention_count = ?, status = ?, confidence = ?, last_mentioned_at = ?
                     WHERE uuid = ?
-                ''', (new_mention_count, new_status, now, existing_uuid))
+                ''', (new_mention_count, new_status, new_confidence, now, existing_uuid))
                 
                 # 更新实体的updated_at
                 cursor.execute('UPDATE entities SET updated_at = ? WHERE uuid = ?', (now, entity_uuid))
@@ -744,9 +859,9 @@ class DatabaseManager:
                 info_uuid = str(uuid.uuid4())
                 cursor.execute('''
                     INSERT INTO entity_related_info 
-                    (uuid, entity_uuid, content, type, source, confidence, status, mention_count, last_mentioned_at, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (info_uuid, entity_uuid, content, type_, source, confidence, status, mention_count, now, now))
+                    (uuid, entity_uuid, content, type, source, confidence, status, mention_count, last_mentioned_at, created_at, fingerprint)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (info_uuid, entity_uuid, content, type_, source, confidence, status, mention_count, now, now, fingerprint))
                 
                 # 更新实体的updated_at
                 cursor.execute('UPDATE entities SET updated_at = ? WHERE uuid = ?', (now, entity_uuid))
@@ -756,6 +871,30 @@ class DatabaseManager:
 
                 return info_uuid
 
+    @staticmethod
+    def _find_duplicate_info(candidates: List[Any], content: str,
+                             fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        在候选相关信息中查找与content相同或近似重复的条目
+
+        Args:
+            candidates: 候选记录（需包含 content、fingerprint 字段）
+            content: 新信息内容
+            fingerprint: 新信息指纹
+
+        Returns:
+            完全相同的记录优先，否则返回相似度最高的近似重复记录；没有则返回None
+        """
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            if candidate['content'] == content:
+                return candidate
+            if is_near_duplicate(content, candidate['content'], fingerprint, candidate['fingerprint']):
+                score = fingerprint_similarity(fingerprint, candidate['fingerprint'])
+                if best is None or score > best_score:
+                    best, best_score = candidate, score
+        return best
+
     def get_entity_related_info(self, entity_uuid: str) -> List[Dict[str, Any]]:
         """
         获取实体的所有相关信息
@@ -794,6 +933,239 @@ class DatabaseManager:
             print(f"✗ 删除相关信息时出错: {e}")
             return False
 
+    def compact_related_info_duplicates(self, entity_uuid: str = None) -> Dict[str, int]:
+        """
+        合并已有的近似重复相关信息（一次性整理任务）
+        同一实体、同一类型下的近似重复条目合并到提及次数最多的条目，
+        提及次数累加、置信度取最大值，并按阈值升级状态
+
+        Args:
+            entity_uuid: 只整理指定实体，为None时整理全部实体
+
+        Returns:
+            统计信息：checked（检查条数）、merged（被合并删除的条数）、kept（合并后保留并更新的条数）
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            sql = '''
+                SELECT uuid, entity_uuid, content, type, confidence, status, mention_count,
+                       last_mentioned_at, created_at, fingerprint
+                FROM entity_related_info
+            '''
+            if entity_uuid:
+                cursor.execute(sql + ' WHERE entity_uuid = ?', (entity_uuid,))
+            else:
+                cursor.execute(sql)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+            groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+            for row in rows:
+                if not row['fingerprint']:
+                    row['fingerprint'] = compute_fingerprint(row['content'])
+                groups.setdefault((row['entity_uuid'], row['type']), []).append(row)
+
+            updated: Dict[str, Dict[str, Any]] = {}
+            deleted: List[str] = []
+            for group in groups.values():
+                if len(group) < 2:
+                    continue
+                # 已确认、提及次数多、创建早的条目优先作为保留项
+                group.sort(key=lambda r: (r['status'] != self.STATUS_CONFIRMED,
+                                          -(r['mention_count'] or 1), r['created_at']))
+                keepers: List[Dict[str, Any]] = []
+                for row in group:
+                    keeper = self._find_duplicate_info(keepers, row['content'], row['fingerprint'])
+                    if keeper is None:
+                        keepers.append(row)
+                        continue
+                    keeper['mention_count'] = (keeper['mention_count'] or 1) + (row['mention_count'] or 1)
+                    keeper['confidence'] = max(keeper['confidence'] or 0.0, row['confidence'] or 0.0)
+                    keeper['last_mentioned_at'] = max(keeper['last_mentioned_at'] or '', row['last_mentioned_at'] or '') or None
+                    if (row['status'] == self.STATUS_CONFIRMED
+                            or keeper['mention_count'] >= self.KNOWLEDGE_CONFIRMATION_THRESHOLD):
+                        keeper['status'] = self.STATUS_CONFIRMED
+                    updated[keeper['uuid']] = keeper
+                    deleted.append(row['uuid'])
+
+            if updated:
+                cursor.executemany('''
+                    UPDATE entity_related_info
+                    SET mention_count = ?, confidence = ?, status = ?, last_mentioned_at = ?, fingerprint = ?
+                    WHERE uuid = ?
+                ''', [(r['mention_count'], r['confidence'], r['status'], r['last_mentioned_at'],
+                       r['fingerprint'], r['uuid']) for r in updated.values()])
+            if deleted:
+                cursor.executemany('DELETE FROM entity_related_info WHERE uuid = ?',
+                                   [(info_uuid,) for info_uuid in deleted])
+
+        stats = {'checked': len(rows), 'merged': len(deleted), 'kept': len(updated)}
+        if deleted:
+            print(f"✓ 近似重复知识整理完成: 检查 {stats['checked']} 条，合并 {stats['merged']} 条")
+        return stats
+
+    def upsert_knowledge_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量写入知识提取结果（单个事务）
+        解析或创建实体、写入定义、合并相同或近似重复的相关信息（增加mention_count并升级状态），
+        并返回每条知识写入后的最终状态
+
+        Args:
+            items: 知识列表，每项包含 entity_name、content、is_definition、type、source、confidence
+
+        Returns:
+            与items顺序一致的结果列表，每项包含 entity_name、entity_uuid、is_definition、
+            info_uuid、status、mention_count、confidence、merged
+        """
+        if not items:
+            return []
+
+        if self.debug:
+            print(f"🐛 [DEBUG] 批量写入知识: {len(items)} 条")
+
+        now = datetime.now().isoformat()
+        results: List[Dict[str, Any]] = []
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            # 1. 批量解析实体（按规范化名称）
+            names: Dict[str, str] = {}
+            for item in items:
+                name = item.get('entity_name') or '未知'
+                names.setdefault(name.strip().lower(), name)
+
+            entity_uuids: Dict[str, str] = {}
+            normalized_names = list(names.keys())
+            for start in range(0, len(normalized_names), self.BATCH_CHUNK_SIZE):
+                chunk = normalized_names[start:start + self.BATCH_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT uuid, normalized_name FROM entities WHERE normalized_name IN ({placeholders})',
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    entity_uuids.setdefault(row['normalized_name'], row['uuid'])
+
+            new_entities = []
+            for normalized_name, name in names.items():
+                if normalized_name not in entity_uuids:
+                    entity_uuid = str(uuid.uuid4())
+                    entity_uuids[normalized_name] = entity_uuid
+                    new_entities.append((entity_uuid, name, normalized_name, now, now))
+            if new_entities:
+                cursor.executemany('''
+                    INSERT INTO entities (uuid, name, normalized_name, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', new_entities)
+
+            # 2. 预取涉及实体的已有相关信息，用于去重
+            related_uuids = sorted({
+                entity_uuids[(item.get('entity_name') or '未知').strip().lower()]
+                for item in items if not item.get('is_definition', False)
+            })
+            existing_info: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+            for start in range(0, len(related_uuids), self.BATCH_CHUNK_SIZE):
+                chunk = related_uuids[start:start + self.BATCH_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT uuid, entity_uuid, content, type, confidence, mention_count, status, fingerprint
+                    FROM entity_related_info WHERE entity_uuid IN ({placeholders})
+                ''', chunk)
+                for row in cursor.fetchall():
+                    existing_info.setdefault((row['entity_uuid'], row['type']), []).append(dict(row))
+
+            # 3. 在内存中合并，最后统一写入
+            definitions: Dict[str, Tuple] = {}
+            inserts: Dict[str, Dict[str, Any]] = {}
+            updates: Dict[str, Dict[str, Any]] = {}
+            touched_entities = set()
+
+            for item in items:
+                name = item.get('entity_name') or '未知'
+                entity_uuid = entity_uuids[name.strip().lower()]
+                content = item.get('content', '')
+                touched_entities.add(entity_uuid)
+
+                if item.get('is_definition', False):
+                    confidence = item.get('confidence', 0.8)
+                    # 同一批次中后出现的定义覆盖先出现的
+                    definitions[entity_uuid] = (
+                        entity_uuid, content, item.get('type', '定义'), item.get('source', ''),
+                        confidence, 50, 0, now, now
+                    )
+                    results.append({
+                        'entity_name': name, 'entity_uuid': entity_uuid, 'is_definition': True,
+                        'info_uuid': None, 'status': None, 'mention_count': None,
+                        'confidence': confidence, 'merged': False
+                    })
+                    continue
+
+                type_ = item.get('type', '其他')
+                fingerprint = compute_fingerprint(content)
+                candidates = existing_info.setdefault((entity_uuid, type_), [])
+                record = self._find_duplicate_info(candidates, content, fingerprint)
+
+                if record:
+                    # 已存在相同或近似重复的信息：增加mention_count，恢复被衰减的置信度，达到阈值后升级为"确认"
+                    record['mention_count'] += 1
+                    record['confidence'] = max(record['confidence'] or 0.0, item.get('confidence', 0.7))
+                    if record['mention_count'] >= self.KNOWLEDGE_CONFIRMATION_THRESHOLD:
+                        record['status'] = self.STATUS_CONFIRMED
+                    if record['uuid'] not in inserts:
+                        updates[record['uuid']] = record
+                    merged = True
+                else:
+                    record = {
+                        'uuid': str(uuid.uuid4()), 'entity_uuid': entity_uuid, 'content': content,
+                        'type': type_, 'source': item.get('source', ''),
+                        'confidence': item.get('confidence', 0.7),
+                        'status': item.get('status', self.STATUS_SUSPECTED), 'mention_count': 1,
+                        'fingerprint': fingerprint
+                    }
+                    candidates.append(record)
+                    inserts[record['uuid']] = record
+                    merged = False
+
+                results.append({
+                    'entity_name': name, 'entity_uuid': entity_uuid, 'is_definition': False,
+                    'info_uuid': record['uuid'], 'status': record['status'],
+                    'mention_count': record['mention_count'], 'confidence': record['confidence'],
+                    'merged': merged
+                })
+
+            if definitions:
+                cursor.executemany('DELETE FROM entity_definitions WHERE entity_uuid = ?',
+                                   [(entity_uuid,) for entity_uuid in definitions])
+                cursor.executemany('''
+                    INSERT INTO entity_definitions
+                    (entity_uuid, content, type, source, confidence, priority, is_base_knowledge, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', list(definitions.values()))
+
+            if inserts:
+                cursor.executemany('''
+                    INSERT INTO entity_related_info
+                    (uuid, entity_uuid, content, type, source, confidence, status, mention_count, last_mentioned_at, created_at, fingerprint)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(r['uuid'], r['entity_uuid'], r['content'], r['type'], r['source'], r['confidence'],
+                       r['status'], r['mention_count'], now, now, r['fingerprint']) for r in inserts.values()])
+
+            if updates:
+                cursor.executemany('''
+                    UPDATE entity_related_info
+                    SET mention_count = ?, status = ?, confidence = ?, last_mentioned_at = ?
+                    WHERE uuid = ?
+                ''', [(r['mention_count'], r['status'], r['confidence'], now, r['uuid']) for r in updates.values()])
+
+            cursor.executemany('UPDATE entities SET updated_at = ? WHERE uuid = ?',
+                               [(now, entity_uuid) for entity_uuid in touched_entities])
+
+        if self.debug:
+            print(f"🐛 [DEBUG] ✓ 批量写入完成 - 新实体: {len(new_entities)}, "
+                  f"新信息: {len(inserts)}, 合并: {len(updates)}, 定义: {len(definitions)}")
+
+        return results
+
     # ==================== 短期记忆相关方法 ====================
 
     def add_short_term_message(self, role: str, content: str) -> int:
@@ -838,6 +1210,30 @@ class DatabaseManager:
                 cursor.execute('SELECT * FROM short_term_memory ORDER BY id ASC')
                 return [dict(row) for row in cursor.fetchall()]
 
+    def get_short_term_messages_since(self, after_id: Optional[int] = None,
+                                      limit: int = None) -> List[Dict[str, Any]]:
+        """
+        获取指定消息ID之后的短期记忆消息（按时间顺序）
+
+        Args:
+            after_id: 起始消息ID（不包含），为None时从头开始
+            limit: 最多返回最近的多少条
+
+        Returns:
+            消息列表
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if limit:
+                cursor.execute('''
+                    SELECT * FROM short_term_memory
+                    WHERE id > ? ORDER BY id DESC LIMIT ?
+                ''', (after_id or 0, limit))
+                # 反转以保持时间顺序
+                return [dict(row) for row in reversed(cursor.fetchall())]
+            cursor.execute('SELECT * FROM short_term_memory WHERE id > ? ORDER BY id ASC', (after_id or 0,))
+            return [dict(row) for row in cursor.fetchall()]
+
     def delete_short_term_messages(self, message_ids: List[int]) -> bool:
         """
         删除短期记忆消息
@@ -964,18 +1360,48 @@ class DatabaseManager:
                   datetime.now().isoformat()))
         return analysis_uuid
 
-    def get_emotion_history(self) -> List[Dict[str, Any]]:
+    def get_emotion_history(self, limit: int = None) -> List[Dict[str, Any]]:
         """
         获取情感分析历史
 
+        Args:
+            limit: 最多返回最近的多少条，None表示全部
+
         Returns:
-            情感分析列表
+            情感分析列表（按时间倒序）
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM emotion_history ORDER BY created_at DESC')
+            if limit:
+                cursor.execute('SELECT * FROM emotion_history ORDER BY created_at DESC LIMIT ?', (limit,))
+            else:
+                cursor.execute('SELECT * FROM emotion_history ORDER BY created_at DESC')
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_emotion_count(self) -> int:
+        """
+        获取情感分析记录数量
+
+        Returns:
+            记录数量
+        """
+        with self.get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM emotion_history').fetchone()[0]
+
+    def get_emotion_series(self) -> List[Tuple]:
+        """
+        获取情感评分时间序列（仅数值列，用于趋势分析）
+
+        Returns:
+            (created_at, overall_score, intimacy, trust, pleasure, resonance, dependence) 元组列表，按时间正序
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT created_at, overall_score, intimacy, trust, pleasure, resonance, dependence
+                FROM emotion_history ORDER BY created_at ASC
+            ''')
+            return [tuple(row) for row in cursor.fetchall()]
+
     def get_latest_emotion(self) -> Optional[Dict[str, Any]]:
         """
         获取最新的情感分析
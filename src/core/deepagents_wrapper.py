@@ -4,15 +4,20 @@ DeepAgents 集成模块
 """
 
 import os
-from typing import List, Dict, Any, Optional, Callable
+import copy
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from dotenv import load_dotenv
 from deepagents import create_deep_agent, SubAgent as DeepSubAgent, MemoryMiddleware, FilesystemMiddleware
-from deepagents.backends import StateBackend
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_openai import ChatOpenAI
 
 from src.tools.debug_logger import get_debug_logger
 from src.core.langchain_llm import LangChainLLM, ModelType
+from src.core.file_spill_backend import create_file_backend
 
 load_dotenv()
 
@@ -40,6 +45,7 @@ class DeepSubAgentWrapper:
         memory_paths: List[str] = None,
         enable_filesystem: bool = True,
         enable_memory: bool = True,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
         **kwargs  # 接受额外参数以保持向后兼容
     ):
         """
@@ -54,6 +60,7 @@ class DeepSubAgentWrapper:
             memory_paths: 记忆文件路径列表
             enable_filesystem: 是否启用文件系统功能
             enable_memory: 是否启用长期记忆功能
+            checkpointer: 共享的检查点存储（如 SQLiteCheckpointSaver），为None时使用随实例释放的内存检查点
             **kwargs: 其他参数（用于向后兼容，会被忽略）
         """
         self.agent_id = agent_id
@@ -61,23 +68,18 @@ class DeepSubAgentWrapper:
         self.description = description
         self.tools = tools or []
         
+        # 默认线程ID（None时使用agent_id）；池化副本使用独立线程并在执行后清理
+        self.thread_id = None
+        self.ephemeral_thread = False
+        
         # 构建系统提示词
         if system_prompt is None:
-            system_prompt = f"""你是一个{role}。
-
-你的职责：{description}
-
-请按照任务要求完成你的工作，如有需要可以使用可用的工具。
-你可以：
-1. 使用write_todos管理待办事项，规划任务步骤
-2. 使用文件系统工具（ls, read_file, write_file等）处理大型结果
-3. 保持状态跨会话持久化
-"""
+            system_prompt = self.default_system_prompt(role, description)
         
         self.system_prompt = system_prompt
         
         # 创建checkpointer用于状态持久化
-        self.checkpointer = MemorySaver()
+        self.checkpointer = checkpointer or MemorySaver()
         
         # 配置记忆路径
         self.memory_paths = memory_paths or []
@@ -120,7 +122,7 @@ class DeepSubAgentWrapper:
                 system_prompt=self.system_prompt,
                 middleware=middleware,
                 checkpointer=self.checkpointer,  # 启用状态持久化
-                backend=StateBackend,  # 使用状态后端（内存中的文件系统）
+                backend=create_file_backend(),  # 状态后端（内存中的文件系统），大文件转存到磁盘
                 name=agent_id
             )
             
@@ -136,6 +138,48 @@ class DeepSubAgentWrapper:
             debug_logger.log_error('DeepSubAgentWrapper', f'创建深度智能体失败: {str(e)}', e)
             raise
 
+    @staticmethod
+    def default_system_prompt(role: str, description: str) -> str:
+        """
+        根据角色和描述生成默认系统提示词
+
+        Args:
+            role: 角色名称
+            description: 角色描述
+
+        Returns:
+            系统提示词
+        """
+        return f"""你是一个{role}。
+
+你的职责：{description}
+
+请按照任务要求完成你的工作，如有需要可以使用可用的工具。
+你可以：
+1. 使用write_todos管理待办事项，规划任务步骤
+2. 使用文件系统工具（ls, read_file, write_file等）处理大型结果
+3. 保持状态跨会话持久化
+"""
+
+    def bind(self, agent_id: str, description: Optional[str] = None) -> 'DeepSubAgentWrapper':
+        """
+        复用已编译的智能体，返回使用独立线程ID的浅拷贝
+
+        Args:
+            agent_id: 新的智能体ID
+            description: 角色描述（仅用于展示，不影响已编译的智能体）
+
+        Returns:
+            共享同一智能体图和checkpointer的包装器，执行结束后删除其线程的检查点
+        """
+        bound = copy.copy(self)
+        bound.agent_id = agent_id
+        if description is not None:
+            bound.description = description
+        bound.thread_id = f'{agent_id}_{uuid.uuid4().hex[:8]}'
+        bound.ephemeral_thread = True
+        return bound
+
     def execute_task(
         self,
         task_description: str,
@@ -165,7 +209,7 @@ class DeepSubAgentWrapper:
         try:
             # 使用thread_id实现跨会话状态管理
             if thread_id is None:
-                thread_id = self.agent_id
+                thread_id = self.thread_id or self.agent_id
             
             # 准备配置
             config = {
@@ -221,6 +265,13 @@ class DeepSubAgentWrapper:
         except Exception as e:
             debug_logger.log_error('DeepSubAgentWrapper', f'智能体[{self.role}]执行失败: {str(e)}', e)
             return f"【执行失败】{str(e)}"
+        finally:
+            # 池化副本的线程只属于本次任务，结束后释放共享checkpointer中的状态
+            if self.ephemeral_thread and thread_id == self.thread_id:
+                try:
+                    self.checkpointer.delete_thread(thread_id)
+                except Exception as e:
+                    debug_logger.log_error('DeepSubAgentWrapper', f'清理线程状态失败: {str(e)}', e)
     
     def _format_context(self, context: Dict[str, Any]) -> str:
         """
@@ -257,6 +308,116 @@ class DeepSubAgentWrapper:
             return {}
 
 
+class SubAgentPool:
+    """
+    深度子智能体池
+    按角色、系统提示词、工具和中间件配置缓存已编译的智能体（含LLM客户端和checkpointer），
+    同样配置的子智能体直接复用，每次取出的副本使用独立的线程ID；超出容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_size: int = None):
+        """
+        初始化子智能体池
+
+        Args:
+            max_size: 最多缓存的已编译智能体数量
+        """
+        self.max_size = max_size or int(os.getenv('SUB_AGENT_POOL_SIZE', '16'))
+        self._agents: 'OrderedDict[Tuple, DeepSubAgentWrapper]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _make_key(role: str, system_prompt: str, tools: List[Any], memory_paths: List[str],
+                  enable_filesystem: bool, enable_memory: bool) -> Tuple:
+        """生成缓存键（工具按名称和对象标识区分）"""
+        tool_keys = tuple((getattr(tool, 'name', type(tool).__name__), id(tool)) for tool in tools)
+        return (role, system_prompt, tool_keys, tuple(memory_paths), enable_filesystem, enable_memory)
+
+    def acquire(
+        self,
+        agent_id: str,
+        role: str,
+        description: str,
+        system_prompt: Optional[str] = None,
+        tools: List[Any] = None,
+        memory_paths: List[str] = None,
+        enable_filesystem: bool = True,
+        enable_memory: bool = True
+    ) -> DeepSubAgentWrapper:
+        """
+        取出一个子智能体，参数同 DeepSubAgentWrapper
+
+        Returns:
+            复用已编译智能体、使用独立线程ID的包装器
+        """
+        tools = tools or []
+        memory_paths = memory_paths or []
+        if system_prompt is None:
+            system_prompt = DeepSubAgentWrapper.default_system_prompt(role, description)
+        key = self._make_key(role, system_prompt, tools, memory_paths, enable_filesystem, enable_memory)
+
+        with self._lock:
+            template = self._agents.get(key)
+            if template is not None:
+                self._agents.move_to_end(key)
+                self._stats['hits'] += 1
+        if template is None:
+            # 在锁外编译，避免阻塞其他角色的取用；并发创建同一配置时保留先放入的那个
+            built = DeepSubAgentWrapper(
+                agent_id=agent_id,
+                role=role,
+                description=description,
+                system_prompt=system_prompt,
+                tools=tools,
+                memory_paths=memory_paths,
+                enable_filesystem=enable_filesystem,
+                enable_memory=enable_memory
+            )
+            with self._lock:
+                self._stats['misses'] += 1
+                template = self._agents.setdefault(key, built)
+                self._agents.move_to_end(key)
+                while len(self._agents) > self.max_size:
+                    self._agents.popitem(last=False)
+                    self._stats['evictions'] += 1
+
+        return template.bind(agent_id, description)
+
+    def clear(self):
+        """清空池"""
+        with self._lock:
+            self._agents.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取池的统计信息
+
+        Returns:
+            命中、未命中、淘汰次数和当前大小
+        """
+        with self._lock:
+            return dict(self._stats, size=len(self._agents))
+
+
+_sub_agent_pool: Optional[SubAgentPool] = None
+_sub_agent_pool_lock = threading.Lock()
+
+
+def get_sub_agent_pool() -> SubAgentPool:
+    """
+    获取进程内共享的子智能体池
+
+    Returns:
+        SubAgentPool实例
+    """
+    global _sub_agent_pool
+    with _sub_agent_pool_lock:
+        if _sub_agent_pool is None:
+            _sub_agent_pool = SubAgentPool()
+        return _sub_agent_pool
+
+
 class DeepAgentsKnowledgeManager:
     """
     基于DeepAgents的知识管理器
@@ -331,7 +492,7 @@ class DeepAgentsKnowledgeManager:
             system_prompt=system_prompt,
             memory=[self.memory_file],  # 启用长期记忆
             checkpointer=self.checkpointer,
-            backend=StateBackend,
+            backend=create_file_backend(),
             name="knowledge_manager"
         )
         
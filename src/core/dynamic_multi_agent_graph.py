@@ -10,9 +10,11 @@ from typing import TypedDict, Annotated, List, Dict, Any, Optional
 import operator
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.tools.debug_logger import get_debug_logger
+from src.core.dag_executor import DagExecutor, find_cycle, critical_path
+from src.core.checkpoint_store import SQLiteCheckpointSaver
+from src.core.agent_result_cache import AgentResultCache
 from src.core.event_manager import TaskEvent
 
 # 获取debug日志记录器
@@ -21,6 +23,9 @@ debug_logger = get_debug_logger()
 # 是否启用长期记忆和跨会话状态管理
 ENABLE_PERSISTENT_STATE = os.getenv('ENABLE_PERSISTENT_STATE', 'true').lower() == 'true'
 
+# 是否缓存子智能体结果（相同角色、相近任务和相同依赖输出时复用）
+ENABLE_AGENT_RESULT_CACHE = os.getenv('AGENT_RESULT_CACHE_ENABLED', 'false').lower() == 'true'
+
 
 class AgentState(TypedDict):
     """
@@ -75,7 +80,8 @@ class DynamicMultiAgentGraph:
     增强版：支持长期记忆和跨会话状态管理
     """
     
-    def __init__(self, question_tool=None, progress_callback=None, enable_persistent_state=ENABLE_PERSISTENT_STATE):
+    def __init__(self, question_tool=None, progress_callback=None, enable_persistent_state=ENABLE_PERSISTENT_STATE,
+                 max_concurrency: int = None, db_manager=None, enable_result_cache=ENABLE_AGENT_RESULT_CACHE):
         """
         初始化动态多智能体协作图
         
@@ -83,18 +89,35 @@ class DynamicMultiAgentGraph:
             question_tool: 中断性提问工具
             progress_callback: 进度回调函数
             enable_persistent_state: 是否启用持久化状态管理
+            max_concurrency: 同时执行的智能体数量上限
+            db_manager: 保存检查点和结果缓存的数据库管理器实例
+            enable_result_cache: 是否缓存子智能体结果（任务事件的 metadata 中 bypass_result_cache 为真时跳过读取）
         """
         self.question_tool = question_tool
         self.progress_callback = progress_callback
         self.enable_persistent_state = enable_persistent_state
+        self.dag_executor = DagExecutor(max_concurrency)
         
         # 启用持久化状态管理
         if self.enable_persistent_state:
-            self.checkpointer = MemorySaver()
+            try:
+                # 检查点保存在数据库中，进程重启后可以继续被中断的任务
+                self.checkpointer = SQLiteCheckpointSaver(db_manager)
+            except Exception as e:
+                debug_logger.log_error('DynamicMultiAgentGraph', f'数据库检查点初始化失败，使用内存检查点: {str(e)}', e)
+                self.checkpointer = MemorySaver()
             debug_logger.log_info('DynamicMultiAgentGraph', '已启用持久化状态管理（checkpointer）')
         else:
             self.checkpointer = None
         
+        # 子智能体结果缓存（可选）
+        self.result_cache = None
+        if enable_result_cache:
+            try:
+                self.result_cache = AgentResultCache(db_manager)
+            except Exception as e:
+                debug_logger.log_error('DynamicMultiAgentGraph', f'子智能体结果缓存初始化失败: {str(e)}', e)
+        
         self.graph = self._build_graph()
         
         debug_logger.log_module('DynamicMultiAgentGraph', '动态多智能体协作图初始化完成', {
@@ -152,7 +175,7 @@ class DynamicMultiAgentGraph:
         
         workflow.add_edge("synthesize", END)
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
     
     def _emit_progress(self, state: MultiAgentState, message: str):
         """
@@ -223,7 +246,7 @@ class DynamicMultiAgentGraph:
     
     def _execute_parallel_node(self, state: MultiAgentState) -> MultiAgentState:
         """
-        并行执行节点：同时执行多个独立的智能体任务
+        并行执行节点：同时执行多个独立的智能体任务（声明了依赖的智能体仍会等待其依赖）
         
         Args:
             state: 当前状态
@@ -232,56 +255,11 @@ class DynamicMultiAgentGraph:
             更新后的状态
         """
         debug_logger.log_module('DynamicMultiAgentGraph', '开始并行执行', {})
-        
-        plan = state['orchestration_plan']
-        agents_to_execute = [a for a in plan['agents'] if a.get('status') == 'pending']
-        
-        if not agents_to_execute:
-            state['next_action'] = 'synthesize'
-            return state
-        
-        self._emit_progress(state, f"并行执行{len(agents_to_execute)}个智能体任务...")
-        
-        # 使用线程池并行执行
-        with ThreadPoolExecutor(max_workers=min(len(agents_to_execute), 3)) as executor:
-            futures = {}
-            for agent_state in agents_to_execute:
-                future = executor.submit(self._execute_agent, agent_state, state)
-                futures[future] = agent_state['agent_id']
-            
-            # 收集结果
-            for future in as_completed(futures):
-                agent_id = futures[future]
-                try:
-                    result = future.result()
-                    state['agent_results'][agent_id] = result['result']
-                    
-                    # 更新智能体状态
-                    for a in plan['agents']:
-                        if a['agent_id'] == agent_id:
-                            a['status'] = 'completed' if result['success'] else 'failed'
-                            a['result'] = result['result']
-                            if not result['success']:
-                                a['error'] = result.get('error')
-                    
-                    self._emit_progress(state, f"智能体 [{result['role']}] 完成任务")
-                    
-                except Exception as e:
-                    debug_logger.log_error('DynamicMultiAgentGraph', f'智能体执行异常: {str(e)}', e)
-                    state['agent_results'][agent_id] = f"执行失败: {str(e)}"
-        
-        # 检查是否还有待执行的智能体
-        remaining = [a for a in plan['agents'] if a.get('status') == 'pending']
-        if remaining:
-            state['next_action'] = 'execute_parallel'
-        else:
-            state['next_action'] = 'synthesize'
-        
-        return state
+        return self._execute_plan(state)
     
     def _execute_sequential_node(self, state: MultiAgentState) -> MultiAgentState:
         """
-        顺序执行节点：按依赖关系顺序执行智能体任务
+        顺序执行节点：按依赖关系执行智能体任务，互不依赖的智能体同时执行
         
         Args:
             state: 当前状态
@@ -290,51 +268,82 @@ class DynamicMultiAgentGraph:
             更新后的状态
         """
         debug_logger.log_module('DynamicMultiAgentGraph', '开始顺序执行', {})
+        return self._execute_plan(state)
+    
+    def _execute_plan(self, state: MultiAgentState) -> MultiAgentState:
+        """
+        按依赖图执行所有待执行的智能体：每个智能体在其依赖全部结束后立即开始，
+        并记录每个智能体的耗时和关键路径
         
+        Args:
+            state: 当前状态
+            
+        Returns:
+            更新后的状态
+        """
         plan = state['orchestration_plan']
-        agents_to_execute = [a for a in plan['agents'] if a.get('status') == 'pending']
+        agents = {a['agent_id']: a for a in plan['agents'] if a.get('status') == 'pending'}
         
-        if not agents_to_execute:
+        if not agents:
             state['next_action'] = 'synthesize'
             return state
         
-        # 找到第一个可执行的智能体（依赖已满足）
-        executable = None
-        for agent_state in agents_to_execute:
-            dependencies = agent_state.get('dependencies', [])
-            if all(state['agent_results'].get(dep_id) for dep_id in dependencies):
-                executable = agent_state
-                break
-        
-        if not executable:
-            # 没有可执行的智能体，可能是依赖关系有问题
-            state['error'] = '无法找到可执行的智能体，可能存在循环依赖'
+        # 已完成的智能体不再作为依赖等待
+        dependencies = {
+            agent_id: [dep for dep in agent.get('dependencies', []) if dep in agents]
+            for agent_id, agent in agents.items()
+        }
+        cycle = find_cycle(dependencies)
+        if cycle:
+            state['error'] = f"智能体依赖关系存在循环：{' -> '.join(cycle)}"
             state['next_action'] = 'end'
             return state
         
-        self._emit_progress(state, f"执行智能体 [{executable['role']}] 的任务...")
-        
-        # 执行智能体
-        result = self._execute_agent(executable, state)
-        state['agent_results'][executable['agent_id']] = result['result']
+        self._emit_progress(state, f"执行{len(agents)}个智能体任务（最多同时执行{self.dag_executor.max_concurrency}个）...")
         
-        # 更新智能体状态
-        for a in plan['agents']:
-            if a['agent_id'] == executable['agent_id']:
-                a['status'] = 'completed' if result['success'] else 'failed'
-                a['result'] = result['result']
-                if not result['success']:
-                    a['error'] = result.get('error')
+        def on_complete(agent_id: str, run: Dict[str, Any]):
+            agent = agents[agent_id]
+            result = run['result'] or {
+                'success': False,
+                'role': agent['role'],
+                'result': f"执行失败: {run['error']}",
+                'error': run['error']
+            }
+            state['agent_results'][agent_id] = result['result']
+            agent['status'] = 'completed' if result['success'] else 'failed'
+            agent['result'] = result['result']
+            if not result['success']:
+                agent['error'] = result.get('error')
+            
+            state['collaboration_logs'].append({
+                'timestamp': self._get_timestamp(),
+                'type': 'agent_timing',
+                'agent_id': agent_id,
+                'role': agent['role'],
+                'dependencies': dependencies[agent_id],
+                'started_offset': round(run['started'], 3),
+                'duration_seconds': round(run['duration'], 3)
+            })
+            self._emit_progress(state, f"智能体 [{agent['role']}] 完成任务")
         
-        self._emit_progress(state, f"智能体 [{result['role']}] 完成任务")
+        runs = self.dag_executor.run(
+            dependencies,
+            lambda agent_id: self._execute_agent(agents[agent_id], state),
+            on_complete=on_complete
+        )
         
-        # 检查是否还有待执行的智能体
-        remaining = [a for a in plan['agents'] if a.get('status') == 'pending']
-        if remaining:
-            state['next_action'] = 'execute_sequential'
-        else:
-            state['next_action'] = 'synthesize'
+        path, path_seconds = critical_path(dependencies, {k: v['duration'] for k, v in runs.items()})
+        state['collaboration_logs'].append({
+            'timestamp': self._get_timestamp(),
+            'type': 'execution_summary',
+            'wall_seconds': round(max((run['finished'] for run in runs.values()), default=0.0), 3),
+            'total_agent_seconds': round(sum(run['duration'] for run in runs.values()), 3),
+            'critical_path': path,
+            'critical_path_seconds': round(path_seconds, 3),
+            'max_concurrency': self.dag_executor.max_concurrency
+        })
         
+        state['next_action'] = 'synthesize'
         return state
     
     def _synthesize_node(self, state: MultiAgentState) -> MultiAgentState:
@@ -475,12 +484,6 @@ class DynamicMultiAgentGraph:
         """
         from src.core.multi_agent_coordinator import create_sub_agent
         
-        agent = create_sub_agent(
-            agent_id=agent_state['agent_id'],
-            role=agent_state['role'],
-            description=agent_state['description']
-        )
-        
         # 构建上下文，包含依赖的智能体结果
         context = {
             'task_info': state['task_event'],
@@ -494,9 +497,44 @@ class DynamicMultiAgentGraph:
                 for dep_id in agent_state['dependencies']
             }
         
+        # 查询结果缓存（任务事件可通过 metadata.bypass_result_cache 要求重新执行）
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.make_key(
+                agent_state['role'], agent_state['task'],
+                list(context.get('dependency_results', {}).values()),
+                task_info=context['task_info'],
+                character=context['character']
+            )
+            bypass = (state['task_event'].get('metadata') or {}).get('bypass_result_cache')
+            cached = None if bypass else self.result_cache.get(cache_key)
+            if cached is not None:
+                state['collaboration_logs'].append({
+                    'timestamp': self._get_timestamp(),
+                    'agent_id': agent_state['agent_id'],
+                    'role': agent_state['role'],
+                    'action': '复用缓存结果',
+                    'result': cached[:200] + '...' if len(cached) > 200 else cached
+                })
+                return {
+                    'success': True,
+                    'role': agent_state['role'],
+                    'result': cached,
+                    'cached': True
+                }
+        
         try:
+            agent = create_sub_agent(
+                agent_id=agent_state['agent_id'],
+                role=agent_state['role'],
+                description=agent_state['description']
+            )
             result = agent.execute_task(agent_state['task'], context)
             
+            # 只缓存成功的结果
+            if cache_key is not None and not result.startswith('【执行失败】'):
+                self.result_cache.put(cache_key, agent_state['role'], agent_state['task'], result)
+            
             state['collaboration_logs'].append({
                 'timestamp': self._get_timestamp(),
                 'agent_id': agent_state['agent_id'],
@@ -630,7 +668,16 @@ class DynamicMultiAgentGraph:
                     'thread_id': thread_id
                 })
                 
-                final_state = self.graph.invoke(initial_state, config=config)
+                if self.graph.get_state(config).next:
+                    # 上次执行在中途中断（如进程退出），从最后一个检查点继续
+                    debug_logger.log_info('DynamicMultiAgentGraph', '从检查点恢复中断的任务', {
+                        'thread_id': thread_id
+                    })
+                    final_state = self.graph.invoke(None, config=config)
+                else:
+                    # 已完成的旧状态不再需要，重新执行时从空状态开始，避免累积上次的日志和智能体
+                    self.checkpointer.delete_thread(thread_id)
+                    final_state = self.graph.invoke(initial_state, config=config)
             else:
                 # 无状态执行
                 final_state = self.graph.invoke(initial_state)
@@ -12,6 +12,7 @@ from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import requests
 from src.core.database_manager import DatabaseManager
+from src.core.emotion_trends import EmotionTrendEngine
 from src.tools.debug_logger import get_debug_logger
 
 load_dotenv()
@@ -26,10 +27,22 @@ class EmotionRelationshipAnalyzer:
     分阶段评估系统：
     - 初次评估：基于前5轮对话，生成初始印象并评分(0-35)
     - 更新评估：每15轮对话，评估最近表现并给出分数变化(-3到+3)
+    - 增量评估：仅发送上次的结构化情感状态和新增消息，返回评分变化量
     使用累加评分系统，基于角色设定生成印象
     使用数据库存储替代JSON文件
     """
 
+    # 情感维度（与 emotion_history 表字段一致）
+    DIMENSIONS = ('intimacy', 'trust', 'pleasure', 'resonance', 'dependence')
+    # 没有维度评分的历史记录使用的基准值
+    DIMENSION_BASELINE = 50
+    # 增量评估单次最多发送的新消息数
+    INCREMENTAL_MAX_MESSAGES = 30
+    # 增量评估中上次印象的最大长度
+    IMPRESSION_SUMMARY_LENGTH = 120
+    # 记录上次分析到的消息ID的元数据键
+    METADATA_LAST_MESSAGE_ID = 'emotion_last_analyzed_message_id'
+
     def __init__(self,
                  db_manager: DatabaseManager = None):
         """
@@ -44,6 +57,9 @@ class EmotionRelationshipAnalyzer:
         # 初始化模型名称（用于日志记录）
         self.model_name = os.getenv('TOOL_MODEL_NAME', 'zai-org/GLM-4.6V')
 
+        # 情感趋势分析引擎（向量化计算与图表降采样）
+        self.trend_engine = EmotionTrendEngine(self.db)
+
         # 检查是否需要从JSON迁移数据
         if os.path.exists('emotion_data.json'):
             print("○ 检测到旧的情感数据JSON文件，正在迁移...")
@@ -161,6 +177,7 @@ class EmotionRelationshipAnalyzer:
 
             # 保存到数据库
             self._save_emotion_to_db(emotion_data)
+            self._mark_analyzed(recent_messages)
 
             debug_logger.log_info('EmotionAnalyzer', '情感分析完成', {
                 'overall_score': emotion_data.get('overall_score', 0),
@@ -175,6 +192,160 @@ class EmotionRelationshipAnalyzer:
             print(f"情感分析时出错: {e}")
             return self._get_default_emotion_result()
 
+    def analyze_emotion_incremental(self,
+                                    messages: List[Dict[str, Any]],
+                                    character_name: str = "AI",
+                                    character_brief: str = "") -> Dict[str, Any]:
+        """
+        增量情感分析
+        只发送上一次的结构化情感状态（评分、维度、印象摘要）和上次分析之后的新消息，
+        由LLM返回评分变化量，提示词长度与关系持续时间无关
+
+        Args:
+            messages: 候选消息列表（需包含消息 id，只分析 id 大于上次分析位置的消息）
+            character_name: AI角色名称
+            character_brief: 简短的角色描述
+
+        Returns:
+            情感分析结果；没有历史情感状态时退化为初次评估
+        """
+        previous_state = self.get_latest_emotion_state()
+        if previous_state is None:
+            return self.analyze_emotion_relationship(
+                messages, character_name, character_brief, is_initial=True
+            )
+
+        last_message_id = self.get_last_analyzed_message_id()
+        new_messages = [
+            msg for msg in messages
+            if msg.get('id') is None or last_message_id is None or msg['id'] > last_message_id
+        ][-self.INCREMENTAL_MAX_MESSAGES:]
+
+        debug_logger.log_module('EmotionAnalyzer', '开始增量情感分析', {
+            'new_messages': len(new_messages),
+            'last_message_id': last_message_id
+        })
+
+        if len(new_messages) < 2:
+            # 没有足够的新对话，保持上次状态
+            debug_logger.log_info('EmotionAnalyzer', '新增对话不足，跳过增量分析', {
+                'message_count': len(new_messages)
+            })
+            return dict(previous_state, score_change=0,
+                        previous_score=previous_state['overall_score'],
+                        is_initial=False, incremental=True, skipped=True)
+
+        impression = previous_state.get('impression', '')
+        if len(impression) > self.IMPRESSION_SUMMARY_LENGTH:
+            impression = impression[:self.IMPRESSION_SUMMARY_LENGTH] + "..."
+
+        try:
+            from src.core.prompt_manager import get_prompt_manager
+            variables = {
+                'character_name': character_name,
+                'character_brief': character_brief or "无特殊设定",
+                'relationship_type': previous_state['relationship_type'],
+                'emotional_tone': previous_state['emotional_tone'],
+                'overall_score': previous_state['overall_score'],
+                'impression': impression or "暂无",
+                'conversation_text': self._format_conversation(new_messages)
+            }
+            variables.update(previous_state['dimensions'])
+            prompt = get_prompt_manager().get_system_prompt('emotion_incremental', variables)
+
+            debug_logger.log_prompt('EmotionAnalyzer', 'user', prompt, {
+                'message_count': len(new_messages),
+                'prompt_length': len(prompt),
+                'incremental': True
+            })
+
+            result = self._call_llm(prompt)
+            emotion_data = self._parse_emotion_result(result, is_initial=False)
+
+            # 应用总分变化量（-3到+3）
+            current_score = previous_state['overall_score']
+            score_change = max(-3, min(3, self._to_int(emotion_data.get('score_change'))))
+            emotion_data['previous_score'] = current_score
+            emotion_data['score_change'] = score_change
+            emotion_data['overall_score'] = max(0, min(100, current_score + score_change))
+
+            # 应用维度变化量（-5到+5）
+            changes = emotion_data.get('dimension_changes') or {}
+            emotion_data['dimensions'] = {
+                name: max(0, min(100, value + max(-5, min(5, self._to_int(changes.get(name))))))
+                for name, value in previous_state['dimensions'].items()
+            }
+
+            emotion_data['timestamp'] = datetime.now().isoformat()
+            emotion_data['message_count'] = len(new_messages)
+            emotion_data['is_initial'] = False
+            emotion_data['incremental'] = True
+
+            self._save_emotion_to_db(emotion_data)
+            self._mark_analyzed(new_messages)
+
+            debug_logger.log_info('EmotionAnalyzer', '增量情感分析完成', {
+                'previous_score': current_score,
+                'score_change': score_change,
+                'final_score': emotion_data['overall_score'],
+                'dimensions': emotion_data['dimensions']
+            })
+
+            return emotion_data
+
+        except Exception as e:
+            debug_logger.log_error('EmotionAnalyzer', f'增量情感分析时出错: {str(e)}', e)
+            print(f"增量情感分析时出错: {e}")
+            return self._get_default_emotion_result(is_initial=False)
+
+    @staticmethod
+    def _to_int(value: Any, default: int = 0) -> int:
+        """安全地将LLM返回的数值转换为整数"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_latest_emotion_state(self) -> Optional[Dict[str, Any]]:
+        """
+        获取最新的结构化情感状态（用于增量评估）
+
+        Returns:
+            包含 overall_score、relationship_type、emotional_tone、impression、dimensions 的字典，
+            没有历史记录时返回None
+        """
+        latest_row = self.db.get_latest_emotion()
+        if not latest_row:
+            return None
+
+        latest = self._format_emotion_row(latest_row)
+        dimensions = {name: latest_row.get(name) or 0 for name in self.DIMENSIONS}
+        if not any(dimensions.values()):
+            # 旧记录没有维度评分，使用基准值
+            dimensions = {name: self.DIMENSION_BASELINE for name in self.DIMENSIONS}
+        latest['dimensions'] = dimensions
+        return latest
+
+    def get_last_analyzed_message_id(self) -> Optional[int]:
+        """
+        获取上次情感分析覆盖到的消息ID
+
+        Returns:
+            消息ID，没有记录时返回None
+        """
+        return self.db.get_metadata(self.METADATA_LAST_MESSAGE_ID)
+
+    def _mark_analyzed(self, messages: List[Dict[str, Any]]):
+        """
+        记录本次分析覆盖到的最后一条消息ID
+
+        Args:
+            messages: 本次分析的消息（不含ID时不记录）
+        """
+        message_ids = [msg['id'] for msg in messages if msg.get('id') is not None]
+        if message_ids:
+            self.db.set_metadata(self.METADATA_LAST_MESSAGE_ID, max(message_ids))
+
     def _save_emotion_to_db(self, emotion_data: Dict[str, Any]):
         """
         保存情感分析结果到数据库
@@ -218,16 +389,19 @@ class EmotionRelationshipAnalyzer:
                     score_info = f"【评分变化】{previous_score} → {overall_score} ({score_change:+d})\n\n"
             
             combined_summary = f"{score_info}【印象】\n{impression}\n\n【总结】\n{analysis}"
+
+            # 维度评分仅由增量评估维护，其余评估保持为0
+            dimensions = emotion_data.get('dimensions') or {}
             
             self.db.add_emotion_analysis(
                 relationship_type=emotion_data.get('relationship_type', '未知'),
                 emotional_tone=emotion_data.get('emotional_tone', '未知'),
                 overall_score=overall_score,
-                intimacy=0,  # 不再使用维度评分
-                trust=0,
-                pleasure=0,
-                resonance=0,
-                dependence=0,
+                intimacy=_safe_int(dimensions.get('intimacy'), 0),
+                trust=_safe_int(dimensions.get('trust'), 0),
+                pleasure=_safe_int(dimensions.get('pleasure'), 0),
+                resonance=_safe_int(dimensions.get('resonance'), 0),
+                dependence=_safe_int(dimensions.get('dependence'), 0),
                 analysis_summary=combined_summary
             )
             debug_logger.log_info('EmotionAnalyzer', '情感数据已保存到数据库')
@@ -591,6 +765,18 @@ class EmotionRelationshipAnalyzer:
         
         return base_result
 
+    def get_emotion_trend_analytics(self, max_points: int = 100) -> Dict[str, Any]:
+        """
+        获取情感趋势分析（滑动平均、各维度斜率、变化点及降采样后的图表数据）
+
+        Args:
+            max_points: 图表数据的最大点数
+
+        Returns:
+            趋势分析字典
+        """
+        return self.trend_engine.analyze(max_points=max_points)
+
     def get_emotion_trend(self) -> List[Dict[str, Any]]:
         """
         获取情感关系变化趋势（从数据库）
@@ -682,6 +868,18 @@ class EmotionRelationshipAnalyzer:
         if not latest:
             return None
 
+        return self._format_emotion_row(latest)
+
+    def _format_emotion_row(self, latest: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将 emotion_history 记录转换为情感数据格式
+
+        Args:
+            latest: 数据库记录
+
+        Returns:
+            情感数据字典
+        """
         # 转换为新格式
         analysis_summary = latest.get('analysis_summary', '')
         impression = ""
@@ -717,6 +915,17 @@ class EmotionRelationshipAnalyzer:
     def generate_tone_prompt(self) -> str:
         """
         根据最新情感分析生成对话语气提示
+        结果按 emotion_history 表的变更计数缓存，没有新的情感记录时直接复用
+
+        Returns:
+            语气提示文本，如果没有情感数据则返回空字符串
+        """
+        return self.db.get_cached_fragment('emotion_tone_prompt', ('emotion_history',),
+                                           self._build_tone_prompt)
+
+    def _build_tone_prompt(self) -> str:
+        """
+        构建对话语气提示
 
         Returns:
             语气提示文本，如果没有情感数据则返回空字符串
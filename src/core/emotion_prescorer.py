@@ -0,0 +1,242 @@
+"""
+情感预评分模块
+基于中文情感词典、表情符号和标点特征，在本地为每条消息计算情感倾向和亲密度信号，
+用于决定何时需要调用LLM进行情感关系分析：信号明显变化时提前分析，平淡闲聊时跳过定期分析
+"""
+
+import os
+import math
+import re
+from typing import Dict, Any, Tuple
+
+# 情感倾向词典（词 -> 权重）
+POSITIVE_WORDS = {
+    '开心': 1.0, '高兴': 1.0, '快乐': 1.0, '喜欢': 0.8, '爱': 0.8, '棒': 0.8, '厉害': 0.7,
+    '太好了': 1.2, '不错': 0.6, '好玩': 0.7, '有趣': 0.7, '感谢': 0.8, '谢谢': 0.6,
+    '期待': 0.7, '幸福': 1.2, '满意': 0.8, '舒服': 0.6, '温暖': 0.8, '放心': 0.5,
+    '可爱': 0.8, '优秀': 0.8, '完美': 1.0, '赞': 0.7, '哈哈': 0.6, 'hhh': 0.6, '嘿嘿': 0.5,
+    '激动': 0.8, '感动': 1.0, '轻松': 0.5, '好耶': 1.0,
+}
+NEGATIVE_WORDS = {
+    '难过': 1.0, '伤心': 1.0, '生气': 1.0, '讨厌': 1.0, '烦': 0.8, '累': 0.6, '无聊': 0.6,
+    '失望': 1.0, '郁闷': 0.8, '焦虑': 0.8, '害怕': 0.7, '痛苦': 1.2, '崩溃': 1.2,
+    '后悔': 0.8, '委屈': 0.9, '孤独': 0.9, '糟糕': 0.9, '烦死': 1.2, '气死': 1.2,
+    '难受': 0.9, '不爽': 0.9, '垃圾': 1.0, '无语': 0.7, '呵呵': 0.6, '算了': 0.5,
+    '失眠': 0.6, '哭': 0.8,
+}
+# 亲密度词典（正值表示拉近距离，负值表示疏远）
+INTIMACY_WORDS = {
+    '想你': 1.2, '喜欢你': 1.2, '爱你': 1.5, '抱抱': 1.0, '亲爱的': 1.0, '陪我': 0.8,
+    '陪着': 0.6, '信任': 0.8, '秘密': 0.7, '只告诉你': 1.0, '晚安': 0.4, '早安': 0.4,
+    '谢谢你': 0.6, '有你': 0.8, '我们': 0.3, '一起': 0.5, '想听': 0.4, '心事': 0.7,
+    '别理我': -1.2, '滚': -1.5, '不想聊': -1.0, '随便': -0.5, '关你什么事': -1.5,
+    '你不懂': -0.8, '走开': -1.2, '闭嘴': -1.5, '懒得': -0.6, '别烦': -1.0,
+}
+
+# 表情符号（字符 -> (情感倾向, 亲密度)）
+EMOJI_SIGNALS = {
+    '😊': (0.6, 0.2), '😄': (0.8, 0.1), '😁': (0.8, 0.1), '😂': (0.6, 0.1), '🤣': (0.6, 0.1),
+    '🥰': (0.9, 0.8), '😍': (0.9, 0.6), '😘': (0.8, 1.0), '❤': (0.8, 0.9), '💕': (0.8, 0.9),
+    '👍': (0.6, 0.0), '🎉': (0.8, 0.1), '🤗': (0.6, 0.8), '😢': (-0.8, 0.1), '😭': (-1.0, 0.1),
+    '😡': (-1.0, -0.3), '😠': (-0.9, -0.3), '💔': (-1.0, 0.0), '👎': (-0.7, -0.2),
+    '😒': (-0.6, -0.4), '🙄': (-0.6, -0.5), '😞': (-0.8, 0.0), '😔': (-0.7, 0.0),
+}
+
+NEGATION_WORDS = ('不', '没', '别', '没有', '不太', '不怎么', '并不')
+INTENSIFIERS = ('很', '非常', '特别', '太', '超', '好', '真', '十分', '超级')
+
+_EXCLAMATION = re.compile(r'[!！]')
+_ELLIPSIS = re.compile(r'(\.\.\.|。。。|…)')
+
+
+def _lexicon_score(text: str, lexicon: Dict[str, float]) -> float:
+    """
+    按词典累加得分（长词优先，处理否定词和程度副词）
+
+    Args:
+        text: 消息文本
+        lexicon: 词 -> 权重
+
+    Returns:
+        原始得分
+    """
+    score = 0.0
+    consumed = [False] * len(text)
+    for word in sorted(lexicon, key=len, reverse=True):
+        start = text.find(word)
+        while start != -1:
+            end = start + len(word)
+            if not any(consumed[start:end]):
+                for i in range(start, end):
+                    consumed[i] = True
+                weight = lexicon[word]
+                prefix = text[max(0, start - 3):start]
+                if any(prefix.endswith(intensifier) for intensifier in INTENSIFIERS):
+                    weight *= 1.5
+                if any(negation in prefix for negation in NEGATION_WORDS):
+                    weight = -weight * 0.5
+                score += weight
+            start = text.find(word, end)
+    return score
+
+
+def score_message(text: str) -> Dict[str, float]:
+    """
+    计算单条消息的情感倾向与亲密度信号
+
+    Args:
+        text: 消息文本
+
+    Returns:
+        包含 valence（-1到1）、intimacy（-1到1）的字典
+    """
+    text = (text or '').lower()
+    valence = _lexicon_score(text, POSITIVE_WORDS) - _lexicon_score(text, NEGATIVE_WORDS)
+    intimacy = _lexicon_score(text, INTIMACY_WORDS)
+
+    for char in text:
+        signal = EMOJI_SIGNALS.get(char)
+        if signal:
+            valence += signal[0]
+            intimacy += signal[1]
+
+    # 感叹号放大情绪强度，省略号略偏消极
+    exclamations = len(_EXCLAMATION.findall(text))
+    if exclamations:
+        valence *= 1 + 0.2 * min(exclamations, 3)
+    if _ELLIPSIS.search(text):
+        valence -= 0.3
+
+    return {
+        'valence': math.tanh(valence / 2),
+        'intimacy': math.tanh(intimacy / 2)
+    }
+
+
+class EmotionPreScorer:
+    """
+    情感预评分器
+    对每条用户消息计算本地信号并维护指数滑动平均，与上次LLM分析时的基线比较：
+    - 信号偏移较大时提前触发分析
+    - 到达定期分析点但信号平淡时跳过，最长不超过 max_interval_rounds
+    """
+
+    # 触发原因
+    REASON_SHIFT = "shift"  # 信号明显变化
+    REASON_SCHEDULED = "scheduled"  # 定期分析
+    REASON_MAX_INTERVAL = "max_interval"  # 达到最长间隔
+    REASON_FLAT = "flat"  # 信号平淡，跳过
+    REASON_TOO_SOON = "too_soon"  # 距上次分析太近
+    REASON_WAITING = "waiting"  # 未到分析点
+
+    def __init__(
+        self,
+        interval_rounds: int = 15,
+        min_rounds: int = 3,
+        max_interval_rounds: int = None,
+        shift_threshold: float = None,
+        flat_threshold: float = 0.1,
+        smoothing: float = 0.3
+    ):
+        """
+        初始化情感预评分器
+
+        Args:
+            interval_rounds: 定期分析的间隔轮数
+            min_rounds: 两次分析之间的最少轮数
+            max_interval_rounds: 信号平淡时最长可推迟到的轮数
+            shift_threshold: 提前触发分析的信号偏移阈值
+            flat_threshold: 低于该值的偏移和活跃度视为平淡
+            smoothing: 指数滑动平均的平滑系数
+        """
+        self.interval_rounds = interval_rounds
+        self.min_rounds = min_rounds
+        self.max_interval_rounds = max_interval_rounds or int(
+            os.getenv('EMOTION_PRESCORE_MAX_INTERVAL', str(interval_rounds * 3)))
+        self.shift_threshold = shift_threshold if shift_threshold is not None else float(
+            os.getenv('EMOTION_PRESCORE_SHIFT_THRESHOLD', '0.35'))
+        self.flat_threshold = flat_threshold
+        self.smoothing = smoothing
+
+        self.valence = 0.0
+        self.intimacy = 0.0
+        self._baseline = (0.0, 0.0)
+        self._activity = 0.0
+        self._observed = 0
+
+    def observe(self, text: str) -> Dict[str, float]:
+        """
+        处理一条用户消息，更新滑动平均
+
+        Args:
+            text: 消息文本
+
+        Returns:
+            该消息的信号
+        """
+        signal = score_message(text)
+        self.valence += self.smoothing * (signal['valence'] - self.valence)
+        self.intimacy += self.smoothing * (signal['intimacy'] - self.intimacy)
+        self._activity += abs(signal['valence']) + abs(signal['intimacy'])
+        self._observed += 1
+        return signal
+
+    @property
+    def shift(self) -> float:
+        """当前信号相对上次分析基线的偏移量"""
+        return max(abs(self.valence - self._baseline[0]), abs(self.intimacy - self._baseline[1]))
+
+    @property
+    def rounds_since_analysis(self) -> int:
+        """上次分析以来观察到的消息数（单调递增，不受短期记忆归档影响）"""
+        return self._observed
+
+    @property
+    def activity(self) -> float:
+        """上次分析以来每条消息的平均信号强度"""
+        return self._activity / self._observed if self._observed else 0.0
+
+    def should_analyze(self, rounds_since_last: int = None) -> Tuple[bool, str]:
+        """
+        判断是否需要进行LLM情感分析
+
+        Args:
+            rounds_since_last: 距上次分析的对话轮数（默认为上次分析以来观察到的消息数）
+
+        Returns:
+            (是否分析, 原因)
+        """
+        if rounds_since_last is None:
+            rounds_since_last = self._observed
+        if rounds_since_last < self.min_rounds:
+            return False, self.REASON_TOO_SOON
+        if self.shift >= self.shift_threshold:
+            return True, self.REASON_SHIFT
+        if rounds_since_last >= self.max_interval_rounds:
+            return True, self.REASON_MAX_INTERVAL
+        if rounds_since_last >= self.interval_rounds:
+            if self.shift < self.flat_threshold and self.activity < self.flat_threshold:
+                return False, self.REASON_FLAT
+            return True, self.REASON_SCHEDULED
+        return False, self.REASON_WAITING
+
+    def mark_analyzed(self):
+        """LLM分析完成后，以当前信号作为新的基线"""
+        self._baseline = (self.valence, self.intimacy)
+        self._activity = 0.0
+        self._observed = 0
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        获取当前预评分状态
+
+        Returns:
+            状态字典
+        """
+        return {
+            'valence': round(self.valence, 3),
+            'intimacy': round(self.intimacy, 3),
+            'shift': round(self.shift, 3),
+            'activity': round(self.activity, 3),
+            'observed_messages': self._observed
+        }
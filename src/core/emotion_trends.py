@@ -0,0 +1,249 @@
+"""
+情感趋势分析模块
+基于NumPy对情感评分时间序列做向量化计算：滑动平均、各维度斜率、变化点检测，
+并使用LTTB（Largest-Triangle-Three-Buckets）降采样，使图表点数与历史长度无关
+"""
+
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from src.core.database_manager import DatabaseManager
+
+# 情感维度（与 emotion_history 表字段一致）
+DIMENSIONS = ('intimacy', 'trust', 'pleasure', 'resonance', 'dependence')
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def moving_average(values: Sequence[float], window: int) -> np.ndarray:
+    """
+    计算尾随滑动平均（序列开头不足一个窗口时使用已有数据的平均值）
+
+    Args:
+        values: 数值序列
+        window: 窗口大小
+
+    Returns:
+        与输入等长的滑动平均数组
+    """
+    data = np.asarray(values, dtype=float)
+    if data.size == 0:
+        return data
+    window = max(1, min(window, data.size))
+    cumsum = np.cumsum(np.insert(data, 0, 0.0))
+    counts = np.minimum(np.arange(1, data.size + 1), window)
+    starts = np.arange(1, data.size + 1) - counts
+    return (cumsum[1:] - cumsum[starts]) / counts
+
+
+def linear_slopes(x: Sequence[float], series: np.ndarray) -> np.ndarray:
+    """
+    对多列序列同时做最小二乘线性拟合，返回每列的斜率（忽略NaN）
+
+    Args:
+        x: 自变量（长度为n）
+        series: 形状为 (n,) 或 (n, k) 的因变量
+
+    Returns:
+        形状为 (k,) 的斜率数组，有效点少于2个或自变量无变化的列为NaN
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(series, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+
+    valid = ~np.isnan(y)
+    counts = valid.sum(axis=0)
+    xs = np.where(valid, x[:, None], 0.0)
+    ys = np.where(valid, y, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = xs.sum(axis=0) / counts
+        y_mean = ys.sum(axis=0) / counts
+        dx = np.where(valid, x[:, None] - x_mean, 0.0)
+        dy = np.where(valid, y - y_mean, 0.0)
+        denominator = (dx * dx).sum(axis=0)
+        slopes = (dx * dy).sum(axis=0) / denominator
+    slopes[(counts < 2) | (denominator == 0)] = np.nan
+    return slopes
+
+
+def detect_change_points(values: Sequence[float], window: int = 3,
+                         threshold: float = 1.5) -> List[int]:
+    """
+    检测变化点：比较每个位置前后各 window 步的平均变化量，差值超过阈值且为局部最大时记为变化点
+    （评分是累加的，因此在一阶差分上检测趋势方向或速度的改变）
+
+    Args:
+        values: 数值序列
+        window: 前后比较的窗口大小
+        threshold: 平均变化量差值的阈值（评分单位/次）
+
+    Returns:
+        变化点在原序列中的索引列表
+    """
+    data = np.asarray(values, dtype=float)
+    steps = np.diff(data)
+    if steps.size < 2 * window:
+        return []
+
+    cumsum = np.cumsum(np.insert(steps, 0, 0.0))
+    centers = np.arange(window, steps.size - window + 1)
+    before = (cumsum[centers] - cumsum[centers - window]) / window
+    after = (cumsum[centers + window] - cumsum[centers]) / window
+    shift = np.abs(after - before)
+
+    change_points = []
+    for i in np.argsort(-shift, kind='stable'):
+        if shift[i] < threshold:
+            break
+        center = int(centers[i])
+        # 非极大值抑制：窗口范围内只保留最显著的变化点
+        if all(abs(center - existing) >= window for existing in change_points):
+            change_points.append(center)
+    # steps 的索引 center 对应原序列中变化开始的点
+    return sorted(change_points)
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    LTTB降采样：保留首尾点，每个桶中选择与前一个选中点和下一个桶平均点构成最大三角形的点
+
+    Args:
+        x: 横坐标（单调递增）
+        y: 纵坐标
+        threshold: 目标点数
+
+    Returns:
+        被选中点的索引数组（升序）
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def _to_list(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    """将数组转换为JSON友好的列表（NaN转为None）"""
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+class EmotionTrendEngine:
+    """
+    情感趋势分析引擎
+    从数据库读取数值时间序列，一次性计算趋势指标并输出固定点数的图表数据
+    """
+
+    def __init__(self, db_manager: DatabaseManager = None,
+                 max_points: int = 100, window: int = 5, change_threshold: float = 1.5):
+        """
+        初始化情感趋势分析引擎
+
+        Args:
+            db_manager: 数据库管理器实例
+            max_points: 图表数据的最大点数
+            window: 滑动平均和变化点检测的窗口大小
+            change_threshold: 变化点检测阈值（评分单位/次）
+        """
+        self.db = db_manager or DatabaseManager()
+        self.max_points = max_points
+        self.window = window
+        self.change_threshold = change_threshold
+
+    @staticmethod
+    def _parse_times(timestamps: List[str]) -> np.ndarray:
+        """将ISO时间字符串转换为以天为单位的浮点数组，解析失败时使用序号"""
+        try:
+            times = np.array(timestamps, dtype='datetime64[us]')
+            return (times - times[0]).astype('timedelta64[us]').astype(float) / 1e6 / _SECONDS_PER_DAY
+        except (ValueError, TypeError):
+            return np.arange(len(timestamps), dtype=float)
+
+    def analyze(self, rows: List[Sequence] = None, max_points: int = None) -> Dict[str, Any]:
+        """
+        计算情感趋势
+
+        Args:
+            rows: (created_at, overall_score, 五个维度...) 序列，None时从数据库读取
+            max_points: 图表数据的最大点数（默认使用初始化参数）
+
+        Returns:
+            趋势字典，包含 count、timestamps、overall_score、moving_average、dimensions（降采样后的图表数据）、
+            slopes（每次分析/每天的斜率）、change_points
+        """
+        rows = self.db.get_emotion_series() if rows is None else rows
+        max_points = max_points or self.max_points
+
+        if not rows:
+            return {
+                'count': 0, 'timestamps': [], 'overall_score': [], 'moving_average': [],
+                'dimensions': {name: [] for name in DIMENSIONS},
+                'slopes': {'per_analysis': {}, 'per_day': {}}, 'change_points': []
+            }
+
+        timestamps = [row[0] for row in rows]
+        values = np.array([[np.nan if v is None else v for v in row[1:7]] for row in rows], dtype=float)
+        scores = values[:, 0]
+        dimensions = values[:, 1:]
+        # 旧记录的维度全部为0表示未评估，不参与计算
+        dimensions[np.all(dimensions == 0, axis=1)] = np.nan
+
+        days = self._parse_times(timestamps)
+        steps = np.arange(len(rows), dtype=float)
+        averages = moving_average(scores, self.window)
+
+        names = ('overall_score',) + DIMENSIONS
+        matrix = np.column_stack([scores, dimensions])
+        per_analysis = linear_slopes(steps, matrix)
+        per_day = linear_slopes(days, matrix)
+
+        change_points = [
+            {
+                'index': index,
+                'timestamp': timestamps[index],
+                'score': float(scores[index]),
+                'trend_before': round(float(np.mean(np.diff(scores[max(0, index - self.window):index + 1]))), 2),
+                'trend_after': round(float(np.mean(np.diff(scores[index:index + self.window + 1]))), 2)
+            }
+            for index in detect_change_points(scores, self.window, self.change_threshold)
+        ]
+
+        selected = lttb_indices(steps, scores, max_points)
+
+        return {
+            'count': len(rows),
+            'timestamps': [timestamps[i] for i in selected],
+            'overall_score': _to_list(scores[selected]),
+            'moving_average': _to_list(averages[selected]),
+            'dimensions': {
+                name: _to_list(dimensions[selected, col]) for col, name in enumerate(DIMENSIONS)
+            },
+            'slopes': {
+                'per_analysis': dict(zip(names, _to_list(per_analysis, 3))),
+                'per_day': dict(zip(names, _to_list(per_day, 3)))
+            },
+            'change_points': change_points
+        }
@@ -0,0 +1,325 @@
+"""
+环境拓扑图模块
+将环境、环境连接和域加载为内存中的邻接表，支持多跳路径查找（BFS/Dijkstra）和预计算的可达性，
+数据在相关表写入后自动重新加载，使视觉工具的拓扑查询无需访问数据库
+"""
+
+import heapq
+from collections import deque
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from src.core.database_manager import DatabaseManager
+
+# 不同连接类型的通行代价（Dijkstra 权重），未列出的类型按1计算
+CONNECTION_WEIGHTS = {
+    'normal': 1.0,
+    'door': 1.0,
+    'stairs': 2.0,
+    'portal': 0.5,
+}
+
+
+class _GraphSnapshot:
+    """某一数据版本下的环境拓扑快照"""
+
+    def __init__(self, environments: List[Dict[str, Any]], connections: List[Dict[str, Any]],
+                 domains: List[Dict[str, Any]], memberships: List[Tuple[str, str]]):
+        self.environments: Dict[str, Dict[str, Any]] = {env['uuid']: env for env in environments}
+        self.adjacency: Dict[str, Dict[str, float]] = {uuid: {} for uuid in self.environments}
+        for connection in connections:
+            source = connection['from_environment_uuid']
+            target = connection['to_environment_uuid']
+            if source not in self.environments or target not in self.environments:
+                continue
+            weight = CONNECTION_WEIGHTS.get(connection.get('connection_type') or 'normal', 1.0)
+            self._add_edge(source, target, weight)
+            if connection.get('direction', 'bidirectional') == 'bidirectional':
+                self._add_edge(target, source, weight)
+
+        # 与 get_active_environment 的SQL语义一致：is_active=1 中 updated_at 最新的一个
+        active = [env for env in environments if env.get('is_active') == 1]
+        self.active_uuid = max(active, key=lambda env: env.get('updated_at') or '')['uuid'] if active else None
+
+        self.domains: Dict[str, Dict[str, Any]] = {domain['uuid']: domain for domain in domains}
+        self.domain_order = [domain['uuid'] for domain in
+                             sorted(domains, key=lambda d: d.get('created_at') or '', reverse=True)]
+        self.domain_members: Dict[str, List[str]] = {uuid: [] for uuid in self.domains}
+        self.environment_domains: Dict[str, List[str]] = {}
+        for domain_uuid, environment_uuid in memberships:
+            if domain_uuid in self.domains and environment_uuid in self.environments:
+                self.domain_members[domain_uuid].append(environment_uuid)
+                self.environment_domains.setdefault(environment_uuid, []).append(domain_uuid)
+        for members in self.domain_members.values():
+            members.sort(key=lambda uuid: self.environments[uuid]['name'])
+        for owners in self.environment_domains.values():
+            owners.sort(key=lambda uuid: self.domains[uuid]['name'])
+
+        # 预计算每个环境的可达集合（按跳数排序的BFS结果）
+        self.reachable: Dict[str, Dict[str, int]] = {uuid: self._bfs_hops(uuid) for uuid in self.environments}
+
+    def _add_edge(self, source: str, target: str, weight: float):
+        """添加有向边（重复连接保留代价较小的）"""
+        current = self.adjacency[source].get(target)
+        if current is None or weight < current:
+            self.adjacency[source][target] = weight
+
+    def _bfs_hops(self, source: str) -> Dict[str, int]:
+        """从 source 出发的BFS，返回可达环境到跳数的映射（不含自身）"""
+        hops = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbor in self.adjacency[node]:
+                if neighbor not in hops:
+                    hops[neighbor] = hops[node] + 1
+                    queue.append(neighbor)
+        del hops[source]
+        return hops
+
+
+class EnvironmentGraph:
+    """
+    环境拓扑图
+    通过 DatabaseManager 的派生片段缓存持有拓扑快照，环境、连接或域相关表变更后自动重建
+    """
+
+    # 拓扑快照依赖的数据表
+    SOURCE_TABLES = ('environment_descriptions', 'environment_connections',
+                     'environment_domains', 'domain_environments')
+    CACHE_KEY = 'environment_graph'
+
+    def __init__(self, db_manager: DatabaseManager = None):
+        """
+        初始化环境拓扑图
+
+        Args:
+            db_manager: 数据库管理器实例
+        """
+        self.db = db_manager or DatabaseManager()
+
+    def _snapshot(self) -> _GraphSnapshot:
+        """获取当前数据版本的拓扑快照"""
+        return self.db.get_cached_fragment(self.CACHE_KEY, self.SOURCE_TABLES, self._load)
+
+    def _load(self) -> _GraphSnapshot:
+        """从数据库加载拓扑快照"""
+        with self.db.get_connection() as conn:
+            environments = [dict(row) for row in conn.execute('SELECT * FROM environment_descriptions')]
+            connections = [dict(row) for row in conn.execute('SELECT * FROM environment_connections')]
+            domains = [dict(row) for row in conn.execute('SELECT * FROM environment_domains')]
+            memberships = [tuple(row) for row in conn.execute(
+                'SELECT domain_uuid, environment_uuid FROM domain_environments')]
+        return _GraphSnapshot(environments, connections, domains, memberships)
+
+    # ==================== 环境查询 ====================
+
+    def get_environment(self, env_uuid: str) -> Optional[Dict[str, Any]]:
+        """
+        获取环境信息
+
+        Args:
+            env_uuid: 环境UUID
+
+        Returns:
+            环境字典或None
+        """
+        return self._snapshot().environments.get(env_uuid)
+
+    def get_all_environments(self) -> List[Dict[str, Any]]:
+        """
+        获取所有环境
+
+        Returns:
+            环境列表
+        """
+        return list(self._snapshot().environments.values())
+
+    def get_active_environment(self) -> Optional[Dict[str, Any]]:
+        """
+        获取当前激活的环境
+
+        Returns:
+            环境字典或None
+        """
+        snapshot = self._snapshot()
+        return snapshot.environments.get(snapshot.active_uuid) if snapshot.active_uuid else None
+
+    def get_neighbors(self, env_uuid: str) -> List[Dict[str, Any]]:
+        """
+        获取可直接到达的环境
+
+        Args:
+            env_uuid: 环境UUID
+
+        Returns:
+            相邻环境列表
+        """
+        snapshot = self._snapshot()
+        return [snapshot.environments[uuid] for uuid in snapshot.adjacency.get(env_uuid, {})]
+
+    def get_reachable_environments(self, env_uuid: str) -> List[Dict[str, Any]]:
+        """
+        获取可到达（含多跳）的所有环境，按跳数从近到远排序
+
+        Args:
+            env_uuid: 起始环境UUID
+
+        Returns:
+            环境列表
+        """
+        snapshot = self._snapshot()
+        hops = snapshot.reachable.get(env_uuid, {})
+        return [snapshot.environments[uuid] for uuid in sorted(hops, key=hops.get)]
+
+    def can_move_directly(self, from_env_uuid: str, to_env_uuid: str) -> bool:
+        """
+        检查两个环境之间是否存在直接连接
+
+        Args:
+            from_env_uuid: 起始环境UUID
+            to_env_uuid: 目标环境UUID
+
+        Returns:
+            是否直接连通
+        """
+        if from_env_uuid == to_env_uuid:
+            return True
+        return to_env_uuid in self._snapshot().adjacency.get(from_env_uuid, {})
+
+    def is_reachable(self, from_env_uuid: str, to_env_uuid: str) -> bool:
+        """
+        检查目标环境是否可到达（允许经过其他环境）
+
+        Args:
+            from_env_uuid: 起始环境UUID
+            to_env_uuid: 目标环境UUID
+
+        Returns:
+            是否可到达
+        """
+        if from_env_uuid == to_env_uuid:
+            return True
+        return to_env_uuid in self._snapshot().reachable.get(from_env_uuid, {})
+
+    def get_distance(self, from_env_uuid: str, to_env_uuid: str) -> Optional[int]:
+        """
+        获取两个环境之间的最少跳数（来自预计算的可达性）
+
+        Args:
+            from_env_uuid: 起始环境UUID
+            to_env_uuid: 目标环境UUID
+
+        Returns:
+            跳数，不可达时返回None
+        """
+        if from_env_uuid == to_env_uuid:
+            return 0
+        return self._snapshot().reachable.get(from_env_uuid, {}).get(to_env_uuid)
+
+    def find_route(self, from_env_uuid: str, to_env_uuid: str,
+                   weighted: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        查找两个环境之间的路线
+
+        Args:
+            from_env_uuid: 起始环境UUID
+            to_env_uuid: 目标环境UUID
+            weighted: True 使用 Dijkstra 按连接代价求最短路线，False 使用 BFS 求最少跳数路线
+
+        Returns:
+            包含 path（环境列表，含起点和终点）、hops、cost 的字典，不可达时返回None
+        """
+        snapshot = self._snapshot()
+        if from_env_uuid not in snapshot.environments or to_env_uuid not in snapshot.environments:
+            return None
+        if to_env_uuid != from_env_uuid and to_env_uuid not in snapshot.reachable[from_env_uuid]:
+            return None
+
+        previous: Dict[str, Optional[str]] = {from_env_uuid: None}
+        if weighted:
+            costs = {from_env_uuid: 0.0}
+            heap = [(0.0, from_env_uuid)]
+            visited: Set[str] = set()
+            while heap:
+                cost, node = heapq.heappop(heap)
+                if node in visited:
+                    continue
+                visited.add(node)
+                if node == to_env_uuid:
+                    break
+                for neighbor, weight in snapshot.adjacency[node].items():
+                    new_cost = cost + weight
+                    if new_cost < costs.get(neighbor, float('inf')):
+                        costs[neighbor] = new_cost
+                        previous[neighbor] = node
+                        heapq.heappush(heap, (new_cost, neighbor))
+        else:
+            queue = deque([from_env_uuid])
+            while queue and to_env_uuid not in previous:
+                node = queue.popleft()
+                for neighbor in snapshot.adjacency[node]:
+                    if neighbor not in previous:
+                        previous[neighbor] = node
+                        queue.append(neighbor)
+
+        path = [to_env_uuid]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        path.reverse()
+
+        cost = sum(snapshot.adjacency[a][b] for a, b in zip(path, path[1:]))
+        return {
+            'path': [snapshot.environments[uuid] for uuid in path],
+            'hops': len(path) - 1,
+            'cost': cost
+        }
+
+    # ==================== 域查询 ====================
+
+    def get_domain(self, domain_uuid: str) -> Optional[Dict[str, Any]]:
+        """
+        获取域信息
+
+        Args:
+            domain_uuid: 域UUID
+
+        Returns:
+            域字典或None
+        """
+        return self._snapshot().domains.get(domain_uuid)
+
+    def get_all_domains(self) -> List[Dict[str, Any]]:
+        """
+        获取所有域（按创建时间倒序）
+
+        Returns:
+            域列表
+        """
+        snapshot = self._snapshot()
+        return [snapshot.domains[uuid] for uuid in snapshot.domain_order]
+
+    def get_domain_environments(self, domain_uuid: str) -> List[Dict[str, Any]]:
+        """
+        获取域中的所有环境（按名称排序）
+
+        Args:
+            domain_uuid: 域UUID
+
+        Returns:
+            环境列表
+        """
+        snapshot = self._snapshot()
+        return [snapshot.environments[uuid] for uuid in snapshot.domain_members.get(domain_uuid, [])]
+
+    def get_environment_domains(self, env_uuid: str) -> List[Dict[str, Any]]:
+        """
+        获取环境所属的所有域（按名称排序）
+
+        Args:
+            env_uuid: 环境UUID
+
+        Returns:
+            域列表
+        """
+        snapshot = self._snapshot()
+        return [snapshot.domains[uuid] for uuid in snapshot.environment_domains.get(env_uuid, [])]
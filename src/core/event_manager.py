@@ -202,9 +202,36 @@ class EventManager:
                     FOREIGN KEY (event_id) REFERENCES events(event_id)
                 )
             ''')
-        
+
+        self._migrate_database()
+
         debug_logger.log_info('EventManager', '数据库表初始化完成')
 
+    def _migrate_database(self):
+        """
+        添加事件执行引擎使用的字段（执行次数、下次重试时间、领取时间）和排序索引
+        """
+        with self.db.get_connection() as conn:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(events)').fetchall()]
+            if not columns:
+                # 表不存在（如每次连接都是新库的 :memory: 模式）
+                return
+
+            new_columns = [
+                ('attempts', 'INTEGER DEFAULT 0'),
+                ('next_attempt_at', 'TEXT'),
+                ('claimed_at', 'TEXT'),
+            ]
+            for name, ddl in new_columns:
+                if name not in columns:
+                    conn.execute(f'ALTER TABLE events ADD COLUMN {name} {ddl}')
+
+            # 待处理事件按 priority DESC, created_at ASC 取出，索引方向与排序一致以避免临时排序
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_events_status_priority '
+                         'ON events(status, priority DESC, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_event '
+                         'ON event_logs(event_id, created_at)')
+
     def create_event(
         self,
         title: str,
@@ -448,6 +475,138 @@ class EventManager:
             debug_logger.log_error('EventManager', f'更新事件状态失败: {str(e)}', e)
             return False
 
+    # ==================== 执行引擎状态转换 ====================
+
+    def claim_event(self, event_id: str) -> bool:
+        """
+        领取待处理事件（条件更新，只有一个执行者能将其从 pending 转为 processing）
+
+        Args:
+            event_id: 事件ID
+
+        Returns:
+            是否领取成功
+        """
+        now = datetime.now().isoformat()
+        with self.db.get_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE events
+                SET status = ?, claimed_at = ?, updated_at = ?, attempts = COALESCE(attempts, 0) + 1
+                WHERE event_id = ? AND status = ? AND claimed_at IS NULL
+            ''', (EventStatus.PROCESSING.value, now, now, event_id, EventStatus.PENDING.value))
+            return cursor.rowcount == 1
+
+    def release_event(self, event_id: str):
+        """
+        执行结束后释放领取标记（事件状态由处理逻辑自行更新）
+
+        Args:
+            event_id: 事件ID
+        """
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                UPDATE events SET claimed_at = NULL, next_attempt_at = NULL WHERE event_id = ?
+            ''', (event_id,))
+
+    def schedule_retry(self, event_id: str, next_attempt_at: Optional[str], error: str):
+        """
+        执行异常后安排重试；没有下次重试时间时标记为失败
+
+        Args:
+            event_id: 事件ID
+            next_attempt_at: 下次重试时间（ISO格式），None表示不再重试
+            error: 错误信息
+        """
+        now = datetime.now().isoformat()
+        status = EventStatus.PENDING if next_attempt_at else EventStatus.FAILED
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                UPDATE events
+                SET status = ?, next_attempt_at = ?, claimed_at = NULL, updated_at = ?
+                WHERE event_id = ?
+            ''', (status.value, next_attempt_at, now, event_id))
+
+        if next_attempt_at:
+            self.add_event_log(event_id, 'retry_scheduled', f'执行异常，将于 {next_attempt_at} 重试：{error}')
+        else:
+            self.add_event_log(event_id, 'status_change', f'执行异常，不再重试：{error}')
+
+    def requeue_event(self, event_id: str) -> bool:
+        """
+        将事件重新置为待处理（用于重新触发已完成或失败的事件，正在执行的事件不受影响）
+        用户重新触发的事件在元数据中标记 bypass_result_cache，子智能体重新执行而不复用缓存结果
+
+        Args:
+            event_id: 事件ID
+
+        Returns:
+            是否成功
+        """
+        import json
+        with self.db.get_connection() as conn:
+            row = conn.execute('SELECT metadata FROM events WHERE event_id = ?', (event_id,)).fetchone()
+            if row is None:
+                return False
+            metadata = json.loads(row[0]) if row[0] else {}
+            metadata['bypass_result_cache'] = True
+            cursor = conn.execute('''
+                UPDATE events
+                SET status = ?, attempts = 0, next_attempt_at = NULL, metadata = ?, updated_at = ?
+                WHERE event_id = ? AND claimed_at IS NULL
+            ''', (EventStatus.PENDING.value, json.dumps(metadata, ensure_ascii=False),
+                  datetime.now().isoformat(), event_id))
+            return cursor.rowcount == 1
+
+    def recover_interrupted_events(self) -> int:
+        """
+        恢复上次运行中途中断的事件：仍带有领取标记的事件重新置为待处理
+        （处理逻辑主动保持 processing 状态的事件在执行结束时已释放领取标记，不受影响）
+
+        Returns:
+            恢复的事件数量
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE events
+                SET status = ?, claimed_at = NULL, updated_at = ?
+                WHERE claimed_at IS NOT NULL
+            ''', (EventStatus.PENDING.value, datetime.now().isoformat()))
+            recovered = cursor.rowcount
+
+        if recovered:
+            debug_logger.log_info('EventManager', '已恢复中断的事件', {'count': recovered})
+        return recovered
+
+    def get_event_attempts(self, event_id: str) -> int:
+        """
+        获取事件已被领取执行的次数
+
+        Args:
+            event_id: 事件ID
+
+        Returns:
+            执行次数
+        """
+        with self.db.get_connection() as conn:
+            row = conn.execute('SELECT attempts FROM events WHERE event_id = ?', (event_id,)).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def get_schedulable_events(self) -> List[Dict[str, Any]]:
+        """
+        获取所有待处理事件的调度信息（不解析元数据）
+
+        Returns:
+            字典列表，包含 event_id、event_type、priority、created_at、next_attempt_at
+        """
+        with self.db.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT event_id, event_type, priority, created_at, next_attempt_at
+                FROM events
+                WHERE status = ?
+                ORDER BY priority DESC, created_at ASC
+            ''', (EventStatus.PENDING.value,)).fetchall()
+        return [dict(row) for row in rows]
+
     def add_event_log(
         self,
         event_id: str,
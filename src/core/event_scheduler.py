@@ -0,0 +1,327 @@
+"""
+事件执行引擎模块
+从事件表加载待处理事件到按优先级排序的堆中，由固定大小的工作线程池依次执行；
+支持按事件类型限制并发、异常后按指数退避重试，状态转换通过数据库条件更新完成，进程中断后可恢复
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from src.core.event_manager import EventManager, Event, EventStatus
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+# 执行结果回调：(事件ID, 处理结果, 异常)
+ResultCallback = Callable[[str, Any, Optional[BaseException]], None]
+
+
+class EventExecutionError(RuntimeError):
+    """事件处理失败（处理函数抛出后由执行引擎按退避策略重试）"""
+
+
+def parse_type_limits(value: str) -> Dict[str, int]:
+    """
+    解析按事件类型的并发上限配置（如 "task:1,notification:2"）
+
+    Args:
+        value: 配置字符串
+
+    Returns:
+        事件类型 -> 并发上限
+    """
+    limits = {}
+    for item in (value or '').split(','):
+        if ':' not in item:
+            continue
+        event_type, limit = item.split(':', 1)
+        try:
+            limits[event_type.strip()] = max(1, int(limit))
+        except ValueError:
+            continue
+    return limits
+
+
+class EventScheduler:
+    """
+    事件执行引擎
+    堆中条目为 (-优先级, 创建时间, 序号, 事件ID, 事件类型, 最早执行时间)，
+    调度线程每次取出优先级最高、已到执行时间且所属类型未达并发上限的事件，领取成功后交给线程池执行
+    """
+
+    def __init__(
+        self,
+        event_manager: EventManager,
+        handler: Callable[[Event], Any],
+        max_workers: int = None,
+        type_limits: Dict[str, int] = None,
+        max_retries: int = None,
+        retry_base_seconds: float = None,
+        on_result: ResultCallback = None
+    ):
+        """
+        初始化事件执行引擎
+
+        Args:
+            event_manager: 事件管理器
+            handler: 事件处理函数（抛出异常表示需要重试）
+            max_workers: 工作线程数量
+            type_limits: 按事件类型的并发上限
+            max_retries: 异常后的最大重试次数
+            retry_base_seconds: 重试退避的基础秒数（第n次重试等待 base * 2^(n-1) 秒）
+            on_result: 没有单独指定回调的事件执行结束后的回调
+        """
+        self.event_manager = event_manager
+        self.handler = handler
+        self.max_workers = max_workers or int(os.getenv('EVENT_WORKERS', '2'))
+        self.type_limits = type_limits if type_limits is not None else \
+            parse_type_limits(os.getenv('EVENT_TYPE_LIMITS', 'task:1,notification:2'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('EVENT_MAX_RETRIES', '3'))
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else \
+            float(os.getenv('EVENT_RETRY_BASE_SECONDS', '2'))
+        self.on_result = on_result
+
+        self._heap: List[Tuple[int, str, int, str, str, Optional[datetime]]] = []
+        self._queued: set = set()
+        self._callbacks: Dict[str, ResultCallback] = {}
+        self._running_by_type: Dict[str, int] = {}
+        self._running = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {'completed': 0, 'retried': 0, 'failed': 0, 'recovered': 0}
+
+    # ==================== 队列 ====================
+
+    def _push(self, event_id: str, event_type: str, priority: int, created_at: str,
+              not_before: Optional[datetime] = None):
+        """将事件加入堆（调用方持有条件锁）"""
+        if event_id in self._queued:
+            return
+        self._queued.add(event_id)
+        heapq.heappush(self._heap, (-priority, created_at, next(self._sequence),
+                                    event_id, event_type, not_before))
+        self._condition.notify()
+
+    def load_pending(self) -> int:
+        """
+        将数据库中所有待处理事件加入队列
+
+        Returns:
+            加入的事件数量
+        """
+        rows = self.event_manager.get_schedulable_events()
+        with self._condition:
+            before = len(self._queued)
+            for row in rows:
+                not_before = datetime.fromisoformat(row['next_attempt_at']) if row['next_attempt_at'] else None
+                self._push(row['event_id'], row['event_type'], row['priority'], row['created_at'], not_before)
+            return len(self._queued) - before
+
+    def submit(self, event_id: str, callback: ResultCallback = None, requeue: bool = False) -> bool:
+        """
+        提交单个事件
+
+        Args:
+            event_id: 事件ID
+            callback: 该事件执行结束后的回调
+            requeue: 事件不是待处理状态时是否重新置为待处理（重新触发）
+
+        Returns:
+            是否已加入队列
+        """
+        event = self.event_manager.get_event(event_id)
+        if event is None:
+            return False
+        if event.status != EventStatus.PENDING:
+            if not requeue or not self.event_manager.requeue_event(event_id):
+                return False
+
+        with self._condition:
+            if callback is not None:
+                self._callbacks[event_id] = callback
+            self._push(event_id, event.event_type.value, event.priority.value, event.created_at)
+        return True
+
+    def _next_ready(self) -> Tuple[Optional[tuple], Optional[float]]:
+        """
+        取出下一个可执行的事件（调用方持有条件锁）
+
+        Returns:
+            (堆条目或None, 没有可执行事件时距最近一个重试时间的秒数)
+        """
+        if self._running >= self.max_workers:
+            return None, None
+
+        now = datetime.now()
+        deferred = []
+        chosen = None
+        wait_seconds = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            not_before, event_type = item[5], item[4]
+            if not_before is not None and not_before > now:
+                delay = (not_before - now).total_seconds()
+                wait_seconds = delay if wait_seconds is None else min(wait_seconds, delay)
+                deferred.append(item)
+            elif self._running_by_type.get(event_type, 0) >= self.type_limits.get(event_type, self.max_workers):
+                deferred.append(item)
+            else:
+                chosen = item
+                break
+        for item in deferred:
+            heapq.heappush(self._heap, item)
+        return chosen, wait_seconds
+
+    # ==================== 调度与执行 ====================
+
+    def start(self, recover: bool = True):
+        """
+        启动执行引擎
+
+        Args:
+            recover: 是否先恢复上次运行中断的事件
+        """
+        if not self._stopped:
+            return
+        if recover:
+            self._stats['recovered'] += self.event_manager.recover_interrupted_events()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='EventWorker')
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='EventScheduler', daemon=True)
+        self._dispatcher.start()
+        debug_logger.log_module('EventScheduler', '事件执行引擎已启动', {
+            'max_workers': self.max_workers,
+            'type_limits': self.type_limits
+        })
+
+    def stop(self, wait: bool = True):
+        """
+        停止执行引擎（已开始执行的事件会执行完毕）
+
+        Args:
+            wait: 是否等待执行中的事件结束
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """
+        等待队列中没有可立即执行的事件且没有执行中的事件
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否在超时前达到空闲
+        """
+        def idle():
+            now = datetime.now()
+            return self._running == 0 and all(item[5] is not None and item[5] > now for item in self._heap)
+
+        with self._condition:
+            return self._condition.wait_for(idle, timeout)
+
+    def _dispatch_loop(self):
+        """调度线程：按优先级领取事件并交给线程池"""
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                item, wait_seconds = self._next_ready()
+                if item is None:
+                    self._condition.wait(wait_seconds)
+                    continue
+                event_id, event_type = item[3], item[4]
+                self._queued.discard(event_id)
+                # 领取前先占用并发名额，避免空闲判断和并发上限出现空档
+                self._running += 1
+                self._running_by_type[event_type] = self._running_by_type.get(event_type, 0) + 1
+
+            # 条件更新领取事件，已被取消、删除或由其他途径处理的事件直接跳过
+            if self.event_manager.claim_event(event_id):
+                self._executor.submit(self._execute, event_id, event_type)
+                continue
+
+            with self._condition:
+                self._running -= 1
+                self._running_by_type[event_type] -= 1
+                self._callbacks.pop(event_id, None)
+                self._condition.notify_all()
+
+    def _execute(self, event_id: str, event_type: str):
+        """工作线程：执行事件并完成状态转换"""
+        result, error = None, None
+        try:
+            event = self.event_manager.get_event(event_id)
+            result = self.handler(event)
+            self.event_manager.release_event(event_id)
+            outcome = 'completed'
+        except Exception as e:
+            error = e
+            debug_logger.log_error('EventScheduler', f'事件执行异常: {event_id}', e)
+            outcome = self._handle_failure(event_id, event_type, e)
+
+        with self._condition:
+            self._stats[outcome] += 1
+            self._running -= 1
+            self._running_by_type[event_type] -= 1
+            # 等待重试的事件在最终结束后再回调
+            callback = None
+            if outcome != 'retried':
+                callback = self._callbacks.pop(event_id, None) or self.on_result
+            self._condition.notify_all()
+
+        if callback is not None:
+            try:
+                callback(event_id, result, error)
+            except Exception as e:
+                debug_logger.log_error('EventScheduler', f'事件结果回调异常: {event_id}', e)
+
+    def _handle_failure(self, event_id: str, event_type: str, error: Exception) -> str:
+        """
+        执行异常：未超过重试次数时按指数退避重新入队，否则标记为失败
+
+        Returns:
+            'retried' 或 'failed'
+        """
+        event = self.event_manager.get_event(event_id)
+        if event is None:
+            return 'failed'
+
+        attempts = self.event_manager.get_event_attempts(event_id)
+        if attempts > self.max_retries:
+            self.event_manager.schedule_retry(event_id, None, str(error))
+            return 'failed'
+
+        not_before = datetime.now() + timedelta(seconds=self.retry_base_seconds * (2 ** (attempts - 1)))
+        self.event_manager.schedule_retry(event_id, not_before.isoformat(), str(error))
+        with self._condition:
+            self._push(event_id, event_type, event.priority.value, event.created_at, not_before)
+        return 'retried'
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取执行引擎统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._condition:
+            return dict(self._stats,
+                        queued=len(self._heap),
+                        running=self._running,
+                        running_by_type={k: v for k, v in self._running_by_type.items() if v})
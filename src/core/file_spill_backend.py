@@ -0,0 +1,284 @@
+"""
+深度智能体文件系统后端模块
+小文件仍保存在图状态中；超过阈值的文件（如网页搜索的大段结果）按内容哈希转存到磁盘，
+状态中只保留引用，读取时通过内存映射按行窗口取回，图状态和检查点的大小不再随工具输出增长
+"""
+
+import hashlib
+import mmap
+import os
+import time
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+from deepagents.backends import StateBackend
+from deepagents.backends.protocol import ReadResult, WriteResult
+from deepagents.backends.utils import create_file_data, normalize_read_bounds
+
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+# 状态中表示文件已转存的字段（值为内容哈希）
+SPILL_KEY = 'spilled_sha256'
+
+
+class BlobStore:
+    """
+    按内容寻址的磁盘存储
+    每个内容保存为 <哈希前两位>/<哈希> 文件，旁边的 .idx 文件记录每行起始的字节偏移，
+    读取时对两者做内存映射，只解码请求的行窗口
+    """
+
+    def __init__(self, root: str = None, ttl_hours: float = None):
+        """
+        初始化磁盘存储
+
+        Args:
+            root: 存储目录
+            ttl_hours: 多久未访问的内容在初始化时被删除（小时）
+        """
+        self.root = root or os.getenv('AGENT_FILE_SPILL_DIR', 'agent_files')
+        self.ttl_hours = ttl_hours if ttl_hours is not None else float(os.getenv('AGENT_FILE_SPILL_TTL_HOURS', '168'))
+        self.prune()
+
+    def _path(self, digest: str) -> str:
+        """内容文件路径"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        """先写临时文件再替换，并发写入同一内容时不会读到半个文件"""
+        tmp_path = f'{path}.{os.getpid()}.{id(data)}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def put(self, content: str) -> Tuple[str, int]:
+        """
+        保存文本内容（相同内容只保存一份）
+
+        Args:
+            content: 文本内容
+
+        Returns:
+            (内容哈希, 字节数)
+        """
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return digest, len(data)
+
+        # 行的切分方式与 str.splitlines 一致，行窗口与状态后端的读取结果相同
+        offsets = array('Q')
+        position = 0
+        for line in content.splitlines(keepends=True):
+            offsets.append(position)
+            position += len(line.encode('utf-8'))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomic(path + '.idx', offsets.tobytes())
+        self._write_atomic(path, data)
+        return digest, len(data)
+
+    @staticmethod
+    def _touch(path: str):
+        """刷新访问时间（按修改时间清理，仍在读取的内容不会过期）"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        """只读映射文件，空文件返回None"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_text(self, digest: str) -> str:
+        """
+        读取完整内容
+
+        Args:
+            digest: 内容哈希
+
+        Returns:
+            文本内容
+        """
+        path = self._path(digest)
+        self._touch(path)
+        mapped = self._map(path)
+        if mapped is None:
+            return ''
+        with mapped:
+            return mapped[:].decode('utf-8')
+
+    def read_lines(self, digest: str, offset: int, limit: int) -> Tuple[str, int]:
+        """
+        读取行窗口
+
+        Args:
+            digest: 内容哈希
+            offset: 起始行（从0开始）
+            limit: 最多读取的行数
+
+        Returns:
+            (窗口内容, 总行数)
+        """
+        path = self._path(digest)
+        self._touch(path)
+        index = self._map(path + '.idx')
+        if index is None:
+            return '', 0
+        with index:
+            total = len(index) // 8
+            if offset >= total:
+                return '', total
+            end = min(offset + limit, total)
+            start_byte = array('Q', index[offset * 8:offset * 8 + 8])[0]
+            end_byte = array('Q', index[end * 8:end * 8 + 8])[0] if end < total else None
+
+        data = self._map(path)
+        with data:
+            return data[start_byte:end_byte].decode('utf-8'), total
+
+    def exists(self, digest: str) -> bool:
+        """内容是否已保存"""
+        return os.path.exists(self._path(digest))
+
+    def prune(self, now: float = None) -> int:
+        """
+        删除超过有效期未写入或读取（按修改时间，读取时会刷新）的内容
+
+        Args:
+            now: 当前时间戳（默认系统时间）
+
+        Returns:
+            删除的内容数量
+        """
+        cutoff = (now or time.time()) - self.ttl_hours * 3600
+        removed = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.idx') or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        if os.path.exists(path + '.idx'):
+                            os.remove(path + '.idx')
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            debug_logger.log_info('BlobStore', '删除过期的转存文件', {'removed': removed})
+        return removed
+
+
+class SpillingStateBackend(StateBackend):
+    """
+    会把大文件转存到磁盘的状态后端
+    写入状态前把超过阈值的文本文件替换为引用（内容哈希 + 占位说明），
+    读取文件列表时按引用取回内容；read 只映射请求的行窗口
+    """
+
+    def __init__(self, store: BlobStore = None, threshold_bytes: int = None):
+        """
+        初始化后端
+
+        Args:
+            store: 磁盘存储（默认按环境变量配置创建）
+            threshold_bytes: 超过该字节数的文件转存到磁盘
+        """
+        super().__init__()
+        self.store = store or BlobStore()
+        self.threshold_bytes = threshold_bytes or int(os.getenv('AGENT_FILE_SPILL_THRESHOLD_KB', '16')) * 1024
+
+    def _spill(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """把大文件替换为磁盘引用"""
+        content = file_data.get('content')
+        if file_data.get('encoding', 'utf-8') != 'utf-8' or not isinstance(content, str):
+            return file_data
+        # 每个字符最多4个字节，字符数足够小时不必编码
+        if len(content) * 4 <= self.threshold_bytes or len(content.encode('utf-8')) <= self.threshold_bytes:
+            return file_data
+        digest, size = self.store.put(content)
+        return {
+            **file_data,
+            'content': f'[内容已转存到磁盘：{size} 字节]',
+            SPILL_KEY: digest
+        }
+
+    def _load(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """按引用取回完整内容"""
+        loaded = {key: value for key, value in file_data.items() if key != SPILL_KEY}
+        try:
+            loaded['content'] = self.store.read_text(file_data[SPILL_KEY])
+        except OSError as e:
+            debug_logger.log_error('SpillingStateBackend', f'读取转存文件失败: {str(e)}', e)
+        return loaded
+
+    def _send_files_update(self, update: Dict[str, Any]) -> None:
+        super()._send_files_update({
+            path: self._spill(file_data) if file_data is not None else None
+            for path, file_data in update.items()
+        })
+
+    def _read_files(self) -> Dict[str, Any]:
+        return {
+            path: self._load(file_data) if file_data and SPILL_KEY in file_data else file_data
+            for path, file_data in super()._read_files().items()
+        }
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """写入文件（只需要已有文件的创建时间，不取回转存的内容）"""
+        existing = super()._read_files().get(file_path)
+        created_at = existing.get('created_at') if existing else None
+        self._send_files_update({file_path: create_file_data(content, created_at=created_at)})
+        return WriteResult(path=file_path)
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> ReadResult:
+        """读取文件的行窗口，转存的文件只映射请求的部分"""
+        file_data = super()._read_files().get(file_path)
+        if not file_data or SPILL_KEY not in file_data:
+            return super().read(file_path, offset, limit)
+
+        offset, limit = normalize_read_bounds(offset, limit)
+        if limit == 0:
+            return super().read(file_path, offset, limit)
+        try:
+            window, total = self.store.read_lines(file_data[SPILL_KEY], offset, limit)
+        except OSError as e:
+            return ReadResult(error=f"File '{file_path}' could not be read: {e}")
+        if offset >= total:
+            return ReadResult(error=f'Line offset {offset} exceeds file length ({total} lines)')
+
+        end = min(offset + limit, total)
+        metadata = {key: value for key, value in file_data.items() if key not in ('content', SPILL_KEY)}
+        return ReadResult(
+            file_data={**metadata, 'content': window.replace('\r\n', '\n').replace('\r', '\n')},
+            total_lines=total,
+            start_line=offset + 1,
+            end_line=end,
+            next_offset=end if end < total else None
+        )
+
+
+def create_file_backend():
+    """
+    创建深度智能体使用的文件系统后端
+
+    Returns:
+        启用转存时返回 SpillingStateBackend 实例，否则返回普通的 StateBackend 实例
+    """
+    if os.getenv('AGENT_FILE_SPILL_ENABLED', 'true').lower() == 'true':
+        try:
+            return SpillingStateBackend()
+        except Exception as e:
+            debug_logger.log_error('SpillingStateBackend', f'创建转存后端失败，使用状态后端: {str(e)}', e)
+    return StateBackend()
@@ -0,0 +1,279 @@
+"""
+知识维护模块
+定期对实体相关信息执行置信度衰减、过期"疑似"知识归档和单实体容量限制，
+使检索用的热数据表规模保持稳定
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from src.core.database_manager import DatabaseManager
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+
+class KnowledgeMaintenanceEngine:
+    """
+    知识维护引擎
+    按最后提及时间衰减置信度，降级长期未提及的"确认"知识，
+    归档过期或低置信度的"疑似"知识，并限制每个实体保留的相关信息数量。
+    被移除的条目写入归档表，可追溯
+    """
+
+    # 归档原因
+    REASON_STALE = "stale"  # 长期未再提及
+    REASON_LOW_CONFIDENCE = "low_confidence"  # 衰减后置信度过低
+    REASON_OVER_CAPACITY = "over_capacity"  # 超出单实体容量
+
+    # 元数据键
+    METADATA_LAST_RUN = "knowledge_maintenance_last_run"
+    METADATA_LAST_REPORT = "knowledge_maintenance_last_report"
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager = None,
+        suspected_half_life_days: float = 30.0,
+        confirmed_half_life_days: float = 180.0,
+        stale_days: float = 60.0,
+        archive_confidence: float = 0.2,
+        demote_confidence: float = 0.4,
+        max_related_info_per_entity: int = None,
+        interval_hours: float = None
+    ):
+        """
+        初始化知识维护引擎
+
+        Args:
+            db_manager: 数据库管理器实例
+            suspected_half_life_days: "疑似"知识置信度半衰期（天）
+            confirmed_half_life_days: "确认"知识置信度半衰期（天）
+            stale_days: "疑似"知识超过该天数未被提及即归档
+            archive_confidence: "疑似"知识置信度低于该值即归档
+            demote_confidence: "确认"知识置信度低于该值降级为"疑似"
+            max_related_info_per_entity: 每个实体最多保留的相关信息数量
+            interval_hours: 两次维护之间的最小间隔（小时）
+        """
+        self.db = db_manager or DatabaseManager()
+        self.suspected_half_life_days = suspected_half_life_days
+        self.confirmed_half_life_days = confirmed_half_life_days
+        self.stale_days = stale_days
+        self.archive_confidence = archive_confidence
+        self.demote_confidence = demote_confidence
+        self.max_related_info_per_entity = max_related_info_per_entity or int(
+            os.getenv('KNOWLEDGE_MAX_RELATED_INFO', '30'))
+        self.interval_hours = interval_hours if interval_hours is not None else float(
+            os.getenv('KNOWLEDGE_MAINTENANCE_INTERVAL_HOURS', '24'))
+
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """初始化归档表和维护查询所需的索引"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entity_related_info_archive (
+                    uuid TEXT PRIMARY KEY,
+                    entity_uuid TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    type TEXT,
+                    source TEXT,
+                    confidence REAL,
+                    status TEXT,
+                    mention_count INTEGER,
+                    last_mentioned_at TEXT,
+                    created_at TEXT NOT NULL,
+                    fingerprint TEXT,
+                    archived_at TEXT NOT NULL,
+                    archive_reason TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_related_archive_archived ON entity_related_info_archive(archived_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_related_archive_entity ON entity_related_info_archive(entity_uuid)')
+
+    def is_due(self, now: datetime = None) -> bool:
+        """
+        判断是否到达维护周期
+
+        Args:
+            now: 当前时间（默认为系统当前时间）
+
+        Returns:
+            是否需要执行维护
+        """
+        last_run = self.db.get_metadata(self.METADATA_LAST_RUN)
+        if not last_run:
+            return True
+        now = now or datetime.now()
+        try:
+            elapsed_hours = (now - datetime.fromisoformat(last_run)).total_seconds() / 3600
+        except ValueError:
+            return True
+        return elapsed_hours >= self.interval_hours
+
+    def run_if_due(self, now: datetime = None) -> Optional[Dict[str, Any]]:
+        """
+        到达维护周期时执行维护
+
+        Args:
+            now: 当前时间（默认为系统当前时间）
+
+        Returns:
+            维护报告，未到周期时返回None
+        """
+        if not self.is_due(now):
+            return None
+        return self.run(now)
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        """解析ISO时间字符串，失败时返回None"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    def _rank_key(self, row: Dict[str, Any]):
+        """容量限制时的保留优先级：确认优先，其次提及次数、置信度、最近提及时间"""
+        return (
+            row['status'] == DatabaseManager.STATUS_CONFIRMED,
+            row['mention_count'] or 1,
+            row['confidence'] or 0.0,
+            row['last_mentioned_at'] or row['created_at'] or ''
+        )
+
+    def run(self, now: datetime = None) -> Dict[str, Any]:
+        """
+        执行一次知识维护
+
+        Args:
+            now: 当前时间（默认为系统当前时间）
+
+        Returns:
+            维护报告，包含 decayed、demoted、archived（被归档条目列表）及 run_at
+        """
+        now = now or datetime.now()
+        last_run = self._parse_time(self.db.get_metadata(self.METADATA_LAST_RUN))
+
+        updates: Dict[str, Dict[str, Any]] = {}
+        archived: List[Dict[str, Any]] = []
+        demoted = 0
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM entity_related_info')
+            rows = [dict(row) for row in cursor.fetchall()]
+
+            kept_by_entity: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                mentioned_at = self._parse_time(row['last_mentioned_at']) or self._parse_time(row['created_at']) or now
+                was_suspected = row['status'] != DatabaseManager.STATUS_CONFIRMED
+
+                # 1. 置信度衰减：只衰减上次维护之后（或最后提及之后）经过的时间，避免重复衰减；
+                #    再次提及时 DatabaseManager 会恢复置信度，衰减从该次提及重新开始累积
+                decay_from = max(mentioned_at, last_run) if last_run else mentioned_at
+                elapsed_days = (now - decay_from).total_seconds() / 86400
+                if elapsed_days > 0 and row['confidence'] is not None:
+                    half_life = self.suspected_half_life_days if was_suspected else self.confirmed_half_life_days
+                    row['confidence'] = round(row['confidence'] * 0.5 ** (elapsed_days / half_life), 4)
+                    updates[row['uuid']] = row
+
+                # 2. 长期未提及的"确认"知识降级为"疑似"，记录降级时间（过期判断从降级时开始计算，保留观察期）
+                if not was_suspected and (row['confidence'] or 0.0) < self.demote_confidence:
+                    row['status'] = DatabaseManager.STATUS_SUSPECTED
+                    row['demoted_at'] = now.isoformat()
+                    updates[row['uuid']] = row
+                    demoted += 1
+
+                # 3. 归档过期或低置信度的"疑似"知识
+                if was_suspected:
+                    demoted_at = self._parse_time(row.get('demoted_at'))
+                    idle_since = max(mentioned_at, demoted_at) if demoted_at else mentioned_at
+                    idle_days = (now - idle_since).total_seconds() / 86400
+                    if idle_days >= self.stale_days:
+                        archived.append(dict(row, archive_reason=self.REASON_STALE))
+                        continue
+                    if (row['confidence'] or 0.0) < self.archive_confidence:
+                        archived.append(dict(row, archive_reason=self.REASON_LOW_CONFIDENCE))
+                        continue
+
+                kept_by_entity.setdefault(row['entity_uuid'], []).append(row)
+
+            # 4. 单实体容量限制
+            for entity_rows in kept_by_entity.values():
+                if len(entity_rows) <= self.max_related_info_per_entity:
+                    continue
+                entity_rows.sort(key=self._rank_key, reverse=True)
+                for row in entity_rows[self.max_related_info_per_entity:]:
+                    archived.append(dict(row, archive_reason=self.REASON_OVER_CAPACITY))
+
+            archived_uuids = {row['uuid'] for row in archived}
+            pending_updates = [row for info_uuid, row in updates.items() if info_uuid not in archived_uuids]
+            if pending_updates:
+                cursor.executemany(
+                    'UPDATE entity_related_info SET confidence = ?, status = ?, demoted_at = ? WHERE uuid = ?',
+                    [(row['confidence'], row['status'], row.get('demoted_at'), row['uuid']) for row in pending_updates]
+                )
+
+            if archived:
+                archived_at = now.isoformat()
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO entity_related_info_archive
+                    (uuid, entity_uuid, content, type, source, confidence, status, mention_count,
+                     last_mentioned_at, created_at, fingerprint, archived_at, archive_reason)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(row['uuid'], row['entity_uuid'], row['content'], row['type'], row['source'],
+                       row['confidence'], row['status'], row['mention_count'], row['last_mentioned_at'],
+                       row['created_at'], row.get('fingerprint'), archived_at, row['archive_reason'])
+                      for row in archived])
+                cursor.executemany('DELETE FROM entity_related_info WHERE uuid = ?',
+                                   [(info_uuid,) for info_uuid in archived_uuids])
+
+        report = {
+            'run_at': now.isoformat(),
+            'checked': len(rows),
+            'decayed': len(pending_updates),
+            'demoted': demoted,
+            'archived_count': len(archived),
+            'archived': [
+                {
+                    'uuid': row['uuid'],
+                    'entity_uuid': row['entity_uuid'],
+                    'content': row['content'],
+                    'reason': row['archive_reason']
+                }
+                for row in archived
+            ]
+        }
+
+        self.db.set_metadata(self.METADATA_LAST_RUN, report['run_at'])
+        self.db.set_metadata(self.METADATA_LAST_REPORT, {
+            k: v for k, v in report.items() if k != 'archived'
+        })
+
+        print(f"✓ 知识库维护完成: 检查 {report['checked']} 条，衰减 {report['decayed']} 条，"
+              f"降级 {demoted} 条，归档 {len(archived)} 条")
+        for item in report['archived']:
+            print(f"  - 归档 [{item['reason']}] {item['content'][:30]}")
+        debug_logger.log_info('KnowledgeMaintenance', '知识库维护完成', report)
+
+        return report
+
+    def get_archived_info(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        获取最近归档的相关信息
+
+        Args:
+            limit: 返回数量上限
+
+        Returns:
+            归档记录列表（按归档时间倒序）
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                'SELECT * FROM entity_related_info_archive ORDER BY archived_at DESC LIMIT ?',
+                (limit,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
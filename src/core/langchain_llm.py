@@ -20,6 +20,10 @@ from src.tools.debug_logger import get_debug_logger
 debug_logger = get_debug_logger()
 
 
+class LLMRequestError(RuntimeError):
+    """LLM请求失败（调用方要求抛出异常而不是返回错误提示文本时使用）"""
+
+
 class LangChainLLM:
     """
     基于LangChain的LLM封装类
@@ -119,12 +123,13 @@ class LangChainLLM:
         
         return langchain_messages
     
-    def chat(self, messages: List[Dict[str, str]]) -> str:
+    def chat(self, messages: List[Dict[str, str]], raise_errors: bool = False) -> str:
         """
         发送聊天请求
         
         Args:
             messages: 消息列表，格式为 [{'role': 'user/assistant/system', 'content': '...'}]
+            raise_errors: 请求失败时抛出 LLMRequestError，而不是返回错误提示文本
             
         Returns:
             AI的回复内容
@@ -174,6 +179,8 @@ class LangChainLLM:
         except Exception as e:
             debug_logger.log_error('LangChainLLM', f'LLM调用错误: {str(e)}', e)
             print(f"LLM调用错误: {e}")
+            if raise_errors:
+                raise LLMRequestError(str(e)) from e
             return f"抱歉，处理请求时出现错误: {str(e)}"
     
     def chat_with_template(
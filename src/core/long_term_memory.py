@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 import requests
 from src.core.database_manager import DatabaseManager
 from src.core.knowledge_base import KnowledgeBase
+from src.core.knowledge_maintenance import KnowledgeMaintenanceEngine
 
 load_dotenv()
 
@@ -61,6 +62,9 @@ class LongTermMemoryManager:
             model_name=self.model_name
         )
 
+        # 知识维护引擎（定期衰减和清理相关信息）
+        self.knowledge_maintenance = KnowledgeMaintenanceEngine(db_manager=self.db)
+
         # 检查是否需要从JSON迁移数据
         self._check_and_migrate_json()
 
@@ -192,58 +196,40 @@ class LongTermMemoryManager:
         if knowledge_list and len(knowledge_list) > 0:
             print(f"✓ 提取到 {len(knowledge_list)} 条知识")
 
-            # 保存每条知识
+            # 整理为批量写入格式（默认来源为"对话提取"，相关信息默认状态为"疑似"）
+            batch_items = []
             for knowledge_data in knowledge_list:
-                entity_name = knowledge_data.get('entity_name', knowledge_data.get('title', '未知'))
                 is_def = knowledge_data.get('is_definition', False)
-                content = knowledge_data.get('content', '')
-                content_preview = content[:30]
-                print(f"  • [{knowledge_data.get('type', '其他')}] {entity_name}{'的定义' if is_def else ''}: {content_preview}...")
-
-                # 保存到数据库
-                entity_uuid = self.db.find_or_create_entity(entity_name)
+                batch_items.append({
+                    'entity_name': knowledge_data.get('entity_name', knowledge_data.get('title', '未知')),
+                    'content': knowledge_data.get('content', ''),
+                    'is_definition': is_def,
+                    'type': knowledge_data.get('type', '定义' if is_def else '其他'),
+                    'source': knowledge_data.get('source', '对话提取'),
+                    'confidence': knowledge_data.get('confidence', 0.8 if is_def else 0.7),
+                    'status': DatabaseManager.STATUS_SUSPECTED
+                })
+
+            # 单个事务内完成实体解析、去重、计数和状态升级
+            saved_results = self.db.upsert_knowledge_batch(batch_items)
+
+            for item, saved in zip(batch_items, saved_results):
+                entity_name = item['entity_name']
+                is_def = item['is_definition']
+                print(f"  • [{item['type']}] {entity_name}{'的定义' if is_def else ''}: {item['content'][:30]}...")
 
                 if is_def:
-                    # 保存为定义
-                    self.db.set_entity_definition(
-                        entity_uuid=entity_uuid,
-                        content=content,
-                        type_=knowledge_data.get('type', '定义'),
-                        source=knowledge_data.get('source', '对话提取'),
-                        confidence=knowledge_data.get('confidence', 0.8)
-                    )
-                    print(f"    置信度: {knowledge_data.get('confidence', 0.8):.2f} | 实体UUID: {entity_uuid}")
+                    print(f"    置信度: {saved['confidence']:.2f} | 实体UUID: {saved['entity_uuid']}")
                 else:
-                    # 保存为相关信息，默认状态为"疑似"
-                    # add_entity_related_info 会检查是否已存在相同信息，如果存在会增加mention_count
-                    from src.core.database_manager import DatabaseManager
-                    info_uuid = self.db.add_entity_related_info(
-                        entity_uuid=entity_uuid,
-                        content=content,
-                        type_=knowledge_data.get('type', '其他'),
-                        source=knowledge_data.get('source', '对话提取'),
-                        confidence=knowledge_data.get('confidence', 0.7),
-                        status=DatabaseManager.STATUS_SUSPECTED
-                    )
-                    
-                    # 获取信息状态以显示
-                    info = self.db.get_entity_related_info(entity_uuid)
-                    saved_info = next((i for i in info if i['uuid'] == info_uuid), None)
-                    if saved_info:
-                        status = saved_info.get('status', DatabaseManager.STATUS_SUSPECTED)
-                        mention_count = saved_info.get('mention_count', 1)
-                        status_label = f"[{status}]" if status == DatabaseManager.STATUS_CONFIRMED else f"[{status}×{mention_count}]"
-                        print(f"    状态: {status_label} | 置信度: {knowledge_data.get('confidence', 0.7):.2f} | 实体UUID: {entity_uuid}")
-                    else:
-                        print(f"    置信度: {knowledge_data.get('confidence', 0.7):.2f} | 实体UUID: {entity_uuid}")
-
-            # 每次提取知识后，检查是否需要清理过时信息
-            # 每10次提取清理一次（即每50轮对话）
-            total_conv = self.db.get_metadata('total_conversations', 0)
-            if total_conv % 50 == 0 and total_conv > 0:
+                    status = saved['status']
+                    mention_count = saved['mention_count']
+                    status_label = f"[{status}]" if status == DatabaseManager.STATUS_CONFIRMED else f"[{status}×{mention_count}]"
+                    print(f"    状态: {status_label} | 置信度: {saved['confidence']:.2f} | 实体UUID: {saved['entity_uuid']}")
+
+            # 每次提取知识后，检查是否到达维护周期（置信度衰减、过期知识归档、容量限制）
+            if self.knowledge_maintenance.is_due():
                 print("○ 执行定期知识库清理...")
-                # 这里可以添加清理逻辑
-                print(f"✓ 清理完成")
+                self.knowledge_maintenance.run()
         else:
             print("○ 未提取到新知识")
 
@@ -327,6 +313,20 @@ class LongTermMemoryManager:
         messages = self.db.get_short_term_messages(limit=count)
         return [{'role': msg['role'], 'content': msg['content']} for msg in messages]
 
+    def get_messages_since(self, message_id: Optional[int] = None, count: int = 30) -> List[Dict[str, Any]]:
+        """
+        获取指定消息之后的短期记忆消息（保留消息ID，用于增量处理）
+
+        Args:
+            message_id: 起始消息ID（不包含），为None时返回最近的消息
+            count: 最多返回最近的多少条
+
+        Returns:
+            消息列表，每项包含 id、role、content
+        """
+        messages = self.db.get_short_term_messages_since(message_id, limit=count)
+        return [{'id': msg['id'], 'role': msg['role'], 'content': msg['content']} for msg in messages]
+
     def get_all_summaries(self) -> List[Dict[str, Any]]:
         """
         获取所有长期记忆概括（从数据库）
@@ -4,6 +4,7 @@
 """
 
 import os
+import re
 import time
 import json
 from datetime import datetime
@@ -13,7 +14,8 @@ import requests
 from src.core.event_manager import TaskEvent
 from src.tools.interrupt_question_tool import InterruptQuestionTool
 from src.tools.debug_logger import get_debug_logger
-from src.core.deepagents_wrapper import DeepSubAgentWrapper
+from src.core.deepagents_wrapper import DeepSubAgentWrapper, get_sub_agent_pool
+from src.core.dag_executor import DagExecutor, critical_path
 
 load_dotenv()
 
@@ -23,6 +25,12 @@ debug_logger = get_debug_logger()
 # 标志：是否使用deepagents增强的子智能体
 USE_DEEP_AGENTS = os.getenv('USE_DEEP_AGENTS', 'true').lower() == 'true'
 
+# 标志：是否复用已编译的deepagents子智能体
+SUB_AGENT_POOL_ENABLED = os.getenv('SUB_AGENT_POOL_ENABLED', 'true').lower() == 'true'
+
+# 计划行末尾的依赖标注，如「（依赖：步骤1、步骤2）」或「（依赖：无）」
+STEP_DEPENDENCY_PATTERN = re.compile(r'[（(]\s*依赖\s*[:：]\s*([^）)]*)[）)]\s*$')
+
 
 class SubAgent:
     """
@@ -172,7 +180,8 @@ def create_sub_agent(
     agent_id: str,
     role: str,
     description: str,
-    use_deep_agents: bool = USE_DEEP_AGENTS
+    use_deep_agents: bool = USE_DEEP_AGENTS,
+    use_pool: bool = None
 ) -> 'SubAgent':
     """
     工厂函数：创建子智能体
@@ -183,6 +192,7 @@ def create_sub_agent(
         role: 角色名称
         description: 角色描述
         use_deep_agents: 是否使用deepagents（默认从环境变量读取）
+        use_pool: 是否从子智能体池复用已编译的智能体（默认从环境变量读取）
 
     Returns:
         SubAgent或DeepSubAgentWrapper实例
@@ -190,6 +200,12 @@ def create_sub_agent(
     if use_deep_agents:
         try:
             debug_logger.log_info('SubAgentFactory', f'创建DeepAgents增强子智能体: {role}')
+            if SUB_AGENT_POOL_ENABLED if use_pool is None else use_pool:
+                return get_sub_agent_pool().acquire(
+                    agent_id=agent_id,
+                    role=role,
+                    description=description
+                )
             return DeepSubAgentWrapper(
                 agent_id=agent_id,
                 role=role,
@@ -216,7 +232,8 @@ class MultiAgentCoordinator:
         self,
         question_tool: InterruptQuestionTool,
         progress_callback: Optional[Callable[[str], None]] = None,
-        use_dynamic_graph: bool = True
+        use_dynamic_graph: bool = True,
+        db_manager=None
     ):
         """
         初始化多智能体协调器（使用LangChain架构）
@@ -225,6 +242,7 @@ class MultiAgentCoordinator:
             question_tool: 中断性提问工具
             progress_callback: 进度回调函数
             use_dynamic_graph: 是否使用动态协作图（默认True）
+            db_manager: 数据库管理器实例（保存协作图的检查点）
         """
         self.question_tool = question_tool
         self.progress_callback = progress_callback
@@ -232,6 +250,9 @@ class MultiAgentCoordinator:
         
         # 协作日志记录
         self.collaboration_logs = []
+
+        # 传统流程的步骤按依赖图执行，互不依赖的步骤并发运行
+        self.dag_executor = DagExecutor()
         
         # 初始化动态协作图
         if use_dynamic_graph:
@@ -239,7 +260,8 @@ class MultiAgentCoordinator:
                 from src.core.dynamic_multi_agent_graph import DynamicMultiAgentGraph
                 self.dynamic_graph = DynamicMultiAgentGraph(
                     question_tool=question_tool,
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback,
+                    db_manager=db_manager
                 )
                 debug_logger.log_module('MultiAgentCoordinator', 
                     '多智能体协调器初始化完成（使用动态LangGraph协作）')
@@ -387,14 +409,29 @@ class MultiAgentCoordinator:
         
         self.emit_progress(f"执行计划已制定，共{len(execution_plan['steps'])}个步骤")
 
-        # 第三步：执行计划
-        execution_results = []
-        for i, step in enumerate(execution_plan['steps'], 1):
-            self.emit_progress(f"正在执行步骤 {i}/{len(execution_plan['steps'])}: {step['description']}")
-            
-            result = self._execute_step(step, task_event, character_context, execution_results)
-            execution_results.append(result)
-            
+        # 第三步：按依赖图执行计划，每个步骤只拿到它依赖的步骤结果
+        steps = execution_plan['steps']
+        total = len(steps)
+        results: Dict[int, Dict[str, Any]] = {}
+        failure = {}
+
+        def execute(index: int) -> Dict[str, Any]:
+            step = steps[index]
+            self.emit_progress(f"正在执行步骤 {index + 1}/{total}: {step['description']}")
+            dependency_results = [results[dep] for dep in step['dependencies']]
+            return self._execute_step(step, task_event, character_context, dependency_results)
+
+        def on_complete(index: int, run: Dict[str, Any]) -> bool:
+            # 在协调线程中执行：向用户提问和失败处理保持串行
+            result = run['result'] or {
+                'success': False,
+                'step': steps[index]['description'],
+                'error': run['error'] or '未知错误'
+            }
+            results[index] = result
+            self.add_collaboration_log('任务执行专家', '步骤耗时',
+                                       f"步骤{index + 1}耗时{run['duration']:.2f}秒")
+
             if result.get('needs_user_input'):
                 # 需要用户输入
                 answer = self.question_tool.ask_user(
@@ -409,16 +446,39 @@ class MultiAgentCoordinator:
                 self.emit_progress(f"步骤执行失败：{error_detail}")
                 # 确保execution_results包含失败信息
                 if not result.get('output'):
-                    result['output'] = f"❌ 步骤{i}执行失败：{error_detail}"
-                return {
-                    'success': False,
-                    'message': f'任务执行失败于步骤{i}：{error_detail}',
-                    'error': f'执行失败于步骤{i}：{error_detail}',
-                    'execution_results': execution_results,
-                    'collaboration_logs': self.collaboration_logs
-                }
-
-            self.emit_progress(f"步骤 {i} 完成")
+                    result['output'] = f"❌ 步骤{index + 1}执行失败：{error_detail}"
+                failure.setdefault('step', index + 1)
+                failure.setdefault('error', error_detail)
+                return False
+
+            self.emit_progress(f"步骤 {index + 1} 完成")
+            return True
+
+        dependencies = {index: step['dependencies'] for index, step in enumerate(steps)}
+        runs = self.dag_executor.run(dependencies, execute, on_complete)
+        # 结果按计划顺序排列，最后一个即计划的最终步骤
+        execution_results = [results[index] for index in sorted(results)]
+
+        path, seconds = critical_path(dependencies, {index: run['duration'] for index, run in runs.items()})
+        self.add_collaboration_log('系统', '执行统计', json.dumps({
+            'steps': len(runs),
+            'critical_path': [index + 1 for index in path],
+            'critical_path_seconds': round(seconds, 3),
+            'total_step_seconds': round(sum(run['duration'] for run in runs.values()), 3)
+        }, ensure_ascii=False))
+
+        if failure:
+            # 失败步骤的结果放在最后，避免之后独立成功的步骤的输出被当作最终结果
+            failed_index = failure['step'] - 1
+            execution_results = [results[index] for index in sorted(results) if index != failed_index]
+            execution_results.append(results[failed_index])
+            return {
+                'success': False,
+                'message': f"任务执行失败于步骤{failure['step']}：{failure['error']}",
+                'error': f"执行失败于步骤{failure['step']}：{failure['error']}",
+                'execution_results': execution_results,
+                'collaboration_logs': self.collaboration_logs
+            }
 
         # 所有步骤已完成，返回结果给用户
         self.emit_progress("✅ 所有步骤已完成，任务结果已提交给用户")
@@ -519,7 +579,9 @@ class MultiAgentCoordinator:
         self.add_collaboration_log('任务规划专家', '开始规划', '基于任务分析结果制定执行计划')
 
         plan_text = planning_agent.execute_task(
-            '请将这个任务分解为3-5个具体可执行的步骤。每个步骤用一行描述，格式为：步骤N：具体要做的事情',
+            '请将这个任务分解为3-5个具体可执行的步骤。每个步骤用一行描述，格式为：'
+            '步骤N：具体要做的事情（依赖：步骤编号，多个用顿号分隔，不需要其他步骤的结果时写“依赖：无”）。'
+            '互不依赖的步骤会同时执行，只依赖真正需要其结果的步骤',
             context
         )
 
@@ -528,22 +590,40 @@ class MultiAgentCoordinator:
 
         # 解析计划文本为步骤列表
         steps = []
+        numbers = {}
         lines = plan_text.strip().split('\n')
         for line in lines:
             line = line.strip()
             if line and ('步骤' in line or line[0].isdigit()):
+                # 先取出行末的依赖标注，避免其中的冒号影响描述的切分
+                marker = STEP_DEPENDENCY_PATTERN.search(line)
+                if marker:
+                    line = line[:marker.start()].rstrip()
                 # 去除步骤编号，只保留描述
                 if '：' in line:
-                    description = line.split('：', 1)[1].strip()
+                    label, description = line.split('：', 1)
                 elif ':' in line:
-                    description = line.split(':', 1)[1].strip()
+                    label, description = line.split(':', 1)
                 else:
-                    description = line
+                    label, description = '', line
+                description = description.strip()
                 
                 if description:  # 确保描述不为空
+                    index = len(steps)
+                    if marker:
+                        # 只保留对前面步骤的依赖，依赖图因此不会有循环
+                        dependencies = sorted({numbers[int(n)] for n in re.findall(r'\d+', marker.group(1))
+                                               if int(n) in numbers})
+                    else:
+                        # 未标注依赖时按顺序执行，与原有行为一致
+                        dependencies = [index - 1] if index else []
+                    label_number = re.search(r'\d+', label)
+                    numbers.setdefault(int(label_number.group()) if label_number else index + 1, index)
                     steps.append({
                         'description': description,
-                        'status': 'pending'
+                        'status': 'pending',
+                        'step_id': index,
+                        'dependencies': dependencies
                     })
 
         # 验证至少有一个步骤
@@ -554,7 +634,9 @@ class MultiAgentCoordinator:
             # 创建一个默认步骤
             steps.append({
                 'description': '完成任务要求',
-                'status': 'pending'
+                'status': 'pending',
+                'step_id': 0,
+                'dependencies': []
             })
 
         return {
@@ -576,7 +658,7 @@ class MultiAgentCoordinator:
             step: 步骤信息
             task_event: 任务事件
             character_context: 角色上下文
-            previous_results: 之前步骤的结果
+            previous_results: 该步骤依赖的步骤结果
 
         Returns:
             执行结果
@@ -587,7 +669,7 @@ class MultiAgentCoordinator:
 
         # 创建执行智能体（使用工厂函数）
         execution_agent = create_sub_agent(
-            agent_id=f'execution_agent_{len(previous_results)}',
+            agent_id=f"execution_agent_{step.get('step_id', len(previous_results))}",
             role='任务执行专家',
             description='负责执行具体的任务步骤'
         )
@@ -0,0 +1,243 @@
+"""
+名称匹配模块
+基于Aho-Corasick自动机的多模式匹配，一次扫描即可找出查询中提到的所有环境、域和物体名称（含别名），
+被更长的匹配覆盖的片段会被丢弃，候选先按原名优先于别名、再按与当前环境的拓扑距离排序
+"""
+
+from collections import deque
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from src.core.database_manager import DatabaseManager
+from src.core.environment_graph import EnvironmentGraph
+
+# 名称类别
+KIND_ENVIRONMENT = "environment"
+KIND_DOMAIN = "domain"
+KIND_OBJECT = "object"
+
+# 同等距离下的类别优先级（数值越小越优先）
+_KIND_PRIORITY = {KIND_ENVIRONMENT: 0, KIND_DOMAIN: 1, KIND_OBJECT: 2}
+
+# 别名与物体名称的最短长度（过短的名称如单字容易误匹配）
+MIN_ALIAS_LENGTH = 2
+
+
+class AhoCorasickMatcher:
+    """
+    Aho-Corasick 多模式匹配自动机
+    add() 添加模式后调用 build() 构建失配指针；build() 之后再次 add() 会在下次匹配前自动重建
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[List[int]] = [[]]  # 在该节点结束的模式
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]  # 在该节点可输出的全部模式（含失配链上的）
+        self._patterns: List[str] = []
+        self._payloads: List[List[Any]] = []
+        self._pattern_index: Dict[str, int] = {}
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: str, payload: Any = None):
+        """
+        添加模式（相同模式的多个负载会合并）
+
+        Args:
+            pattern: 模式字符串（匹配时不区分大小写）
+            payload: 匹配时返回的附加数据
+        """
+        pattern = (pattern or '').lower()
+        if not pattern:
+            return
+        index = self._pattern_index.get(pattern)
+        if index is not None:
+            self._payloads[index].append(payload)
+            return
+
+        index = len(self._patterns)
+        self._patterns.append(pattern)
+        self._payloads.append([payload])
+        self._pattern_index[pattern] = index
+
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._terminal.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._terminal[node].append(index)
+        self._built = False
+
+    def build(self):
+        """按BFS顺序计算失配指针并合并输出集合"""
+        self._fail = [0] * len(self._goto)
+        self._output = [list(patterns) for patterns in self._terminal]
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # 失配节点更浅，BFS保证其输出集合已经完整
+                self._output[child] += self._output[self._fail[child]]
+                queue.append(child)
+        self._built = True
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str, List[Any]]]:
+        """
+        一次扫描找出文本中所有模式出现的位置
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            (起始位置, 结束位置, 模式, 负载列表) 列表，按结束位置排序
+        """
+        if not self._built:
+            self.build()
+        matches = []
+        node = 0
+        for position, char in enumerate((text or '').lower()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._output[node]:
+                pattern = self._patterns[index]
+                matches.append((position - len(pattern) + 1, position + 1, pattern, self._payloads[index]))
+        return matches
+
+
+def derive_aliases(name: str) -> List[str]:
+    """
+    由名称推导别名（如"小可的房间"→"房间"，"厨房（一楼）"→"厨房"）
+
+    Args:
+        name: 原始名称
+
+    Returns:
+        别名列表（不含原名）
+    """
+    aliases = []
+    for left, right in (('(', ')'), ('（', '）')):
+        if left in name and name.endswith(right):
+            aliases.append(name[:name.index(left)].strip())
+    if '的' in name:
+        aliases.append(name.rsplit('的', 1)[1].strip())
+    return [alias for alias in dict.fromkeys(aliases) if len(alias) >= MIN_ALIAS_LENGTH and alias != name]
+
+
+class EnvironmentNameIndex:
+    """
+    环境名称索引
+    对所有环境、域和物体的名称及别名构建Aho-Corasick自动机，名称相关表变更后重建，
+    解析查询时按与当前环境的拓扑距离排序候选
+    """
+
+    # 名称索引依赖的数据表
+    SOURCE_TABLES = ('environment_descriptions', 'environment_objects', 'environment_domains')
+    CACHE_KEY = 'environment_name_index'
+
+    def __init__(self, db_manager: DatabaseManager = None, env_graph: EnvironmentGraph = None):
+        """
+        初始化环境名称索引
+
+        Args:
+            db_manager: 数据库管理器实例
+            env_graph: 环境拓扑图（用于计算距离），None时自动创建
+        """
+        self.db = db_manager or DatabaseManager()
+        self.env_graph = env_graph or EnvironmentGraph(self.db)
+
+    def _matcher(self) -> AhoCorasickMatcher:
+        """获取当前数据版本的匹配自动机"""
+        return self.db.get_cached_fragment(self.CACHE_KEY, self.SOURCE_TABLES, self._build)
+
+    def _build(self) -> AhoCorasickMatcher:
+        """从数据库加载所有名称并构建自动机"""
+        matcher = AhoCorasickMatcher()
+
+        def register(name: str, target: Dict[str, Any]):
+            # 单字物体名（如"床"）容易出现在其他词语中，与别名一样不注册
+            if target['kind'] != KIND_OBJECT or len(name or '') >= MIN_ALIAS_LENGTH:
+                matcher.add(name, dict(target, alias=False))
+            for alias in derive_aliases(name):
+                matcher.add(alias, dict(target, alias=True))
+
+        with self.db.get_connection() as conn:
+            for row in conn.execute('SELECT uuid, name FROM environment_descriptions'):
+                register(row['name'], {'kind': KIND_ENVIRONMENT, 'uuid': row['uuid'],
+                                       'name': row['name'], 'environment_uuid': row['uuid']})
+            for row in conn.execute('SELECT uuid, name FROM environment_domains'):
+                register(row['name'], {'kind': KIND_DOMAIN, 'uuid': row['uuid'],
+                                       'name': row['name'], 'environment_uuid': None})
+            for row in conn.execute('SELECT uuid, name, environment_uuid FROM environment_objects'):
+                register(row['name'], {'kind': KIND_OBJECT, 'uuid': row['uuid'],
+                                       'name': row['name'], 'environment_uuid': row['environment_uuid']})
+        matcher.build()
+        return matcher
+
+    def _distance(self, candidate: Dict[str, Any], current_env_uuid: Optional[str]) -> Optional[int]:
+        """计算候选与当前环境的跳数距离（域取其中最近的环境，不可达时返回None）"""
+        if not current_env_uuid:
+            return None
+        if candidate['kind'] == KIND_DOMAIN:
+            targets = [env['uuid'] for env in self.env_graph.get_domain_environments(candidate['uuid'])]
+        else:
+            targets = [candidate['environment_uuid']] if candidate['environment_uuid'] else []
+        distances = [self.env_graph.get_distance(current_env_uuid, target) for target in targets]
+        distances = [d for d in distances if d is not None]
+        return min(distances) if distances else None
+
+    def resolve(self, query: str, current_env_uuid: str = None,
+                kinds: Iterable[str] = None) -> List[Dict[str, Any]]:
+        """
+        解析查询中提到的环境、域或物体
+
+        Args:
+            query: 用户查询
+            current_env_uuid: 当前环境UUID（用于按距离排序）
+            kinds: 只返回这些类别的候选，None表示全部
+
+        Returns:
+            候选列表，每项包含 kind、uuid、name、environment_uuid、matched_text、alias、distance，
+            按原名优先于别名、距离（不可达排最后）、类别优先级、匹配长度降序排序；
+            位于更长匹配内部的片段（如"小可的房间"中的"房间"）不作为候选
+        """
+        kinds = set(kinds) if kinds else None
+        matches = [match for match in self._matcher().find_all(query)
+                   if not kinds or any(payload['kind'] in kinds for payload in match[3])]
+        spans = {(start, end) for start, end, _, _ in matches}
+        candidates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for start, end, pattern, payloads in matches:
+            if any(other_start <= start and end <= other_end and (other_start, other_end) != (start, end)
+                   for other_start, other_end in spans):
+                continue
+            for payload in payloads:
+                if kinds and payload['kind'] not in kinds:
+                    continue
+                key = (payload['kind'], payload['uuid'])
+                existing = candidates.get(key)
+                # 同一目标保留最长的匹配（优先原名）
+                if existing and (len(existing['matched_text']), not existing['alias']) >= (len(pattern), not payload['alias']):
+                    continue
+                candidates[key] = dict(payload, matched_text=pattern, position=start)
+
+        for candidate in candidates.values():
+            candidate['distance'] = self._distance(candidate, current_env_uuid)
+
+        return sorted(candidates.values(), key=lambda c: (
+            c['alias'],
+            c['distance'] is None,
+            c['distance'] if c['distance'] is not None else 0,
+            _KIND_PRIORITY[c['kind']],
+            -len(c['matched_text']),
+            c['position']
+        ))
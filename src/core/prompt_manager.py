@@ -5,12 +5,82 @@
 """
 
 import os
-from typing import Dict, Any, Optional
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 占位符格式：{variable_name}，与模板中的变量写法一致
+_PLACEHOLDER_PATTERN = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+class CompiledPrompt:
+    """
+    编译后的提示词模板
+    将模板一次性拆分为字面量片段和占位符片段，渲染时单次遍历拼接
+    """
+
+    __slots__ = ('source', 'segments', 'placeholders')
+
+    def __init__(self, source: str):
+        """
+        编译提示词模板
+
+        Args:
+            source: 模板原文
+        """
+        self.source = source
+        # 片段列表：(是否为占位符, 字面量文本或变量名)
+        self.segments: List[Tuple[bool, str]] = []
+        position = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append((False, source[position:match.start()]))
+            self.segments.append((True, match.group(1)))
+            position = match.end()
+        if position < len(source):
+            self.segments.append((False, source[position:]))
+        self.placeholders = frozenset(name for is_var, name in self.segments if is_var)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """
+        渲染模板，未提供的变量保留原始占位符
+
+        Args:
+            variables: 变量字典
+
+        Returns:
+            渲染后的提示词
+        """
+        parts = []
+        for is_var, text in self.segments:
+            if not is_var:
+                parts.append(text)
+            elif text in variables:
+                # 将None转换为空字符串
+                value = variables[text]
+                parts.append(str(value) if value is not None else "")
+            else:
+                parts.append(f"{{{text}}}")
+        return "".join(parts)
+
+
+@lru_cache(maxsize=128)
+def compile_prompt(template: str) -> CompiledPrompt:
+    """
+    编译提示词模板（按模板文本缓存）
+
+    Args:
+        template: 模板原文
+
+    Returns:
+        CompiledPrompt实例
+    """
+    return CompiledPrompt(template)
+
 
 class PromptManager:
     """
@@ -32,7 +102,8 @@ class PromptManager:
             prompts_dir = project_root / "prompts"
 
         self.prompts_dir = Path(prompts_dir)
-        self._cache: Dict[str, str] = {}
+        # 缓存：cache_key -> (mtime_ns, size, 编译后的模板)
+        self._cache: Dict[str, Tuple[int, int, CompiledPrompt]] = {}
 
         # 验证目录存在
         if not self.prompts_dir.exists():
@@ -53,49 +124,68 @@ class PromptManager:
         Raises:
             FileNotFoundError: 如果文件不存在
         """
-        cache_key = f"{category}/{filename}"
+        return self.load_compiled_prompt(category, filename, use_cache).source
+
+    def load_compiled_prompt(self, category: str, filename: str,
+                             use_cache: bool = True) -> CompiledPrompt:
+        """
+        加载并编译提示词模板
+        缓存按文件的mtime和大小校验，文件被修改后自动重新加载
+
+        Args:
+            category: 提示词类别（character/system/task/worldview）
+            filename: 文件名（不含.md后缀）
+            use_cache: 是否使用缓存
+
+        Returns:
+            CompiledPrompt实例
 
-        # 检查缓存
-        if use_cache and cache_key in self._cache:
-            return self._cache[cache_key]
+        Raises:
+            FileNotFoundError: 如果文件不存在
+        """
+        cache_key = f"{category}/{filename}"
 
         # 构建文件路径
         file_path = self.prompts_dir / category / f"{filename}.md"
 
-        if not file_path.exists():
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            self._cache.pop(cache_key, None)
             raise FileNotFoundError(f"提示词文件不存在: {file_path}")
 
+        # 检查缓存（文件未修改时直接复用编译结果）
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+
         # 读取文件
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
+        compiled = CompiledPrompt(content)
+
         # 缓存内容
         if use_cache:
-            self._cache[cache_key] = content
+            self._cache[cache_key] = (stat.st_mtime_ns, stat.st_size, compiled)
 
-        return content
+        return compiled
 
-    def render_prompt(self, template: str, variables: Dict[str, Any]) -> str:
+    def render_prompt(self, template: Union[str, CompiledPrompt], variables: Dict[str, Any]) -> str:
         """
         渲染提示词模板，替换变量
 
         Args:
-            template: 提示词模板
+            template: 提示词模板（原文或编译后的模板）
             variables: 变量字典
 
         Returns:
             渲染后的提示词
         """
-        result = template
-
-        # 替换所有变量
-        for key, value in variables.items():
-            placeholder = f"{{{key}}}"
-            # 将None转换为空字符串
-            value_str = str(value) if value is not None else ""
-            result = result.replace(placeholder, value_str)
-
-        return result
+        if not isinstance(template, CompiledPrompt):
+            template = compile_prompt(template)
+        return template.render(variables)
 
     def load_and_render(
         self,
@@ -116,16 +206,17 @@ class PromptManager:
         Returns:
             渲染后的提示词
         """
-        template = self.load_prompt(category, filename, use_cache)
-        return self.render_prompt(template, variables)
+        template = self.load_compiled_prompt(category, filename, use_cache)
+        return template.render(variables)
 
     def clear_cache(self):
         """清空缓存"""
         self._cache.clear()
+        compile_prompt.cache_clear()
 
     def reload_prompt(self, category: str, filename: str) -> str:
         """
-        重新加载提示词（不使用缓存）
+        重新加载提示词（丢弃旧缓存并重新读取文件）
 
         Args:
             category: 提示词类别
@@ -138,7 +229,7 @@ class PromptManager:
         if cache_key in self._cache:
             del self._cache[cache_key]
 
-        return self.load_prompt(category, filename, use_cache=False)
+        return self.load_prompt(category, filename, use_cache=True)
 
     def get_character_prompt(
         self,
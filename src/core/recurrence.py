@@ -0,0 +1,208 @@
+"""
+周期日程展开模块
+按需将周期日程的重复规则展开为查询窗口内的具体日程实例，按天缓存展开结果（LRU），
+查询多年范围时也只计算被访问到的日期，不在数据库中生成重复记录
+"""
+
+import copy
+import os
+import re
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
+
+# 索引条目：(开始时间, 结束时间, 日程对象)，与 schedule_index 一致
+IndexEntry = Tuple[datetime, datetime, Any]
+
+_WEEKDAY_CHARS = {
+    '一': 0, '二': 1, '三': 2, '四': 3, '五': 4, '六': 5, '日': 6, '天': 6,
+    '1': 0, '2': 1, '3': 2, '4': 3, '5': 4, '6': 5, '7': 6
+}
+_WEEKDAY_LIST = re.compile(r'(?:周|星期|礼拜)([一二三四五六日天1-7](?:[、,，和及与/ ]*[一二三四五六日天1-7])*)')
+_EVERY_DAY = ('每天', '每日', '天天')
+ALL_WEEKDAYS = frozenset(range(7))
+# 重复实例ID的格式为 "原日程ID@日期"
+OCCURRENCE_SEPARATOR = '@'
+
+
+def parse_recurrence_weekdays(pattern: str, weekday: Optional[int] = None) -> FrozenSet[int]:
+    """
+    解析重复模式中的星期（如"每周一、三、五"、"工作日"、"每天"）
+
+    Args:
+        pattern: 重复模式描述
+        weekday: 元数据中的星期几（0=周一），模式无法解析时使用
+
+    Returns:
+        星期集合（0-6），无法确定时返回空集合
+    """
+    pattern = pattern or ''
+    if any(word in pattern for word in _EVERY_DAY):
+        return ALL_WEEKDAYS
+
+    weekdays = set()
+    if '工作日' in pattern:
+        weekdays.update(range(5))
+    if '周末' in pattern:
+        weekdays.update((5, 6))
+    for match in _WEEKDAY_LIST.finditer(pattern):
+        weekdays.update(_WEEKDAY_CHARS[char] for char in match.group(1) if char in _WEEKDAY_CHARS)
+
+    if not weekdays and weekday is not None and 0 <= int(weekday) <= 6:
+        weekdays.add(int(weekday))
+    return frozenset(weekdays)
+
+
+def occurrence_parent_id(schedule_id: str) -> Optional[str]:
+    """
+    获取重复实例所属的周期日程ID
+
+    Args:
+        schedule_id: 日程ID
+
+    Returns:
+        重复实例返回原日程ID，其他日程返回None
+    """
+    parent_id, separator, _ = (schedule_id or '').partition(OCCURRENCE_SEPARATOR)
+    return parent_id if separator and parent_id else None
+
+
+class _RecurrenceRule:
+    """单个周期日程的重复规则"""
+
+    def __init__(self, start: datetime, end: datetime, schedule: Any):
+        metadata = schedule.metadata
+        self.schedule = schedule
+        self.anchor_day = start.toordinal()
+        self.start_time = start.time()
+        self.duration = end - start
+        # 实例可能跨越的天数（用于确定需要检查的开始日期范围）
+        self.span_days = max(self.duration.days, 0) + 1
+        self.weekdays = parse_recurrence_weekdays(
+            metadata.get('recurrence_pattern'), metadata.get('weekday')) or frozenset([start.weekday()])
+
+        self.until_day = None
+        until = metadata.get('until')
+        if until:
+            try:
+                self.until_day = date.fromisoformat(str(until)[:10]).toordinal()
+            except ValueError:
+                pass
+
+    def occurs_on(self, day: int) -> bool:
+        """该日期是否有实例（原始记录所在的日期由记录本身表示，不重复生成）"""
+        if day <= self.anchor_day or (self.until_day is not None and day > self.until_day):
+            return False
+        return date.fromordinal(day).weekday() in self.weekdays
+
+    def occurrence(self, day: int) -> IndexEntry:
+        """生成某天的日程实例"""
+        start = datetime.combine(date.fromordinal(day), self.start_time)
+        end = start + self.duration
+        instance = copy.copy(self.schedule)
+        instance.schedule_id = f"{self.schedule.schedule_id}{OCCURRENCE_SEPARATOR}{date.fromordinal(day).isoformat()}"
+        instance.start_time = start.isoformat()
+        instance.end_time = end.isoformat()
+        instance.metadata = dict(self.schedule.metadata, occurrence_of=self.schedule.schedule_id)
+        return start, end, instance
+
+
+class RecurrenceExpander:
+    """
+    周期日程展开器
+    保存所有激活周期日程的规则，按开始日期展开实例并以LRU缓存每天的结果，规则变化时清空缓存
+    """
+
+    def __init__(self, cache_days: int = None):
+        """
+        初始化周期日程展开器
+
+        Args:
+            cache_days: 缓存的展开天数上限
+        """
+        self.cache_days = cache_days or int(os.getenv('RECURRENCE_CACHE_DAYS', '1024'))
+        self._rules: Dict[str, _RecurrenceRule] = {}
+        self._max_span_days = 1
+        self._cache: 'OrderedDict[int, List[IndexEntry]]' = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add(self, entry: IndexEntry):
+        """
+        添加周期日程（原始记录的索引条目）
+
+        Args:
+            entry: (开始时间, 结束时间, 日程对象)
+        """
+        rule = _RecurrenceRule(*entry)
+        self._rules[rule.schedule.schedule_id] = rule
+        self._max_span_days = max(self._max_span_days, rule.span_days)
+        self._cache.clear()
+
+    def remove(self, schedule_id: str):
+        """
+        移除周期日程
+
+        Args:
+            schedule_id: 日程ID
+        """
+        if self._rules.pop(schedule_id, None) is not None:
+            self._max_span_days = max((rule.span_days for rule in self._rules.values()), default=1)
+            self._cache.clear()
+
+    def clear(self):
+        """移除所有规则"""
+        self._rules.clear()
+        self._max_span_days = 1
+        self._cache.clear()
+
+    def _occurrences_starting_on(self, day: int) -> List[IndexEntry]:
+        """获取在某天开始的所有实例（LRU缓存）"""
+        cached = self._cache.get(day)
+        if cached is not None:
+            self._cache.move_to_end(day)
+            self._hits += 1
+            return cached
+
+        self._misses += 1
+        occurrences = [rule.occurrence(day) for rule in self._rules.values() if rule.occurs_on(day)]
+        self._cache[day] = occurrences
+        if len(self._cache) > self.cache_days:
+            self._cache.popitem(last=False)
+        return occurrences
+
+    def occurrences(self, query_start: datetime, query_end: datetime) -> List[IndexEntry]:
+        """
+        展开可能与时间段重叠的周期日程实例（由调用方按精确的重叠条件过滤）
+
+        Args:
+            query_start: 查询开始时间
+            query_end: 查询结束时间
+
+        Returns:
+            索引条目列表
+        """
+        if not self._rules:
+            return []
+        results = []
+        # 在查询开始前若干天开始的实例也可能延续到查询时间段内
+        for day in range(query_start.toordinal() - self._max_span_days + 1, query_end.toordinal() + 1):
+            results.extend(self._occurrences_starting_on(day))
+        return results
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取展开器统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            'rules': len(self._rules),
+            'cached_days': len(self._cache),
+            'cache_hits': self._hits,
+            'cache_misses': self._misses
+        }
@@ -1,13 +1,14 @@
 """
 临时日程生成工具
-用于在空闲时间段自动生成临时日程
+用于在空闲时间段自动生成临时日程，并可由后台规划器在空闲时提前为今天及之后几天生成
 """
 
 import os
 import re
 import json
 import time
-from typing import List, Dict, Any, Tuple
+import threading
+from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import requests
@@ -308,3 +309,221 @@ class TemporaryScheduleGenerator:
         
         # 检查是否有临时日程
         return any(s.schedule_type == ScheduleType.TEMPORARY for s in schedules)
+
+
+class TemporarySchedulePlanner:
+    """
+    临时日程后台规划器
+    在用户空闲时（距上次对话超过一定时间）为今天及之后几天预先生成临时日程，
+    使查询日程时只需读取；查询的日期正在后台生成时短暂等待，不在预生成范围内时退回前台生成
+    """
+
+    def __init__(
+        self,
+        generator: TemporaryScheduleGenerator,
+        character_name: str = "智能体",
+        character_info: Dict[str, str] = None,
+        days_ahead: int = None,
+        idle_seconds: float = None,
+        interval_seconds: float = None,
+        wait_seconds: float = None
+    ):
+        """
+        初始化临时日程后台规划器
+
+        Args:
+            generator: 临时日程生成器
+            character_name: 智能体名称
+            character_info: 智能体信息
+            days_ahead: 除今天外预生成的天数
+            idle_seconds: 距上次活动多久后才开始后台生成（秒）
+            interval_seconds: 两次后台检查之间的间隔（秒）
+            wait_seconds: 查询的日期正在后台生成时最多等待的时间（秒）
+        """
+        self.generator = generator
+        self.schedule_manager = generator.schedule_manager
+        self.character_name = character_name
+        self.character_info = character_info or {}
+        self.days_ahead = days_ahead if days_ahead is not None else int(os.getenv('SCHEDULE_PREFETCH_DAYS', '2'))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else \
+            float(os.getenv('SCHEDULE_PREFETCH_IDLE_SECONDS', '30'))
+        self.interval_seconds = interval_seconds if interval_seconds is not None else \
+            float(os.getenv('SCHEDULE_PREFETCH_INTERVAL_SECONDS', '600'))
+        self.wait_seconds = wait_seconds if wait_seconds is not None else \
+            float(os.getenv('SCHEDULE_PREFETCH_WAIT_SECONDS', '5'))
+
+        self._lock = threading.Lock()
+        self._in_progress: Dict[str, threading.Event] = {}  # 日期 -> 生成完成事件
+        self._empty_dates: Dict[str, int] = {}  # 生成结果为空的日期 -> 当时的日程表变更计数，期间没有写入时后台不再重试
+        self._last_activity = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'passes': 0, 'prefetched_days': 0, 'foreground_days': 0, 'waits': 0, 'wait_timeouts': 0}
+
+    # ==================== 生成 ====================
+
+    def has_temporary_schedules(self, date: str) -> bool:
+        """
+        检查某天是否已有临时日程
+
+        Args:
+            date: 日期（ISO格式）
+
+        Returns:
+            是否已有临时日程
+        """
+        schedules = self.schedule_manager.get_schedules_by_time_range(f"{date}T00:00:00", f"{date}T23:59:59")
+        return any(s.schedule_type == ScheduleType.TEMPORARY for s in schedules)
+
+    def _schedules_version(self) -> int:
+        """日程表的变更计数"""
+        return self.schedule_manager.db.get_table_version('schedules')
+
+    def _generate(self, date: str, context: str = "", background: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        为某天生成临时日程（同一日期同时只有一个线程生成）
+
+        Args:
+            date: 日期（ISO格式）
+            context: 对话上下文
+            background: 是否为后台预生成（生成结果为空且之后日程表没有变化的日期跳过）
+
+        Returns:
+            生成的日程列表；该日期正由其他线程生成时返回None
+        """
+        with self._lock:
+            if background and self._empty_dates.get(date) == self._schedules_version():
+                return []
+            if date in self._in_progress:
+                return None
+            self._in_progress[date] = threading.Event()
+
+        try:
+            if self.has_temporary_schedules(date):
+                return []
+            generated = self.generator.generate_temporary_schedules(
+                date=date,
+                character_name=self.character_name,
+                character_info=self.character_info,
+                context=context
+            )
+            with self._lock:
+                if generated:
+                    self._empty_dates.pop(date, None)
+                else:
+                    self._empty_dates[date] = self._schedules_version()
+            return generated
+        finally:
+            with self._lock:
+                self._in_progress.pop(date).set()
+
+    def prefetch(self) -> int:
+        """
+        为今天及之后 days_ahead 天中还没有临时日程的日期生成临时日程
+
+        Returns:
+            本次生成了日程的天数
+        """
+        generated_days = 0
+        today = datetime.now().date()
+        with self._lock:
+            self._empty_dates = {d: v for d, v in self._empty_dates.items() if d >= today.isoformat()}
+        for offset in range(self.days_ahead + 1):
+            if self._stop_event.is_set():
+                break
+            date = (today + timedelta(days=offset)).isoformat()
+            try:
+                if self._generate(date, background=True):
+                    generated_days += 1
+            except Exception as e:
+                debug_logger.log_error('TemporarySchedulePlanner', f'预生成临时日程失败: {date}', e)
+
+        with self._lock:
+            self._stats['passes'] += 1
+            self._stats['prefetched_days'] += generated_days
+        if generated_days:
+            debug_logger.log_info('TemporarySchedulePlanner', '后台预生成临时日程完成', {
+                'days': generated_days
+            })
+        return generated_days
+
+    def ensure_schedules(self, date: str, context: str = "") -> List[Dict[str, Any]]:
+        """
+        查询日程时调用（调用方已确认该日期没有临时日程）：确保该日期有临时日程
+        后台正在生成则最多等待 wait_seconds，超时后不阻塞查询（生成结果稍后可见）；否则在前台生成
+
+        Args:
+            date: 日期（ISO格式）
+            context: 对话上下文
+
+        Returns:
+            本次在前台生成的日程列表
+        """
+        self.touch()
+        generated = self._generate(date, context)
+        if generated is not None:
+            if generated:
+                with self._lock:
+                    self._stats['foreground_days'] += 1
+            return generated
+
+        with self._lock:
+            event = self._in_progress.get(date)
+            self._stats['waits'] += 1
+        if event is not None and not event.wait(self.wait_seconds):
+            with self._lock:
+                self._stats['wait_timeouts'] += 1
+            debug_logger.log_info('TemporarySchedulePlanner', '后台生成未完成，先返回现有日程', {'date': date})
+        return []
+
+    # ==================== 后台线程 ====================
+
+    def touch(self):
+        """记录一次用户活动（推迟后台生成，避免与对话争用LLM）"""
+        self._last_activity = time.monotonic()
+
+    def start(self):
+        """启动后台线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='TemporarySchedulePlanner', daemon=True)
+        self._thread.start()
+        debug_logger.log_module('TemporarySchedulePlanner', '临时日程后台规划器已启动', {
+            'days_ahead': self.days_ahead,
+            'idle_seconds': self.idle_seconds
+        })
+
+    def stop(self, timeout: float = None):
+        """
+        停止后台线程
+
+        Args:
+            timeout: 等待线程结束的最长时间（秒）
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """后台循环：空闲时预生成，然后等待下一次检查"""
+        while not self._stop_event.is_set():
+            idle = time.monotonic() - self._last_activity
+            if idle < self.idle_seconds:
+                self._stop_event.wait(self.idle_seconds - idle)
+                continue
+            self.prefetch()
+            self._stop_event.wait(self.interval_seconds)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取规划器统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return dict(self._stats,
+                        running=self._thread is not None and self._thread.is_alive(),
+                        in_progress=sorted(self._in_progress))
@@ -0,0 +1,321 @@
+"""
+日程区间索引模块
+按天分桶的内存区间树：首次查询时一次性加载激活日程并解析时间，之后冲突检测、时间范围查询和空闲时段计算
+只访问相关日期的桶，复杂度为 O(log n + k)；日程管理器自身的写入增量更新对应的桶，
+其他途径的写入通过数据表变更计数发现并在下次查询时整体重新加载
+"""
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+
+from src.core.database_manager import DatabaseManager
+from src.core.recurrence import RecurrenceExpander
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+# 跨越天数超过该值的日程不分桶，单独存放并在每次查询时检查
+MAX_BUCKET_SPAN_DAYS = 31
+
+# 周期日程的类型值（其重复实例由 RecurrenceExpander 按需展开）
+RECURRING_TYPE = 'recurring'
+
+# 索引条目：(开始时间, 结束时间, 日程对象)
+IndexEntry = Tuple[datetime, datetime, Any]
+
+
+def parse_schedule_time(value: str) -> datetime:
+    """
+    解析日程时间（ISO格式，带时区的时间转换为本地时间后去掉时区）
+
+    Args:
+        value: ISO格式时间字符串
+
+    Returns:
+        不带时区的datetime
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def overlaps(start: datetime, end: datetime, query_start: datetime, query_end: datetime) -> bool:
+    """
+    判断日程是否落在查询时间段内（与原SQL条件一致：区间相交，或在时间段内开始）
+
+    Args:
+        start: 日程开始时间
+        end: 日程结束时间
+        query_start: 查询开始时间
+        query_end: 查询结束时间
+
+    Returns:
+        是否重叠
+    """
+    return start < query_end and (end > query_start or start >= query_start)
+
+
+class IntervalTree:
+    """
+    静态区间树
+    条目按开始时间排序后隐式构成平衡二叉树，每个节点记录子树中最大的结束时间，用于剪枝
+    """
+
+    def __init__(self, entries: Iterable[IndexEntry]):
+        """
+        构建区间树
+
+        Args:
+            entries: 索引条目
+        """
+        self._entries = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self._max_end: List[Optional[datetime]] = [None] * len(self._entries)
+        self._build(0, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _build(self, lo: int, hi: int) -> Optional[datetime]:
+        """递归计算 [lo, hi) 子树的最大结束时间"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._entries[mid][1]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_end[mid] = max_end
+        return max_end
+
+    def query(self, query_start: datetime, query_end: datetime) -> List[IndexEntry]:
+        """
+        查找与时间段重叠的条目
+
+        Args:
+            query_start: 查询开始时间
+            query_end: 查询结束时间
+
+        Returns:
+            条目列表（按开始时间排序）
+        """
+        results = []
+        stack = [(0, len(self._entries))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            # 子树中所有日程都在查询开始之前结束
+            if self._max_end[mid] < query_start:
+                continue
+            entry = self._entries[mid]
+            if entry[0] < query_end:
+                if overlaps(entry[0], entry[1], query_start, query_end):
+                    results.append(entry)
+                stack.append((mid + 1, hi))
+            stack.append((lo, mid))
+        results.sort(key=lambda entry: (entry[0], entry[1]))
+        return results
+
+
+class ScheduleIndex:
+    """
+    日程区间索引
+    激活日程按所覆盖的日期分桶，每个桶在首次查询时构建区间树，桶内容变化后重新构建；
+    周期日程的原始记录照常入桶，之后的重复实例在查询时按需展开
+    """
+
+    TABLE = 'schedules'
+
+    def __init__(self, db_manager: DatabaseManager,
+                 load_all: Callable[[], Iterable[Any]],
+                 load_one: Callable[[str], Optional[Any]]):
+        """
+        初始化日程区间索引
+
+        Args:
+            db_manager: 数据库管理器实例（用于读取数据表变更计数）
+            load_all: 加载所有激活日程的函数
+            load_one: 按ID加载单个日程的函数
+        """
+        self.db = db_manager
+        self._load_all = load_all
+        self._load_one = load_one
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+
+        self._buckets: Dict[int, Dict[str, IndexEntry]] = {}
+        self._bucket_days: List[int] = []  # 已有桶的日期序号（升序）
+        self._trees: Dict[int, IntervalTree] = {}
+        self._long_entries: Dict[str, IndexEntry] = {}
+        self._entry_days: Dict[str, List[int]] = {}  # 日程ID -> 所在的桶
+        self.recurrence = RecurrenceExpander()
+
+    # ==================== 维护 ====================
+
+    def _reset(self):
+        """清空索引"""
+        self._buckets = {}
+        self._bucket_days = []
+        self._trees = {}
+        self._long_entries = {}
+        self._entry_days = {}
+        self.recurrence.clear()
+
+    def _ensure_loaded(self):
+        """索引未加载或数据表被其他途径修改时重新加载"""
+        version = self.db.get_table_version(self.TABLE)
+        if self._version == version:
+            return
+
+        self._reset()
+        for schedule in self._load_all():
+            self._add(schedule)
+        self._version = version
+        debug_logger.log_info('ScheduleIndex', '日程索引已加载', {
+            'schedules': len(self._entry_days),
+            'day_buckets': len(self._bucket_days)
+        })
+
+    @staticmethod
+    def _days_covered(start: datetime, end: datetime) -> range:
+        """日程覆盖的日期序号（恰好在零点结束的日程不计入结束当天）"""
+        last = end - timedelta(microseconds=1) if end > start else start
+        return range(start.toordinal(), max(start, last).toordinal() + 1)
+
+    def _add(self, schedule: Any):
+        """将激活日程加入索引"""
+        if not schedule.is_active:
+            return
+        try:
+            entry = (parse_schedule_time(schedule.start_time), parse_schedule_time(schedule.end_time), schedule)
+        except (TypeError, ValueError):
+            debug_logger.log_info('ScheduleIndex', '日程时间无法解析，未加入索引', {
+                'schedule_id': schedule.schedule_id
+            })
+            return
+
+        if getattr(schedule.schedule_type, 'value', schedule.schedule_type) == RECURRING_TYPE:
+            self.recurrence.add(entry)
+
+        days = self._days_covered(entry[0], entry[1])
+        if len(days) > MAX_BUCKET_SPAN_DAYS:
+            self._long_entries[schedule.schedule_id] = entry
+            self._entry_days[schedule.schedule_id] = []
+            return
+
+        for day in days:
+            bucket = self._buckets.get(day)
+            if bucket is None:
+                bucket = self._buckets[day] = {}
+                bisect.insort(self._bucket_days, day)
+            bucket[schedule.schedule_id] = entry
+            self._trees.pop(day, None)
+        self._entry_days[schedule.schedule_id] = list(days)
+
+    def _remove(self, schedule_id: str):
+        """将日程移出索引"""
+        days = self._entry_days.pop(schedule_id, None)
+        if days is None:
+            return
+        self._long_entries.pop(schedule_id, None)
+        self.recurrence.remove(schedule_id)
+        for day in days:
+            bucket = self._buckets[day]
+            bucket.pop(schedule_id, None)
+            self._trees.pop(day, None)
+            if not bucket:
+                del self._buckets[day]
+                self._bucket_days.pop(bisect.bisect_left(self._bucket_days, day))
+
+    def refresh(self, schedule_id: str):
+        """
+        日程管理器写入某个日程后调用，增量更新对应的桶
+        如果期间还有其他写入（计数器增加不止一次），则留待下次查询时整体重新加载
+
+        Args:
+            schedule_id: 被写入的日程ID
+        """
+        with self._lock:
+            if self._version is None:
+                return
+            version = self.db.get_table_version(self.TABLE)
+            if version != self._version + 1:
+                self._version = None
+                return
+            self._remove(schedule_id)
+            schedule = self._load_one(schedule_id)
+            if schedule is not None:
+                self._add(schedule)
+            self._version = version
+
+    def invalidate(self):
+        """丢弃索引，下次查询时重新加载"""
+        with self._lock:
+            self._version = None
+            self._reset()
+
+    # ==================== 查询 ====================
+
+    def _tree(self, day: int) -> IntervalTree:
+        """获取某天的区间树（按需构建）"""
+        tree = self._trees.get(day)
+        if tree is None:
+            tree = self._trees[day] = IntervalTree(self._buckets[day].values())
+        return tree
+
+    def query(self, query_start: datetime, query_end: datetime,
+              queryable_only: bool = False, expand_recurring: bool = True) -> List[IndexEntry]:
+        """
+        查找与时间段重叠的激活日程
+
+        Args:
+            query_start: 查询开始时间
+            query_end: 查询结束时间
+            queryable_only: 是否只返回可查询的日程
+            expand_recurring: 是否包含周期日程展开的重复实例（为False时只返回数据库中的原始记录）
+
+        Returns:
+            索引条目列表（按开始时间排序）
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            found: Dict[str, IndexEntry] = {}
+            lo = bisect.bisect_left(self._bucket_days, query_start.toordinal())
+            hi = bisect.bisect_right(self._bucket_days, query_end.toordinal())
+            for day in self._bucket_days[lo:hi]:
+                for entry in self._tree(day).query(query_start, query_end):
+                    found[entry[2].schedule_id] = entry
+            for schedule_id, entry in self._long_entries.items():
+                if overlaps(entry[0], entry[1], query_start, query_end):
+                    found[schedule_id] = entry
+            occurrences = self.recurrence.occurrences(query_start, query_end) if expand_recurring else []
+            for entry in occurrences:
+                if overlaps(entry[0], entry[1], query_start, query_end):
+                    found[entry[2].schedule_id] = entry
+
+        entries = [entry for entry in found.values() if not queryable_only or entry[2].is_queryable]
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        return entries
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取索引统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return {
+                'loaded': self._version is not None,
+                'schedules': len(self._entry_days),
+                'day_buckets': len(self._bucket_days),
+                'built_trees': len(self._trees),
+                'long_schedules': len(self._long_entries),
+                'recurrence': self.recurrence.get_statistics()
+            }
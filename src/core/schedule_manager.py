@@ -3,11 +3,14 @@
 实现日程的创建、管理、冲突检测和优先级控制
 """
 
+import json
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from enum import Enum
 from src.core.database_manager import DatabaseManager
+from src.core.recurrence import occurrence_parent_id
+from src.core.schedule_index import ScheduleIndex, parse_schedule_time
 from src.tools.debug_logger import get_debug_logger
 
 # 获取debug日志记录器
@@ -72,7 +75,7 @@ class Schedule:
             is_active: 是否激活
             collaboration_status: 协作确认状态
             is_queryable: 是否可被查询
-            metadata: 附加元数据
+            metadata: 附加元数据（字典或JSON字符串）
         """
         self.schedule_id = schedule_id or str(uuid.uuid4())
         self.title = title
@@ -85,7 +88,22 @@ class Schedule:
         self.is_active = is_active
         self.collaboration_status = collaboration_status
         self.is_queryable = is_queryable
-        self.metadata = metadata or {}
+        self.metadata = metadata
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """附加元数据（从数据库加载时保留JSON原文，首次访问时才解析）"""
+        if self._metadata is None:
+            self._metadata = json.loads(self._metadata_json) if self._metadata_json else {}
+            self._metadata_json = None
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value):
+        if isinstance(value, str):
+            self._metadata, self._metadata_json = None, value
+        else:
+            self._metadata, self._metadata_json = value or {}, None
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -238,6 +256,9 @@ class ScheduleManager:
     负责日程的创建、查询、冲突检测和优先级管理
     """
 
+    # 由开始/结束时间和元数据派生、用于索引查询的列
+    DERIVED_COLUMNS = ('start_epoch', 'end_epoch', 'day', 'involves_user', 'recurrence_pattern', 'weekday')
+
     def __init__(self, db_manager: DatabaseManager = None):
         """
         初始化日程管理器
@@ -247,9 +268,34 @@ class ScheduleManager:
         """
         self.db = db_manager or DatabaseManager()
         self._initialize_database()
+
+        # 按天分桶的内存区间索引（首次查询时加载）
+        self.index = ScheduleIndex(self.db, self._load_active_schedules, self.get_schedule)
+        # 相似日程检查器（首次使用时创建并复用）
+        self._similarity_checker = None
+        # 日程写入后的回调（如提醒引擎），参数为日程ID
+        self._change_listeners: List[Callable[[str], None]] = []
         
         debug_logger.log_module('ScheduleManager', '日程管理器初始化完成')
 
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """
+        注册日程写入后的回调（在区间索引更新之后调用）
+
+        Args:
+            listener: 回调函数，参数为被写入的日程ID
+        """
+        self._change_listeners.append(listener)
+
+    def _schedule_written(self, schedule_id: str):
+        """日程写入后增量更新区间索引并通知回调"""
+        self.index.refresh(schedule_id)
+        for listener in self._change_listeners:
+            try:
+                listener(schedule_id)
+            except Exception as e:
+                debug_logger.log_error('ScheduleManager', f'日程变更回调异常: {str(e)}', e)
+
     def _initialize_database(self):
         """初始化数据库表"""
         with self.db.get_connection() as conn:
@@ -268,7 +314,13 @@ class ScheduleManager:
                     is_active INTEGER DEFAULT 1,
                     collaboration_status TEXT NOT NULL,
                     is_queryable INTEGER DEFAULT 1,
-                    metadata TEXT
+                    metadata TEXT,
+                    start_epoch INTEGER,
+                    end_epoch INTEGER,
+                    day INTEGER,
+                    involves_user INTEGER DEFAULT 0,
+                    recurrence_pattern TEXT,
+                    weekday INTEGER
                 )
             ''')
             
@@ -280,9 +332,115 @@ class ScheduleManager:
             
             # 显式提交
             conn.commit()
+
+        self._migrate_database()
         
         debug_logger.log_info('ScheduleManager', '数据库表初始化完成')
 
+    def _migrate_database(self):
+        """
+        添加可索引的时间列（epoch秒、开始日期）和从元数据提升的过滤字段，并为旧数据补算
+        """
+        with self.db.get_connection() as conn:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(schedules)').fetchall()]
+            if not columns:
+                # 表不存在（如每次连接都是新库的 :memory: 模式）
+                return
+
+            new_columns = [
+                ('start_epoch', 'INTEGER'),
+                ('end_epoch', 'INTEGER'),
+                ('day', 'INTEGER'),
+                ('involves_user', 'INTEGER DEFAULT 0'),
+                ('recurrence_pattern', 'TEXT'),
+                ('weekday', 'INTEGER'),
+            ]
+            migrations_needed = [(name, ddl) for name, ddl in new_columns if name not in columns]
+            if migrations_needed:
+                print("○ 检测到日程表需要迁移，正在添加新字段...")
+                for name, ddl in migrations_needed:
+                    conn.execute(f'ALTER TABLE schedules ADD COLUMN {name} {ddl}')
+                    print(f"  ✓ 已添加字段: {name}")
+
+            # 区间查询：(is_active, start_epoch) 范围扫描；按天查询；最长跨度由表达式索引直接得到
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_schedules_active_epoch '
+                         'ON schedules(is_active, start_epoch, end_epoch)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_schedules_day '
+                         'ON schedules(day, is_active, start_epoch)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_schedules_span ON schedules(end_epoch - start_epoch)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_schedules_involves_user '
+                         'ON schedules(involves_user, is_active, start_epoch)')
+
+            # 为旧数据补算派生字段
+            missing = conn.execute(
+                'SELECT schedule_id, start_time, end_time, metadata FROM schedules WHERE start_epoch IS NULL'
+            ).fetchall()
+            updates = []
+            for schedule_id, start_time, end_time, metadata in missing:
+                try:
+                    derived = self._derived_columns(start_time, end_time, json.loads(metadata) if metadata else {})
+                except (TypeError, ValueError):
+                    continue
+                updates.append(tuple(derived.values()) + (schedule_id,))
+            if updates:
+                conn.executemany(f'''
+                    UPDATE schedules SET {", ".join(f"{name} = ?" for name in self.DERIVED_COLUMNS)}
+                    WHERE schedule_id = ?
+                ''', updates)
+                print(f"  ✓ 已为 {len(updates)} 条日程补算时间索引字段")
+
+    @staticmethod
+    def _time_columns(start_time: str, end_time: str) -> Dict[str, int]:
+        """计算时间派生列：epoch秒和开始日期（YYYYMMDD整数，本地时间）"""
+        start = parse_schedule_time(start_time)
+        end = parse_schedule_time(end_time)
+        return {
+            'start_epoch': int(start.timestamp()),
+            'end_epoch': int(end.timestamp()),
+            'day': int(start.strftime('%Y%m%d'))
+        }
+
+    @classmethod
+    def _derived_columns(cls, start_time: str, end_time: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """计算全部派生列（顺序与 DERIVED_COLUMNS 一致）"""
+        columns = cls._time_columns(start_time, end_time)
+        columns['involves_user'] = 1 if metadata.get('involves_user') else 0
+        columns['recurrence_pattern'] = metadata.get('recurrence_pattern')
+        columns['weekday'] = metadata.get('weekday')
+        return columns
+
+    @staticmethod
+    def _row_to_schedule(row) -> Schedule:
+        """将 schedules 表的一行转换为日程对象（元数据延迟解析）"""
+        return Schedule.from_dict({
+            'schedule_id': row[0],
+            'title': row[1],
+            'description': row[2],
+            'schedule_type': row[3],
+            'priority': row[4],
+            'start_time': row[5],
+            'end_time': row[6],
+            'created_at': row[7],
+            'is_active': row[9] == 1,
+            'collaboration_status': row[10],
+            'is_queryable': row[11] == 1,
+            'metadata': row[12]
+        })
+
+    @property
+    def similarity_checker(self):
+        """相似日程检查器（延迟创建）"""
+        if self._similarity_checker is None:
+            from src.core.schedule_similarity_checker import ScheduleSimilarityChecker
+            self._similarity_checker = ScheduleSimilarityChecker()
+        return self._similarity_checker
+
+    def _load_active_schedules(self) -> List[Schedule]:
+        """加载所有激活日程（用于构建区间索引）"""
+        with self.db.get_connection() as conn:
+            cursor = conn.execute('SELECT * FROM schedules WHERE is_active = 1')
+            return [self._row_to_schedule(row) for row in cursor.fetchall()]
+
     def create_schedule(
         self,
         title: str,
@@ -328,16 +486,25 @@ class ScheduleManager:
             else:  # TEMPORARY
                 priority = SchedulePriority.LOW
 
+        # 时间无法解析的日程无法参与冲突检测和区间索引
+        try:
+            parse_schedule_time(start_time)
+            parse_schedule_time(end_time)
+        except (TypeError, ValueError):
+            message = f"日程时间格式无效：{start_time} 到 {end_time}"
+            debug_logger.log_info('ScheduleManager', message)
+            return False, None, message
+
         # 检查当天是否有相似日程
         if check_similarity:
-            from src.core.schedule_similarity_checker import ScheduleSimilarityChecker, get_schedules_on_same_day
+            from src.core.schedule_similarity_checker import get_schedules_on_same_day
             
             # 获取当天的所有日程
             same_day_schedules = get_schedules_on_same_day(self, start_time)
             
             if same_day_schedules:
-                # 使用LLM检查相似度
-                checker = ScheduleSimilarityChecker()
+                # 本地预过滤后使用LLM批量检查相似度
+                checker = self.similarity_checker
                 new_schedule_dict = {
                     'title': title,
                     'description': description,
@@ -353,9 +520,13 @@ class ScheduleManager:
                 )
                 
                 if has_similar:
+                    if schedule_to_delete and not self.delete_schedule(schedule_to_delete):
+                        # 旧日程无法单独删除（如周期日程的某个重复实例），保留已有日程
+                        message = f"检测到相似日程，但已有日程无法删除，保留已有日程。原因：{result.get('reason', '')}"
+                        debug_logger.log_info('ScheduleManager', message, {'schedule_id': schedule_to_delete})
+                        return False, None, message
                     if schedule_to_delete:
-                        # LLM建议保留新日程，删除旧日程
-                        self.delete_schedule(schedule_to_delete)
+                        # LLM建议保留新日程，已删除旧日程
                         message = f"检测到相似日程，已删除旧日程并创建新日程。原因：{result.get('reason', '新日程更详细')}"
                         debug_logger.log_info('ScheduleManager', message)
                         # 继续创建新日程
@@ -407,15 +578,16 @@ class ScheduleManager:
             )
 
         # 保存到数据库
-        import json
         try:
+            derived = self._derived_columns(schedule.start_time, schedule.end_time, schedule.metadata)
             with self.db.get_connection() as conn:
                 conn.execute('''
                     INSERT INTO schedules (
                         schedule_id, title, description, schedule_type, 
                         priority, start_time, end_time, created_at,
-                        is_active, collaboration_status, is_queryable, metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        is_active, collaboration_status, is_queryable, metadata,
+                        start_epoch, end_epoch, day, involves_user, recurrence_pattern, weekday
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     schedule.schedule_id,
                     schedule.title,
@@ -429,7 +601,9 @@ class ScheduleManager:
                     schedule.collaboration_status.value,
                     1 if schedule.is_queryable else 0,
                     json.dumps(schedule.metadata, ensure_ascii=False)
-                ))
+                ) + tuple(derived.values()))
+
+            self._schedule_written(schedule.schedule_id)
 
             message = f"日程创建成功：{title}"
             debug_logger.log_info('ScheduleManager', message, {
@@ -463,48 +637,14 @@ class ScheduleManager:
         Returns:
             (是否冲突, 冲突的日程对象或None)
         """
-        import json
-        
-        with self.db.get_connection() as conn:
-            # 查询时间段内的所有激活日程
-            query = '''
-                SELECT * FROM schedules 
-                WHERE is_active = 1
-                AND (
-                    (start_time < ? AND end_time > ?)
-                    OR (start_time >= ? AND start_time < ?)
-                    OR (end_time > ? AND end_time <= ?)
-                )
-            '''
-            params = [end_time, start_time, start_time, end_time, start_time, end_time]
-            
-            if exclude_schedule_id:
-                query += ' AND schedule_id != ?'
-                params.append(exclude_schedule_id)
-            
-            cursor = conn.execute(query, params)
-            
-            for row in cursor.fetchall():
-                existing_priority = SchedulePriority(row[4])  # priority字段
-                
-                # 如果现有日程的优先级 >= 新日程的优先级，则冲突
-                if existing_priority.value >= new_priority.value:
-                    data = {
-                        'schedule_id': row[0],
-                        'title': row[1],
-                        'description': row[2],
-                        'schedule_type': row[3],
-                        'priority': row[4],
-                        'start_time': row[5],
-                        'end_time': row[6],
-                        'created_at': row[7],
-                        'is_active': row[9] == 1,
-                        'collaboration_status': row[10],
-                        'is_queryable': row[11] == 1,
-                        'metadata': json.loads(row[12]) if row[12] else {}
-                    }
-                    conflicting_schedule = Schedule.from_dict(data)
-                    return True, conflicting_schedule
+        # 通过区间索引查询时间段内的所有激活日程（含按需展开的周期日程实例）
+        for _, _, schedule in self.index.query(parse_schedule_time(start_time), parse_schedule_time(end_time)):
+            if exclude_schedule_id and exclude_schedule_id in (
+                    schedule.schedule_id, schedule.metadata.get('occurrence_of')):
+                continue
+            # 如果现有日程的优先级 >= 新日程的优先级，则冲突
+            if schedule.priority.value >= new_priority.value:
+                return True, schedule
         
         return False, None
 
@@ -513,36 +653,23 @@ class ScheduleManager:
         获取指定日程
 
         Args:
-            schedule_id: 日程ID
+            schedule_id: 日程ID（周期日程的重复实例ID返回所属的周期日程）
 
         Returns:
             日程对象，不存在时返回None
         """
-        import json
-        
         with self.db.get_connection() as conn:
             cursor = conn.execute(
                 'SELECT * FROM schedules WHERE schedule_id = ?',
                 (schedule_id,)
             )
             row = cursor.fetchone()
+            parent_id = occurrence_parent_id(schedule_id)
+            if row is None and parent_id:
+                row = conn.execute('SELECT * FROM schedules WHERE schedule_id = ?', (parent_id,)).fetchone()
 
             if row:
-                data = {
-                    'schedule_id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'schedule_type': row[3],
-                    'priority': row[4],
-                    'start_time': row[5],
-                    'end_time': row[6],
-                    'created_at': row[7],
-                    'is_active': row[9] == 1,
-                    'collaboration_status': row[10],
-                    'is_queryable': row[11] == 1,
-                    'metadata': json.loads(row[12]) if row[12] else {}
-                }
-                return Schedule.from_dict(data)
+                return self._row_to_schedule(row)
 
         return None
 
@@ -552,7 +679,8 @@ class ScheduleManager:
         end_time: str,
         queryable_only: bool = True,
         active_only: bool = True,
-        include_inactive: bool = False
+        include_inactive: bool = False,
+        expand_recurring: bool = True
     ) -> List[Schedule]:
         """
         获取时间范围内的所有日程
@@ -563,53 +691,93 @@ class ScheduleManager:
             queryable_only: 是否只返回可查询的日程
             active_only: 是否只返回激活的日程（优先级高于include_inactive）
             include_inactive: 是否包含未激活的日程（当active_only=False时生效）
+            expand_recurring: 是否包含周期日程的重复实例（只读的展示和冲突判断使用；
+                需要按ID修改或删除日程的界面应传入False，只列出原始记录）
 
         Returns:
-            日程列表
+            日程列表（周期日程包含在时间范围内按需展开的重复实例，ID为 "原日程ID@日期"）
         """
-        import json
-        
-        query = '''
-            SELECT * FROM schedules 
-            WHERE (
-                (start_time < ? AND end_time > ?)
-                OR (start_time >= ? AND start_time < ?)
-            )
-        '''
-        params = [end_time, start_time, start_time, end_time]
-        
-        if queryable_only:
-            query += ' AND is_queryable = 1'
-        
+        if active_only or not include_inactive:
+            # 激活日程走区间索引
+            entries = self.index.query(parse_schedule_time(start_time), parse_schedule_time(end_time),
+                                       queryable_only=queryable_only, expand_recurring=expand_recurring)
+            return [schedule for _, _, schedule in entries]
+
+        # 包含未激活日程时直接查询数据库
+        bounds = self._time_columns(start_time, end_time)
+        with self.db.get_connection() as conn:
+            return [self._row_to_schedule(row) for row in
+                    self._query_overlapping(conn, bounds['start_epoch'], bounds['end_epoch'], queryable_only)]
+
+    def _query_overlapping(self, conn, start_epoch: int, end_epoch: int, queryable_only: bool = False) -> List[Any]:
+        """
+        查询与时间段重叠的日程行（可走索引的区间条件）
+        开始时间限定在 [查询开始 - 最长日程跨度, 查询结束) 内，使 SQLite 可以对 start_epoch 做范围扫描
+
+        Args:
+            conn: 数据库连接
+            start_epoch: 查询开始时间（epoch秒）
+            end_epoch: 查询结束时间（epoch秒）
+            queryable_only: 是否只返回可查询的日程
+
+        Returns:
+            数据行列表（按开始时间排序）
+        """
+        max_span = conn.execute('SELECT MAX(end_epoch - start_epoch) FROM schedules').fetchone()[0] or 0
+        rows = []
+        # 分别查询激活和未激活的日程，使 (is_active, start_epoch) 索引的两段范围都能被使用
+        for is_active in (1, 0):
+            rows.extend(conn.execute(f'''
+                SELECT * FROM schedules
+                WHERE is_active = ?
+                AND start_epoch >= ? AND start_epoch < ?
+                AND (end_epoch > ? OR start_epoch >= ?)
+                {'AND is_queryable = 1' if queryable_only else ''}
+            ''', (is_active, start_epoch - max_span, end_epoch, start_epoch, start_epoch)).fetchall())
+        rows.sort(key=lambda row: row[5])
+        return rows
+
+    def find_schedules(
+        self,
+        date: str = None,
+        schedule_type: ScheduleType = None,
+        involves_user: bool = None,
+        recurrence_pattern: str = None,
+        active_only: bool = True
+    ) -> List[Schedule]:
+        """
+        按开始日期和提升出元数据的字段筛选日程（均可走索引，不解析元数据）
+
+        Args:
+            date: 开始日期（如 "2024-01-15"），None表示不限
+            schedule_type: 日程类型
+            involves_user: 是否涉及用户参与
+            recurrence_pattern: 重复模式
+            active_only: 是否只返回激活的日程
+
+        Returns:
+            日程列表（按开始时间排序）
+        """
+        conditions, params = [], []
+        if date:
+            conditions.append('day = ?')
+            params.append(int(date[:10].replace('-', '')))
         if active_only:
-            query += ' AND is_active = 1'
-        elif not include_inactive:
-            query += ' AND is_active = 1'
-        
-        query += ' ORDER BY start_time ASC'
-        
+            conditions.append('is_active = 1')
+        if schedule_type is not None:
+            conditions.append('schedule_type = ?')
+            params.append(schedule_type.value)
+        if involves_user is not None:
+            conditions.append('involves_user = ?')
+            params.append(1 if involves_user else 0)
+        if recurrence_pattern is not None:
+            conditions.append('recurrence_pattern = ?')
+            params.append(recurrence_pattern)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
         with self.db.get_connection() as conn:
-            cursor = conn.execute(query, params)
-            
-            schedules = []
-            for row in cursor.fetchall():
-                data = {
-                    'schedule_id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'schedule_type': row[3],
-                    'priority': row[4],
-                    'start_time': row[5],
-                    'end_time': row[6],
-                    'created_at': row[7],
-                    'is_active': row[9] == 1,
-                    'collaboration_status': row[10],
-                    'is_queryable': row[11] == 1,
-                    'metadata': json.loads(row[12]) if row[12] else {}
-                }
-                schedules.append(Schedule.from_dict(data))
-        
-        return schedules
+            cursor = conn.execute(f'SELECT * FROM schedules {where} ORDER BY start_epoch ASC', params)
+            return [self._row_to_schedule(row) for row in cursor.fetchall()]
 
     def get_pending_collaboration_schedules(self) -> List[Schedule]:
         """
@@ -618,8 +786,6 @@ class ScheduleManager:
         Returns:
             待确认的日程列表
         """
-        import json
-        
         with self.db.get_connection() as conn:
             cursor = conn.execute('''
                 SELECT * FROM schedules 
@@ -628,25 +794,7 @@ class ScheduleManager:
                 ORDER BY created_at ASC
             ''', (CollaborationStatus.PENDING.value,))
             
-            schedules = []
-            for row in cursor.fetchall():
-                data = {
-                    'schedule_id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'schedule_type': row[3],
-                    'priority': row[4],
-                    'start_time': row[5],
-                    'end_time': row[6],
-                    'created_at': row[7],
-                    'is_active': row[9] == 1,
-                    'collaboration_status': row[10],
-                    'is_queryable': row[11] == 1,
-                    'metadata': json.loads(row[12]) if row[12] else {}
-                }
-                schedules.append(Schedule.from_dict(data))
-        
-        return schedules
+            return [self._row_to_schedule(row) for row in cursor.fetchall()]
 
     def confirm_collaboration(self, schedule_id: str, confirmed: bool) -> bool:
         """
@@ -676,6 +824,7 @@ class ScheduleManager:
                     datetime.now().isoformat(),
                     schedule_id
                 ))
+            self._schedule_written(schedule_id)
             
             debug_logger.log_info('ScheduleManager', '协作日程状态更新', {
                 'schedule_id': schedule_id,
@@ -719,18 +868,30 @@ class ScheduleManager:
                 debug_logger.log_info('ScheduleManager', '没有有效的字段可更新')
                 return False
 
-            set_clause = ", ".join([f"{k} = ?" for k in safe_kwargs.keys()])
-            set_clause += ", updated_at = ?"
-            values = list(safe_kwargs.values()) + [datetime.now().isoformat(), schedule_id]
-
             with self.db.get_connection() as conn:
+                # 时间变化时同步更新可索引的时间列
+                if 'start_time' in safe_kwargs or 'end_time' in safe_kwargs:
+                    current = conn.execute('SELECT start_time, end_time FROM schedules WHERE schedule_id = ?',
+                                           (schedule_id,)).fetchone()
+                    if current is None:
+                        return False
+                    safe_kwargs.update(self._time_columns(safe_kwargs.get('start_time', current[0]),
+                                                          safe_kwargs.get('end_time', current[1])))
+
+                set_clause = ", ".join([f"{k} = ?" for k in safe_kwargs.keys()])
+                set_clause += ", updated_at = ?"
+                values = list(safe_kwargs.values()) + [datetime.now().isoformat(), schedule_id]
+
                 cursor = conn.cursor()
                 cursor.execute(f'''
                     UPDATE schedules 
                     SET {set_clause}
                     WHERE schedule_id = ?
                 ''', values)
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+            if updated:
+                self._schedule_written(schedule_id)
+            return updated
         except Exception as e:
             debug_logger.log_error('ScheduleManager', f'更新日程时出错: {str(e)}', e)
             return False
@@ -740,18 +901,23 @@ class ScheduleManager:
         删除日程（软删除，设置为非激活状态）
 
         Args:
-            schedule_id: 日程ID
+            schedule_id: 日程ID（周期日程的重复实例不是数据库记录，无法单独删除）
 
         Returns:
-            是否删除成功
+            是否删除成功（没有对应的日程时返回False）
         """
         try:
             with self.db.get_connection() as conn:
-                conn.execute('''
+                cursor = conn.execute('''
                     UPDATE schedules 
                     SET is_active = 0, updated_at = ?
                     WHERE schedule_id = ?
                 ''', (datetime.now().isoformat(), schedule_id))
+                deleted = cursor.rowcount > 0
+            if not deleted:
+                debug_logger.log_info('ScheduleManager', '没有可删除的日程', {'schedule_id': schedule_id})
+                return False
+            self._schedule_written(schedule_id)
 
             debug_logger.log_info('ScheduleManager', '日程删除成功', {
                 'schedule_id': schedule_id
@@ -778,24 +944,18 @@ class ScheduleManager:
         Returns:
             空闲时间段列表 [(start_time, end_time), ...]
         """
-        # 获取当天的所有日程
+        # 获取当天的所有日程（索引条目中的时间已解析，按开始时间排序）
         start_of_day = f"{date}T00:00:00"
         end_of_day = f"{date}T23:59:59"
+        current_time = datetime.fromisoformat(start_of_day)
+        end_time = datetime.fromisoformat(end_of_day)
         
-        schedules = self.get_schedules_by_time_range(start_of_day, end_of_day)
-        
-        # 按开始时间排序
-        schedules.sort(key=lambda s: s.start_time)
+        entries = self.index.query(current_time, end_time, queryable_only=True)
         
         # 计算空闲时间段
         free_slots = []
-        current_time = datetime.fromisoformat(start_of_day)
-        end_time = datetime.fromisoformat(end_of_day)
         
-        for schedule in schedules:
-            schedule_start = datetime.fromisoformat(schedule.start_time)
-            schedule_end = datetime.fromisoformat(schedule.end_time)
-            
+        for schedule_start, schedule_end, _ in entries:
             # 如果当前时间到日程开始时间之间有足够的空隙
             if (schedule_start - current_time).total_seconds() / 60 >= slot_duration_minutes:
                 free_slots.append((
@@ -0,0 +1,374 @@
+"""
+日程提醒模块
+用分层时间轮维护即将开始的日程的提醒时间：每个刻度只处理当前槽位，均摊 O(1)；
+提醒条目从日程区间索引中按时间窗口载入，日程写入时增量更新，不轮询数据库，
+到期时通过事件管理器生成通知型事件
+"""
+
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, Hashable, Tuple
+
+from src.core.event_manager import EventManager, Event, EventType, EventPriority
+from src.tools.debug_logger import get_debug_logger
+
+# 获取debug日志记录器
+debug_logger = get_debug_logger()
+
+
+class TimerWheel:
+    """
+    分层时间轮
+    第 L 层每个槽位跨 2^(bits*L) 个刻度；定时器按剩余刻度数放入能容纳它的最低层，
+    当低层转完一圈时把高层对应槽位中的定时器重新分配到低层（级联），超出最高层范围的定时器放在溢出表中
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slot_bits: int = 6, levels: int = 4, now: float = None):
+        """
+        初始化时间轮
+
+        Args:
+            tick_seconds: 每个刻度的秒数
+            slot_bits: 每层槽位数的二进制位数（槽位数为 2^slot_bits）
+            levels: 层数
+            now: 当前时间戳（默认当前时间）
+        """
+        self.tick_seconds = tick_seconds
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._levels = levels
+        self._wheels: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, Tuple[int, Any]] = {}
+        self._locations: Dict[Hashable, Optional[Tuple[int, int]]] = {}  # 键 -> (层, 槽位)，溢出表为None
+        self._current = int((time.time() if now is None else now) // tick_seconds)  # 最后处理过的刻度
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+
+    @property
+    def current_time(self) -> float:
+        """最后处理过的刻度对应的时间戳"""
+        return self._current * self.tick_seconds
+
+    def _place(self, key: Hashable, expiry: int, payload: Any):
+        """按到期刻度放入对应层的槽位（以下一个待处理刻度为基准）"""
+        delta = expiry - (self._current + 1)
+        for level in range(self._levels):
+            if delta < 1 << (self._bits * (level + 1)):
+                slot = (expiry >> (self._bits * level)) & self._mask
+                self._wheels[level][slot][key] = (expiry, payload)
+                self._locations[key] = (level, slot)
+                return
+        self._overflow[key] = (expiry, payload)
+        self._locations[key] = None
+
+    def schedule(self, key: Hashable, when: float, payload: Any = None):
+        """
+        添加定时器（相同键的定时器会被替换）
+
+        Args:
+            key: 定时器键
+            when: 到期时间戳（已过期的在下一个刻度触发）
+            payload: 到期时返回的数据
+        """
+        self.cancel(key)
+        expiry = max(math.ceil(when / self.tick_seconds), self._current + 1)
+        self._place(key, expiry, payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        取消定时器
+
+        Args:
+            key: 定时器键
+
+        Returns:
+            是否存在该定时器
+        """
+        if key not in self._locations:
+            return False
+        location = self._locations.pop(key)
+        if location is None:
+            del self._overflow[key]
+        else:
+            del self._wheels[location[0]][location[1]][key]
+        return True
+
+    def _cascade(self, tick: int):
+        """处理刻度前，把高层中本轮到期的定时器重新分配到低层"""
+        if tick & ((1 << (self._bits * self._levels)) - 1) == 0 and self._overflow:
+            overflow, self._overflow = self._overflow, {}
+            for key, (expiry, payload) in overflow.items():
+                self._place(key, expiry, payload)
+
+        for level in range(self._levels - 1, 0, -1):
+            if tick & ((1 << (self._bits * level)) - 1):
+                continue
+            slot = (tick >> (self._bits * level)) & self._mask
+            timers, self._wheels[level][slot] = self._wheels[level][slot], {}
+            for key, (expiry, payload) in timers.items():
+                self._place(key, expiry, payload)
+
+    def advance(self, now: float = None) -> List[Tuple[Hashable, Any]]:
+        """
+        推进到当前时间，返回期间到期的定时器
+
+        Args:
+            now: 当前时间戳（默认当前时间）
+
+        Returns:
+            (键, 数据) 列表，按到期顺序
+        """
+        target = int((time.time() if now is None else now) // self.tick_seconds)
+        fired = []
+        while self._current < target:
+            if not self._locations:
+                self._current = target
+                break
+            tick = self._current + 1
+            self._cascade(tick)
+            self._current = tick
+            due, self._wheels[0][tick & self._mask] = self._wheels[0][tick & self._mask], {}
+            for key, (_, payload) in due.items():
+                del self._locations[key]
+                fired.append((key, payload))
+        return fired
+
+
+def _parse_lead_minutes(value: str) -> List[int]:
+    """解析提前提醒的分钟数列表（如 "15,0"）"""
+    leads = set()
+    for item in (value or '').split(','):
+        item = item.strip()
+        if item.isdigit():
+            leads.add(int(item))
+    return sorted(leads, reverse=True) or [0]
+
+
+def _parse_types(value: str) -> List[str]:
+    """解析日程类型列表（如 "temporary,recurring"）"""
+    return [item.strip().lower() for item in (value or '').split(',') if item.strip()]
+
+
+class ScheduleReminderEngine:
+    """
+    日程提醒引擎
+    在 [当前时间, 窗口末尾) 内为每个可查询日程（含周期日程的重复实例）的每个提前量放置一个定时器，
+    窗口过半时从内存索引向后扩展；日程写入时只更新该日程的定时器，
+    其他途径的写入通过数据表变更计数发现后整体重新载入窗口
+    """
+
+    TABLE = 'schedules'
+
+    def __init__(
+        self,
+        schedule_manager,
+        event_manager: EventManager,
+        lead_minutes: List[int] = None,
+        horizon_hours: float = None,
+        tick_seconds: float = None,
+        on_event: Callable[[Event], None] = None,
+        skip_types: List[str] = None
+    ):
+        """
+        初始化日程提醒引擎
+
+        Args:
+            schedule_manager: 日程管理器
+            event_manager: 事件管理器（用于生成通知型事件）
+            lead_minutes: 提前提醒的分钟数列表（0表示开始时提醒）
+            horizon_hours: 时间轮中保持的提醒窗口长度（小时）
+            tick_seconds: 时间轮刻度（秒）
+            on_event: 生成提醒事件后的回调（如提交给事件执行引擎）
+            skip_types: 不提醒的日程类型（默认跳过LLM自动生成的临时日程）
+        """
+        self.schedule_manager = schedule_manager
+        self.event_manager = event_manager
+        self.lead_minutes = lead_minutes if lead_minutes is not None else \
+            _parse_lead_minutes(os.getenv('SCHEDULE_REMINDER_LEAD_MINUTES', '15,0'))
+        self.horizon = timedelta(hours=horizon_hours if horizon_hours is not None else
+                                 float(os.getenv('SCHEDULE_REMINDER_HORIZON_HOURS', '24')))
+        self.tick_seconds = tick_seconds if tick_seconds is not None else \
+            float(os.getenv('SCHEDULE_REMINDER_TICK_SECONDS', '1'))
+        self.on_event = on_event
+        self.skip_types = set(skip_types if skip_types is not None else
+                              _parse_types(os.getenv('SCHEDULE_REMINDER_SKIP_TYPES', 'temporary')))
+
+        self._lock = threading.RLock()
+        self.wheel: Optional[TimerWheel] = None
+        self._keys_by_schedule: Dict[str, set] = {}  # 日程ID（周期实例归入原日程）-> 定时器键
+        self._horizon_end: Optional[datetime] = None
+        self._version: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'reminders_sent': 0, 'reloads': 0}
+
+        schedule_manager.add_change_listener(self.on_schedule_changed)
+
+    # ==================== 定时器维护 ====================
+
+    @staticmethod
+    def _base_id(schedule_id: str) -> str:
+        """周期日程实例ID（原ID@日期）对应的原日程ID"""
+        return schedule_id.split('@', 1)[0]
+
+    def _add_entries(self, window_start: datetime, window_end: datetime, only_base_id: str = None):
+        """将提醒时间落在 [window_start, window_end) 内的日程放入时间轮"""
+        max_lead = timedelta(minutes=max(self.lead_minutes))
+        entries = self.schedule_manager.index.query(window_start, window_end + max_lead, queryable_only=True)
+        for start, _, schedule in entries:
+            base_id = self._base_id(schedule.schedule_id)
+            if only_base_id is not None and base_id != only_base_id:
+                continue
+            if schedule.schedule_type.value in self.skip_types:
+                continue
+            for lead in self.lead_minutes:
+                fire_at = start - timedelta(minutes=lead)
+                if window_start <= fire_at < window_end:
+                    key = (schedule.schedule_id, lead)
+                    self.wheel.schedule(key, fire_at.timestamp(), (schedule, start, lead))
+                    self._keys_by_schedule.setdefault(base_id, set()).add(key)
+
+    def _reload(self, now: datetime):
+        """重新载入整个提醒窗口"""
+        self.wheel = TimerWheel(self.tick_seconds, now=now.timestamp())
+        self._keys_by_schedule = {}
+        self._version = self.schedule_manager.db.get_table_version(self.TABLE)
+        self._horizon_end = now + self.horizon
+        self._add_entries(now, self._horizon_end)
+        self._stats['reloads'] += 1
+        debug_logger.log_info('ScheduleReminderEngine', '提醒窗口已载入', {
+            'timers': len(self.wheel),
+            'horizon_end': self._horizon_end.isoformat()
+        })
+
+    def on_schedule_changed(self, schedule_id: str):
+        """
+        日程管理器写入日程后的回调：只重建该日程的定时器
+
+        Args:
+            schedule_id: 被写入的日程ID
+        """
+        with self._lock:
+            if self.wheel is None:
+                return
+            version = self.schedule_manager.db.get_table_version(self.TABLE)
+            if version != self._version + 1:
+                # 期间还有其他写入，下个刻度整体重新载入
+                return
+            for key in self._keys_by_schedule.pop(schedule_id, ()):
+                self.wheel.cancel(key)
+            # 只放入尚未处理过的时间点之后的提醒
+            processed_until = datetime.fromtimestamp(self.wheel.current_time) + timedelta(microseconds=1)
+            self._add_entries(processed_until, self._horizon_end, only_base_id=schedule_id)
+            self._version = version
+
+    # ==================== 刻度 ====================
+
+    def tick(self, now: datetime = None) -> List[Event]:
+        """
+        推进时间轮，为到期的提醒生成通知型事件
+
+        Args:
+            now: 当前时间（默认当前时间）
+
+        Returns:
+            生成的事件列表
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if self.wheel is None or self.schedule_manager.db.get_table_version(self.TABLE) != self._version:
+                self._reload(now)
+            elif now >= self._horizon_end - self.horizon / 2:
+                # 窗口过半，向后扩展
+                new_end = now + self.horizon
+                self._add_entries(self._horizon_end, new_end)
+                self._horizon_end = new_end
+
+            fired = self.wheel.advance(now.timestamp())
+            for key, _ in fired:
+                keys = self._keys_by_schedule.get(self._base_id(key[0]))
+                if keys is not None:
+                    keys.discard(key)
+
+        events = []
+        for _, (schedule, start, lead) in fired:
+            try:
+                events.append(self._emit(schedule, start, lead))
+            except Exception as e:
+                debug_logger.log_error('ScheduleReminderEngine', f'生成提醒事件失败: {schedule.title}', e)
+        return events
+
+    def _emit(self, schedule, start: datetime, lead: int) -> Event:
+        """生成提醒通知事件"""
+        when = f"{lead}分钟后" if lead else "现在"
+        description = f"日程「{schedule.title}」{when}开始（{start.strftime('%m-%d %H:%M')}）"
+        if schedule.description:
+            description += f"\n{schedule.description}"
+        priority = EventPriority.HIGH if schedule.priority.value >= EventPriority.HIGH.value else EventPriority.MEDIUM
+
+        event = self.event_manager.create_event(
+            title=f"日程提醒：{schedule.title}",
+            description=description,
+            event_type=EventType.NOTIFICATION,
+            priority=priority
+        )
+        with self._lock:
+            self._stats['reminders_sent'] += 1
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+
+    # ==================== 后台线程 ====================
+
+    def start(self):
+        """启动后台刻度线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ScheduleReminderEngine', daemon=True)
+        self._thread.start()
+        debug_logger.log_module('ScheduleReminderEngine', '日程提醒引擎已启动', {
+            'lead_minutes': self.lead_minutes
+        })
+
+    def stop(self, timeout: float = None):
+        """
+        停止后台刻度线程
+
+        Args:
+            timeout: 等待线程结束的最长时间（秒）
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """后台循环：每个刻度推进一次时间轮"""
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                debug_logger.log_error('ScheduleReminderEngine', f'提醒刻度处理异常: {str(e)}', e)
+            self._stop_event.wait(self.tick_seconds)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取提醒引擎统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return dict(self._stats,
+                        pending_timers=len(self.wheel) if self.wheel is not None else 0,
+                        horizon_end=self._horizon_end.isoformat() if self._horizon_end else None)
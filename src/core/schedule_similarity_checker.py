@@ -4,6 +4,7 @@
 """
 
 import os
+import re
 import json
 import time
 from typing import List, Dict, Any, Optional, Tuple
@@ -17,6 +18,7 @@ except ImportError:
     pass
 
 import requests
+from src.core.text_fingerprint import shingles
 from src.tools.debug_logger import get_debug_logger
 
 # 获取debug日志记录器
@@ -26,7 +28,7 @@ debug_logger = get_debug_logger()
 class ScheduleSimilarityChecker:
     """
     日程相似度检查工具
-    使用LLM判断两个日程是否相似，以及应该保留哪一个
+    先用本地的文本重合度和时间重叠度排除明显无关的日程，剩余候选按批交给LLM判断
     """
 
     def __init__(self):
@@ -36,9 +38,62 @@ class ScheduleSimilarityChecker:
         self.model_name = os.getenv('MODEL_NAME', 'Qwen/Qwen2.5-7B-Instruct')
         self.temperature = 0.3  # 使用较低的温度以获得更确定的输出
         self.max_tokens = 800
+        # 每次LLM调用最多判断的候选数量，回复长度上限随候选数量增加
+        self.batch_size = max(1, int(os.getenv('SCHEDULE_SIMILARITY_BATCH_SIZE', '5')))
+        self.tokens_per_candidate = 200
+        # 本地预过滤阈值：文本重合度或时间重叠度达到任一阈值的日程才交给LLM判断
+        self.text_threshold = float(os.getenv('SCHEDULE_SIMILARITY_TEXT_THRESHOLD', '0.3'))
+        self.overlap_threshold = float(os.getenv('SCHEDULE_SIMILARITY_OVERLAP_THRESHOLD', '0.5'))
 
         debug_logger.log_module('ScheduleSimilarityChecker', '日程相似度检查工具初始化完成')
 
+    @staticmethod
+    def _text_similarity(schedule1: Dict[str, Any], schedule2: Dict[str, Any]) -> float:
+        """标题和描述的特征重合度（重叠系数，短文本被长文本包含时接近1）"""
+        features1 = shingles(f"{schedule1.get('title', '')}{schedule1.get('description', '')}")
+        features2 = shingles(f"{schedule2.get('title', '')}{schedule2.get('description', '')}")
+        if not features1 or not features2:
+            return 0.0
+        return len(features1 & features2) / min(len(features1), len(features2))
+
+    @staticmethod
+    def _time_overlap(schedule1: Dict[str, Any], schedule2: Dict[str, Any]) -> float:
+        """两个日程时间段的交并比（无法解析时为0）"""
+        try:
+            start1 = datetime.fromisoformat(schedule1['start_time'])
+            end1 = datetime.fromisoformat(schedule1['end_time'])
+            start2 = datetime.fromisoformat(schedule2['start_time'])
+            end2 = datetime.fromisoformat(schedule2['end_time'])
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+        intersection = (min(end1, end2) - max(start1, start2)).total_seconds()
+        union = (max(end1, end2) - min(start1, start2)).total_seconds()
+        return max(intersection, 0.0) / union if union > 0 else 0.0
+
+    def prefilter_candidates(
+        self,
+        new_schedule: Dict[str, Any],
+        existing_schedules: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        本地预过滤：排除文本和时间都明显无关的日程
+
+        Args:
+            new_schedule: 新日程信息字典
+            existing_schedules: 当天已有的日程列表
+
+        Returns:
+            候选日程列表（按文本重合度降序）
+        """
+        scored = []
+        for existing in existing_schedules:
+            text_score = self._text_similarity(new_schedule, existing)
+            overlap = self._time_overlap(new_schedule, existing)
+            if text_score >= self.text_threshold or overlap >= self.overlap_threshold:
+                scored.append((text_score, overlap, existing))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [existing for _, _, existing in scored]
+
     def check_similar_schedules(
         self,
         new_schedule: Dict[str, Any],
@@ -52,25 +107,30 @@ class ScheduleSimilarityChecker:
             existing_schedules: 当天已有的日程列表
             
         Returns:
-            (是否有相似日程, 应保留的日程ID, LLM判断结果)
+            (是否有相似日程, 应删除的已有日程ID（保留新日程时）, LLM判断结果)
         """
         if not existing_schedules:
             debug_logger.log_info('ScheduleSimilarityChecker', '当天没有其他日程，无需检查相似度')
             return False, None, None
-        
+
+        candidates = self.prefilter_candidates(new_schedule, existing_schedules)
         debug_logger.log_module('ScheduleSimilarityChecker', '开始检查日程相似度', {
             'new_schedule': new_schedule.get('title'),
-            'existing_count': len(existing_schedules)
+            'existing_count': len(existing_schedules),
+            'candidate_count': len(candidates)
         })
-        
-        # 逐一检查每个已有日程
-        for existing in existing_schedules:
-            result = self._compare_two_schedules(new_schedule, existing)
-            
-            if result and result.get('is_similar'):
-                # 发现相似日程
+        if not candidates:
+            debug_logger.log_info('ScheduleSimilarityChecker', '预过滤后没有候选日程，无需调用LLM')
+            return False, None, None
+
+        # 每批候选一次LLM调用，按候选顺序（文本重合度从高到低）采用第一个相似的结论
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start:start + self.batch_size]
+            for existing, result in zip(batch, self._compare_batch(new_schedule, batch)):
+                if not result or not result.get('is_similar'):
+                    continue
                 schedule_to_keep = result.get('keep_schedule')
-                
+
                 if schedule_to_keep == 'new':
                     # 保留新日程，删除旧日程
                     debug_logger.log_info('ScheduleSimilarityChecker', 
@@ -86,22 +146,22 @@ class ScheduleSimilarityChecker:
         debug_logger.log_info('ScheduleSimilarityChecker', '未发现相似日程')
         return False, None, None
 
-    def _compare_two_schedules(
+    def _compare_batch(
         self,
-        schedule1: Dict[str, Any],
-        schedule2: Dict[str, Any]
-    ) -> Optional[Dict[str, Any]]:
+        new_schedule: Dict[str, Any],
+        candidates: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
         """
-        使用LLM比较两个日程是否相似
+        使用一次LLM调用比较新日程与多个候选日程，批量结果无法解析或缺少部分候选时逐个重新判断这些候选
         
         Args:
-            schedule1: 第一个日程（新日程）
-            schedule2: 第二个日程（已有日程）
+            new_schedule: 新日程
+            candidates: 候选的已有日程
             
         Returns:
-            LLM判断结果字典，包含is_similar和keep_schedule字段
+            与候选一一对应的判断结果（包含is_similar、keep_schedule、reason），缺失时为None
         """
-        system_prompt = """你是一个日程管理专家。你需要判断两个日程是否相似，以及应该保留哪一个。
+        system_prompt = """你是一个日程管理专家。你需要逐一判断新日程与每个已有日程是否相似，以及应该保留哪一个。
 
 判断标准：
 1. 如果两个日程的主题、活动内容基本一致，视为相似日程
@@ -114,27 +174,80 @@ class ScheduleSimilarityChecker:
 - 比较时间信息的明确程度
 - 比较其他元数据的丰富程度
 
-请返回JSON格式的判断结果：
+请返回JSON格式的判断结果，每个已有日程对应一项：
 {
-    "is_similar": true/false,  // 是否相似
-    "reason": "判断理由",  // 详细说明判断的理由
-    "keep_schedule": "new"/"existing"/"none"  // 应保留哪个（new=新日程, existing=已有日程, none=不相似无需选择）
+    "results": [
+        {
+            "index": 1,  // 已有日程的编号
+            "is_similar": true/false,  // 是否相似
+            "reason": "判断理由",  // 详细说明判断的理由
+            "keep_schedule": "new"/"existing"/"none"  // 应保留哪个（new=新日程, existing=已有日程, none=不相似无需选择）
+        }
+    ]
 }"""
 
         # 格式化日程信息
-        schedule1_info = self._format_schedule_for_llm(schedule1, "新日程")
-        schedule2_info = self._format_schedule_for_llm(schedule2, "已有日程")
+        existing_info = '\n\n'.join(
+            self._format_schedule_for_llm(candidate, f"已有日程{index}")
+            for index, candidate in enumerate(candidates, 1)
+        )
+        user_prompt = f"""请判断新日程与以下每个已有日程是否相似，如果相似，应该保留哪一个：
+
+{self._format_schedule_for_llm(new_schedule, "新日程")}
 
-        user_prompt = f"""请判断以下两个日程是否相似，如果相似，应该保留哪一个：
+{existing_info}
 
-{schedule1_info}
+请逐一分析，并返回JSON格式的判断结果。"""
 
-{schedule2_info}
+        max_tokens = max(self.max_tokens, self.tokens_per_candidate * len(candidates))
+        parsed_result = self._call_llm(system_prompt, user_prompt, max_tokens=max_tokens)
+        verdicts: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
 
-请分析这两个日程，并返回JSON格式的判断结果。"""
+        items = []
+        if parsed_result:
+            # 兼容只有一个候选时直接返回单个判断结果
+            items = parsed_result.get('results', [parsed_result] if 'is_similar' in parsed_result else [])
+            if not isinstance(items, list):
+                items = []
+        for position, item in enumerate(items):
+            if not isinstance(item, dict) or 'is_similar' not in item or 'keep_schedule' not in item:
+                continue
+            try:
+                index = int(item.get('index', position + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(candidates):
+                verdicts[index] = item
 
+        missing = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        if len(candidates) > 1 and missing:
+            # 批量回复被截断或格式不正确：逐个候选重新判断
+            debug_logger.log_info('ScheduleSimilarityChecker', '批量判断结果不完整，逐个重新判断', {
+                'candidates': len(candidates),
+                'missing': len(missing)
+            })
+            for index in missing:
+                verdicts[index] = self._compare_batch(new_schedule, [candidates[index]])[0]
+
+        debug_logger.log_info('ScheduleSimilarityChecker', 'LLM批量判断结果', {
+            'candidates': len(candidates),
+            'similar': sum(1 for verdict in verdicts if verdict and verdict.get('is_similar'))
+        })
+        return verdicts
+
+    def _call_llm(self, system_prompt: str, user_prompt: str, max_tokens: int = None) -> Optional[Dict[str, Any]]:
+        """
+        调用LLM并解析JSON响应
+        
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            max_tokens: 回复长度上限（默认 self.max_tokens）
+            
+        Returns:
+            解析后的JSON字典，失败时返回None
+        """
         try:
-            # 调用LLM进行相似度判断
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -149,7 +262,7 @@ class ScheduleSimilarityChecker:
                 'model': self.model_name,
                 'messages': messages,
                 'temperature': self.temperature,
-                'max_tokens': self.max_tokens,
+                'max_tokens': max_tokens or self.max_tokens,
                 'stream': False
             }
 
@@ -173,21 +286,15 @@ class ScheduleSimilarityChecker:
                 # 尝试解析JSON结果
                 try:
                     # 提取JSON部分（可能被包裹在markdown代码块中）
-                    import re
                     json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
                     if json_match:
                         content = json_match.group(1)
                     
                     parsed_result = json.loads(content)
-                    
-                    # 验证结果格式
-                    if 'is_similar' in parsed_result and 'keep_schedule' in parsed_result:
-                        debug_logger.log_info('ScheduleSimilarityChecker', 
-                            f"LLM判断结果：相似={parsed_result['is_similar']}, 保留={parsed_result.get('keep_schedule')}")
+                    if isinstance(parsed_result, dict):
                         return parsed_result
-                    else:
-                        debug_logger.log_error('ScheduleSimilarityChecker', 'LLM返回结果格式不正确')
-                        return None
+                    debug_logger.log_error('ScheduleSimilarityChecker', 'LLM返回结果格式不正确')
+                    return None
                         
                 except json.JSONDecodeError as e:
                     debug_logger.log_error('ScheduleSimilarityChecker', f'解析LLM响应JSON失败: {str(e)}')
@@ -0,0 +1,174 @@
+"""
+文本指纹模块
+为知识条目生成局部敏感的MinHash指纹，用于识别近似重复的知识
+（如"喜欢猫"与"很喜欢猫咪"），使不同提取批次中的同义表述能够合并计数
+"""
+
+import re
+import hashlib
+import random
+from difflib import SequenceMatcher
+from typing import Optional, Set
+
+# MinHash排列数量与每个槽位保留的位数（b-bit MinHash）
+NUM_PERMUTATIONS = 64
+SLOT_BITS = 16
+_SLOT_HEX_WIDTH = SLOT_BITS // 4
+_SLOT_MASK = (1 << SLOT_BITS) - 1
+
+# 判定为近似重复的最低相似度（估计的Jaccard系数）
+NEAR_DUPLICATE_THRESHOLD = 0.6
+# 长文本中增删了实词时，较短一方的长度至少达到较长一方的该比例才可能视为重复
+LENGTH_RATIO_THRESHOLD = 0.85
+# 归一化后少于该字数的短文本：一方须完整包含另一方，并按精确的Jaccard系数使用更高的阈值
+SHORT_TEXT_LENGTH = 10
+SHORT_TEXT_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# 固定随机种子，保证指纹在不同进程和版本间稳定可比
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# 不影响语义的程度副词、语气词（归一化时移除）；单字只移除几乎不出现在实词中的"很"和"的"，
+# 句末语气词只在句子或分句末尾移除（"地铁"、"太阳"、"酒吧"中的字保留）
+_FILLER_WORDS = ('非常', '特别', '十分', '比较', '有点', '有些', '真的', '一直', '超级')
+_FILLER_CHARS = re.compile(r'[很的]')
+_TRAILING_PARTICLES = re.compile(r'[啊呀呢哦嘛啦]+(?=[\s\W_]|$)')
+_NON_WORD = re.compile(r'[\s\W_]+')
+# 否定词与数字（含中文数字）会改变事实本身，不同时不能视为重复
+_NEGATION_CHARS = re.compile(r'[不没别未非无莫勿]')
+_DIGITS = re.compile(r'\d+|[零〇一二两三四五六七八九十百千万亿]+')
+# 增删后不改变事实的字：语气词、"猫咪"/"猫儿"的后缀、"北京市"的行政区划后缀
+_TOLERATED_INSERTIONS = set('啊呀呢哦嘛啦吧了咪儿市省县')
+
+
+def normalize_text(text: str) -> str:
+    """
+    归一化文本：小写、去除句末语气词、空白和标点、去除程度副词
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        归一化后的文本
+    """
+    text = _TRAILING_PARTICLES.sub('', (text or '').lower())
+    text = _NON_WORD.sub('', text)
+    for word in _FILLER_WORDS:
+        text = text.replace(word, '')
+    return _FILLER_CHARS.sub('', text)
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    生成文本的特征集合（单字 + 相邻双字）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        特征集合
+    """
+    normalized = normalize_text(text)
+    features = set(normalized)
+    features.update(normalized[i:i + 2] for i in range(len(normalized) - 1))
+    return features
+
+
+def _stable_hash(feature: str) -> int:
+    """跨进程稳定的64位哈希（内置hash()受PYTHONHASHSEED影响）"""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def compute_fingerprint(text: str) -> str:
+    """
+    计算文本的MinHash指纹
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        十六进制指纹字符串（NUM_PERMUTATIONS个槽位，每个SLOT_BITS位）
+    """
+    hashes = [_stable_hash(feature) for feature in shingles(text)] or [0]
+    slots = []
+    for a, b in _PERMUTATIONS:
+        slots.append(min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _SLOT_MASK)
+    return ''.join(f"{slot:0{_SLOT_HEX_WIDTH}x}" for slot in slots)
+
+
+def fingerprint_similarity(fingerprint_a: Optional[str], fingerprint_b: Optional[str]) -> float:
+    """
+    根据两个指纹估计Jaccard相似度
+
+    Args:
+        fingerprint_a: 指纹A
+        fingerprint_b: 指纹B
+
+    Returns:
+        相似度（0.0-1.0），指纹缺失或格式不一致时返回0.0
+    """
+    if not fingerprint_a or not fingerprint_b or len(fingerprint_a) != len(fingerprint_b):
+        return 0.0
+    width = _SLOT_HEX_WIDTH
+    matches = sum(
+        1 for i in range(0, len(fingerprint_a), width)
+        if fingerprint_a[i:i + width] == fingerprint_b[i:i + width]
+    )
+    return matches / (len(fingerprint_a) // width)
+
+
+def is_near_duplicate(text_a: str, text_b: str,
+                      fingerprint_a: Optional[str] = None,
+                      fingerprint_b: Optional[str] = None,
+                      threshold: float = NEAR_DUPLICATE_THRESHOLD) -> bool:
+    """
+    判断两段文本是否为近似重复
+
+    否定词或数字不一致的文本（"喜欢猫"/"不喜欢猫"、"3月5日"/"五月三日"）永远不视为重复；
+    两段文本只允许相差增删的字，对齐后有任何一处被替换的内容（"妹妹叫小红"/"妹妹叫小明"、
+    "颜色是红色"/"颜色是蓝色"）都视为不同的事实。增删的字只能是语气词和后缀（"喜欢猫"/"喜欢猫咪"）；
+    长文本在长度接近时还允许增删少量实词，"喜欢猫"/"喜欢猫狗"、"在上海工作"/"在上海工作过"、
+    "颜色是红色"/"颜色是红色和蓝色"都视为不同的事实。短文本还要求一方完整包含另一方，
+    并按精确的Jaccard系数使用更高的阈值。
+
+    Args:
+        text_a: 文本A
+        text_b: 文本B
+        fingerprint_a: 文本A的指纹（为None时现场计算）
+        fingerprint_b: 文本B的指纹（为None时现场计算）
+        threshold: 相似度阈值
+
+    Returns:
+        是否近似重复
+    """
+    norm_a, norm_b = normalize_text(text_a), normalize_text(text_b)
+    if norm_a == norm_b:
+        return True
+    if set(_NEGATION_CHARS.findall(norm_a)) != set(_NEGATION_CHARS.findall(norm_b)):
+        return False
+    if _DIGITS.findall(norm_a) != _DIGITS.findall(norm_b):
+        return False
+    opcodes = SequenceMatcher(None, norm_a, norm_b, autojunk=False).get_opcodes()
+    if any(tag == 'replace' for tag, *_ in opcodes):
+        return False
+    inserted = ''.join(norm_a[i1:i2] + norm_b[j1:j2] for tag, i1, i2, j1, j2 in opcodes if tag != 'equal')
+    if not set(inserted) <= _TOLERATED_INSERTIONS:
+        shorter_length, longer_length = sorted((len(norm_a), len(norm_b)))
+        if longer_length < SHORT_TEXT_LENGTH or shorter_length < longer_length * LENGTH_RATIO_THRESHOLD:
+            return False
+
+    if max(len(norm_a), len(norm_b)) < SHORT_TEXT_LENGTH:
+        shorter, longer = sorted((norm_a, norm_b), key=len)
+        if not shorter or shorter not in longer:
+            return False
+        features_a, features_b = shingles(text_a), shingles(text_b)
+        similarity = len(features_a & features_b) / len(features_a | features_b)
+        return similarity >= max(threshold, SHORT_TEXT_THRESHOLD)
+
+    fingerprint_a = fingerprint_a or compute_fingerprint(text_a)
+    fingerprint_b = fingerprint_b or compute_fingerprint(text_b)
+    return fingerprint_similarity(fingerprint_a, fingerprint_b) >= threshold
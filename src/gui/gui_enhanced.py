@@ -1687,62 +1687,51 @@ class EnhancedChatDebugGUI:
             if not result:
                 return
 
-        # 在新线程中处理事件
-        def process_event_thread():
-            try:
-                self.update_status("处理事件中...", "orange")
-                self.is_processing = True
-
-                # 设置中断性提问的回调 - 使用线程安全的方式
-                def question_callback(question):
-                    # 使用事件和共享变量在主线程安全地显示对话框并获取结果
-                    result_event = threading.Event()
-                    result_holder = {"answer": ""}
-                    
-                    def ask_on_main_thread():
-                        answer = simpledialog.askstring(
-                            "智能体提问",
-                            question,
-                            parent=self.root
-                        )
-                        result_holder["answer"] = answer or ""
-                        result_event.set()
-                    
-                    self.root.after(0, ask_on_main_thread)
-                    result_event.wait()
-                    return result_holder["answer"]
-
-                self.agent.interrupt_question_tool.set_question_callback(question_callback)
-
-                # 处理事件
-                result_message = self.agent.handle_event(event_id)
-
-                # 在聊天区域显示结果
-                self.root.after(0, lambda: self.add_system_message(result_message))
-
-                self.is_processing = False
-                self.update_status("就绪", "green")
-                
-                # 刷新事件列表
-                self.root.after(0, self.refresh_event_list)
-            
-            except Exception as e:
-                # 出错时的处理
-                error_msg = f"处理事件时发生错误：{str(e)}"
+        # 设置中断性提问的回调 - 使用线程安全的方式
+        def question_callback(question):
+            # 使用事件和共享变量在主线程安全地显示对话框并获取结果
+            result_event = threading.Event()
+            result_holder = {"answer": ""}
+
+            def ask_on_main_thread():
+                answer = simpledialog.askstring(
+                    "智能体提问",
+                    question,
+                    parent=self.root
+                )
+                result_holder["answer"] = answer or ""
+                result_event.set()
+
+            self.root.after(0, ask_on_main_thread)
+            result_event.wait()
+            return result_holder["answer"]
+
+        # 事件执行结束后的回调（在事件执行引擎的工作线程中调用）
+        def on_event_done(done_event_id, result_message, error):
+            self.is_processing = False
+            if error is not None:
+                error_msg = f"处理事件时发生错误：{str(error)}"
                 print(error_msg)
-                import traceback
-                traceback.print_exc()
-                
-                self.is_processing = False
                 self.update_status("错误", "red")
-                
                 # 在主线程显示错误消息
                 self.root.after(0, lambda: self.show_error_dialog("处理错误", error_msg))
+            else:
+                # 在聊天区域显示结果
+                self.root.after(0, lambda: self.add_system_message(result_message))
+                self.update_status("就绪", "green")
 
-        import threading
-        thread = threading.Thread(target=process_event_thread)
-        thread.daemon = True
-        thread.start()
+            # 刷新事件列表
+            self.root.after(0, self.refresh_event_list)
+
+        self.agent.interrupt_question_tool.set_question_callback(question_callback)
+
+        # 交给事件执行引擎按优先级排队处理
+        self.update_status("处理事件中...", "orange")
+        self.is_processing = True
+        if not self.agent.event_scheduler.submit(event_id, callback=on_event_done, requeue=True):
+            self.is_processing = False
+            self.update_status("就绪", "green")
+            messagebox.showwarning("警告", "事件正在处理中，请稍后再试！")
 
     def view_event_details(self):
         """查看事件详情"""
@@ -2300,15 +2289,15 @@ class EnhancedChatDebugGUI:
             self._last_kb_count = stats['knowledge_base']['total_knowledge']
 
             # 记录初始情感分析数量
-            emotion_history = self.agent.get_emotion_history()
-            self._last_emotion_count = len(emotion_history)
+            emotion_count = self.agent.get_emotion_count()
+            self._last_emotion_count = emotion_count
 
             # 如果已有情感数据，加载并显示最新的
-            if emotion_history:
+            if emotion_count:
                 latest_emotion = self.agent.get_latest_emotion()
                 if latest_emotion:
                     self.update_emotion_display(latest_emotion)
-                    print(f"✓ 加载已有情感数据: {len(emotion_history)} 条记录")
+                    print(f"✓ 加载已有情感数据: {emotion_count} 条记录")
                     print(f"  最新关系类型: {latest_emotion.get('relationship_type', '未知')}")
                     print(f"  情感基调: {latest_emotion.get('emotional_tone', '未知')}")
                     print(f"  总体评分: {latest_emotion.get('overall_score', 0)}/100")
@@ -2325,9 +2314,9 @@ class EnhancedChatDebugGUI:
             self.add_system_message("系统初始化完成！开始对话吧～")
 
             # 如果有情感数据，显示提示
-            if emotion_history:
+            if emotion_count:
                 self.add_system_message(
-                    f"💖 已加载情感分析数据 ({len(emotion_history)} 条) | "
+                    f"💖 已加载情感分析数据 ({emotion_count} 条) | "
                     f"当前关系：{latest_emotion.get('relationship_type', '未知')}"
                 )
 
@@ -3452,8 +3441,7 @@ class EnhancedChatDebugGUI:
         if short_term_rounds > 0 and short_term_rounds % 10 == 0:
             # 可能刚进行了情感分析，检查是否有新的情感数据
             old_emotion_count = getattr(self, '_last_emotion_count', 0)
-            emotion_history = self.agent.get_emotion_history()
-            new_emotion_count = len(emotion_history)
+            new_emotion_count = self.agent.get_emotion_count()
 
             if new_emotion_count > old_emotion_count:
                 # 有新的情感分析结果，自动刷新显示
@@ -4314,7 +4302,7 @@ class EnhancedChatDebugGUI:
             
             # 如果有当前环境，检查是否可以切换
             if current_env:
-                can_switch = self.agent.db.can_move_to_environment(
+                can_switch = self.agent.vision_tool.env_graph.is_reachable(
                     current_env['uuid'],
                     selected_env['uuid']
                 )
@@ -201,9 +201,9 @@ class ScheduleManagerGUI:
             start_time = datetime.combine(start_date, datetime.min.time()).isoformat()
             end_time = datetime.combine(end_date, datetime.max.time()).isoformat()
             
-            # 获取日程
+            # 获取日程（周期日程只列出原始记录，不列出按需展开的重复实例）
             schedules = self.schedule_manager.get_schedules_by_time_range(
-                start_time, end_time, queryable_only=False, active_only=True
+                start_time, end_time, queryable_only=False, active_only=True, expand_recurring=False
             )
             
             # 根据类型筛选
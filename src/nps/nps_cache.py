@@ -0,0 +1,119 @@
+"""
+NPS 工具结果缓存模块
+按工具和归一化后的调用参数缓存工具结果，有效期由 .NPS 元数据中的 cache_ttl 声明，
+有效期内的重复调用直接返回缓存的结果
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.text_fingerprint import normalize_text
+
+# 作为查询文本参与缓存键的参数（归一化后比较）
+QUERY_FIELDS = ('user_input', 'query')
+# 不影响结果的参数
+IGNORED_FIELDS = ('timeout',)
+
+
+class NPSResultCache:
+    """
+    进程内的 LRU 工具结果缓存
+    每个条目保存过期时间（单调时钟），读取时忽略已过期的条目，超出上限时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        初始化结果缓存
+
+        Args:
+            max_entries: 最多保留的条目数量
+        """
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(tool_id: str, context: Dict[str, Any] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            tool_id: 工具ID
+            context: 执行上下文（查询文本归一化后参与计算，忽略空白、标点和语气词的差异）
+
+        Returns:
+            缓存键
+        """
+        params = {
+            key: normalize_text(value) if key in QUERY_FIELDS and isinstance(value, str) else value
+            for key, value in (context or {}).items()
+            if key not in IGNORED_FIELDS
+        }
+        return json.dumps([tool_id, params], ensure_ascii=False, sort_keys=True, default=str)
+
+    def get(self, key: str, now: float = None) -> Optional[Dict[str, Any]]:
+        """
+        读取未过期的缓存结果
+
+        Args:
+            key: 缓存键
+            now: 当前时间（单调时钟，默认 time.monotonic()）
+
+        Returns:
+            缓存的结果，不存在或已过期时返回None
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
+
+    def put(self, key: str, result: Dict[str, Any], ttl: float, now: float = None):
+        """
+        写入缓存结果
+
+        Args:
+            key: 缓存键
+            result: 工具执行结果
+            ttl: 有效期（秒）
+            now: 当前时间（单调时钟，默认 time.monotonic()）
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries[key] = (now + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            命中、未命中、过期、淘汰次数，命中率和当前条目数
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                hit_rate=round(self._stats['hits'] / lookups, 3) if lookups else 0.0
+            )
@@ -4,12 +4,15 @@ NPS 工具调用模块
 """
 
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import requests
 from src.tools.debug_logger import get_debug_logger
 from src.nps.nps_registry import NPSRegistry, NPSTool
+from src.nps.nps_cache import NPSResultCache
 
 load_dotenv()
 
@@ -55,6 +58,36 @@ class NPSInvoker:
             debug_logger.log_info('NPSInvoker', '无效的NPS_LLM_TIMEOUT，使用默认值10')
             self.llm_timeout = 10
         
+        # 工具执行配置：.NPS 中未声明 timeout 的工具使用默认时限
+        try:
+            self.tool_timeout = float(os.getenv('NPS_TOOL_TIMEOUT', '10'))
+        except ValueError:
+            debug_logger.log_info('NPSInvoker', '无效的NPS_TOOL_TIMEOUT，使用默认值10')
+            self.tool_timeout = 10.0
+        
+        try:
+            self.tool_max_workers = int(os.getenv('NPS_TOOL_MAX_WORKERS', '4'))
+        except ValueError:
+            debug_logger.log_info('NPSInvoker', '无效的NPS_TOOL_MAX_WORKERS，使用默认值4')
+            self.tool_max_workers = 4
+        
+        # 所有调用共用的工具线程池；超时的工具在后台结束，结果被丢弃
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.tool_max_workers),
+                                            thread_name_prefix='nps-tool')
+        
+        # 工具结果缓存：.NPS 中声明了 cache_ttl 的工具在有效期内复用相同参数的结果
+        self.cache_enabled = os.getenv('NPS_TOOL_CACHE_ENABLED', 'true').lower() == 'true'
+        try:
+            cache_max_entries = int(os.getenv('NPS_TOOL_CACHE_MAX_ENTRIES', '256'))
+        except ValueError:
+            debug_logger.log_info('NPSInvoker', '无效的NPS_TOOL_CACHE_MAX_ENTRIES，使用默认值256')
+            cache_max_entries = 256
+        self.result_cache = NPSResultCache(cache_max_entries)
+        
+        # 每个工具的调用、超时、失败和缓存命中次数
+        self._stats_lock = threading.Lock()
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+        
         # 工具注册表
         self.registry = registry or NPSRegistry()
         
@@ -252,34 +285,64 @@ class NPSInvoker:
                 'has_context': False
             }
         
-        # 调用相关工具
+        # 并发调用相关工具，每个工具在各自的时限内等待结果
+        tools = []
+        for tool_id in dict.fromkeys(relevant_tool_ids):
+            tool = self.registry.get_tool(tool_id)
+            if tool and tool.enabled:
+                tools.append(tool)
+        
+        started = time.monotonic()
+        calls = []
+        for tool in tools:
+            timeout = tool.timeout or self.tool_timeout
+            # 工具自身的网络请求也使用同一时限
+            context = {'user_input': user_input, 'timeout': timeout}
+            cached = self._get_cached_result(tool, context)
+            if cached is not None:
+                calls.append((tool, cached, None, None))
+                continue
+            debug_logger.log_info('NPSInvoker', f'调用工具: {tool.name}', {'timeout': timeout})
+            future = self._executor.submit(self._execute_and_store, tool, context)
+            calls.append((tool, None, future, started + timeout))
+        
         tools_results = []
         context_parts = []
         
-        for tool_id in relevant_tool_ids:
-            tool = self.registry.get_tool(tool_id)
-            if tool and tool.enabled:
-                debug_logger.log_info('NPSInvoker', f'调用工具: {tool.name}')
-                
-                # 执行工具
-                result = tool.execute({'user_input': user_input})
-                tools_results.append(result)
-                
-                if result['success'] and result.get('result'):
-                    # 提取工具返回的上下文信息
-                    tool_result = result['result']
-                    if isinstance(tool_result, dict):
-                        context = tool_result.get('context', '')
-                        if context:
-                            context_parts.append(f"[{tool.name}] {context}")
-                    elif isinstance(tool_result, str):
-                        context_parts.append(f"[{tool.name}] {tool_result}")
+        for tool, result, future, deadline in calls:
+            if result is None:
+                try:
+                    result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    debug_logger.log_info('NPSInvoker', f'工具执行超时，结果不进入上下文: {tool.name}')
+                    result = {
+                        'success': False,
+                        'tool_id': tool.tool_id,
+                        'tool_name': tool.name,
+                        'error': '执行超时',
+                        'timed_out': True
+                    }
+            self._record_tool_result(tool.tool_id, result)
+            tools_results.append(result)
+            
+            if result['success'] and result.get('result'):
+                # 提取工具返回的上下文信息
+                tool_result = result['result']
+                if isinstance(tool_result, dict):
+                    tool_context = tool_result.get('context', '')
+                    if tool_context:
+                        context_parts.append(f"[{tool.name}] {tool_context}")
+                elif isinstance(tool_result, str):
+                    context_parts.append(f"[{tool.name}] {tool_result}")
         
         # 合并上下文
         context_info = '\n'.join(context_parts) if context_parts else ''
         
         debug_logger.log_info('NPSInvoker', f'工具调用完成', {
             'invoked_count': len(tools_results),
+            'timed_out': [r['tool_id'] for r in tools_results if r.get('timed_out')],
+            'cached': [r['tool_id'] for r in tools_results if r.get('cached')],
+            'elapsed': round(time.monotonic() - started, 3),
             'context_length': len(context_info)
         })
         
@@ -289,6 +352,75 @@ class NPSInvoker:
             'has_context': bool(context_info)
         }
     
+    def _get_cached_result(self, tool: NPSTool, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        读取工具在有效期内的缓存结果
+
+        Args:
+            tool: 工具实例
+            context: 执行上下文
+
+        Returns:
+            缓存的结果（带 cached 标记），工具未声明 cache_ttl 或未命中时返回None
+        """
+        if not self.cache_enabled or not tool.cache_ttl:
+            return None
+        cached = self.result_cache.get(NPSResultCache.make_key(tool.tool_id, context))
+        if cached is None:
+            return None
+        debug_logger.log_info('NPSInvoker', f'使用缓存的工具结果: {tool.name}')
+        return dict(cached, cached=True)
+    
+    def _execute_and_store(self, tool: NPSTool, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行工具并缓存结果（在线程池中运行，超时后才完成的结果也能供之后的调用复用）
+
+        Args:
+            tool: 工具实例
+            context: 执行上下文
+
+        Returns:
+            工具执行结果
+        """
+        result = tool.execute(context)
+        self._store_result(tool, context, result)
+        return result
+    
+    def _store_result(self, tool: NPSTool, context: Dict[str, Any], result: Dict[str, Any]):
+        """
+        缓存工具的成功结果（工具返回 success 为 False 的结果不缓存）
+
+        Args:
+            tool: 工具实例
+            context: 执行上下文
+            result: 工具执行结果
+        """
+        if not self.cache_enabled or not tool.cache_ttl or not result.get('success'):
+            return
+        tool_result = result.get('result')
+        if isinstance(tool_result, dict) and tool_result.get('success') is False:
+            return
+        self.result_cache.put(NPSResultCache.make_key(tool.tool_id, context), result, tool.cache_ttl)
+    
+    def _record_tool_result(self, tool_id: str, result: Dict[str, Any]):
+        """
+        记录工具的调用结果
+
+        Args:
+            tool_id: 工具ID
+            result: 工具执行结果
+        """
+        with self._stats_lock:
+            stats = self._tool_stats.setdefault(tool_id, {'calls': 0, 'timeouts': 0, 'failures': 0,
+                                                          'cache_hits': 0})
+            stats['calls'] += 1
+            if result.get('cached'):
+                stats['cache_hits'] += 1
+            elif result.get('timed_out'):
+                stats['timeouts'] += 1
+            elif not result.get('success'):
+                stats['failures'] += 1
+    
     def get_context_for_understanding(self, user_input: str) -> Optional[str]:
         """
         获取理解阶段需要的上下文信息
@@ -361,8 +493,12 @@ class NPSInvoker:
         
         debug_logger.log_module('NPSInvoker', f'直接调用工具: {tool.name}', context or {})
         
-        # 执行工具
-        result = tool.execute(context or {})
+        # 执行工具（有效期内相同参数的调用直接返回缓存）
+        context = context or {}
+        result = self._get_cached_result(tool, context)
+        if result is None:
+            result = self._execute_and_store(tool, context)
+        self._record_tool_result(tool.tool_id, result)
         
         return result
     
@@ -389,5 +525,21 @@ class NPSInvoker:
                 'temperature': self.llm_temperature,
                 'max_tokens': self.llm_max_tokens,
                 'timeout': self.llm_timeout
-            }
+            },
+            'tool_config': {
+                'timeout': self.tool_timeout,
+                'max_workers': self.tool_max_workers
+            },
+            'tool_stats': self._get_tool_stats(),
+            'tool_cache': dict(self.result_cache.get_statistics(), enabled=self.cache_enabled)
         }
+    
+    def _get_tool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取每个工具的调用、超时、失败和缓存命中次数
+
+        Returns:
+            工具ID -> 统计信息
+        """
+        with self._stats_lock:
+            return {tool_id: dict(stats) for tool_id, stats in self._tool_stats.items()}
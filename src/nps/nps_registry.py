@@ -29,6 +29,8 @@ class NPSTool:
                  version: str = "1.0.0",
                  author: str = "Unknown",
                  enabled: bool = True,
+                 timeout: float = None,
+                 cache_ttl: float = None,
                  **kwargs):  # 接受额外参数以保持向后兼容
         """
         初始化 NPS 工具
@@ -42,6 +44,8 @@ class NPSTool:
             version: 工具版本
             author: 工具作者
             enabled: 是否启用
+            timeout: 执行时限（秒），超时的结果不进入上下文；为空时使用调用器的默认时限
+            cache_ttl: 结果可复用的时间（秒），有效期内相同参数的调用直接返回缓存；为空时不缓存
             **kwargs: 其他参数（用于向后兼容，会被忽略）
         """
         self.tool_id = tool_id
@@ -52,6 +56,8 @@ class NPSTool:
         self.version = version
         self.author = author
         self.enabled = enabled
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
     
     def execute(self, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -94,7 +100,9 @@ class NPSTool:
             'keywords': self.keywords,
             'version': self.version,
             'author': self.author,
-            'enabled': self.enabled
+            'enabled': self.enabled,
+            'timeout': self.timeout,
+            'cache_ttl': self.cache_ttl
         }
 
 
@@ -205,7 +213,10 @@ class NPSRegistry:
                 execute_func=execute_func,
                 version=metadata.get('version', '1.0.0'),
                 author=metadata.get('author', 'Unknown'),
-                enabled=metadata.get('enabled', True)
+                enabled=metadata.get('enabled', True),
+                # 执行时限无效时使用调用器的默认时限，缓存有效期无效时不缓存
+                timeout=self._positive_number(metadata, 'timeout', nps_path),
+                cache_ttl=self._positive_number(metadata, 'cache_ttl', nps_path)
             )
             
             # 注册工具
@@ -225,6 +236,27 @@ class NPSRegistry:
             debug_logger.log_error('NPSRegistry', f'注册工具失败', e)
             return None
     
+    @staticmethod
+    def _positive_number(metadata: Dict[str, Any], field: str, nps_path: str) -> Optional[float]:
+        """
+        读取元数据中的正数字段（秒）
+
+        Args:
+            metadata: .NPS 元数据
+            field: 字段名
+            nps_path: .NPS 文件路径（用于日志）
+
+        Returns:
+            字段值，未声明或无效时返回None
+        """
+        value = metadata.get(field)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            debug_logger.log_error('NPSRegistry', f'无效的 {field}: {value}', f'文件: {nps_path}')
+            return None
+        return value
+    
     def register_tool(self, tool: NPSTool) -> bool:
         """
         手动注册一个工具
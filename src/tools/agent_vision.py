@@ -12,6 +12,8 @@ from datetime import datetime
 from dotenv import load_dotenv
 import requests
 from src.core.database_manager import DatabaseManager
+from src.core.environment_graph import EnvironmentGraph
+from src.core.name_matcher import EnvironmentNameIndex, KIND_ENVIRONMENT, KIND_DOMAIN, KIND_OBJECT
 from src.tools.debug_logger import get_debug_logger
 
 load_dotenv()
@@ -26,6 +28,10 @@ class AgentVisionTool:
     负责检测用户查询是否涉及环境，并从数据库读取相应的环境描述
     """
 
+    # 视觉描述依赖的数据表（任一表变更后重新格式化）
+    VISION_SOURCE_TABLES = ('environment_descriptions', 'environment_objects',
+                            'environment_domains', 'domain_environments')
+
     def __init__(self, db_manager: DatabaseManager = None):
         """
         初始化视觉工具
@@ -34,6 +40,11 @@ class AgentVisionTool:
             db_manager: 数据库管理器实例
         """
         self.db = db_manager or DatabaseManager()
+
+        # 内存环境拓扑图（环境、连接、域相关的查询不再访问数据库）
+        self.env_graph = EnvironmentGraph(self.db)
+        # 环境/域/物体名称索引（一次扫描解析查询中提到的名称）
+        self.name_index = EnvironmentNameIndex(self.db, self.env_graph)
         
         # API配置（用于智能判断是否需要使用视觉工具）
         self.api_key = os.getenv('SILICONFLOW_API_KEY')
@@ -261,7 +272,7 @@ class AgentVisionTool:
             return None
         
         # 获取当前激活的环境
-        environment = self.db.get_active_environment()
+        environment = self.env_graph.get_active_environment()
         if not environment:
             debug_logger.log_info('AgentVisionTool', '没有激活的环境', {
                 'suggestion': '请先创建并激活一个环境'
@@ -312,6 +323,7 @@ class AgentVisionTool:
     def _format_vision_context(self, vision_context: Dict[str, Any]) -> str:
         """
         格式化视觉上下文为文本描述
+        结果按环境相关表的变更计数缓存，环境未变化时直接复用
 
         Args:
             vision_context: 视觉上下文字典
@@ -321,7 +333,28 @@ class AgentVisionTool:
         """
         if not vision_context:
             return ""
-        
+
+        if vision_context.get('type') == 'domain':
+            current_env = vision_context.get('current_environment') or {}
+            cache_key = f"vision:domain:{vision_context['domain']['uuid']}:{current_env.get('uuid', '')}"
+        elif vision_context.get('environment'):
+            cache_key = f"vision:env:{vision_context['environment']['uuid']}"
+        else:
+            return ""
+
+        return self.db.get_cached_fragment(cache_key, self.VISION_SOURCE_TABLES,
+                                           lambda: self._build_vision_text(vision_context))
+
+    def _build_vision_text(self, vision_context: Dict[str, Any]) -> str:
+        """
+        构建视觉上下文文本描述
+
+        Args:
+            vision_context: 视觉上下文字典
+
+        Returns:
+            格式化的文本描述
+        """
         # 检查是否为域级别的上下文
         if vision_context.get('type') == 'domain':
             domain = vision_context['domain']
@@ -335,7 +368,7 @@ class AgentVisionTool:
                 context_parts.append(f"\n当前具体位置: {current_env['name']}")
             
             # 获取域中的环境列表
-            environments = self.db.get_domain_environments(domain['uuid'])
+            environments = self.env_graph.get_domain_environments(domain['uuid'])
             if environments:
                 env_names = [env['name'] for env in environments]
                 context_parts.append(f"\n域包含的区域: {', '.join(env_names)}")
@@ -561,42 +594,65 @@ class AgentVisionTool:
             return None
 
         # 获取当前环境
-        current_env = self.db.get_active_environment()
+        current_env = self.env_graph.get_active_environment()
         if not current_env:
             debug_logger.log_info('AgentVisionTool', '没有当前激活的环境')
             return None
 
-        # 获取所有连通的环境
-        connected_envs = self.db.get_connected_environments(current_env['uuid'])
-        if not connected_envs:
-            debug_logger.log_info('AgentVisionTool', '当前环境没有连通的环境')
-            return None
-
-        # 尝试匹配环境名称
+        # 解析查询中提到的环境或物体（物体对应其所在环境），候选已按距离从近到远排序
         matched_env = None
-        for env in connected_envs:
-            if env['name'] in user_query:
-                matched_env = env
-                break
+        matched_text = None
+        for candidate in self.name_index.resolve(user_query, current_env['uuid'],
+                                                 kinds=(KIND_ENVIRONMENT, KIND_OBJECT)):
+            target_uuid = candidate['environment_uuid']
+            if target_uuid == current_env['uuid'] or candidate['distance'] is None:
+                continue
+            matched_env = self.env_graph.get_environment(target_uuid)
+            matched_text = candidate['matched_text']
+            break
 
         if matched_env:
+            route = self.env_graph.find_route(current_env['uuid'], matched_env['uuid'])
+            route_names = [env['name'] for env in route['path']]
             debug_logger.log_info('AgentVisionTool', '检测到环境切换意图', {
                 'from': current_env['name'],
-                'to': matched_env['name']
+                'to': matched_env['name'],
+                'route': ' → '.join(route_names),
+                'matched_text': matched_text
             })
             return {
                 'intent': 'switch_environment',
                 'from_env': current_env,
                 'to_env': matched_env,
+                'route': route_names,
+                'matched_text': matched_text,
                 'can_switch': True
             }
 
         debug_logger.log_info('AgentVisionTool', '未匹配到目标环境')
         return None
 
+    def format_switch_message(self, switch_intent: Dict[str, Any]) -> str:
+        """
+        生成环境切换提示（多跳时列出途经的环境）
+
+        Args:
+            switch_intent: detect_environment_switch_intent 的返回结果
+
+        Returns:
+            切换提示文本
+        """
+        from_name = switch_intent['from_env']['name']
+        to_name = switch_intent['to_env']['name']
+        route = switch_intent.get('route') or []
+        if len(route) > 2:
+            via = '」「'.join(route[1:-1])
+            return f"\n🚪 [环境切换] 已从「{from_name}」经过「{via}」移动到「{to_name}」"
+        return f"\n🚪 [环境切换] 已从「{from_name}」移动到「{to_name}」"
+
     def switch_environment(self, to_env_uuid: str) -> bool:
         """
-        切换到指定环境
+        切换到指定环境（目标环境可以经由其他环境多跳到达）
 
         Args:
             to_env_uuid: 目标环境UUID
@@ -608,13 +664,13 @@ class AgentVisionTool:
             'to_env_uuid': (to_env_uuid[:8] + '...') if len(to_env_uuid) > 8 else to_env_uuid
         })
 
-        current_env = self.db.get_active_environment()
+        current_env = self.env_graph.get_active_environment()
         if not current_env:
             debug_logger.log_info('AgentVisionTool', '没有当前激活的环境')
             return False
 
         # 检查是否可以切换（是否连通）
-        if not self.db.can_move_to_environment(current_env['uuid'], to_env_uuid):
+        if not self.env_graph.is_reachable(current_env['uuid'], to_env_uuid):
             debug_logger.log_info('AgentVisionTool', '不能切换到目标环境', {
                 'reason': '环境不连通'
             })
@@ -623,7 +679,7 @@ class AgentVisionTool:
         # 执行切换
         success = self.db.set_active_environment(to_env_uuid)
         if success:
-            to_env = self.db.get_environment(to_env_uuid)
+            to_env = self.env_graph.get_environment(to_env_uuid)
             debug_logger.log_info('AgentVisionTool', '环境切换成功', {
                 'from': current_env['name'],
                 'to': to_env['name'] if to_env else 'Unknown'
@@ -641,11 +697,11 @@ class AgentVisionTool:
         Returns:
             可切换环境列表
         """
-        current_env = self.db.get_active_environment()
+        current_env = self.env_graph.get_active_environment()
         if not current_env:
             return []
 
-        return self.db.get_connected_environments(current_env['uuid'])
+        return self.env_graph.get_neighbors(current_env['uuid'])
 
     # ==================== 环境域相关方法 ====================
 
@@ -657,12 +713,12 @@ class AgentVisionTool:
         Returns:
             域信息字典或None
         """
-        current_env = self.db.get_active_environment()
+        current_env = self.env_graph.get_active_environment()
         if not current_env:
             debug_logger.log_info('AgentVisionTool', '没有当前激活的环境')
             return None
 
-        domains = self.db.get_environment_domains(current_env['uuid'])
+        domains = self.env_graph.get_environment_domains(current_env['uuid'])
         if domains:
             debug_logger.log_info('AgentVisionTool', '找到当前环境所属的域', {
                 'domain_name': domains[0]['name'],
@@ -684,16 +740,16 @@ class AgentVisionTool:
         Returns:
             域的描述文本
         """
-        domain = self.db.get_domain(domain_uuid)
+        domain = self.env_graph.get_domain(domain_uuid)
         if not domain:
             return ""
 
         # 获取域中的环境列表
-        environments = self.db.get_domain_environments(domain_uuid)
+        environments = self.env_graph.get_domain_environments(domain_uuid)
         
         if use_default_env and domain['default_environment_uuid']:
             # 使用默认环境的详细描述
-            default_env = self.db.get_environment(domain['default_environment_uuid'])
+            default_env = self.env_graph.get_environment(domain['default_environment_uuid'])
             if default_env:
                 desc = f"【{domain['name']}】\n"
                 desc += f"{domain['description']}\n" if domain['description'] else ""
@@ -736,13 +792,13 @@ class AgentVisionTool:
             return None
         
         # 获取当前激活的环境
-        current_env = self.db.get_active_environment()
+        current_env = self.env_graph.get_active_environment()
         if not current_env:
             debug_logger.log_info('AgentVisionTool', '没有激活的环境')
             return None
         
         # 检查当前环境是否属于某个域
-        domains = self.db.get_environment_domains(current_env['uuid'])
+        domains = self.env_graph.get_environment_domains(current_env['uuid'])
         
         if not high_precision and domains:
             # 低精度模式：返回域级别的描述
@@ -810,14 +866,14 @@ class AgentVisionTool:
             'domain_uuid': uuid_display
         })
 
-        domain = self.db.get_domain(domain_uuid)
+        domain = self.env_graph.get_domain(domain_uuid)
         if not domain:
             debug_logger.log_info('AgentVisionTool', '域不存在')
             return False
 
         # 如果域有默认环境，切换到默认环境
         if domain['default_environment_uuid']:
-            default_env = self.db.get_environment(domain['default_environment_uuid'])
+            default_env = self.env_graph.get_environment(domain['default_environment_uuid'])
             if default_env:
                 success = self.db.set_active_environment(domain['default_environment_uuid'])
                 if success:
@@ -832,7 +888,7 @@ class AgentVisionTool:
                 return False
         else:
             # 如果没有设置默认环境，切换到域中的第一个环境
-            environments = self.db.get_domain_environments(domain_uuid)
+            environments = self.env_graph.get_domain_environments(domain_uuid)
             if environments:
                 first_env = environments[0]
                 success = self.db.set_active_environment(first_env['uuid'])
@@ -874,21 +930,13 @@ class AgentVisionTool:
             debug_logger.log_info('AgentVisionTool', '未检测到切换关键词')
             return None
 
-        # 获取所有域
-        all_domains = self.db.get_all_domains()
-        if not all_domains:
-            debug_logger.log_info('AgentVisionTool', '没有已定义的域')
-            return None
-
-        # 尝试匹配域名称
-        matched_domain = None
-        for domain in all_domains:
-            if domain['name'] in user_query:
-                matched_domain = domain
-                break
+        # 解析查询中提到的域（离当前环境近的优先）
+        current_env = self.env_graph.get_active_environment()
+        candidates = self.name_index.resolve(user_query, current_env['uuid'] if current_env else None,
+                                             kinds=(KIND_DOMAIN,))
+        matched_domain = self.env_graph.get_domain(candidates[0]['uuid']) if candidates else None
 
         if matched_domain:
-            current_env = self.db.get_active_environment()
             debug_logger.log_info('AgentVisionTool', '检测到域切换意图', {
                 'from_env': current_env['name'] if current_env else 'None',
                 'to_domain': matched_domain['name']
@@ -122,7 +122,17 @@ class ExpressionStyleManager:
 
     def generate_agent_expression_prompt(self) -> Optional[str]:
         """
-        生成智能体个性化表达提示词
+        生成智能体个性化表达提示词（按 agent_expressions 表的变更计数缓存）
+
+        Returns:
+            提示词文本，如果没有表达则返回None
+        """
+        return self.db.get_cached_fragment('agent_expression_prompt', ('agent_expressions',),
+                                           self._build_agent_expression_prompt)
+
+    def _build_agent_expression_prompt(self) -> Optional[str]:
+        """
+        构建智能体个性化表达提示词
 
         Returns:
             提示词文本，如果没有表达则返回None
@@ -363,7 +373,17 @@ class ExpressionStyleManager:
 
     def generate_user_expression_context(self) -> Optional[str]:
         """
-        生成用户表达习惯上下文提示词
+        生成用户表达习惯上下文提示词（按 user_expression_habits 表的变更计数缓存）
+
+        Returns:
+            提示词文本，如果没有可用的表达习惯则返回None
+        """
+        return self.db.get_cached_fragment('user_expression_context', ('user_expression_habits',),
+                                           self._build_user_expression_context)
+
+    def _build_user_expression_context(self) -> Optional[str]:
+        """
+        构建用户表达习惯上下文提示词
 
         Returns:
             提示词文本，如果没有可用的表达习惯则返回None
@@ -0,0 +1,124 @@
+"""
+子智能体结果缓存测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.agent_result_cache import AgentResultCache
+from src.core.database_manager import DatabaseManager
+from src.core.dynamic_multi_agent_graph import DynamicMultiAgentGraph
+
+
+class TestAgentResultCache(unittest.TestCase):
+    """测试缓存键归一化、过期和持久化"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.cache = AgentResultCache(self.db, ttl_hours=1, max_entries=2)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_key_normalization(self):
+        key = AgentResultCache.make_key('天气助手', '查一下明天天气')
+        self.assertEqual(key, AgentResultCache.make_key('天气助手', '查一下 明天天气！'))
+        self.assertNotEqual(AgentResultCache.make_key('写作助手', '写得很详细'),
+                            AgentResultCache.make_key('写作助手', '写得详细'))
+        self.assertNotEqual(key, AgentResultCache.make_key('出行助手', '查一下明天天气'))
+        self.assertNotEqual(key, AgentResultCache.make_key('天气助手', '查一下明天天气', ['上海']))
+
+    def test_key_includes_task_event_and_character(self):
+        """不同任务事件中相同的子任务文本不会互相命中"""
+        task = '整理资料并给出总结'
+        key = AgentResultCache.make_key('总结专家', task, task_info={'title': '调研咖啡机', 'description': '比较价格'})
+        self.assertNotEqual(key, AgentResultCache.make_key(
+            '总结专家', task, task_info={'title': '准备旅行', 'description': '查机票'}))
+        self.assertNotEqual(key, AgentResultCache.make_key(
+            '总结专家', task, task_info={'title': '调研咖啡机', 'description': '比较价格'},
+            character={'name': '小可'}))
+        # 事件ID等其他字段不影响缓存键
+        self.assertEqual(key, AgentResultCache.make_key(
+            '总结专家', task, task_info={'title': '调研咖啡机', 'description': '比较价格', 'event_id': 'e2'}))
+
+    def test_ttl_and_persistence(self):
+        now = datetime(2024, 1, 15, 9, 0)
+        key = AgentResultCache.make_key('天气助手', '查一下明天天气')
+        self.cache.put(key, '天气助手', '查一下明天天气', '晴', now=now)
+        self.assertEqual(self.cache.get(key, now=now + timedelta(minutes=30)), '晴')
+
+        # 新实例（模拟重启）读取同一数据库
+        restarted = AgentResultCache(self.db, ttl_hours=1)
+        self.assertEqual(restarted.get(key, now=now + timedelta(minutes=59)), '晴')
+        self.assertIsNone(restarted.get(key, now=now + timedelta(hours=1)))
+
+    def test_max_entries(self):
+        now = datetime(2024, 1, 15, 9, 0)
+        for i in range(3):
+            self.cache.put(f'k{i}', '角色', f'任务{i}', f'结果{i}', now=now + timedelta(seconds=i))
+        self.assertIsNone(self.cache.get('k0', now=now))
+        self.assertEqual(self.cache.get('k2', now=now), '结果2')
+        self.assertEqual(self.cache.get_statistics()['entries'], 2)
+
+
+class TestDynamicGraphResultCache(unittest.TestCase):
+    """测试协作图执行智能体时复用缓存结果"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.graph = DynamicMultiAgentGraph(enable_persistent_state=False, db_manager=DatabaseManager(self.db_path),
+                                            enable_result_cache=True)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _execute(self, task, metadata=None, dependency_output=None, title='出行准备'):
+        agent_state = dict(agent_id='weather', role='天气助手', description='', task=task,
+                           status='pending', result=None, error=None,
+                           dependencies=['location'] if dependency_output else [])
+        state = {'task_event': {'title': title, 'description': '', 'metadata': metadata or {}},
+                 'character_context': {},
+                 'agent_results': {'location': dependency_output}, 'collaboration_logs': []}
+        return self.graph._execute_agent(agent_state, state)
+
+    @patch('src.core.multi_agent_coordinator.create_sub_agent')
+    def test_reuse_and_bypass(self, mock_create):
+        agent = MagicMock()
+        agent.execute_task.side_effect = ['晴', '多云', '小雨', '【执行失败】超时', '阴', '大风']
+        mock_create.return_value = agent
+
+        self.assertEqual(self._execute('查一下明天天气')['result'], '晴')
+        cached = self._execute('查一下 明天天气！')
+        self.assertTrue(cached['cached'])
+        self.assertEqual(cached['result'], '晴')
+        self.assertEqual(agent.execute_task.call_count, 1)
+
+        # 依赖输出不同则重新执行
+        self.assertEqual(self._execute('查一下明天天气', dependency_output='北京')['result'], '多云')
+
+        # 跳过缓存时重新执行并刷新缓存
+        self.assertEqual(self._execute('查一下明天天气', {'bypass_result_cache': True})['result'], '小雨')
+        self.assertEqual(self._execute('查一下明天天气')['result'], '小雨')
+
+        # 失败结果不缓存
+        self._execute('帮我规划周末')
+        self.assertEqual(self._execute('帮我规划周末')['result'], '阴')
+
+        # 其他任务事件中相同的子任务文本不复用
+        self.assertEqual(self._execute('查一下明天天气', title='周末野餐')['result'], '大风')
+
+
+if __name__ == '__main__':
+    unittest.main()
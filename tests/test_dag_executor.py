@@ -0,0 +1,125 @@
+"""
+依赖图执行器测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.dag_executor import DagExecutor, DependencyCycleError, find_cycle, critical_path
+from src.core.dynamic_multi_agent_graph import DynamicMultiAgentGraph
+
+
+class TestDagExecutor(unittest.TestCase):
+    """测试依赖图执行顺序、并发上限和循环检测"""
+
+    def test_find_cycle(self):
+        self.assertIsNone(find_cycle({'a': [], 'b': ['a'], 'c': ['a', 'b', 'missing']}))
+        self.assertEqual(find_cycle({'a': ['c'], 'b': ['a'], 'c': ['b']}), ['a', 'c', 'b', 'a'])
+        self.assertEqual(find_cycle({'a': ['a']}), ['a', 'a'])
+        with self.assertRaises(DependencyCycleError):
+            DagExecutor(2).run({'a': ['b'], 'b': ['a']}, lambda node: node)
+
+    def test_starts_when_dependencies_complete(self):
+        durations = {'a': 0.05, 'b': 0.05, 'slow': 0.3, 'c': 0.05}
+        dependencies = {'a': [], 'slow': [], 'b': ['a'], 'c': ['b', 'unknown']}
+
+        def execute(node):
+            time.sleep(durations[node])
+            return node.upper()
+
+        completed = []
+        runs = DagExecutor(3).run(dependencies, execute, on_complete=lambda node, run: completed.append(node))
+        self.assertEqual({node: run['result'] for node, run in runs.items()},
+                         {'a': 'A', 'b': 'B', 'slow': 'SLOW', 'c': 'C'})
+        # b 和 c 不等待与其无关的 slow 完成
+        self.assertGreaterEqual(runs['b']['started'], runs['a']['finished'])
+        self.assertGreaterEqual(runs['c']['started'], runs['b']['finished'])
+        self.assertLess(runs['c']['finished'], runs['slow']['finished'])
+        self.assertEqual(completed[-1], 'slow')
+
+        path, seconds = critical_path(DagExecutor.normalize(dependencies),
+                                      {node: run['duration'] for node, run in runs.items()})
+        self.assertEqual(path, ['slow'])
+        self.assertAlmostEqual(seconds, runs['slow']['duration'])
+
+    def test_concurrency_limit_and_errors(self):
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+
+        def execute(node):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.02)
+            with lock:
+                active['now'] -= 1
+            if node == 'n3':
+                raise RuntimeError('boom')
+            return node
+
+        runs = DagExecutor(2).run({f'n{i}': [] for i in range(6)}, execute)
+        self.assertEqual(active['max'], 2)
+        self.assertEqual(runs['n3']['error'], 'boom')
+        self.assertEqual(len(runs), 6)
+
+
+class TestDynamicGraphWavefront(unittest.TestCase):
+    """测试多智能体协作图按依赖图执行智能体"""
+
+    def setUp(self):
+        self.graph = DynamicMultiAgentGraph(enable_persistent_state=False, max_concurrency=3)
+
+    def _state(self, agents):
+        return {
+            'task_event': {'title': '测试任务', 'description': ''},
+            'character_context': {},
+            'orchestration_plan': {'execution_strategy': 'sequential', 'agents': [
+                dict(agent_id=agent_id, role=agent_id, description='', task='', status='pending',
+                     result=None, error=None, dependencies=deps)
+                for agent_id, deps in agents
+            ]},
+            'agents': [],
+            'agent_results': {},
+            'collaboration_logs': [],
+            'final_result': None,
+            'error': None,
+            'next_action': 'execute_sequential'
+        }
+
+    def test_dependency_results_visible(self):
+        def fake_execute(agent_state, state):
+            context = {dep: state['agent_results'][dep] for dep in agent_state['dependencies']}
+            return {'success': True, 'role': agent_state['role'],
+                    'result': f"{agent_state['agent_id']}<{','.join(sorted(context))}>"}
+
+        state = self._state([('research', []), ('data', []), ('write', ['research', 'data'])])
+        with patch.object(self.graph, '_execute_agent', side_effect=fake_execute), \
+                patch('builtins.print'):
+            state = self.graph._execute_sequential_node(state)
+
+        self.assertEqual(state['next_action'], 'synthesize')
+        self.assertEqual(state['agent_results']['write'], 'write<data,research>')
+        self.assertTrue(all(a['status'] == 'completed' for a in state['orchestration_plan']['agents']))
+        timings = [log for log in state['collaboration_logs'] if log.get('type') == 'agent_timing']
+        self.assertEqual(len(timings), 3)
+        summary = [log for log in state['collaboration_logs'] if log.get('type') == 'execution_summary'][0]
+        self.assertEqual(summary['critical_path'][-1], 'write')
+
+    def test_cycle_reported(self):
+        state = self._state([('a', ['b']), ('b', ['a'])])
+        with patch.object(self.graph, '_execute_agent') as execute_agent:
+            state = self.graph._execute_parallel_node(state)
+        execute_agent.assert_not_called()
+        self.assertEqual(state['next_action'], 'end')
+        self.assertIn('循环', state['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
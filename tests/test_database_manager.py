@@ -0,0 +1,221 @@
+"""
+数据库管理器测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+
+
+class TestUpsertKnowledgeBatch(unittest.TestCase):
+    """测试批量知识写入"""
+
+    def setUp(self):
+        """使用临时数据库文件"""
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_empty_batch(self):
+        """测试空批次"""
+        self.assertEqual(self.db.upsert_knowledge_batch([]), [])
+
+    def test_creates_entities_and_definitions(self):
+        """测试创建实体和定义"""
+        results = self.db.upsert_knowledge_batch([
+            {'entity_name': '小可', 'content': '一名高中生', 'is_definition': True, 'type': '定义'},
+            {'entity_name': '小可', 'content': '喜欢历史', 'type': '爱好'},
+        ])
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['entity_uuid'], results[1]['entity_uuid'])
+        entity_uuid = results[0]['entity_uuid']
+        self.assertEqual(self.db.get_entity_by_name('小可')['uuid'], entity_uuid)
+        self.assertEqual(self.db.get_entity_definition(entity_uuid)['content'], '一名高中生')
+        self.assertEqual(results[1]['status'], DatabaseManager.STATUS_SUSPECTED)
+        self.assertFalse(results[1]['merged'])
+
+    def test_reuses_existing_entity(self):
+        """测试复用已有实体（名称规范化匹配）"""
+        entity_uuid = self.db.create_entity('Python')
+        results = self.db.upsert_knowledge_batch([
+            {'entity_name': ' python ', 'content': '一门编程语言', 'type': '其他'},
+        ])
+        self.assertEqual(results[0]['entity_uuid'], entity_uuid)
+        self.assertEqual(len(self.db.get_all_entities()), 1)
+
+    def test_merges_duplicates_and_promotes_status(self):
+        """测试重复信息合并、计数与状态升级（含同批次内重复）"""
+        entity_uuid = self.db.find_or_create_entity('用户')
+        self.db.add_entity_related_info(entity_uuid, '喜欢猫', type_='爱好')
+
+        item = {'entity_name': '用户', 'content': '喜欢猫', 'type': '爱好'}
+        results = self.db.upsert_knowledge_batch([item, dict(item)])
+
+        self.assertTrue(results[0]['merged'])
+        self.assertEqual(results[0]['mention_count'], 2)
+        self.assertEqual(results[1]['mention_count'], 3)
+        self.assertEqual(results[1]['status'], DatabaseManager.STATUS_CONFIRMED)
+
+        rows = self.db.get_entity_related_info(entity_uuid)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['mention_count'], 3)
+        self.assertEqual(rows[0]['status'], DatabaseManager.STATUS_CONFIRMED)
+
+    def test_new_item_repeated_in_same_batch(self):
+        """测试同批次内新信息重复出现只插入一行"""
+        item = {'entity_name': '天气', 'content': '今天下雨', 'type': '事实'}
+        results = self.db.upsert_knowledge_batch([item, dict(item)])
+
+        self.assertEqual(results[0]['info_uuid'], results[1]['info_uuid'])
+        rows = self.db.get_entity_related_info(results[0]['entity_uuid'])
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['mention_count'], 2)
+
+
+class TestNearDuplicateKnowledge(unittest.TestCase):
+    """测试近似重复知识合并"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.entity_uuid = self.db.find_or_create_entity('用户')
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_paraphrase_counts_as_mention(self):
+        """测试同义表述计为再次提及"""
+        first = self.db.add_entity_related_info(self.entity_uuid, '喜欢猫', type_='爱好')
+        second = self.db.add_entity_related_info(self.entity_uuid, '很喜欢猫咪', type_='爱好')
+
+        self.assertEqual(first, second)
+        rows = self.db.get_entity_related_info(self.entity_uuid)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['mention_count'], 2)
+        self.assertTrue(rows[0]['fingerprint'])
+
+    def test_different_facts_are_kept(self):
+        """测试否定、不同对象的信息不会被合并"""
+        self.db.add_entity_related_info(self.entity_uuid, '喜欢猫', type_='爱好')
+        self.db.add_entity_related_info(self.entity_uuid, '不喜欢猫', type_='爱好')
+        self.db.add_entity_related_info(self.entity_uuid, '喜欢狗', type_='爱好')
+        self.assertEqual(len(self.db.get_entity_related_info(self.entity_uuid)), 3)
+
+    def test_changed_names_and_dates_are_kept(self):
+        """测试名字、颜色、中文数字日期不同的信息不会合并计数"""
+        contents = ['妹妹叫小红', '妹妹叫小明', '最喜欢的颜色是红色', '最喜欢的颜色是蓝色',
+                    '最喜欢的颜色是红色和蓝色', '生日是五月三日', '生日是五月四日',
+                    '在上海工作', '在上海工作过', '喜欢吃鱼', '喜欢吃鱼头']
+        for content in contents:
+            self.db.add_entity_related_info(self.entity_uuid, content, type_='事实')
+
+        rows = self.db.get_entity_related_info(self.entity_uuid)
+        self.assertEqual(len(rows), len(contents))
+        self.assertTrue(all(r['mention_count'] == 1 for r in rows))
+
+    def test_batch_merges_paraphrase(self):
+        """测试批量写入时合并同义表述"""
+        self.db.add_entity_related_info(self.entity_uuid, '住在北京', type_='事实')
+        results = self.db.upsert_knowledge_batch([
+            {'entity_name': '用户', 'content': '住在北京市', 'type': '事实'},
+        ])
+        self.assertTrue(results[0]['merged'])
+        self.assertEqual(results[0]['mention_count'], 2)
+
+    def test_compaction_merges_existing_duplicates(self):
+        """测试一次性整理合并已有的近似重复条目"""
+        # 模拟旧数据：直接插入未经去重的记录
+        with self.db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO entity_related_info
+                (uuid, entity_uuid, content, type, status, mention_count, created_at)
+                VALUES (?, ?, ?, '爱好', ?, ?, ?)
+            ''', [
+                ('a', self.entity_uuid, '喜欢猫', DatabaseManager.STATUS_SUSPECTED, 1, '2024-01-01'),
+                ('b', self.entity_uuid, '很喜欢猫咪', DatabaseManager.STATUS_SUSPECTED, 2, '2024-01-02'),
+                ('c', self.entity_uuid, '喜欢历史', DatabaseManager.STATUS_SUSPECTED, 1, '2024-01-03'),
+            ])
+
+        stats = self.db.compact_related_info_duplicates()
+
+        self.assertEqual(stats['merged'], 1)
+        rows = {r['uuid']: r for r in self.db.get_entity_related_info(self.entity_uuid)}
+        self.assertEqual(set(rows), {'b', 'c'})
+        self.assertEqual(rows['b']['mention_count'], 3)
+        self.assertEqual(rows['b']['status'], DatabaseManager.STATUS_CONFIRMED)
+
+
+class TestDerivedFragmentCache(unittest.TestCase):
+    """测试按表变更计数失效的派生片段缓存"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_write_bumps_only_touched_tables(self):
+        """提交写入后只递增被写入表的计数"""
+        expressions = self.db.get_table_version('agent_expressions')
+        habits = self.db.get_table_version('user_expression_habits')
+        self.db.add_agent_expression('wc', '感叹')
+        self.db.get_all_agent_expressions()
+        self.assertEqual(self.db.get_table_version('agent_expressions'), expressions + 1)
+        self.assertEqual(self.db.get_table_version('user_expression_habits'), habits)
+
+    def test_rollback_does_not_bump(self):
+        """回滚的事务不改变计数"""
+        before = self.db.get_table_version('agent_expressions')
+        with self.assertRaises(RuntimeError):
+            with self.db.get_connection() as conn:
+                conn.execute("DELETE FROM agent_expressions")
+                raise RuntimeError('abort')
+        self.assertEqual(self.db.get_table_version('agent_expressions'), before)
+
+    def test_fragment_rebuilt_only_after_source_change(self):
+        """依赖表未变化时复用片段，变化后重新构建"""
+        calls = []
+
+        def build():
+            calls.append(1)
+            return len(self.db.get_all_agent_expressions())
+
+        self.assertEqual(self.db.get_cached_fragment('count', ('agent_expressions',), build), 0)
+        self.assertEqual(self.db.get_cached_fragment('count', ('agent_expressions',), build), 0)
+        self.assertEqual(len(calls), 1)
+
+        self.db.set_metadata('unrelated', 1)
+        self.db.get_cached_fragment('count', ('agent_expressions',), build)
+        self.assertEqual(len(calls), 1)
+
+        self.db.add_agent_expression('hhh', '笑声')
+        self.assertEqual(self.db.get_cached_fragment('count', ('agent_expressions',), build), 1)
+        self.assertEqual(len(calls), 2)
+
+    def test_versions_shared_between_instances(self):
+        """同一数据库文件的其他实例写入也会使缓存失效"""
+        other = DatabaseManager(self.db_path)
+        build = lambda: len(self.db.get_all_agent_expressions())
+        self.assertEqual(self.db.get_cached_fragment('count', ('agent_expressions',), build), 0)
+        other.add_agent_expression('orz', '无奈')
+        self.assertEqual(self.db.get_cached_fragment('count', ('agent_expressions',), build), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
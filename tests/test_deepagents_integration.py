@@ -11,7 +11,7 @@ from unittest.mock import MagicMock, patch
 # 添加项目路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.deepagents_wrapper import DeepSubAgentWrapper, DeepAgentsKnowledgeManager
+from src.core.deepagents_wrapper import DeepSubAgentWrapper, DeepAgentsKnowledgeManager, SubAgentPool
 
 
 class TestDeepSubAgentWrapper(unittest.TestCase):
@@ -242,7 +242,8 @@ class TestFactoryFunction(unittest.TestCase):
             agent_id='test',
             role='测试',
             description='测试描述',
-            use_deep_agents=True
+            use_deep_agents=True,
+            use_pool=False
         )
         
         # 验证
@@ -253,6 +254,70 @@ class TestFactoryFunction(unittest.TestCase):
         )
         self.assertEqual(agent, mock_instance)
 
+    @patch('src.core.deepagents_wrapper.create_deep_agent')
+    def test_create_pooled_subagent(self, mock_create_agent):
+        """测试从子智能体池取出DeepSubAgentWrapper"""
+        from src.core.multi_agent_coordinator import create_sub_agent
+        
+        mock_create_agent.return_value = MagicMock()
+        with patch('src.core.multi_agent_coordinator.get_sub_agent_pool', return_value=SubAgentPool()):
+            first = create_sub_agent(agent_id='a1', role='测试', description='测试描述', use_deep_agents=True)
+            second = create_sub_agent(agent_id='a2', role='测试', description='测试描述', use_deep_agents=True)
+        
+        # 同一配置只编译一次
+        mock_create_agent.assert_called_once()
+        self.assertIsInstance(first, DeepSubAgentWrapper)
+        self.assertIs(first.agent, second.agent)
+
+
+class TestSubAgentPool(unittest.TestCase):
+    """测试子智能体池复用已编译的智能体并隔离线程"""
+    
+    def setUp(self):
+        """测试前准备"""
+        os.environ['SILICON_FLOW_API_KEY'] = 'test-key'
+    
+    @patch('src.core.deepagents_wrapper.create_deep_agent')
+    def test_reuse_and_isolated_threads(self, mock_create_agent):
+        """测试相同配置复用，不同配置分别编译，每次取出使用独立线程"""
+        mock_create_agent.side_effect = lambda **kwargs: MagicMock()
+        pool = SubAgentPool(max_size=2)
+        
+        first = pool.acquire('task1_research', '研究员', '查资料')
+        second = pool.acquire('task2_research', '研究员', '查资料')
+        writer = pool.acquire('task2_writer', '写作者', '写报告')
+        
+        self.assertEqual(mock_create_agent.call_count, 2)
+        self.assertIs(first.agent, second.agent)
+        self.assertIs(first.checkpointer, second.checkpointer)
+        self.assertIsNot(first.agent, writer.agent)
+        self.assertNotEqual(first.thread_id, second.thread_id)
+        self.assertTrue(first.thread_id.startswith('task1_research_'))
+        self.assertEqual(pool.get_statistics(), {'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2})
+        
+        # 超出容量时淘汰最久未使用的配置
+        pool.acquire('task3_review', '审阅者', '检查结果')
+        pool.acquire('task3_research', '研究员', '查资料')
+        self.assertEqual(mock_create_agent.call_count, 4)
+        self.assertEqual(pool.get_statistics()['evictions'], 2)
+    
+    @patch('src.core.deepagents_wrapper.create_deep_agent')
+    def test_thread_released_after_execution(self, mock_create_agent):
+        """测试池化副本执行结束后删除其线程的检查点"""
+        mock_message = MagicMock()
+        mock_message.content = '完成'
+        mock_agent = MagicMock()
+        mock_agent.invoke.return_value = {'messages': [mock_message]}
+        mock_create_agent.return_value = mock_agent
+        
+        agent = SubAgentPool().acquire('task1_research', '研究员', '查资料')
+        with patch.object(agent.checkpointer, 'delete_thread') as delete_thread:
+            self.assertEqual(agent.execute_task('查资料', {}), '完成')
+        
+        config = mock_agent.invoke.call_args[1]['config']
+        self.assertEqual(config['configurable']['thread_id'], agent.thread_id)
+        delete_thread.assert_called_once_with(agent.thread_id)
+
 
 if __name__ == '__main__':
     unittest.main()
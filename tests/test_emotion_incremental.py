@@ -0,0 +1,107 @@
+"""
+增量情感分析测试
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.emotion_analyzer import EmotionRelationshipAnalyzer
+
+
+class TestIncrementalEmotionAnalysis(unittest.TestCase):
+    """测试只基于新增消息的增量情感评估"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.analyzer = EmotionRelationshipAnalyzer(self.db)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _add_messages(self, count):
+        for i in range(count):
+            role = 'user' if i % 2 == 0 else 'assistant'
+            self.db.add_short_term_message(role, f'消息{i}')
+
+    def _messages_since(self, message_id=None):
+        return [{'id': msg['id'], 'role': msg['role'], 'content': msg['content']}
+                for msg in self.db.get_short_term_messages_since(message_id, limit=30)]
+
+    def _seed_initial(self):
+        self._add_messages(4)
+        initial = json.dumps({
+            'overall_score': 20,
+            'relationship_type': '朋友',
+            'emotional_tone': '积极',
+            'impression': '友善的用户',
+            'analysis': '初次聊天很愉快'
+        }, ensure_ascii=False)
+        with patch.object(self.analyzer, '_call_llm', return_value=initial):
+            self.analyzer.analyze_emotion_incremental(self._messages_since(), '小可')
+
+    def test_first_analysis_falls_back_to_initial(self):
+        """没有历史情感状态时执行初次评估并记录分析位置"""
+        self._seed_initial()
+        latest = self.analyzer.get_latest_emotion()
+        self.assertEqual(latest['overall_score'], 20)
+        self.assertEqual(self.analyzer.get_last_analyzed_message_id(), 4)
+
+    def test_incremental_applies_clamped_deltas(self):
+        """增量评估只发送新消息，并限制变化量范围"""
+        self._seed_initial()
+        self._add_messages(4)
+
+        response = json.dumps({
+            'score_change': 10,
+            'dimension_changes': {'intimacy': 3, 'trust': -20},
+            'relationship_type': '好朋友',
+            'emotional_tone': '积极',
+            'impression': '越来越熟悉',
+            'analysis': '聊得很投机'
+        }, ensure_ascii=False)
+        with patch.object(self.analyzer, '_call_llm', return_value=response) as mock_llm:
+            result = self.analyzer.analyze_emotion_incremental(
+                self._messages_since(self.analyzer.get_last_analyzed_message_id()), '小可', '18岁学生'
+            )
+
+        prompt = mock_llm.call_args[0][0]
+        self.assertIn('消息0', prompt)  # 新增的第5条消息内容为"消息0"
+        self.assertIn('友善的用户', prompt)
+        self.assertEqual(result['message_count'], 4)
+        self.assertEqual(result['score_change'], 3)
+        self.assertEqual(result['overall_score'], 23)
+        self.assertEqual(result['dimensions']['intimacy'], 53)
+        self.assertEqual(result['dimensions']['trust'], 45)
+        self.assertEqual(result['dimensions']['pleasure'], 50)
+        self.assertEqual(self.analyzer.get_last_analyzed_message_id(), 8)
+
+        state = self.analyzer.get_latest_emotion_state()
+        self.assertEqual(state['overall_score'], 23)
+        self.assertEqual(state['dimensions']['intimacy'], 53)
+
+    def test_skips_llm_without_new_messages(self):
+        """没有足够新消息时不调用LLM"""
+        self._seed_initial()
+        self._add_messages(1)
+        with patch.object(self.analyzer, '_call_llm') as mock_llm:
+            result = self.analyzer.analyze_emotion_incremental(
+                self._messages_since(self.analyzer.get_last_analyzed_message_id()), '小可'
+            )
+        mock_llm.assert_not_called()
+        self.assertTrue(result['skipped'])
+        self.assertEqual(result['overall_score'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+情感预评分测试
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.emotion_prescorer import EmotionPreScorer, score_message
+
+
+class TestScoreMessage(unittest.TestCase):
+    """测试单条消息的本地信号"""
+
+    def test_polarity(self):
+        self.assertGreater(score_message('今天好开心！')['valence'], 0.3)
+        self.assertLess(score_message('烦死了，好难过')['valence'], -0.3)
+        self.assertEqual(score_message('今天吃了面条')['valence'], 0.0)
+
+    def test_negation_flips_sign(self):
+        self.assertLess(score_message('我不开心')['valence'], 0)
+
+    def test_emoji_and_intimacy(self):
+        signal = score_message('想你了🥰')
+        self.assertGreater(signal['intimacy'], 0.5)
+        self.assertGreater(signal['valence'], 0)
+        self.assertLess(score_message('别理我')['intimacy'], 0)
+
+
+class TestEmotionPreScorer(unittest.TestCase):
+    """测试分析时机判断"""
+
+    def setUp(self):
+        self.scorer = EmotionPreScorer(interval_rounds=15, max_interval_rounds=45, shift_threshold=0.35)
+
+    def test_flat_conversation_skips_scheduled_analysis(self):
+        for _ in range(15):
+            self.scorer.observe('今天中午吃了米饭')
+        self.assertEqual(self.scorer.should_analyze(15), (False, EmotionPreScorer.REASON_FLAT))
+        self.assertEqual(self.scorer.should_analyze(45), (True, EmotionPreScorer.REASON_MAX_INTERVAL))
+
+    def test_large_shift_triggers_early(self):
+        for _ in range(4):
+            self.scorer.observe('气死我了，真的好难过😭')
+        self.assertEqual(self.scorer.should_analyze(4), (True, EmotionPreScorer.REASON_SHIFT))
+        self.assertEqual(self.scorer.should_analyze(2)[1], EmotionPreScorer.REASON_TOO_SOON)
+
+    def test_mark_analyzed_resets_baseline(self):
+        for _ in range(4):
+            self.scorer.observe('好开心，谢谢你！')
+        self.scorer.mark_analyzed()
+        self.assertEqual(self.scorer.shift, 0.0)
+        self.scorer.observe('好开心，谢谢你！')
+        self.assertFalse(self.scorer.should_analyze(5)[0])
+
+
+    def test_rounds_counted_by_observed_messages(self):
+        """测试默认按上次分析以来观察到的消息数计算间隔（不受短期记忆归档影响）"""
+        self.scorer.mark_analyzed()
+        for _ in range(2):
+            self.scorer.observe('今天中午吃了米饭')
+        self.assertEqual(self.scorer.should_analyze(), (False, EmotionPreScorer.REASON_TOO_SOON))
+        for _ in range(43):
+            self.scorer.observe('今天中午吃了米饭')
+        self.assertEqual(self.scorer.rounds_since_analysis, 45)
+        self.assertEqual(self.scorer.should_analyze(), (True, EmotionPreScorer.REASON_MAX_INTERVAL))
+        self.scorer.mark_analyzed()
+        self.assertEqual(self.scorer.rounds_since_analysis, 0)
+
+if __name__ == '__main__':
+    unittest.main()
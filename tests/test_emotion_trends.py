@@ -0,0 +1,97 @@
+"""
+情感趋势分析测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.emotion_trends import (
+    EmotionTrendEngine, moving_average, linear_slopes, detect_change_points, lttb_indices
+)
+
+
+class TestTrendFunctions(unittest.TestCase):
+    """测试向量化趋势函数"""
+
+    def test_moving_average(self):
+        np.testing.assert_allclose(moving_average([1, 2, 3, 4, 5], 3), [1, 1.5, 2, 3, 4])
+
+    def test_linear_slopes_ignore_nan(self):
+        x = np.arange(5)
+        series = np.column_stack([2 * x + 1, [np.nan, 1, 2, 3, 4], [np.nan] * 4 + [1]])
+        slopes = linear_slopes(x, series)
+        np.testing.assert_allclose(slopes[:2], [2, 1])
+        self.assertTrue(np.isnan(slopes[2]))
+
+    def test_change_point_on_trend_reversal(self):
+        rising = list(range(0, 30, 3))
+        values = rising + list(range(27, 0, -3))
+        self.assertEqual(detect_change_points(values, window=3, threshold=1.5), [9])
+        self.assertEqual(detect_change_points(rising, window=3, threshold=1.5), [])
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        x = np.arange(10000)
+        y = np.zeros(10000)
+        y[5000] = 100
+        indices = lttb_indices(x, y, 100)
+        self.assertEqual(len(indices), 100)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 9999)
+        self.assertIn(5000, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+
+class TestEmotionTrendEngine(unittest.TestCase):
+    """测试从数据库读取的趋势分析"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.engine = EmotionTrendEngine(self.db, max_points=10, window=3)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_empty_history(self):
+        result = self.engine.analyze()
+        self.assertEqual(result['count'], 0)
+        self.assertEqual(result['overall_score'], [])
+
+    def test_downsampled_series_and_slopes(self):
+        rows = [
+            (f'2025-01-{day + 1:02d}T10:00:00', 20 + day, 0, 0, 0, 0, 0) if day < 5 else
+            (f'2025-01-{day + 1:02d}T10:00:00', 20 + day, 50 + day, 50, 50, 50, 50)
+            for day in range(25)
+        ]
+        result = self.engine.analyze(rows)
+        self.assertEqual(result['count'], 25)
+        self.assertEqual(len(result['overall_score']), 10)
+        self.assertEqual(len(result['dimensions']['intimacy']), 10)
+        self.assertEqual(result['timestamps'][0], rows[0][0])
+        self.assertAlmostEqual(result['slopes']['per_day']['overall_score'], 1.0)
+        self.assertAlmostEqual(result['slopes']['per_analysis']['intimacy'], 1.0)
+        self.assertEqual(result['slopes']['per_analysis']['trust'], 0.0)
+        # 维度全为0的旧记录不参与计算
+        self.assertIsNone(result['dimensions']['intimacy'][0])
+
+    def test_reads_series_from_database(self):
+        for score in (10, 12, 14):
+            self.db.add_emotion_analysis('朋友', '积极', score, 0, 0, 0, 0, 0, '')
+        self.assertEqual(self.db.get_emotion_count(), 3)
+        result = self.engine.analyze()
+        self.assertEqual(result['overall_score'], [10, 12, 14])
+        self.assertEqual(len(self.db.get_emotion_history(limit=2)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
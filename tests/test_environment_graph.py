@@ -0,0 +1,91 @@
+"""
+环境拓扑图测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.environment_graph import EnvironmentGraph
+from src.tools.agent_vision import AgentVisionTool
+
+
+class TestEnvironmentGraph(unittest.TestCase):
+    """测试内存环境拓扑与多跳路线"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.graph = EnvironmentGraph(self.db)
+
+        self.bedroom = self.db.create_environment('卧室', '小房间')
+        self.hallway = self.db.create_environment('走廊', '长走廊')
+        self.kitchen = self.db.create_environment('厨房', '有灶台')
+        self.garden = self.db.create_environment('花园', '种满了花')
+        self.db.create_environment_connection(self.bedroom, self.hallway, 'door')
+        self.db.create_environment_connection(self.hallway, self.kitchen, 'door')
+        self.db.create_environment_connection(self.garden, self.kitchen, 'door', direction='one_way')
+        self.db.set_active_environment(self.bedroom)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_multi_hop_route(self):
+        route = self.graph.find_route(self.bedroom, self.kitchen)
+        self.assertEqual([env['name'] for env in route['path']], ['卧室', '走廊', '厨房'])
+        self.assertEqual(route['hops'], 2)
+        self.assertTrue(self.graph.is_reachable(self.bedroom, self.kitchen))
+        self.assertFalse(self.graph.can_move_directly(self.bedroom, self.kitchen))
+
+    def test_one_way_connection(self):
+        self.assertTrue(self.graph.is_reachable(self.garden, self.bedroom))
+        self.assertFalse(self.graph.is_reachable(self.bedroom, self.garden))
+        self.assertIsNone(self.graph.find_route(self.kitchen, self.garden))
+
+    def test_dijkstra_prefers_cheaper_connection(self):
+        self.db.create_environment_connection(self.bedroom, self.kitchen, 'stairs')
+        self.db.create_environment_connection(self.bedroom, self.garden, 'portal')
+        # 最少跳数：直接走楼梯；最小代价：传送到花园再进厨房（0.5 + 1.0 < 2.0）
+        fewest_hops = self.graph.find_route(self.bedroom, self.kitchen, weighted=False)
+        self.assertEqual(fewest_hops['hops'], 1)
+        cheapest = self.graph.find_route(self.bedroom, self.kitchen, weighted=True)
+        self.assertEqual([env['name'] for env in cheapest['path']], ['卧室', '花园', '厨房'])
+        self.assertEqual(cheapest['cost'], 1.5)
+
+    def test_rebuilds_after_write(self):
+        self.assertEqual(self.graph.get_active_environment()['uuid'], self.bedroom)
+        self.db.set_active_environment(self.kitchen)
+        self.assertEqual(self.graph.get_active_environment()['uuid'], self.kitchen)
+
+        connection = self.db.get_environment_connections(self.hallway, 'from')[0]
+        self.db.delete_environment_connection(connection['uuid'])
+        self.assertFalse(self.graph.is_reachable(self.bedroom, self.kitchen))
+
+    def test_domains(self):
+        home = self.db.create_domain('家', '温馨的家', default_environment_uuid=self.hallway)
+        self.db.add_environment_to_domain(home, self.bedroom)
+        self.db.add_environment_to_domain(home, self.kitchen)
+        self.assertEqual([env['name'] for env in self.graph.get_domain_environments(home)],
+                         sorted(['卧室', '厨房']))
+        self.assertEqual(self.graph.get_environment_domains(self.kitchen)[0]['name'], '家')
+        self.assertEqual(self.graph.get_domain(home)['default_environment_uuid'], self.hallway)
+
+    def test_vision_switch_through_intermediate_environment(self):
+        vision = AgentVisionTool(self.db)
+        intent = vision.detect_environment_switch_intent('我们去厨房吧')
+        self.assertEqual(intent['to_env']['uuid'], self.kitchen)
+        self.assertEqual(intent['route'], ['卧室', '走廊', '厨房'])
+        self.assertIn('经过「走廊」', vision.format_switch_message(intent))
+        self.assertTrue(vision.switch_environment(self.kitchen))
+        self.assertEqual(self.db.get_active_environment()['uuid'], self.kitchen)
+
+
+if __name__ == '__main__':
+    unittest.main()
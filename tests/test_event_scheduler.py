@@ -0,0 +1,251 @@
+"""
+事件执行引擎测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.event_manager import EventManager, EventType, EventPriority, EventStatus
+from src.core.event_scheduler import EventScheduler, parse_type_limits
+from src.core.chat_agent import ChatAgent, SiliconFlowLLM
+from src.core.langchain_llm import LangChainLLM
+from src.core.model_config import ModelType
+
+
+class TestEventScheduler(unittest.TestCase):
+    """测试事件按优先级执行、并发限制、重试与中断恢复"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.manager = EventManager(DatabaseManager(self.db_path))
+        self.executed = []
+        self.lock = threading.Lock()
+        self.scheduler = None
+
+    def tearDown(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _complete(self, event):
+        """模拟处理逻辑：记录执行顺序并标记为完成"""
+        with self.lock:
+            self.executed.append(event.title)
+        self.manager.update_event_status(event.event_id, EventStatus.COMPLETED)
+        return f'done:{event.title}'
+
+    def _create(self, title, priority=EventPriority.MEDIUM, event_type=EventType.NOTIFICATION):
+        return self.manager.create_event(title, '', event_type, priority)
+
+    def test_priority_order(self):
+        self._create('low', EventPriority.LOW)
+        self._create('urgent', EventPriority.URGENT)
+        self._create('medium', EventPriority.MEDIUM)
+        self._create('high', EventPriority.HIGH)
+
+        self.scheduler = EventScheduler(self.manager, self._complete, max_workers=1, type_limits={})
+        self.assertEqual(self.scheduler.load_pending(), 4)
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.wait_idle(5))
+        self.assertEqual(self.executed, ['urgent', 'high', 'medium', 'low'])
+        self.assertEqual(self.manager.get_statistics()['completed'], 4)
+
+    def test_type_concurrency_limit(self):
+        running = {'task': 0, 'max_task': 0}
+
+        def handler(event):
+            if event.event_type == EventType.TASK:
+                with self.lock:
+                    running['task'] += 1
+                    running['max_task'] = max(running['max_task'], running['task'])
+                time.sleep(0.02)
+                with self.lock:
+                    running['task'] -= 1
+            return self._complete(event)
+
+        for i in range(4):
+            self._create(f'task{i}', event_type=EventType.TASK)
+            self._create(f'notice{i}')
+
+        self.scheduler = EventScheduler(self.manager, handler, max_workers=3, type_limits={'task': 1})
+        self.scheduler.load_pending()
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.wait_idle(5))
+        self.assertEqual(len(self.executed), 8)
+        self.assertEqual(running['max_task'], 1)
+
+    def test_retry_with_backoff(self):
+        event = self._create('flaky')
+        calls = []
+        results = []
+
+        def handler(evt):
+            calls.append(evt.event_id)
+            if len(calls) < 3:
+                raise RuntimeError('temporary error')
+            return self._complete(evt)
+
+        self.scheduler = EventScheduler(self.manager, handler, max_workers=1, max_retries=3,
+                                        retry_base_seconds=0.01)
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.submit(event.event_id, callback=lambda *args: results.append(args)))
+        deadline = time.monotonic() + 5
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(results, [(event.event_id, 'done:flaky', None)])
+        self.assertEqual(self.manager.get_event(event.event_id).status, EventStatus.COMPLETED)
+        self.assertEqual(self.manager.get_event_attempts(event.event_id), 3)
+        self.assertEqual(self.scheduler.get_statistics()['retried'], 2)
+
+    def test_retries_exhausted(self):
+        event = self._create('broken')
+        results = []
+
+        def handler(evt):
+            raise RuntimeError('always fails')
+
+        self.scheduler = EventScheduler(self.manager, handler, max_workers=1, max_retries=1,
+                                        retry_base_seconds=0.01, on_result=lambda *args: results.append(args))
+        self.scheduler.load_pending()
+        self.scheduler.start()
+        deadline = time.monotonic() + 5
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0][2], RuntimeError)
+        self.assertEqual(self.manager.get_event(event.event_id).status, EventStatus.FAILED)
+        log_types = [log['log_type'] for log in self.manager.get_event_logs(event.event_id)]
+        self.assertEqual(log_types, ['retry_scheduled', 'status_change'])
+
+    def test_recover_interrupted(self):
+        event = self._create('interrupted')
+        # 模拟进程在执行中退出：事件已被领取但没有释放
+        self.assertTrue(self.manager.claim_event(event.event_id))
+        self.assertFalse(self.manager.claim_event(event.event_id))
+
+        self.scheduler = EventScheduler(self.manager, self._complete, max_workers=1)
+        self.scheduler.start()
+        self.scheduler.load_pending()
+        self.assertTrue(self.scheduler.wait_idle(5))
+        self.assertEqual(self.executed, ['interrupted'])
+        self.assertEqual(self.scheduler.get_statistics()['recovered'], 1)
+
+    def test_requeue_bypasses_result_cache(self):
+        event = self._create('rerun')
+        self.scheduler = EventScheduler(self.manager, self._complete, max_workers=1)
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.submit(event.event_id))
+        self.assertTrue(self.scheduler.wait_idle(5))
+        self.assertNotIn('bypass_result_cache', self.manager.get_event(event.event_id).metadata)
+
+        # 用户重新触发已完成的事件时，子智能体不复用缓存结果
+        self.assertTrue(self.scheduler.submit(event.event_id, requeue=True))
+        self.assertTrue(self.scheduler.wait_idle(5))
+        self.assertEqual(self.executed, ['rerun', 'rerun'])
+        self.assertTrue(self.manager.get_event(event.event_id).metadata['bypass_result_cache'])
+
+    def test_pending_query_uses_index(self):
+        with self.manager.db.get_connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute('''
+                EXPLAIN QUERY PLAN SELECT * FROM events WHERE status = ?
+                ORDER BY priority DESC, created_at ASC LIMIT 10
+            ''', (EventStatus.PENDING.value,)).fetchall())
+        self.assertIn('idx_events_status_priority', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_parse_type_limits(self):
+        self.assertEqual(parse_type_limits('task:1, notification:3,bad,x:y'), {'task': 1, 'notification': 3})
+
+
+
+class FlakyChatModel:
+    """前几次调用抛出异常的聊天模型"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError('connection reset')
+        return SimpleNamespace(content='日程马上开始啦')
+
+
+class TestChatAgentRetry(unittest.TestCase):
+    """测试通过 ChatAgent.execute_event 处理事件时，LLM错误和任务失败会触发重试"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.manager = EventManager(self.db)
+        self.model = FlakyChatModel(failures=2)
+
+        backend = LangChainLLM.__new__(LangChainLLM)
+        backend.model_type, backend.model_name, backend.llm = ModelType.MAIN, 'fake', self.model
+        llm = SiliconFlowLLM.__new__(SiliconFlowLLM)
+        llm.model_router = SimpleNamespace(route=lambda task_type: backend)
+
+        self.agent = ChatAgent.__new__(ChatAgent)
+        self.agent.db, self.agent.event_manager, self.agent.llm = self.db, self.manager, llm
+        self.agent.system_prompt = ''
+        self.agent.character = SimpleNamespace(name='小助手', get_info_dict=lambda: {})
+        self.agent.multi_agent_coordinator = MagicMock()
+        self.results = []
+        self.scheduler = EventScheduler(self.manager, self.agent.execute_event, max_workers=1,
+                                        max_retries=3, retry_base_seconds=0.01)
+        self.scheduler.start()
+
+    def tearDown(self):
+        self.scheduler.stop()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _run(self, event_type):
+        event = self.manager.create_event('日程提醒', '会议15分钟后开始', event_type, EventPriority.MEDIUM)
+        self.assertTrue(self.scheduler.submit(event.event_id, callback=lambda *args: self.results.append(args)))
+        deadline = time.monotonic() + 5
+        while not self.results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return event
+
+    def test_notification_llm_error_is_retried(self):
+        event = self._run(EventType.NOTIFICATION)
+
+        self.assertEqual(self.model.calls, 3)
+        self.assertIn('日程马上开始啦', self.results[0][1])
+        self.assertIsNone(self.results[0][2])
+        self.assertEqual(self.manager.get_event(event.event_id).status, EventStatus.COMPLETED)
+        self.assertEqual(self.scheduler.get_statistics()['retried'], 2)
+
+    def test_failed_task_is_retried(self):
+        coordinator = self.agent.multi_agent_coordinator
+        coordinator.process_task_event.side_effect = [
+            {'success': False, 'error': '执行失败于步骤1：数据源不可用', 'execution_results': []},
+            {'success': True, 'execution_results': [{'output': '周报已完成'}]},
+        ]
+        event = self._run(EventType.TASK)
+
+        self.assertEqual(coordinator.process_task_event.call_count, 2)
+        self.assertEqual(self.results[0][1:], ('周报已完成', None))
+        self.assertEqual(self.manager.get_event(event.event_id).status, EventStatus.COMPLETED)
+
+
+if __name__ == '__main__':
+    unittest.main()
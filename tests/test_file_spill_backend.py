@@ -0,0 +1,138 @@
+"""
+大文件转存后端测试
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from typing import Annotated, Any, Dict, TypedDict
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from deepagents.backends.utils import create_file_data, slice_read_response
+from deepagents.middleware.filesystem import _file_data_reducer
+from langgraph.graph import StateGraph, START, END
+
+from src.core.file_spill_backend import BlobStore, SpillingStateBackend, SPILL_KEY
+
+
+class TestBlobStore(unittest.TestCase):
+    """测试内容寻址存储和行窗口读取"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = BlobStore(self.root, ttl_hours=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_same_content_stored_once(self):
+        """相同内容只保存一份"""
+        first, size = self.store.put('你好\n世界\n')
+        second, _ = self.store.put('你好\n世界\n')
+
+        self.assertEqual(first, second)
+        self.assertEqual(size, len('你好\n世界\n'.encode('utf-8')))
+        self.assertEqual(self.store.read_text(first), '你好\n世界\n')
+
+    def test_read_lines_matches_state_backend(self):
+        """行窗口与状态后端的切分结果一致（包括CRLF和没有结尾换行的情况）"""
+        content = ''.join(f'第{i}行\r\n' if i % 3 == 0 else f'line {i}\n' for i in range(50)) + '最后一行'
+        digest, _ = self.store.put(content)
+        file_data = create_file_data(content)
+
+        for offset, limit in [(0, 10), (7, 5), (45, 100), (50, 1)]:
+            window, total = self.store.read_lines(digest, offset, limit)
+            expected = slice_read_response(file_data, offset, limit)
+            self.assertEqual(total, 51)
+            self.assertEqual(window.replace('\r\n', '\n'), expected.file_data['content'].replace('\r\n', '\n'))
+
+        self.assertEqual(self.store.read_lines(digest, 51, 10), ('', 51))
+
+    def test_prune_expired(self):
+        """超过有效期未访问的内容被删除"""
+        digest, _ = self.store.put('old content')
+        self.assertEqual(self.store.prune(now=time.time() + 1800), 0)
+        self.assertEqual(self.store.prune(now=time.time() + 7200), 1)
+        self.assertFalse(self.store.exists(digest))
+
+    def test_read_refreshes_expiry(self):
+        """最近读取过的内容不会被清理"""
+        digest, _ = self.store.put('line 1\nline 2\n')
+        path = self.store._path(digest)
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+        self.store.read_lines(digest, 0, 1)
+        self.assertEqual(self.store.prune(), 0)
+
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+        self.store.read_text(digest)
+        self.assertEqual(self.store.prune(), 0)
+        self.assertTrue(self.store.exists(digest))
+
+
+class FilesState(TypedDict):
+    files: Annotated[Dict[str, Any], _file_data_reducer]
+    result: str
+
+
+class TestSpillingStateBackend(unittest.TestCase):
+    """测试图状态中只保留引用，读取时取回原始内容"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.backend = SpillingStateBackend(BlobStore(self.root), threshold_bytes=1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def run_graph(self, content: str, offset: int = 0, limit: int = 2000):
+        """在图节点中写入并读取文件"""
+        backend = self.backend
+
+        def write_node(state):
+            backend.write('/result.txt', content)
+            return {}
+
+        def read_node(state):
+            result = backend.read('/result.txt', offset, limit)
+            return {'result': result.error or result.file_data['content']}
+
+        graph = StateGraph(FilesState)
+        graph.add_node('write', write_node)
+        graph.add_node('read', read_node)
+        graph.add_edge(START, 'write')
+        graph.add_edge('write', 'read')
+        graph.add_edge('read', END)
+        return graph.compile().invoke({'files': {}, 'result': ''})
+
+    def test_large_file_spilled(self):
+        """大文件在状态中只保留占位和哈希"""
+        content = '\n'.join(f'搜索结果 {i}' for i in range(500))
+        state = self.run_graph(content)
+
+        stored = state['files']['/result.txt']
+        self.assertIn(SPILL_KEY, stored)
+        self.assertLess(len(stored['content']), 100)
+        self.assertEqual(state['result'], content)
+
+    def test_line_window(self):
+        """读取转存文件的部分行"""
+        content = '\n'.join(f'line {i}' for i in range(500))
+        state = self.run_graph(content, offset=100, limit=3)
+
+        self.assertEqual(state['result'], 'line 100\nline 101\nline 102\n')
+
+    def test_small_file_inline(self):
+        """小文件仍保存在状态中"""
+        state = self.run_graph('short')
+
+        self.assertNotIn(SPILL_KEY, state['files']['/result.txt'])
+        self.assertEqual(state['result'], 'short')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+知识维护引擎测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.knowledge_maintenance import KnowledgeMaintenanceEngine
+
+
+class TestKnowledgeMaintenance(unittest.TestCase):
+    """测试知识衰减与清理"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.engine = KnowledgeMaintenanceEngine(
+            self.db, max_related_info_per_entity=3, interval_hours=24
+        )
+        self.entity_uuid = self.db.find_or_create_entity('用户')
+        self.now = datetime(2025, 6, 1, 12, 0, 0)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _insert(self, info_uuid, content, days_ago, status=DatabaseManager.STATUS_SUSPECTED,
+                confidence=0.7, mention_count=1):
+        mentioned = (self.now - timedelta(days=days_ago)).isoformat()
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                INSERT INTO entity_related_info
+                (uuid, entity_uuid, content, type, confidence, status, mention_count, last_mentioned_at, created_at)
+                VALUES (?, ?, ?, '其他', ?, ?, ?, ?, ?)
+            ''', (info_uuid, self.entity_uuid, content, confidence, status, mention_count, mentioned, mentioned))
+
+    def _rows(self):
+        return {r['uuid']: r for r in self.db.get_entity_related_info(self.entity_uuid)}
+
+    def test_decay_and_archive_stale(self):
+        """测试衰减置信度并归档过期疑似知识"""
+        self._insert('fresh', '喜欢历史', days_ago=0)
+        self._insert('aging', '住在北京', days_ago=30)
+        self._insert('stale', '养了一只猫', days_ago=90)
+
+        report = self.engine.run(self.now)
+
+        rows = self._rows()
+        self.assertEqual(set(rows), {'fresh', 'aging'})
+        self.assertAlmostEqual(rows['fresh']['confidence'], 0.7)
+        self.assertAlmostEqual(rows['aging']['confidence'], 0.35, places=3)
+        self.assertEqual(report['archived_count'], 1)
+        self.assertEqual(report['archived'][0]['reason'], KnowledgeMaintenanceEngine.REASON_STALE)
+        self.assertEqual(self.engine.get_archived_info()[0]['uuid'], 'stale')
+
+    def test_decay_is_not_applied_twice(self):
+        """测试重复运行只衰减上次维护之后经过的时间"""
+        self._insert('aging', '住在北京', days_ago=30)
+        self.engine.run(self.now)
+        self.engine.run(self.now)
+        self.assertAlmostEqual(self._rows()['aging']['confidence'], 0.35, places=3)
+
+    def test_confirmed_knowledge_is_demoted(self):
+        """测试长期未提及的确认知识降级为疑似"""
+        self._insert('old_fact', '是一名学生', days_ago=200, status=DatabaseManager.STATUS_CONFIRMED)
+
+        report = self.engine.run(self.now)
+
+        rows = self._rows()
+        self.assertEqual(report['demoted'], 1)
+        self.assertEqual(rows['old_fact']['status'], DatabaseManager.STATUS_SUSPECTED)
+
+    def test_demoted_knowledge_gets_observation_period(self):
+        """测试降级后的知识不会在下一次维护时立即按过期归档"""
+        self._insert('old_fact', '是一名学生', days_ago=240, status=DatabaseManager.STATUS_CONFIRMED)
+        self.assertEqual(self.engine.run(self.now)['demoted'], 1)
+        self.assertTrue(self._rows()['old_fact']['demoted_at'])
+
+        report = self.engine.run(self.now + timedelta(days=1))
+        self.assertEqual(report['archived_count'], 0)
+        self.assertIn('old_fact', self._rows())
+
+        for day in range(2, 62):
+            self.engine.run(self.now + timedelta(days=day))
+        self.assertNotIn('old_fact', self._rows())
+
+    def test_regularly_mentioned_fact_survives(self):
+        """测试定期被再次提及的确认知识不会因累积衰减被降级或归档"""
+        self._insert('fact', '是一名学生', days_ago=0, status=DatabaseManager.STATUS_CONFIRMED, mention_count=3)
+        for day in range(7, 729, 7):
+            moment = self.now + timedelta(days=day)
+            self.engine.run(moment)
+            if day % 56 == 0:
+                self.db.add_entity_related_info(self.entity_uuid, '是一名学生', confidence=0.7)
+                with self.db.get_connection() as conn:
+                    conn.execute('UPDATE entity_related_info SET last_mentioned_at = ? WHERE uuid = ?',
+                                 (moment.isoformat(), 'fact'))
+
+        row = self._rows()['fact']
+        self.assertEqual(row['status'], DatabaseManager.STATUS_CONFIRMED)
+        self.assertGreater(row['confidence'], self.engine.demote_confidence)
+        self.assertEqual(self.engine.get_archived_info(), [])
+
+    def test_capacity_limit(self):
+        """测试单实体容量限制保留优先级最高的条目"""
+        self._insert('confirmed', '事实A', days_ago=1, status=DatabaseManager.STATUS_CONFIRMED)
+        self._insert('popular', '事实B', days_ago=1, mention_count=2)
+        self._insert('recent', '事实C', days_ago=0)
+        self._insert('weak', '事实D', days_ago=5, confidence=0.3)
+
+        report = self.engine.run(self.now)
+
+        self.assertEqual(set(self._rows()), {'confirmed', 'popular', 'recent'})
+        self.assertEqual(report['archived'][0]['reason'], KnowledgeMaintenanceEngine.REASON_OVER_CAPACITY)
+
+    def test_run_if_due(self):
+        """测试维护周期判断"""
+        self.assertIsNotNone(self.engine.run_if_due(self.now))
+        self.assertIsNone(self.engine.run_if_due(self.now + timedelta(hours=1)))
+        self.assertIsNotNone(self.engine.run_if_due(self.now + timedelta(hours=25)))
+
+
+if __name__ == '__main__':
+    unittest.main()
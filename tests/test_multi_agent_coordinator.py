@@ -0,0 +1,118 @@
+"""
+多智能体协调器传统流程测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.event_manager import TaskEvent, EventPriority
+from src.core.multi_agent_coordinator import MultiAgentCoordinator
+
+
+class TestTraditionalStepScheduling(unittest.TestCase):
+    """测试传统流程按计划中的依赖并发执行步骤"""
+
+    def setUp(self):
+        with patch('builtins.print'):
+            self.coordinator = MultiAgentCoordinator(question_tool=MagicMock(), use_dynamic_graph=False)
+        self.coordinator.dag_executor.max_concurrency = 3
+        self.task = TaskEvent(event_id='task-1', title='准备周报', description='', priority=EventPriority.MEDIUM)
+
+    def _plan(self, plan_text):
+        planner = MagicMock()
+        planner.execute_task.return_value = plan_text
+        with patch('src.core.multi_agent_coordinator.create_sub_agent', return_value=planner):
+            return self.coordinator._create_execution_plan(self.task, {'summary': '周报'})
+
+    def test_parse_dependencies(self):
+        plan = self._plan('步骤1：收集数据（依赖：无）\n'
+                          '步骤2：整理会议记录（依赖：无）\n'
+                          '步骤3：撰写周报（依赖：步骤1、步骤2）\n'
+                          '步骤4：发送周报\n'
+                          '步骤5：归档（依赖：步骤5、步骤9）')
+        self.assertEqual([step['description'] for step in plan['steps']],
+                         ['收集数据', '整理会议记录', '撰写周报', '发送周报', '归档'])
+        # 未标注依赖时依赖上一步；对自身或不存在步骤的依赖被忽略
+        self.assertEqual([step['dependencies'] for step in plan['steps']], [[], [], [0, 1], [2], []])
+
+    def _run(self, plan_text, execute_step):
+        understand = {'success': True, 'summary': '周报'}
+        with patch.object(self.coordinator, '_understand_task', return_value=understand), \
+                patch.object(self.coordinator, '_create_execution_plan', return_value=self._plan(plan_text)), \
+                patch.object(self.coordinator, '_execute_step', side_effect=execute_step), \
+                patch('builtins.print'):
+            return self.coordinator._process_task_event_traditional(self.task, {})
+
+    def test_independent_steps_run_concurrently(self):
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+        seen = {}
+
+        def execute_step(step, task_event, character_context, previous_results):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            seen[step['description']] = [r['output'] for r in previous_results]
+            return {'success': True, 'step': step['description'], 'output': step['description'].upper(),
+                    'needs_user_input': False}
+
+        result = self._run('步骤1：a（依赖：无）\n步骤2：b（依赖：无）\n步骤3：c（依赖：无）\n'
+                           '步骤4：d（依赖：步骤1、步骤3）', execute_step)
+        self.assertTrue(result['success'])
+        self.assertEqual(active['max'], 3)
+        # 每个步骤只拿到它依赖的结果，结果按计划顺序返回
+        self.assertEqual(seen, {'a': [], 'b': [], 'c': [], 'd': ['A', 'C']})
+        self.assertEqual([r['output'] for r in result['execution_results']], ['A', 'B', 'C', 'D'])
+        timings = [log for log in result['collaboration_logs'] if log['action'] == '步骤耗时']
+        self.assertEqual(len(timings), 4)
+
+    def test_failure_stops_dependents(self):
+        executed = []
+
+        def execute_step(step, task_event, character_context, previous_results):
+            executed.append(step['description'])
+            if step['description'] == 'a':
+                return {'success': False, 'step': 'a', 'error': '数据源不可用'}
+            return {'success': True, 'step': step['description'], 'output': 'ok', 'needs_user_input': False}
+
+        result = self._run('步骤1：a\n步骤2：b\n步骤3：c', execute_step)
+        self.assertFalse(result['success'])
+        self.assertEqual(executed, ['a'])
+        self.assertIn('步骤1', result['error'])
+        self.assertIn('数据源不可用', result['execution_results'][-1]['output'])
+
+    def test_failure_result_is_last(self):
+        def execute_step(step, task_event, character_context, previous_results):
+            if step['description'] == 'a':
+                time.sleep(0.05)
+                return {'success': False, 'step': 'a', 'error': '数据源不可用'}
+            return {'success': True, 'step': step['description'], 'output': 'ok', 'needs_user_input': False}
+
+        result = self._run('步骤1：a（依赖：无）\n步骤2：b（依赖：无）', execute_step)
+        self.assertFalse(result['success'])
+        self.assertEqual(len(result['execution_results']), 2)
+        self.assertIn('数据源不可用', result['execution_results'][-1]['output'])
+
+    def test_user_question_answered(self):
+        def execute_step(step, task_event, character_context, previous_results):
+            return {'success': True, 'step': step['description'], 'output': '请问截止日期？',
+                    'needs_user_input': True, 'question': '请问截止日期？', 'context': step['description']}
+
+        self.coordinator.question_tool.ask_user.return_value = '周五'
+        result = self._run('步骤1：确认截止日期', execute_step)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['execution_results'][0]['user_answer'], '周五')
+
+
+if __name__ == '__main__':
+    unittest.main()
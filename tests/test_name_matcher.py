@@ -0,0 +1,129 @@
+"""
+名称索引匹配测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.name_matcher import (
+    AhoCorasickMatcher, EnvironmentNameIndex, derive_aliases,
+    KIND_ENVIRONMENT, KIND_DOMAIN, KIND_OBJECT
+)
+from src.tools.agent_vision import AgentVisionTool
+
+
+class TestAhoCorasickMatcher(unittest.TestCase):
+    """测试多模式匹配自动机"""
+
+    def test_overlapping_matches(self):
+        matcher = AhoCorasickMatcher()
+        for word in ('he', 'she', 'his', 'hers', 'us'):
+            matcher.add(word, word)
+        found = {(start, pattern) for start, _, pattern, _ in matcher.find_all('ushers')}
+        self.assertEqual(found, {(0, 'us'), (1, 'she'), (2, 'he'), (2, 'hers')})
+
+    def test_add_after_build_rebuilds(self):
+        matcher = AhoCorasickMatcher()
+        matcher.add('厨房', 1)
+        self.assertEqual(len(matcher.find_all('去厨房')), 1)
+        matcher.add('厨房', 2)
+        matcher.add('花园', 3)
+        matches = matcher.find_all('从花园去厨房')
+        self.assertEqual([m[2] for m in matches], ['花园', '厨房'])
+        self.assertEqual(matches[1][3], [1, 2])
+
+    def test_derive_aliases(self):
+        self.assertEqual(derive_aliases('小可的房间'), ['房间'])
+        self.assertEqual(derive_aliases('厨房（一楼）'), ['厨房'])
+        self.assertEqual(derive_aliases('花园'), [])
+
+
+class TestEnvironmentNameIndex(unittest.TestCase):
+    """测试名称解析与按距离排序"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.index = EnvironmentNameIndex(self.db)
+
+        self.bedroom = self.db.create_environment('小可的房间', '小房间')
+        self.hallway = self.db.create_environment('走廊', '长走廊')
+        self.study = self.db.create_environment('书房', '安静的书房')
+        self.library = self.db.create_environment('图书馆', '很远的图书馆')
+        self.db.create_environment_connection(self.bedroom, self.hallway, 'door')
+        self.db.create_environment_connection(self.hallway, self.study, 'door')
+        self.db.create_environment_connection(self.study, self.library, 'door')
+        self.db.set_active_environment(self.hallway)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_alias_match(self):
+        candidates = self.index.resolve('回房间吧', self.hallway)
+        self.assertEqual(candidates[0]['uuid'], self.bedroom)
+        self.assertTrue(candidates[0]['alias'])
+        self.assertEqual(candidates[0]['distance'], 1)
+
+    def test_rank_by_distance(self):
+        self.db.add_environment_object(self.library, '书架', '高大的书架')
+        self.db.add_environment_object(self.study, '书桌', '木质书桌')
+        shelf_near = self.db.add_environment_object(self.study, '书架', '小书架')
+        candidates = self.index.resolve('去书架那边', self.hallway, kinds=(KIND_OBJECT,))
+        self.assertEqual(candidates[0]['uuid'], shelf_near)
+        self.assertEqual([c['distance'] for c in candidates], [1, 2])
+
+    def test_exact_name_beats_nearer_alias(self):
+        """完整名称优先于更近环境的别名，完整名称内部的别名片段不作为候选"""
+        living_room = self.db.create_environment('客厅', '宽敞的客厅')
+        mom_room = self.db.create_environment('妈妈的房间', '整洁的房间')
+        self.db.create_environment_connection(living_room, mom_room, 'door')
+        self.db.create_environment_connection(mom_room, self.bedroom, 'door')
+
+        candidates = self.index.resolve('我想去小可的房间看看', living_room)
+        self.assertEqual(candidates[0]['uuid'], self.bedroom)
+        self.assertFalse(candidates[0]['alias'])
+        self.assertEqual(candidates[0]['distance'], 2)
+        self.assertNotIn(mom_room, [c['uuid'] for c in candidates])
+
+    def test_single_character_object_not_registered(self):
+        """单字物体名不参与匹配"""
+        self.db.add_environment_object(self.study, '床', '单人床')
+        self.assertEqual(self.index.resolve('起床了', self.hallway, kinds=(KIND_OBJECT,)), [])
+
+    def test_object_resolves_to_environment(self):
+        self.db.add_environment_object(self.library, '古籍', '珍贵的古籍')
+        vision = AgentVisionTool(self.db)
+        intent = vision.detect_environment_switch_intent('我想去看看古籍')
+        self.assertEqual(intent['to_env']['uuid'], self.library)
+        self.assertEqual(intent['route'], ['走廊', '书房', '图书馆'])
+        self.assertEqual(intent['matched_text'], '古籍')
+
+    def test_rebuild_after_new_environment(self):
+        self.assertEqual(self.index.resolve('去阳台'), [])
+        balcony = self.db.create_environment('阳台', '能看到风景')
+        candidates = self.index.resolve('去阳台')
+        self.assertEqual(candidates[0]['uuid'], balcony)
+        self.assertIsNone(candidates[0]['distance'])
+
+    def test_domain_intent(self):
+        school = self.db.create_domain('学校', '校园')
+        self.db.add_environment_to_domain(school, self.library)
+        candidates = self.index.resolve('去学校', self.hallway, kinds=(KIND_DOMAIN, KIND_ENVIRONMENT))
+        self.assertEqual(candidates[0]['kind'], KIND_DOMAIN)
+        self.assertEqual(candidates[0]['distance'], 2)
+
+        vision = AgentVisionTool(self.db)
+        intent = vision.detect_domain_switch_intent('我们去学校吧')
+        self.assertEqual(intent['to_domain']['uuid'], school)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,12 +8,15 @@ import os
 import json
 import tempfile
 import shutil
+import threading
+import time
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.nps.nps_registry import NPSRegistry, NPSTool
 from src.nps.nps_invoker import NPSInvoker
+from src.nps.nps_cache import NPSResultCache
 
 
 class TestNPSTool(unittest.TestCase):
@@ -154,7 +157,9 @@ def test_execute(context):
             'description': '自动注册测试',
             'module': 'test_module',
             'function': 'test_execute',
-            'keywords': ['测试']
+            'keywords': ['测试'],
+            'timeout': 3,
+            'cache_ttl': 'soon'
         }
         nps_path = os.path.join(self.temp_dir, 'test_module.NPS')
         with open(nps_path, 'w', encoding='utf-8') as f:
@@ -169,6 +174,8 @@ def test_execute(context):
         tool = self.registry.get_tool('test_module')
         self.assertIsNotNone(tool)
         self.assertEqual(tool.name, '测试模块')
+        self.assertEqual(tool.timeout, 3)
+        self.assertIsNone(tool.cache_ttl)
 
     def test_get_statistics(self):
         """测试获取统计信息"""
@@ -297,6 +304,124 @@ class TestNPSInvoker(unittest.TestCase):
         self.assertIsNotNone(context)
         self.assertIn('测试上下文', context)
 
+    def test_tools_run_concurrently(self):
+        """测试相关工具并发执行，总耗时不是各工具耗时之和"""
+        def slow_func(context):
+            time.sleep(0.3)
+            return {'context': '慢速结果'}
+
+        for i in range(3):
+            self.registry.register_tool(NPSTool(
+                tool_id=f'slow_{i}',
+                name=f'慢速工具{i}',
+                description='测试',
+                keywords=['查询'],
+                execute_func=slow_func
+            ))
+
+        started = time.monotonic()
+        result = self.invoker.invoke_relevant_tools('查询一下', use_llm=False)
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(len(result['tools_invoked']), 3)
+        self.assertEqual(result['context_info'].count('慢速结果'), 3)
+
+    def test_timed_out_tool_dropped(self):
+        """测试超时的工具不进入上下文，并按工具统计超时和失败"""
+        release = threading.Event()
+
+        def hanging_func(context):
+            release.wait(5)
+            return {'context': '迟到的结果'}
+
+        def failing_func(context):
+            raise RuntimeError('服务不可用')
+
+        self.registry.register_tool(NPSTool(
+            tool_id='hanging', name='卡住的工具', description='测试',
+            keywords=['天气'], execute_func=hanging_func, timeout=0.1
+        ))
+        self.registry.register_tool(NPSTool(
+            tool_id='failing', name='失败的工具', description='测试',
+            keywords=['天气'], execute_func=failing_func
+        ))
+        self.registry.register_tool(NPSTool(
+            tool_id='quick', name='快速工具', description='测试',
+            keywords=['天气'], execute_func=lambda context: {'context': '晴'}
+        ))
+
+        try:
+            started = time.monotonic()
+            result = self.invoker.invoke_relevant_tools('今天天气', use_llm=False)
+            elapsed = time.monotonic() - started
+        finally:
+            release.set()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(result['context_info'], '[快速工具] 晴')
+        timed_out = [r for r in result['tools_invoked'] if r.get('timed_out')]
+        self.assertEqual([r['tool_id'] for r in timed_out], ['hanging'])
+
+        stats = self.invoker.get_statistics()['tool_stats']
+        self.assertEqual(stats['hanging'], {'calls': 1, 'timeouts': 1, 'failures': 0, 'cache_hits': 0})
+        self.assertEqual(stats['failing'], {'calls': 1, 'timeouts': 0, 'failures': 1, 'cache_hits': 0})
+        self.assertEqual(stats['quick'], {'calls': 1, 'timeouts': 0, 'failures': 0, 'cache_hits': 0})
+
+    def test_repeated_invocation_served_from_cache(self):
+        """测试声明了 cache_ttl 的工具在有效期内复用归一化后相同查询的结果"""
+        executions = []
+
+        def search_func(context):
+            executions.append(context['user_input'])
+            return {'context': f'结果{len(executions)}'}
+
+        self.registry.register_tool(NPSTool(
+            tool_id='search', name='搜索', description='测试',
+            keywords=['搜索'], execute_func=search_func, cache_ttl=60
+        ))
+
+        first = self.invoker.invoke_relevant_tools('搜索 猫咪', use_llm=False)
+        second = self.invoker.invoke_relevant_tools('搜索猫咪！', use_llm=False)
+        third = self.invoker.invoke_relevant_tools('搜索狗', use_llm=False)
+
+        self.assertEqual(len(executions), 2)
+        self.assertEqual(second['context_info'], first['context_info'])
+        self.assertTrue(second['tools_invoked'][0]['cached'])
+        self.assertEqual(third['context_info'], '[搜索] 结果2')
+
+        stats = self.invoker.get_statistics()
+        self.assertEqual(stats['tool_stats']['search']['cache_hits'], 1)
+        self.assertEqual(stats['tool_cache']['hits'], 1)
+        self.assertEqual(stats['tool_cache']['misses'], 2)
+
+    def test_uncacheable_results(self):
+        """测试未声明 cache_ttl 的工具和返回失败的工具不缓存"""
+        executions = []
+
+        def plain_func(context):
+            executions.append('plain')
+            return {'context': '结果'}
+
+        def failing_search(context):
+            executions.append('failing')
+            return {'success': False, 'error': '缺少API密钥'}
+
+        self.registry.register_tool(NPSTool(
+            tool_id='plain', name='普通工具', description='测试',
+            keywords=['测试'], execute_func=plain_func
+        ))
+        self.registry.register_tool(NPSTool(
+            tool_id='failing_search', name='失败的搜索', description='测试',
+            keywords=['测试'], execute_func=failing_search, cache_ttl=60
+        ))
+
+        self.invoker.invoke_relevant_tools('测试', use_llm=False)
+        self.invoker.invoke_relevant_tools('测试', use_llm=False)
+
+        self.assertEqual(executions.count('plain'), 2)
+        self.assertEqual(executions.count('failing'), 2)
+
     def test_format_nps_prompt(self):
         """测试格式化NPS提示词"""
         context_info = "当前时间：15:30"
@@ -306,6 +431,42 @@ class TestNPSInvoker(unittest.TestCase):
         self.assertIn('当前时间：15:30', prompt)
 
 
+class TestNPSResultCache(unittest.TestCase):
+    """测试 NPSResultCache 类"""
+
+    def test_expiry(self):
+        """测试过期的条目不再返回"""
+        cache = NPSResultCache()
+        cache.put('key', {'success': True}, ttl=1, now=100.0)
+
+        self.assertEqual(cache.get('key', now=100.5), {'success': True})
+        self.assertIsNone(cache.get('key', now=101.0))
+        self.assertEqual(cache.get_statistics()['expired'], 1)
+
+    def test_lru_eviction(self):
+        """测试超出上限时淘汰最久未使用的条目"""
+        cache = NPSResultCache(max_entries=2)
+        cache.put('a', {'v': 1}, ttl=60)
+        cache.put('b', {'v': 2}, ttl=60)
+        cache.get('a')
+        cache.put('c', {'v': 3}, ttl=60)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get_statistics()['evictions'], 1)
+
+    def test_key_normalizes_query(self):
+        """测试缓存键忽略查询中的空白、标点和时限参数"""
+        self.assertEqual(
+            NPSResultCache.make_key('websearch', {'user_input': '今天 的新闻？', 'timeout': 8}),
+            NPSResultCache.make_key('websearch', {'user_input': '今天新闻', 'timeout': 2})
+        )
+        self.assertNotEqual(
+            NPSResultCache.make_key('websearch', {'query': '新闻'}),
+            NPSResultCache.make_key('systime', {'query': '新闻'})
+        )
+
+
 class TestSysTimeModule(unittest.TestCase):
     """测试 SysTime 示例模块"""
 
@@ -0,0 +1,89 @@
+"""
+提示词管理器测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.prompt_manager import PromptManager, CompiledPrompt
+
+
+class TestCompiledPrompt(unittest.TestCase):
+    """测试编译后的模板"""
+
+    def test_render_variables(self):
+        """测试变量替换"""
+        compiled = CompiledPrompt("你好，{name}！今天是{day}。{name}再见")
+        self.assertEqual(compiled.placeholders, frozenset({'name', 'day'}))
+        self.assertEqual(
+            compiled.render({'name': '小可', 'day': '周一'}),
+            "你好，小可！今天是周一。小可再见"
+        )
+
+    def test_missing_and_none_variables(self):
+        """测试缺失变量保留占位符，None渲染为空字符串"""
+        compiled = CompiledPrompt("A{x}B{y}C")
+        self.assertEqual(compiled.render({'x': None}), "AB{y}C")
+
+    def test_non_placeholder_braces(self):
+        """测试JSON等非占位符花括号原样保留"""
+        template = '输出格式：{"score": 0, "tone": "{tone}"}'
+        compiled = CompiledPrompt(template)
+        self.assertEqual(compiled.render({'tone': '温和'}), '输出格式：{"score": 0, "tone": "温和"}')
+
+    def test_values_are_not_rendered_again(self):
+        """测试变量值中的占位符不会被二次替换"""
+        compiled = CompiledPrompt("{a}-{b}")
+        self.assertEqual(compiled.render({'a': '{b}', 'b': 'x'}), "{b}-x")
+
+
+class TestPromptManagerCache(unittest.TestCase):
+    """测试提示词缓存与热加载"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, 'system'))
+        self.prompt_path = os.path.join(self.temp_dir, 'system', 'demo.md')
+        with open(self.prompt_path, 'w', encoding='utf-8') as f:
+            f.write("版本一：{name}")
+        self.manager = PromptManager(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_compiled_prompt_is_cached(self):
+        """测试文件未修改时复用编译结果"""
+        first = self.manager.load_compiled_prompt('system', 'demo')
+        second = self.manager.load_compiled_prompt('system', 'demo')
+        self.assertIs(first, second)
+
+    def test_hot_reload_on_change(self):
+        """测试文件修改后自动重新加载"""
+        self.assertEqual(self.manager.get_system_prompt('demo', {'name': 'A'}), "版本一：A")
+
+        with open(self.prompt_path, 'w', encoding='utf-8') as f:
+            f.write("版本二（已修改）：{name}")
+        # 确保mtime发生变化
+        stat = os.stat(self.prompt_path)
+        os.utime(self.prompt_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(self.manager.get_system_prompt('demo', {'name': 'A'}), "版本二（已修改）：A")
+
+    def test_missing_file(self):
+        """测试文件不存在时抛出异常"""
+        with self.assertRaises(FileNotFoundError):
+            self.manager.load_prompt('system', 'not_exists')
+
+    def test_render_prompt_accepts_string(self):
+        """测试render_prompt兼容字符串模板"""
+        self.assertEqual(self.manager.render_prompt("{a}+{b}", {'a': 1, 'b': 2}), "1+2")
+
+
+if __name__ == '__main__':
+    unittest.main()
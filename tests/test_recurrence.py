@@ -0,0 +1,115 @@
+"""
+周期日程展开测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.recurrence import parse_recurrence_weekdays, occurrence_parent_id, ALL_WEEKDAYS
+from src.core.schedule_manager import ScheduleManager, ScheduleType, SchedulePriority
+
+
+class TestParseRecurrence(unittest.TestCase):
+    """测试重复模式解析"""
+
+    def test_patterns(self):
+        self.assertEqual(parse_recurrence_weekdays('每周一、三、五'), {0, 2, 4})
+        self.assertEqual(parse_recurrence_weekdays('星期二和星期四'), {1, 3})
+        self.assertEqual(parse_recurrence_weekdays('工作日'), set(range(5)))
+        self.assertEqual(parse_recurrence_weekdays('周末'), {5, 6})
+        self.assertEqual(parse_recurrence_weekdays('每天'), ALL_WEEKDAYS)
+        self.assertEqual(parse_recurrence_weekdays('', weekday=3), {3})
+        self.assertEqual(parse_recurrence_weekdays('不定期'), set())
+
+
+class TestRecurringExpansion(unittest.TestCase):
+    """测试周期日程在查询和冲突检测中的展开"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.manager = ScheduleManager(DatabaseManager(self.db_path))
+        # 2024-01-15 是周一
+        _, self.course, _ = self.manager.create_schedule(
+            title='英语课', description='', schedule_type=ScheduleType.RECURRING,
+            start_time='2024-01-15T09:00:00', end_time='2024-01-15T11:00:00',
+            weekday=0, recurrence_pattern='每周一、三', check_similarity=False
+        )
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_occurrences_in_range(self):
+        schedules = self.manager.get_schedules_by_time_range('2024-01-15T00:00:00', '2024-01-21T23:59:59')
+        self.assertEqual([s.start_time for s in schedules],
+                         ['2024-01-15T09:00:00', '2024-01-17T09:00:00'])
+        occurrence = schedules[1]
+        self.assertEqual(occurrence.schedule_id, f'{self.course.schedule_id}@2024-01-17')
+        self.assertEqual(occurrence.metadata['occurrence_of'], self.course.schedule_id)
+
+        # 查询两年后的某一周也只展开被访问的日期
+        far = self.manager.get_schedules_by_time_range('2026-03-02T00:00:00', '2026-03-08T23:59:59')
+        self.assertEqual([s.start_time for s in far], ['2026-03-02T09:00:00', '2026-03-04T09:00:00'])
+        self.assertLessEqual(self.manager.index.get_statistics()['recurrence']['cached_days'], 16)
+
+    def test_conflict_with_occurrence(self):
+        has_conflict, conflict = self.manager.check_conflict(
+            '2024-02-07T10:00:00', '2024-02-07T12:00:00', SchedulePriority.HIGH)
+        self.assertTrue(has_conflict)
+        self.assertEqual(conflict.title, '英语课')
+        self.assertFalse(self.manager.check_conflict(
+            '2024-02-08T10:00:00', '2024-02-08T12:00:00', SchedulePriority.HIGH)[0])
+        # 更新周期日程本身时排除其所有实例
+        self.assertFalse(self.manager.check_conflict(
+            '2024-02-07T10:00:00', '2024-02-07T12:00:00', SchedulePriority.HIGH,
+            exclude_schedule_id=self.course.schedule_id)[0])
+
+    def test_delete_stops_expansion(self):
+        self.manager.delete_schedule(self.course.schedule_id)
+        self.assertEqual(self.manager.get_schedules_by_time_range(
+            '2024-01-15T00:00:00', '2024-01-21T23:59:59'), [])
+        self.assertEqual(self.manager.get_free_time_slots('2024-01-17'),
+                         [('2024-01-17T00:00:00', '2024-01-17T23:59:59')])
+
+    def test_listing_without_occurrences(self):
+        """按ID管理日程的界面只列出原始记录"""
+        schedules = self.manager.get_schedules_by_time_range(
+            '2024-01-01T00:00:00', '2024-12-31T23:59:59', queryable_only=False, expand_recurring=False)
+        self.assertEqual([s.schedule_id for s in schedules], [self.course.schedule_id])
+
+    def test_occurrence_ids(self):
+        """重复实例ID映射到原日程，不能单独删除或更新"""
+        occurrence_id = f'{self.course.schedule_id}@2024-01-17'
+        self.assertEqual(occurrence_parent_id(occurrence_id), self.course.schedule_id)
+        self.assertIsNone(occurrence_parent_id(self.course.schedule_id))
+        self.assertEqual(self.manager.get_schedule(occurrence_id).schedule_id, self.course.schedule_id)
+
+        self.assertFalse(self.manager.delete_schedule(occurrence_id))
+        self.assertFalse(self.manager.update_schedule(occurrence_id, title='新标题'))
+        self.assertFalse(self.manager.delete_schedule('missing'))
+        self.assertEqual(self.manager.get_schedule(self.course.schedule_id).title, '英语课')
+        self.assertTrue(self.manager.get_schedule(self.course.schedule_id).is_active)
+
+    def test_similar_occurrence_is_kept(self):
+        """相似判断建议删除重复实例时保留已有日程，不创建新日程"""
+        self.manager.similarity_checker.check_similar_schedules = lambda new, existing: (
+            True, f'{self.course.schedule_id}@2024-01-17', {'reason': '新日程更详细'})
+        success, schedule, message = self.manager.create_schedule(
+            title='英语课（口语）', description='', schedule_type=ScheduleType.TEMPORARY,
+            start_time='2024-01-17T09:00:00', end_time='2024-01-17T11:00:00')
+
+        self.assertFalse(success)
+        self.assertIsNone(schedule)
+        self.assertIn('保留已有日程', message)
+        self.assertTrue(self.manager.get_schedule(self.course.schedule_id).is_active)
+
+
+if __name__ == '__main__':
+    unittest.main()
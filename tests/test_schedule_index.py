@@ -0,0 +1,111 @@
+"""
+日程区间索引测试
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.schedule_index import IntervalTree, overlaps
+from src.core.schedule_manager import ScheduleManager, ScheduleType, SchedulePriority
+
+
+class TestIntervalTree(unittest.TestCase):
+    """测试区间树查询与暴力扫描结果一致"""
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        base = datetime(2024, 1, 15)
+        entries = []
+        for i in range(500):
+            start = base + timedelta(minutes=rng.randrange(0, 24 * 60))
+            end = start + timedelta(minutes=rng.choice([0, 15, 30, 60, 180, 600]))
+            entries.append((start, end, i))
+        tree = IntervalTree(entries)
+
+        for _ in range(200):
+            query_start = base + timedelta(minutes=rng.randrange(-60, 24 * 60))
+            query_end = query_start + timedelta(minutes=rng.randrange(1, 300))
+            expected = sorted(e[2] for e in entries if overlaps(e[0], e[1], query_start, query_end))
+            actual = sorted(e[2] for e in tree.query(query_start, query_end))
+            self.assertEqual(actual, expected)
+
+
+class TestScheduleIndex(unittest.TestCase):
+    """测试日程管理器通过区间索引查询"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.manager = ScheduleManager(self.db)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _create(self, title, start, end, priority=SchedulePriority.MEDIUM):
+        success, schedule, _ = self.manager.create_schedule(
+            title=title, description='', schedule_type=ScheduleType.APPOINTMENT,
+            start_time=start, end_time=end, priority=priority, check_similarity=False
+        )
+        self.assertTrue(success)
+        return schedule
+
+    def test_incremental_updates(self):
+        meeting = self._create('会议', '2024-01-15T10:00:00', '2024-01-15T11:00:00')
+        self.assertEqual(self.manager.index.get_statistics()['schedules'], 1)
+
+        has_conflict, conflict = self.manager.check_conflict(
+            '2024-01-15T10:30:00', '2024-01-15T12:00:00', SchedulePriority.MEDIUM)
+        self.assertTrue(has_conflict)
+        self.assertEqual(conflict.schedule_id, meeting.schedule_id)
+
+        self.manager.update_schedule(meeting.schedule_id, start_time='2024-01-16T10:00:00',
+                                     end_time='2024-01-16T11:00:00')
+        self.assertEqual(self.manager.get_schedules_by_time_range(
+            '2024-01-15T00:00:00', '2024-01-15T23:59:59'), [])
+        moved = self.manager.get_schedules_by_time_range('2024-01-16T00:00:00', '2024-01-16T23:59:59')
+        self.assertEqual([s.title for s in moved], ['会议'])
+
+        self.manager.delete_schedule(meeting.schedule_id)
+        self.assertFalse(self.manager.check_conflict(
+            '2024-01-16T10:00:00', '2024-01-16T11:00:00', SchedulePriority.LOW)[0])
+        self.assertTrue(self.manager.index.get_statistics()['loaded'])
+
+    def test_multi_day_schedule(self):
+        self._create('出差', '2024-01-15T20:00:00', '2024-01-17T09:00:00')
+        for day in ('2024-01-15', '2024-01-16', '2024-01-17'):
+            schedules = self.manager.get_schedules_by_time_range(f'{day}T00:00:00', f'{day}T23:59:59')
+            self.assertEqual(len(schedules), 1, day)
+        self.assertEqual(self.manager.get_free_time_slots('2024-01-16'), [])
+        self.assertEqual(self.manager.get_schedules_by_time_range(
+            '2024-01-18T00:00:00', '2024-01-18T23:59:59'), [])
+
+    def test_external_write_reloads(self):
+        self._create('午饭', '2024-01-15T12:00:00', '2024-01-15T13:00:00')
+        with self.db.get_connection() as conn:
+            conn.execute('UPDATE schedules SET is_queryable = 0')
+        self.assertEqual(self.manager.get_schedules_by_time_range(
+            '2024-01-15T00:00:00', '2024-01-15T23:59:59', queryable_only=True), [])
+        self.assertEqual(len(self.manager.get_schedules_by_time_range(
+            '2024-01-15T00:00:00', '2024-01-15T23:59:59', queryable_only=False)), 1)
+
+    def test_invalid_time_rejected(self):
+        success, schedule, message = self.manager.create_schedule(
+            title='坏数据', description='', schedule_type=ScheduleType.APPOINTMENT,
+            start_time='明天下午', end_time='2024-01-15T13:00:00', check_similarity=False
+        )
+        self.assertFalse(success)
+        self.assertIsNone(schedule)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -323,5 +323,82 @@ class TestScheduleManager(unittest.TestCase):
         self.assertEqual(stats['active'], 3)
 
 
+class TestScheduleIndexedColumns(unittest.TestCase):
+    """可索引时间列、迁移和提升字段测试"""
+
+    def setUp(self):
+        self.test_db_path = "test_schedule_columns.db"
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+        self.db_manager = DatabaseManager(self.test_db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def test_migrates_legacy_rows(self):
+        with self.db_manager.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE schedules (
+                    schedule_id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT,
+                    schedule_type TEXT NOT NULL, priority INTEGER NOT NULL,
+                    start_time TEXT NOT NULL, end_time TEXT NOT NULL, created_at TEXT NOT NULL,
+                    updated_at TEXT, is_active INTEGER DEFAULT 1, collaboration_status TEXT NOT NULL,
+                    is_queryable INTEGER DEFAULT 1, metadata TEXT
+                )
+            ''')
+            conn.execute('''
+                INSERT INTO schedules VALUES ('old', '旧日程', '', 'recurring', 4,
+                    '2024-01-15T09:00:00', '2024-01-15T10:00:00', '2024-01-01T00:00:00', NULL,
+                    1, 'not_required', 1, '{"weekday": 0, "recurrence_pattern": "每周一"}')
+            ''')
+
+        manager = ScheduleManager(self.db_manager)
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute('''
+                SELECT start_epoch, end_epoch, day, recurrence_pattern, weekday
+                FROM schedules WHERE schedule_id = 'old'
+            ''').fetchone()
+        self.assertEqual(row[1] - row[0], 3600)
+        self.assertEqual(row[2], 20240115)
+        self.assertEqual(tuple(row[3:]), ('每周一', 0))
+        self.assertEqual([s.schedule_id for s in manager.find_schedules(recurrence_pattern='每周一')], ['old'])
+
+    def test_promoted_fields_and_sargable_queries(self):
+        manager = ScheduleManager(self.db_manager)
+        _, walk, _ = manager.create_schedule(
+            title="散步", description="", schedule_type=ScheduleType.TEMPORARY,
+            start_time="2024-01-15T18:00:00", end_time="2024-01-15T19:00:00",
+            involves_user=True, check_similarity=False
+        )
+        _, trip, _ = manager.create_schedule(
+            title="旅行", description="", schedule_type=ScheduleType.APPOINTMENT,
+            start_time="2024-01-10T08:00:00", end_time="2024-01-20T20:00:00", check_similarity=False
+        )
+        manager.delete_schedule(trip.schedule_id)
+
+        involved = manager.find_schedules(date="2024-01-15", involves_user=True)
+        self.assertEqual([s.schedule_id for s in involved], [walk.schedule_id])
+        self.assertEqual(manager.find_schedules(date="2024-01-16"), [])
+
+        # 包含未激活日程时走SQL区间查询，跨度很长的旧日程也能查到
+        all_schedules = manager.get_schedules_by_time_range(
+            "2024-01-15T00:00:00", "2024-01-15T23:59:59", queryable_only=False,
+            active_only=False, include_inactive=True)
+        self.assertEqual([s.title for s in all_schedules], ["旅行", "散步"])
+
+        manager.update_schedule(walk.schedule_id, start_time="2024-01-16T18:00:00",
+                                end_time="2024-01-16T19:00:00")
+        self.assertEqual([s.title for s in manager.find_schedules(date="2024-01-16")], ["散步"])
+
+    def test_metadata_decoded_lazily(self):
+        schedule = ScheduleManager._row_to_schedule(
+            ('id', '标题', '', 'temporary', 1, '2024-01-15T09:00:00', '2024-01-15T10:00:00',
+             '2024-01-01T00:00:00', None, 1, 'not_required', 1, '{"involves_user": true}'))
+        self.assertIsNone(schedule._metadata)
+        self.assertTrue(schedule.metadata['involves_user'])
+        self.assertEqual(schedule.to_dict()['metadata'], {'involves_user': True})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,126 @@
+"""
+临时日程后台预生成测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.schedule_generator import TemporaryScheduleGenerator, TemporarySchedulePlanner
+from src.core.schedule_manager import ScheduleManager, ScheduleType, SchedulePriority
+
+
+class FakeGenerator(TemporaryScheduleGenerator):
+    """不调用LLM的临时日程生成器，可阻塞以模拟耗时生成"""
+
+    def __init__(self, schedule_manager):
+        super().__init__(schedule_manager=schedule_manager)
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def generate_temporary_schedules(self, date, character_name="智能体", character_info=None, context=""):
+        self.calls.append(date)
+        self.started.set()
+        self.release.wait(5)
+        success, schedule, _ = self.schedule_manager.create_schedule(
+            title='阅读时光', description='', schedule_type=ScheduleType.TEMPORARY,
+            start_time=f'{date}T09:00:00', end_time=f'{date}T10:00:00',
+            priority=SchedulePriority.LOW, check_similarity=False
+        )
+        return [schedule.to_dict()] if success else []
+
+
+class TestTemporarySchedulePlanner(unittest.TestCase):
+    """测试后台规划器的预生成、等待和前台退回"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.manager = ScheduleManager(DatabaseManager(self.db_path))
+        self.generator = FakeGenerator(self.manager)
+        self.planner = TemporarySchedulePlanner(self.generator, days_ahead=2, idle_seconds=0,
+                                                interval_seconds=60, wait_seconds=5)
+        self.today = datetime.now().date()
+
+    def tearDown(self):
+        self.generator.release.set()
+        self.planner.stop(timeout=5)
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_prefetch_window(self):
+        self.assertEqual(self.planner.prefetch(), 3)
+        expected = [(self.today + timedelta(days=i)).isoformat() for i in range(3)]
+        self.assertEqual(self.generator.calls, expected)
+
+        # 已有临时日程的日期不再生成，查询路径只读取
+        self.assertEqual(self.planner.prefetch(), 0)
+        self.assertEqual(self.planner.ensure_schedules(expected[1]), [])
+        self.assertEqual(len(self.generator.calls), 3)
+
+    def test_empty_result_not_retried_in_background(self):
+        self.generator.generate_temporary_schedules = lambda date, **kwargs: self.generator.calls.append(date) or []
+        self.assertEqual(self.planner.prefetch(), 0)
+        self.assertEqual(self.planner.prefetch(), 0)
+        self.assertEqual(len(self.generator.calls), 3)
+
+        # 用户查询时仍在前台重新生成
+        self.assertEqual(self.planner.ensure_schedules(self.today.isoformat()), [])
+        self.assertEqual(len(self.generator.calls), 4)
+        self.assertEqual(self.planner.get_statistics()['foreground_days'], 0)
+
+        # 日程表变化后（如用户删除了日程）后台重新尝试
+        success, schedule, _ = self.manager.create_schedule(
+            title='看牙', description='', schedule_type=ScheduleType.APPOINTMENT,
+            start_time=f'{self.today.isoformat()}T15:00:00', end_time=f'{self.today.isoformat()}T16:00:00',
+            priority=SchedulePriority.MEDIUM, check_similarity=False
+        )
+        self.assertTrue(success)
+        self.assertTrue(self.manager.delete_schedule(schedule.schedule_id))
+        self.assertEqual(self.planner.prefetch(), 0)
+        self.assertEqual(len(self.generator.calls), 7)
+
+    def test_query_waits_for_background_generation(self):
+        today = self.today.isoformat()
+        self.generator.release.clear()
+        self.planner.start()
+        self.assertTrue(self.generator.started.wait(5))
+
+        threading.Timer(0.1, self.generator.release.set).start()
+        started = time.monotonic()
+        self.assertEqual(self.planner.ensure_schedules(today), [])
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(self.planner.has_temporary_schedules(today))
+        self.assertEqual(self.generator.calls.count(today), 1)
+        self.assertEqual(self.planner.get_statistics()['waits'], 1)
+
+    def test_wait_timeout_does_not_block(self):
+        today = self.today.isoformat()
+        self.planner.wait_seconds = 0.05
+        self.generator.release.clear()
+        self.planner.start()
+        self.assertTrue(self.generator.started.wait(5))
+
+        self.assertEqual(self.planner.ensure_schedules(today), [])
+        self.assertEqual(self.planner.get_statistics()['wait_timeouts'], 1)
+
+    def test_foreground_fallback_outside_window(self):
+        far_date = (self.today + timedelta(days=30)).isoformat()
+        generated = self.planner.ensure_schedules(far_date)
+        self.assertEqual(len(generated), 1)
+        self.assertEqual(self.generator.calls, [far_date])
+        self.assertEqual(self.planner.get_statistics()['foreground_days'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+日程提醒引擎测试
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.database_manager import DatabaseManager
+from src.core.event_manager import EventManager, EventType
+from src.core.schedule_manager import ScheduleManager, ScheduleType, SchedulePriority
+from src.core.schedule_reminder import TimerWheel, ScheduleReminderEngine
+
+
+class TestTimerWheel(unittest.TestCase):
+    """测试分层时间轮（含级联和溢出表）与逐个比较的结果一致"""
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        wheel = TimerWheel(tick_seconds=1.0, slot_bits=3, levels=3, now=1000)
+        expected = {}
+        for i in range(400):
+            when = 1000 + rng.uniform(0, 3000)
+            wheel.schedule(i, when, i)
+            expected[i] = when
+        for i in rng.sample(range(400), 50):
+            self.assertTrue(wheel.cancel(i))
+            del expected[i]
+        self.assertEqual(len(wheel), 350)
+
+        now = 1000
+        fired = {}
+        while now < 4100:
+            previous, now = now, now + rng.randint(1, 40)
+            for key, payload in wheel.advance(now):
+                self.assertEqual(key, payload)
+                fired[key] = (previous, now)
+
+        self.assertEqual(set(fired), set(expected))
+        for key, (previous, now) in fired.items():
+            # 在推进范围首次覆盖到期刻度时触发
+            self.assertTrue(previous < math.ceil(expected[key]) <= now, key)
+        self.assertEqual(len(wheel), 0)
+
+
+class TestScheduleReminderEngine(unittest.TestCase):
+    """测试日程提醒在提前量到达时生成通知事件，并随日程写入更新"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.schedules = ScheduleManager(self.db)
+        self.events = EventManager(self.db)
+        self.engine = ScheduleReminderEngine(self.schedules, self.events, lead_minutes=[15, 0],
+                                             horizon_hours=24, tick_seconds=60)
+        self.now = datetime(2024, 1, 15, 9, 0)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _create(self, title, start, minutes=60, **kwargs):
+        success, schedule, _ = self.schedules.create_schedule(
+            title=title, description='', start_time=start.isoformat(),
+            end_time=(start + timedelta(minutes=minutes)).isoformat(),
+            priority=SchedulePriority.HIGH, check_similarity=False,
+            **dict({'schedule_type': ScheduleType.APPOINTMENT}, **kwargs)
+        )
+        self.assertTrue(success)
+        return schedule
+
+    def _tick(self, minutes):
+        return [event.title for event in self.engine.tick(self.now + timedelta(minutes=minutes))]
+
+    def test_lead_times(self):
+        self._create('会议', self.now + timedelta(minutes=30))
+        self.assertEqual(self._tick(0), [])
+        self.assertEqual(self._tick(14), [])
+        self.assertEqual(self._tick(15), ['日程提醒：会议'])
+        self.assertEqual(self._tick(29), [])
+        self.assertEqual(self._tick(30), ['日程提醒：会议'])
+
+        events = self.events.get_all_events(event_type=EventType.NOTIFICATION)
+        self.assertEqual(len(events), 2)
+        descriptions = ' '.join(e.description for e in events)
+        self.assertIn('15分钟后开始', descriptions)
+        self.assertIn('现在开始', descriptions)
+
+    def test_temporary_skipped_and_callback(self):
+        submitted = []
+        self.engine.on_event = lambda event: submitted.append(event.event_id)
+        self._create('会议', self.now + timedelta(minutes=30))
+        self._create('随手安排', self.now + timedelta(hours=2), schedule_type=ScheduleType.TEMPORARY)
+        self.assertEqual(self._tick(0), [])
+        self.assertEqual(self._tick(15), ['日程提醒：会议'])
+        self.assertEqual(self._tick(30), ['日程提醒：会议'])
+        self.assertEqual(self._tick(180), [])
+        self.assertEqual(len(submitted), 2)
+        self.assertIsNotNone(self.events.get_event(submitted[0]))
+
+    def test_updates_follow_schedule_writes(self):
+        self._tick(0)
+        meeting = self._create('会议', self.now + timedelta(minutes=30))
+        lunch = self._create('午饭', self.now + timedelta(hours=3))
+        self.assertEqual(self.engine.get_statistics()['pending_timers'], 4)
+        self.assertEqual(self.engine.get_statistics()['reloads'], 1)
+
+        # 改期后原提醒时间不再触发
+        self.schedules.update_schedule(meeting.schedule_id,
+                                       start_time=(self.now + timedelta(hours=2)).isoformat(),
+                                       end_time=(self.now + timedelta(hours=3)).isoformat())
+        self.schedules.delete_schedule(lunch.schedule_id)
+        self.assertEqual(self._tick(30), [])
+        self.assertEqual(self._tick(105), ['日程提醒：会议'])
+        self.assertEqual(self._tick(200), ['日程提醒：会议'])
+        self.assertEqual(self.engine.get_statistics()['reloads'], 1)
+
+    def test_external_write_reloads(self):
+        self._tick(0)
+        self._create('会议', self.now + timedelta(minutes=30))
+        with self.db.get_connection() as conn:
+            conn.execute('UPDATE schedules SET is_active = 0')
+        self.assertEqual(self._tick(20), [])
+        self.assertEqual(self._tick(40), [])
+        self.assertEqual(self.engine.get_statistics()['reloads'], 2)
+
+    def test_recurring_occurrences_and_horizon(self):
+        # 每天 9:30 的周期日程：窗口向后扩展后也能提醒之后几天的实例
+        self._create('晨会', self.now + timedelta(minutes=30), minutes=30,
+                     schedule_type=ScheduleType.RECURRING, recurrence_pattern='每天')
+        fired = []
+        for minutes in range(0, 3 * 24 * 60, 60):
+            fired.extend(self._tick(minutes))
+        self.assertEqual(fired.count('日程提醒：晨会'), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import sys
 import os
 import unittest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -130,6 +131,70 @@ class TestScheduleSimilarity(unittest.TestCase):
         self.assertIn("2024-01-15T10:00:00", formatted)
 
 
+class TestSimilarityPrefilterAndBatch(unittest.TestCase):
+    """测试本地预过滤与LLM批量判断"""
+
+    def setUp(self):
+        self.checker = ScheduleSimilarityChecker()
+        self.new_schedule = {
+            'title': '项目讨论会', 'description': '关于项目进度的会议',
+            'start_time': '2024-01-15T14:00:00', 'end_time': '2024-01-15T15:00:00'
+        }
+        self.existing = [
+            {'schedule_id': 'run', 'title': '晨跑', 'description': '早上跑步锻炼',
+             'start_time': '2024-01-15T06:00:00', 'end_time': '2024-01-15T07:00:00'},
+            {'schedule_id': 'meeting', 'title': '团队会议', 'description': '讨论项目进度',
+             'start_time': '2024-01-15T10:00:00', 'end_time': '2024-01-15T11:00:00'},
+            {'schedule_id': 'tea', 'title': '喝下午茶', 'description': '',
+             'start_time': '2024-01-15T14:00:00', 'end_time': '2024-01-15T15:00:00'},
+        ]
+
+    def test_prefilter_drops_unrelated(self):
+        candidates = self.checker.prefilter_candidates(self.new_schedule, self.existing)
+        # 文本相关的会议排在前面，时间完全重叠的下午茶也保留，晨跑被排除
+        self.assertEqual([c['schedule_id'] for c in candidates], ['meeting', 'tea'])
+
+    def test_single_batched_call(self):
+        verdicts = {'results': [
+            {'index': 2, 'is_similar': False, 'keep_schedule': 'none', 'reason': '不同活动'},
+            {'index': 1, 'is_similar': True, 'keep_schedule': 'new', 'reason': '同一个会议'},
+        ]}
+        with patch.object(self.checker, '_call_llm', return_value=verdicts) as call_llm:
+            has_similar, to_delete, result = self.checker.check_similar_schedules(
+                self.new_schedule, self.existing)
+        self.assertEqual(call_llm.call_count, 1)
+        self.assertTrue(has_similar)
+        self.assertEqual(to_delete, 'meeting')
+        self.assertEqual(result['reason'], '同一个会议')
+
+    def test_large_batches_are_split(self):
+        existing = [dict(self.existing[1], schedule_id=f'meeting{i}') for i in range(7)]
+        with patch.object(self.checker, '_call_llm', return_value={'results': [
+            {'index': i, 'is_similar': False, 'keep_schedule': 'none'} for i in range(1, 6)
+        ]}) as call_llm:
+            result = self.checker.check_similar_schedules(self.new_schedule, existing)
+        self.assertEqual(result, (False, None, None))
+        self.assertEqual(call_llm.call_count, 2)
+        self.assertEqual(call_llm.call_args_list[0].kwargs['max_tokens'], 1000)
+
+    def test_unparsable_batch_falls_back_per_candidate(self):
+        single = {'is_similar': True, 'keep_schedule': 'existing', 'reason': '同一个会议'}
+        with patch.object(self.checker, '_call_llm', side_effect=[None, {'is_similar': False, 'keep_schedule': 'none'},
+                                                                  single]) as call_llm:
+            has_similar, to_delete, result = self.checker.check_similar_schedules(
+                self.new_schedule, self.existing)
+        self.assertEqual(call_llm.call_count, 3)
+        self.assertTrue(has_similar)
+        self.assertIsNone(to_delete)
+        self.assertEqual(result, single)
+
+    def test_no_llm_call_without_candidates(self):
+        with patch.object(self.checker, '_call_llm') as call_llm:
+            result = self.checker.check_similar_schedules(self.new_schedule, self.existing[:1])
+        call_llm.assert_not_called()
+        self.assertEqual(result, (False, None, None))
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("测试日程相似度检查功能")
@@ -0,0 +1,73 @@
+"""
+文本指纹模块测试
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.text_fingerprint import (
+    compute_fingerprint, fingerprint_similarity, is_near_duplicate, normalize_text
+)
+
+
+class TestTextFingerprint(unittest.TestCase):
+    """测试文本指纹"""
+
+    def test_fingerprint_is_stable(self):
+        """测试指纹确定且长度固定"""
+        self.assertEqual(compute_fingerprint('喜欢猫'), compute_fingerprint('喜欢猫'))
+        self.assertEqual(len(compute_fingerprint('喜欢猫')), len(compute_fingerprint('一段更长的文本内容')))
+
+    def test_normalize_text(self):
+        """测试去除程度副词、语气词和标点"""
+        self.assertEqual(normalize_text('非常喜欢历史！'), '喜欢历史')
+
+    def test_similarity(self):
+        """测试相似文本的相似度高于无关文本"""
+        base = compute_fingerprint('喜欢猫')
+        self.assertGreater(
+            fingerprint_similarity(base, compute_fingerprint('很喜欢猫咪')),
+            fingerprint_similarity(base, compute_fingerprint('在上海工作'))
+        )
+        self.assertEqual(fingerprint_similarity(base, None), 0.0)
+
+    def test_near_duplicate(self):
+        """测试近似重复判定"""
+        self.assertTrue(is_near_duplicate('喜欢猫', '很喜欢猫咪'))
+        self.assertTrue(is_near_duplicate('喜欢历史', '特别喜欢历史！'))
+        self.assertFalse(is_near_duplicate('喜欢猫', '喜欢狗'))
+
+    def test_negation_and_numbers_are_guarded(self):
+        """测试否定词和数字不一致时不视为重复"""
+        self.assertFalse(is_near_duplicate('喜欢猫', '不喜欢猫'))
+        self.assertFalse(is_near_duplicate('生日是3月5日', '生日是5月3日'))
+        self.assertFalse(is_near_duplicate('生日是五月三日', '生日是五月四日'))
+
+    def test_different_content_is_guarded(self):
+        """测试名字、对象等内容被替换时不视为重复"""
+        self.assertFalse(is_near_duplicate('妹妹叫小红', '妹妹叫小明'))
+        self.assertFalse(is_near_duplicate('最喜欢的颜色是红色', '最喜欢的颜色是蓝色'))
+        self.assertFalse(is_near_duplicate('住在地铁站附近', '住在铁站附近'))
+        self.assertTrue(is_near_duplicate('周末经常去公园跑步锻炼身体', '周末经常去附近的公园跑步锻炼身体'))
+
+    def test_added_content_is_guarded(self):
+        """测试只多出实词的信息（新增对象、限定或时态）不视为重复"""
+        for text_a, text_b in [('喜欢猫', '喜欢猫狗'), ('喜欢吃鱼', '喜欢吃鱼头'), ('在上海工作', '在上海工作过'),
+                               ('最喜欢的颜色是红色', '最喜欢的颜色是红色和蓝色')]:
+            self.assertFalse(is_near_duplicate(text_a, text_b), (text_a, text_b))
+        self.assertTrue(is_near_duplicate('住在北京', '住在北京市'))
+        self.assertTrue(is_near_duplicate('喜欢猫', '喜欢猫了'))
+
+    def test_normalize_keeps_word_characters(self):
+        """测试实词中的字不会被当作语气词移除"""
+        self.assertNotEqual(normalize_text('住在地铁站附近'), normalize_text('住在铁站附近'))
+        self.assertEqual(normalize_text('喜欢晒太阳'), '喜欢晒太阳')
+        self.assertEqual(normalize_text('很喜欢猫呀！'), '喜欢猫')
+
+
+if __name__ == '__main__':
+    unittest.main()